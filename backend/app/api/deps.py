@@ -1,10 +1,40 @@
 """Dependency injection for FastAPI routes."""
 
+import hmac
+
+from fastapi import Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.exceptions import AdminAuthError, ProfilingDisabledError, VectorServiceAuthError
 from app.models.database import get_session
 
 
 async def get_db() -> AsyncSession:
     async for session in get_session():
         yield session
+
+
+async def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """Reject the request unless it carries the configured admin token."""
+    if not settings.admin_token or not x_admin_token:
+        raise AdminAuthError()
+    if not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise AdminAuthError()
+
+
+async def require_profiling() -> None:
+    if not settings.profiling_enabled:
+        raise ProfilingDisabledError()
+
+
+async def require_vector_service_token(
+    x_vector_service_token: str | None = Header(default=None),
+) -> None:
+    """Reject vector service calls without the shared token, when one is configured."""
+    if not settings.vector_service_token:
+        return
+    if not x_vector_service_token or not hmac.compare_digest(
+        x_vector_service_token, settings.vector_service_token
+    ):
+        raise VectorServiceAuthError()
@@ -0,0 +1,152 @@
+"""Admin endpoints — guarded by the X-Admin-Token header."""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.api.deps import require_admin, require_profiling
+from app.config import settings
+from app.core.exceptions import ProfileNotFoundError
+from app.core.logging import get_logger
+from app.core.profiling import (
+    Profile,
+    SamplingProfiler,
+    memory_snapshot,
+    profile_store,
+    start_memory_tracing,
+    stop_memory_tracing,
+)
+from app.models.schemas import CompactionReport
+from app.services.compaction import compact
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+def _profile_download(profile: Profile, fmt: str) -> Response:
+    """Return a profile as a downloadable collapsed-stack or speedscope file."""
+    if fmt == "speedscope":
+        return Response(
+            content=json.dumps(profile.to_speedscope()),
+            media_type="application/json",
+            headers={
+                "Content-Disposition": f'attachment; filename="{profile.id}.speedscope.json"'
+            },
+        )
+    return PlainTextResponse(
+        profile.to_collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{profile.id}.collapsed.txt"'},
+    )
+
+
+# ── Profiling ──────────────────────────────────────────
+
+@router.get(
+    "/profiles",
+    dependencies=[Depends(require_profiling)],
+    summary="List recent profiles",
+)
+async def list_profiles():
+    """Profiles captured via the X-Profile request header or the CPU endpoint."""
+    return {"profiles": [p.summary() for p in profile_store.list()]}
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    dependencies=[Depends(require_profiling)],
+    summary="Download a profile",
+)
+async def download_profile(
+    profile_id: str,
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise ProfileNotFoundError(profile_id)
+    return _profile_download(profile, format)
+
+
+@router.post(
+    "/profile/cpu",
+    dependencies=[Depends(require_profiling)],
+    summary="Capture a time-boxed CPU profile of every thread",
+)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+):
+    """Sample all threads for the given duration, then return the profile."""
+    seconds = min(seconds, settings.profiling_max_seconds)
+    profiler = SamplingProfiler(
+        kind="process",
+        label=f"process ({seconds:g}s)",
+        interval=settings.profiling_interval_ms / 1000,
+    ).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = profiler.stop()
+        profile_store.add(profile)
+    logger.info("process_profiled", profile_id=profile.id, samples=profile.samples)
+    return _profile_download(profile, format)
+
+
+@router.post(
+    "/profile/memory/start",
+    dependencies=[Depends(require_profiling)],
+    summary="Start tracemalloc",
+)
+async def memory_start(frames: int = Query(settings.profiling_tracemalloc_frames, ge=1, le=100)):
+    started = start_memory_tracing(frames)
+    return {"tracing": True, "started": started}
+
+
+@router.post(
+    "/profile/memory/stop",
+    dependencies=[Depends(require_profiling)],
+    summary="Stop tracemalloc",
+)
+async def memory_stop():
+    stopped = stop_memory_tracing()
+    return {"tracing": False, "stopped": stopped}
+
+
+@router.get(
+    "/profile/memory",
+    dependencies=[Depends(require_profiling)],
+    summary="Snapshot top memory allocators",
+)
+async def memory_report(
+    top: int = Query(25, ge=1, le=500),
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+):
+    """Top allocation sites since tracemalloc was started.
+
+    Starts tracemalloc on first use, so the first snapshot only covers
+    allocations made after this call.
+    """
+    if start_memory_tracing(settings.profiling_tracemalloc_frames):
+        return {"tracing": True, "started": True, "top_allocators": []}
+
+    report, collapsed = await asyncio.to_thread(memory_snapshot, top)
+    if format == "collapsed":
+        return PlainTextResponse(
+            collapsed,
+            headers={"Content-Disposition": 'attachment; filename="memory.collapsed.txt"'},
+        )
+    return report
+
+
+# ── Storage ────────────────────────────────────────────
+
+@router.post(
+    "/compact",
+    response_model=CompactionReport,
+    summary="Purge tombstones and reconcile storage now",
+)
+async def run_compaction():
+    """Run the periodic compaction pass on demand and report what it removed."""
+    return await compact()
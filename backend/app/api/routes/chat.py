@@ -2,64 +2,119 @@
 
 import json
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
-from app.api.deps import get_db
-from app.core.exceptions import NoDocumentsError
+from app.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import GenerationQueueTimeoutError, NoDocumentsError
 from app.core.logging import get_logger
-from app.models.database import Document
-from app.models.schemas import ChatRequest, SourceChunk
+from app.core.metrics import CHAT_REQUESTS, CHAT_STAGE_TIMEOUTS, SSE_BYTES_SENT
+from app.models.schemas import (
+    ChatRequest,
+    ChatSessionCreate,
+    ChatSessionResponse,
+    ChatTurnResponse,
+    SourceChunk,
+)
+from app.services.chat_sessions import chat_sessions
+from app.services.corpus_stats import corpus_stats
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
 
-def _sse_event(event: str, data: dict) -> str:
-    """Format a single SSE event."""
-    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+def _sse_event(event: str, data: dict) -> bytes:
+    """Format a single SSE event, counting its size toward the bytes-sent metric."""
+    payload = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+    SSE_BYTES_SENT.inc(len(payload))
+    return payload
 
 
 @router.post("/chat", summary="Chat with your documents (SSE stream)")
-async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
-    """RAG-powered chat that streams tokens via Server-Sent Events."""
+async def chat(request: ChatRequest):
+    """RAG-powered chat that streams tokens via Server-Sent Events.
+
+    The answer stops when the request's deadline passes; the ``sources`` event then
+    has ``truncated`` set (see rag.query for the other fallbacks).
+    """
+    budgets = [b for b in (settings.chat_deadline_s, request.deadline_s) if b]
+    deadline = Deadline(min(budgets) if budgets else None)
+
     # Verify at least one ready document exists
-    result = await db.execute(
-        select(func.count()).where(Document.status == "ready")
-    )
-    doc_count = result.scalar() or 0
-    if doc_count == 0:
+    if corpus_stats.ready_documents == 0:
         raise NoDocumentsError()
 
+    from app.services.admission import admission_controller
     from app.services.llm import get_llm_client
     from app.services.rag import query as rag_query
 
     llm_client = get_llm_client()
 
+    # A session supplies its own bounded history; resent chat_history is the stateless path
+    session = None
+    tenant_id = request.tenant_id
+    if request.session_id:
+        session = await chat_sessions.load(request.session_id, request.tenant_id)
+        chat_history = session.history()
+        tenant_id = session.tenant_id
+    else:
+        chat_history = [msg.model_dump() for msg in request.chat_history]
+
+    # Fails fast with 429/503 before any provider call when generation capacity is exhausted
+    try:
+        ticket = await admission_controller.acquire(timeout=deadline.timeout())
+    except GenerationQueueTimeoutError:
+        if deadline.expired:
+            CHAT_STAGE_TIMEOUTS.labels(stage="admission").inc()
+        raise
+
     async def event_stream():
+        answer = []
+        truncated = False
         try:
             async for event in rag_query(
                 question=request.question,
-                chat_history=[msg.model_dump() for msg in request.chat_history],
+                chat_history=chat_history,
                 llm_client=llm_client,
+                tenant_id=tenant_id,
+                retrieval_cache=session.retrieval if session else None,
+                deadline=deadline,
             ):
                 if event["type"] == "token":
+                    answer.append(event["token"])
                     yield _sse_event("token", {"token": event["token"]})
                 elif event["type"] == "sources":
                     sources = [
                         SourceChunk(**s).model_dump() for s in event["sources"]
                     ]
-                    yield _sse_event("sources", {"sources": sources})
+                    truncated = event["truncated"]
+                    yield _sse_event(
+                        "sources",
+                        {
+                            "sources": sources,
+                            "truncated": truncated,
+                            "degraded": event["degraded"],
+                        },
+                    )
 
+            if session is not None:
+                # Before "done", so the client's next turn already sees this one
+                await chat_sessions.append_turn(session, request.question, "".join(answer))
             yield _sse_event("done", {})
+            CHAT_REQUESTS.labels(outcome="truncated" if truncated else "ok").inc()
 
         except Exception as e:
             logger.error("chat_stream_error", error=str(e))
+            CHAT_REQUESTS.labels(outcome="error").inc()
             yield _sse_event("error", {"detail": str(e)})
 
+        finally:
+            ticket.release()
+
+    # The background release covers streams that are never iterated (early disconnect)
     return StreamingResponse(
         event_stream(),
         media_type="text/event-stream",
@@ -68,4 +123,40 @@ async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         },
+        background=BackgroundTask(ticket.release),
+    )
+
+
+@router.post(
+    "/chat/sessions",
+    response_model=ChatSessionResponse,
+    status_code=201,
+    summary="Start a server-side chat session",
+)
+async def create_chat_session(request: ChatSessionCreate):
+    row = await chat_sessions.create(request.tenant_id or settings.default_tenant)
+    return ChatSessionResponse(
+        session_id=row.id, tenant_id=row.tenant_id, turn_count=0, created_at=row.created_at
     )
+
+
+@router.get(
+    "/chat/sessions/{session_id}",
+    response_model=ChatSessionResponse,
+    summary="Get a chat session's transcript",
+)
+async def get_chat_session(session_id: str):
+    row, turns = await chat_sessions.turns(session_id)
+    return ChatSessionResponse(
+        session_id=row.id,
+        tenant_id=row.tenant_id,
+        turn_count=row.turn_count,
+        created_at=row.created_at,
+        turns=[ChatTurnResponse.model_validate(turn) for turn in turns],
+    )
+
+
+@router.delete("/chat/sessions/{session_id}", status_code=204, summary="Delete a chat session")
+async def delete_chat_session(session_id: str):
+    await chat_sessions.delete(session_id)
+    return Response(status_code=204)
@@ -1,44 +1,158 @@
 """Document CRUD endpoints."""
 
+import asyncio
+import base64
+import binascii
+import json
+import time
 import uuid
+from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Header, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
 from app.config import settings
-from app.core.exceptions import DocumentNotFoundError, FileTooLargeError, UnsupportedFileTypeError
+from app.core.exceptions import (
+    BulkDeleteTooLargeError,
+    DocumentNotFoundError,
+    FileTooLargeError,
+    InvalidCursorError,
+    UnsupportedFileTypeError,
+)
 from app.core.logging import get_logger
+from app.core.metrics import DOCUMENT_EVENT_STREAMS, SSE_BYTES_SENT
 from app.models.database import Document, async_session
 from app.models.schemas import (
+    TENANT_ID_PATTERN,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
     DocumentDeleteResponse,
     DocumentDetail,
     DocumentListResponse,
+    DocumentStatus,
     DocumentUploadResponse,
+    IngestionPriority,
 )
+from app.services.compaction import purge_tombstoned, tombstone_documents
+from app.services.document_events import DocumentEvent, document_events
+from app.services.ingestion_scheduler import ingestion_scheduler
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/documents")
 
+# Columns returned by the list endpoint — selected directly so rows skip ORM hydration
+_LIST_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.tenant_id,
+    Document.file_size,
+    Document.status,
+    Document.chunk_count,
+    Document.error_message,
+    Document.created_at,
+    Document.updated_at,
+)
 
-async def _run_processing(document_id: str, file_path: str):
-    """Background task: process a document with its own DB session."""
-    async with async_session() as db:
+# Columns a status stream needs for its snapshot and heartbeat recheck
+_STATUS_COLUMNS = (
+    Document.id,
+    Document.tenant_id,
+    Document.status,
+    Document.chunk_count,
+    Document.error_message,
+)
+
+# Client reconnect delay sent at the start of every status stream
+_SSE_RETRY_MS = 3000
+
+
+def _encode_cursor(created_at: datetime, document_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{document_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, document_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), document_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError() from None
+
+
+async def _run_processing(
+    document_id: str, file_path: str, tenant_id: str, priority: IngestionPriority
+):
+    """Background task: wait for an ingestion worker, then process the document with
+    its own DB session.
+    """
+    ticket = await ingestion_scheduler.acquire(document_id, tenant_id, priority)
+    async with ticket, async_session() as db:
+        # Deleted, or failed by compaction's stale sweep, while it was queued
+        status = await db.scalar(select(Document.status).where(Document.id == document_id))
+        if status != "processing":
+            logger.info("processing_skipped", document_id=document_id, status=status)
+            return
         try:
             from app.services.document_processor import process_document
 
             await process_document(document_id, file_path, db)
         except Exception as e:
             logger.error("background_processing_failed", document_id=document_id, error=str(e))
-            result = await db.execute(select(Document).where(Document.id == document_id))
-            doc = result.scalar_one_or_none()
-            if doc:
-                doc.status = "failed"
-                doc.error_message = str(e)
-                await db.commit()
+            await db.rollback()
+            await db.execute(
+                update(Document)
+                .where(Document.id == document_id, Document.status == "processing")
+                .values(status="failed", error_message=str(e))
+            )
+            await db.commit()
+
+
+async def start_ingestion(
+    db: AsyncSession,
+    background_tasks: BackgroundTasks,
+    document_id: str,
+    filename: str,
+    tenant_id: str,
+    file_path: Path,
+    priority: IngestionPriority | None = None,
+) -> Document:
+    """Record an uploaded file as a processing document and queue its ingestion.
+
+    Without an explicit ``priority`` the upload is interactive, or bulk when the
+    tenant already has several documents queued (see ingestion_scheduler).
+    """
+    doc = Document(
+        id=document_id,
+        filename=filename,
+        tenant_id=tenant_id,
+        file_size=file_path.stat().st_size,
+        status="processing",
+    )
+    db.add(doc)
+    await db.commit()
+    await db.refresh(doc)
+
+    priority = ingestion_scheduler.classify(doc.tenant_id, priority)
+    logger.info(
+        "document_uploaded",
+        document_id=document_id,
+        filename=filename,
+        tenant_id=doc.tenant_id,
+        size=doc.file_size,
+        priority=priority.value,
+    )
+
+    document_events.publish(document_id, doc.tenant_id, "processing", "queued")
+    background_tasks.add_task(
+        _run_processing, document_id, str(file_path), doc.tenant_id, priority
+    )
+    return doc
 
 
 @router.post(
@@ -50,9 +164,15 @@ async def _run_processing(document_id: str, file_path: str):
 async def upload_document(
     file: UploadFile,
     background_tasks: BackgroundTasks,
+    tenant_id: str | None = Form(None, pattern=TENANT_ID_PATTERN),
+    priority: IngestionPriority | None = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Upload a file for processing into the knowledge base."""
+    """Upload a file for processing into the tenant's shard of the knowledge base.
+
+    ``priority`` picks the ingestion lane; by default it is chosen from the tenant's
+    queued uploads.
+    """
     filename = file.filename or "unknown"
     ext = Path(filename).suffix.lower()
 
@@ -70,38 +190,201 @@ async def upload_document(
     file_path.parent.mkdir(parents=True, exist_ok=True)
     file_path.write_bytes(content)
 
-    doc = Document(
-        id=document_id,
-        filename=filename,
-        file_size=len(content),
-        status="processing",
+    doc = await start_ingestion(
+        db,
+        background_tasks,
+        document_id,
+        filename,
+        tenant_id or settings.default_tenant,
+        file_path,
+        priority,
     )
-    db.add(doc)
-    await db.commit()
-    await db.refresh(doc)
-
-    logger.info("document_uploaded", document_id=document_id, filename=filename, size=len(content))
-
-    background_tasks.add_task(_run_processing, document_id, str(file_path))
-
     return DocumentUploadResponse.model_validate(doc)
 
 
 @router.get(
     "",
     response_model=DocumentListResponse,
-    summary="List all documents",
+    summary="List documents (cursor-paginated)",
 )
-async def list_documents(db: AsyncSession = Depends(get_db)):
-    """Return all documents ordered by creation date descending."""
-    result = await db.execute(select(Document).order_by(Document.created_at.desc()))
-    documents = result.scalars().all()
-    return DocumentListResponse(
-        documents=[DocumentDetail.model_validate(d) for d in documents],
-        total=len(documents),
+async def list_documents(
+    limit: int = Query(settings.document_page_size, ge=1, le=settings.document_page_size_max),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    status: DocumentStatus | None = None,
+    filename_prefix: str | None = Query(None, min_length=1, max_length=255),
+    tenant_id: str | None = Query(None, pattern=TENANT_ID_PATTERN),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return documents newest first, one keyset page at a time.
+
+    Pages are keyed on (created_at, id), so each page is an index range scan no
+    matter how deep the client has paged. ``total`` counts every match.
+    """
+    filters = []
+    if status is not None:
+        filters.append(Document.status == status.value)
+    else:
+        filters.append(Document.status != DocumentStatus.deleting.value)
+    if tenant_id is not None:
+        filters.append(Document.tenant_id == tenant_id)
+    if filename_prefix:
+        escaped = (
+            filename_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        filters.append(Document.filename.like(f"{escaped}%", escape="\\"))
+
+    page_query = select(*_LIST_COLUMNS).where(*filters)
+    if cursor:
+        created_at, document_id = _decode_cursor(cursor)
+        page_query = page_query.where(
+            tuple_(Document.created_at, Document.id) < tuple_(created_at, document_id)
+        )
+    page_query = page_query.order_by(Document.created_at.desc(), Document.id.desc())
+
+    rows = (await db.execute(page_query.limit(limit + 1))).all()
+    total = (await db.execute(select(func.count()).select_from(Document).where(*filters))).scalar()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    # Plain dicts: validated once against the response_model instead of twice
+    return {
+        "documents": [row._asdict() for row in rows],
+        "total": total or 0,
+        "next_cursor": next_cursor,
+    }
+
+
+def _sse_event(event: str, data: dict, event_id: str | None = None) -> bytes:
+    """Format a single SSE event, counting its size toward the bytes-sent metric."""
+    head = f"id: {event_id}\n" if event_id else ""
+    payload = f"{head}event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+    SSE_BYTES_SENT.inc(len(payload))
+    return payload
+
+
+def _row_event(row, event_id: str = "") -> DocumentEvent:
+    return DocumentEvent(
+        id=event_id,
+        document_id=row.id,
+        tenant_id=row.tenant_id,
+        status=row.status,
+        progress=1.0 if row.status == "ready" else 0.0,
+        chunk_count=row.chunk_count,
+        error_message=row.error_message,
+        timestamp=time.time(),
     )
 
 
+async def _status_rows(
+    document_id: str | None, tenant_id: str | None, watched: set[str] | None = None
+) -> list:
+    """Current rows of a stream's documents: the one document, or the processing ones.
+
+    ``watched`` adds documents the stream last reported as still processing.
+    """
+    if document_id is not None:
+        condition = Document.id == document_id
+    else:
+        condition = Document.status == "processing"
+        if tenant_id is not None:
+            condition = condition & (Document.tenant_id == tenant_id)
+        if watched:
+            condition = or_(condition, Document.id.in_(watched))
+    async with async_session() as db:
+        return (await db.execute(select(*_STATUS_COLUMNS).where(condition))).all()
+
+
+async def _status_stream(document_id: str | None, tenant_id: str | None, last_event_id: str | None):
+    """Status events for one document or a tenant's documents, with resume and heartbeats.
+
+    Without a resumable ``Last-Event-ID`` the stream opens with a snapshot from the
+    database. Live events come from the in-process bus; at every heartbeat the
+    documents still shown as processing are rechecked in the database, which picks
+    up changes made by other API workers.
+    """
+    # Last status sent per document that has not reached a final status
+    watched: dict[str, str] = {}
+
+    def matches(event: DocumentEvent) -> bool:
+        if document_id is not None:
+            return event.document_id == document_id
+        return tenant_id is None or event.tenant_id == tenant_id
+
+    def send(event: DocumentEvent) -> bytes:
+        if event.terminal:
+            watched.pop(event.document_id, None)
+        else:
+            watched[event.document_id] = event.status
+        return _sse_event("status", event.payload(), event.id)
+
+    DOCUMENT_EVENT_STREAMS.inc()
+    try:
+        with document_events.subscribe() as wake:
+            yield f"retry: {_SSE_RETRY_MS}\n\n".encode()
+            cursor = last_event_id or ""
+            while True:
+                wake.clear()
+                if not document_events.can_resume(cursor):
+                    # First connect, an ID from another process, or too far behind
+                    cursor = document_events.last_id
+                    for row in await _status_rows(document_id, tenant_id):
+                        event = _row_event(row, cursor)
+                        yield send(event)
+                        if document_id is not None and event.terminal:
+                            yield _sse_event("done", {})
+                            return
+                for event in document_events.since(cursor):
+                    cursor = event.id
+                    if matches(event):
+                        yield send(event)
+                        if document_id is not None and event.terminal:
+                            yield _sse_event("done", {})
+                            return
+                try:
+                    await asyncio.wait_for(wake.wait(), settings.document_events_heartbeat_s)
+                    continue
+                except TimeoutError:
+                    yield b": ping\n\n"
+                # No `id:` on rechecked statuses, so a resume still replays from the bus
+                for row in await _status_rows(document_id, tenant_id, set(watched)):
+                    if watched.get(row.id) != row.status:
+                        event = _row_event(row)
+                        yield send(event)
+                        if document_id is not None and event.terminal:
+                            yield _sse_event("done", {})
+                            return
+    finally:
+        DOCUMENT_EVENT_STREAMS.dec()
+
+
+def _status_response(stream) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/events", summary="Stream status changes of many documents (SSE)")
+async def stream_document_events(
+    tenant_id: str | None = Query(None, pattern=TENANT_ID_PATTERN),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """Stream status and processing-phase changes of a tenant's documents (all if omitted).
+
+    Opens with the documents currently processing. Reconnect with ``Last-Event-ID``
+    to resume without gaps.
+    """
+    return _status_response(_status_stream(None, tenant_id, last_event_id))
+
+
 @router.get(
     "/{document_id}",
     response_model=DocumentDetail,
@@ -111,9 +394,49 @@ async def get_document(document_id: str, db: AsyncSession = Depends(get_db)):
     """Fetch a single document by ID."""
     result = await db.execute(select(Document).where(Document.id == document_id))
     doc = result.scalar_one_or_none()
-    if not doc:
+    if not doc or doc.status == DocumentStatus.deleting.value:
         raise DocumentNotFoundError(document_id)
-    return DocumentDetail.model_validate(doc)
+    detail = DocumentDetail.model_validate(doc)
+    scheduled = ingestion_scheduler.status(document_id)
+    if scheduled is not None:
+        detail.priority, detail.queue_position = scheduled
+    return detail
+
+
+@router.get("/{document_id}/events", summary="Stream one document's status changes (SSE)")
+async def stream_document_status(
+    document_id: str,
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a document's status and processing phases; ends after ready, failed or deleted."""
+    result = await db.execute(select(Document.id).where(Document.id == document_id))
+    if result.scalar_one_or_none() is None:
+        raise DocumentNotFoundError(document_id)
+    return _status_response(_status_stream(document_id, None, last_event_id))
+
+
+@router.post(
+    "/bulk-delete",
+    response_model=BulkDeleteResponse,
+    status_code=202,
+    summary="Delete many documents",
+)
+async def bulk_delete_documents(request: BulkDeleteRequest, background_tasks: BackgroundTasks):
+    """Tombstone documents immediately; vectors, files and rows are purged in the background."""
+    document_ids = list(dict.fromkeys(request.document_ids))
+    if len(document_ids) > settings.bulk_delete_max:
+        raise BulkDeleteTooLargeError(settings.bulk_delete_max)
+
+    accepted = await tombstone_documents(document_ids)
+    if accepted:
+        background_tasks.add_task(purge_tombstoned)
+
+    accepted_set = set(accepted)
+    return BulkDeleteResponse(
+        accepted=accepted,
+        not_found=[d for d in document_ids if d not in accepted_set],
+    )
 
 
 @router.delete(
@@ -121,30 +444,18 @@ async def get_document(document_id: str, db: AsyncSession = Depends(get_db)):
     response_model=DocumentDeleteResponse,
     summary="Delete a document",
 )
-async def delete_document(document_id: str, db: AsyncSession = Depends(get_db)):
-    """Delete a document, its vectors, and its file from disk."""
-    result = await db.execute(select(Document).where(Document.id == document_id))
-    doc = result.scalar_one_or_none()
-    if not doc:
+async def delete_document(
+    document_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a document. Its chunks leave search at once; storage is purged in the background."""
+    result = await db.execute(select(Document.filename).where(Document.id == document_id))
+    filename = result.scalar_one_or_none()
+    if filename is None or not await tombstone_documents([document_id]):
         raise DocumentNotFoundError(document_id)
 
-    # Delete vectors from ChromaDB
-    try:
-        from app.services.vector_store import vector_store
-
-        vector_store.delete_by_document(document_id)
-    except Exception as e:
-        logger.warning("vector_delete_failed", document_id=document_id, error=str(e))
-
-    # Delete file from disk
-    for file_path in settings.upload_dir.glob(f"{document_id}_*"):
-        try:
-            file_path.unlink()
-        except OSError as e:
-            logger.warning("file_delete_failed", path=str(file_path), error=str(e))
-
-    await db.delete(doc)
-    await db.commit()
+    background_tasks.add_task(purge_tombstoned)
 
     logger.info("document_deleted", document_id=document_id)
-    return DocumentDeleteResponse(success=True, message=f"Document '{doc.filename}' deleted")
+    return DocumentDeleteResponse(success=True, message=f"Document '{filename}' deleted")
@@ -0,0 +1,14 @@
+"""Prometheus scrape endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Render all registered metrics in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
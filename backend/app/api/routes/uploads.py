@@ -0,0 +1,94 @@
+"""Resumable upload endpoints — sessions, byte-range parts and finalize into ingestion."""
+
+import asyncio
+import uuid
+from pathlib import Path
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.api.routes.documents import start_ingestion
+from app.config import settings
+from app.core.exceptions import FileTooLargeError, UnsupportedFileTypeError
+from app.models.schemas import (
+    DocumentUploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+)
+from app.services import uploads
+
+router = APIRouter(prefix="/uploads")
+
+
+@router.post(
+    "",
+    response_model=UploadSessionResponse,
+    status_code=201,
+    summary="Start a resumable upload",
+)
+async def create_upload(request: UploadSessionCreate):
+    """Open a session for a file of ``size`` bytes, sent later as byte-range parts."""
+    if Path(request.filename).suffix.lower() not in settings.supported_extensions:
+        raise UnsupportedFileTypeError(request.filename, settings.supported_extensions)
+    if request.size > settings.max_upload_size_bytes:
+        raise FileTooLargeError(settings.max_upload_size_mb)
+    return await asyncio.to_thread(
+        uploads.create_session,
+        request.filename,
+        request.size,
+        request.tenant_id or settings.default_tenant,
+        request.sha256.lower() if request.sha256 else None,
+    )
+
+
+@router.get(
+    "/{upload_id}",
+    response_model=UploadSessionResponse,
+    summary="Get the byte ranges received so far",
+)
+async def get_upload(upload_id: str):
+    return await asyncio.to_thread(uploads.get_session, upload_id)
+
+
+@router.put(
+    "/{upload_id}",
+    response_model=UploadSessionResponse,
+    summary="Upload one byte range",
+)
+async def put_upload_part(
+    upload_id: str,
+    request: Request,
+    content_range: str = Header(..., alias="Content-Range"),
+    x_content_sha256: str = Header(..., pattern=r"^[0-9a-fA-F]{64}$"),
+):
+    """Write the body at the offset given by ``Content-Range: bytes first-last/total``.
+
+    ``X-Content-SHA256`` is the hex SHA-256 of the body; a mismatch rejects the part.
+    """
+    return await uploads.write_part(upload_id, content_range, x_content_sha256, request.stream())
+
+
+@router.post(
+    "/{upload_id}/complete",
+    response_model=DocumentUploadResponse,
+    status_code=201,
+    summary="Finish a resumable upload and start ingestion",
+)
+async def complete_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    document_id = str(uuid.uuid4())
+    session, file_path = await uploads.finalize(upload_id, document_id)
+    doc = await start_ingestion(
+        db, background_tasks, document_id, session["filename"], session["tenant_id"], file_path
+    )
+    return DocumentUploadResponse.model_validate(doc)
+
+
+@router.delete("/{upload_id}", status_code=204, summary="Abandon a resumable upload")
+async def abort_upload(upload_id: str):
+    await asyncio.to_thread(uploads.abort, upload_id)
+    return Response(status_code=204)
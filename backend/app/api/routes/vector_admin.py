@@ -0,0 +1,155 @@
+"""Vector admin endpoints — embeddings, index parameters and tenant shards.
+
+Served by whichever process hosts the vector store: the API itself in local mode,
+the vector service in remote mode, where the API forwards them (``proxy_router``).
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import FileResponse, Response
+
+from app.api.deps import require_admin
+from app.config import settings
+from app.core.exceptions import (
+    IndexNotTunableError,
+    SnapshotNotFoundError,
+    TenantNotFoundError,
+)
+from app.models.schemas import TENANT_ID_PATTERN, IndexRebuildRequest
+from app.services.index_eval import evaluate
+from app.services.reembedding import reembed_running, start_background_reembed
+from app.services.snapshot import (
+    SNAPSHOT_SUFFIX,
+    list_snapshots,
+    snapshot_running,
+    start_background_snapshot,
+)
+from app.services.vector_backends import HnswParams
+from app.services.vector_store import vector_store
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+proxy_router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+# ── Embeddings ─────────────────────────────────────────
+
+@router.get("/embeddings", summary="Embedding config and re-embedding progress")
+async def embedding_status():
+    def collect() -> dict:
+        return {t: shard.reembed_status() for t, shard in vector_store.shards().items()}
+
+    return {"shards": await asyncio.to_thread(collect), "running": reembed_running()}
+
+
+@router.post(
+    "/embeddings/reembed",
+    status_code=202,
+    summary="Re-embed the corpus with the configured embedding settings",
+)
+async def trigger_reembed():
+    """Start (or resume) re-embedding in the background; a no-op if nothing changed."""
+    started = start_background_reembed() is not None
+    return {"started": started, "running": reembed_running()}
+
+
+# ── Vector index ───────────────────────────────────────
+
+@router.get("/index", summary="Vector index parameters and pending rebuild")
+async def index_status():
+    def collect() -> dict:
+        return {t: shard.index_status() for t, shard in vector_store.shards().items()}
+
+    return {"shards": await asyncio.to_thread(collect), "running": reembed_running()}
+
+
+@router.post(
+    "/index/rebuild",
+    status_code=202,
+    summary="Rebuild every shard with new HNSW parameters",
+)
+async def rebuild_index(body: IndexRebuildRequest | None = None):
+    """Copy each shard's vectors into a collection built with the given parameters, in
+    the background, and swap it in once complete. Searches use the current index until then.
+    """
+    shards = vector_store.shards().values()
+    default = vector_store.shard(settings.default_tenant)
+    if default.index_params is None:
+        raise IndexNotTunableError(default.backend.name)
+    configured = HnswParams.from_settings()
+    requested = body or IndexRebuildRequest()
+    params = HnswParams(
+        m=requested.m or configured.m,
+        construction_ef=requested.construction_ef or configured.construction_ef,
+        search_ef=requested.search_ef or configured.search_ef,
+    )
+    started = False
+    if any(params != shard.index_params or shard.reembed_storage for shard in shards):
+        started = start_background_reembed(params) is not None
+    return {"started": started, "running": reembed_running(), "hnsw": params.to_dict()}
+
+
+@router.post("/index/evaluate", summary="Measure recall@k and latency against exact search")
+async def evaluate_index(
+    queries: int = Query(settings.index_eval_queries, ge=1, le=2000),
+    k: int = Query(settings.retrieval_top_k, ge=1, le=100),
+    tenant_id: str = Query(settings.default_tenant, pattern=TENANT_ID_PATTERN),
+):
+    """Sample queries from a shard's vectors and compare its index with a brute-force scan."""
+    shard = vector_store.shards().get(tenant_id)
+    if shard is None:
+        raise TenantNotFoundError(tenant_id)
+    return await asyncio.to_thread(evaluate, shard.backend, queries, k)
+
+
+@router.get("/shards", summary="Per-tenant shard sizes")
+async def shard_stats():
+    """Chunk and document counts and on-disk index size of every tenant shard."""
+    return {"shards": await asyncio.to_thread(vector_store.shard_stats)}
+
+
+# ── Snapshots ──────────────────────────────────────────
+
+@router.post("/snapshots", status_code=202, summary="Export a snapshot in the background")
+async def trigger_snapshot():
+    """Archive every shard's vectors and chunk texts with the ready document rows.
+
+    Runs in a worker thread without blocking searches or uploads; older archives
+    beyond ``DOCUMIND_SNAPSHOT_KEEP`` are pruned afterwards.
+    """
+    started = start_background_snapshot() is not None
+    return {"started": started, "running": snapshot_running()}
+
+
+@router.get("/snapshots", summary="List snapshot archives")
+async def snapshots():
+    return {"snapshots": await asyncio.to_thread(list_snapshots), "running": snapshot_running()}
+
+
+@router.get("/snapshots/{name}", summary="Download a snapshot archive")
+async def download_snapshot(name: str):
+    path = settings.snapshot_dir / name
+    if "/" in name or not name.endswith(SNAPSHOT_SUFFIX) or not path.is_file():
+        raise SnapshotNotFoundError(name)
+    return FileResponse(path, media_type="application/x-tar", filename=name)
+
+
+# ── Remote mode ────────────────────────────────────────
+
+async def forward_to_vector_service(request: Request):
+    """Relay vector admin calls to the vector service, which owns the store."""
+    status_code, body, content_type = await asyncio.to_thread(
+        vector_store.forward,
+        request.method,
+        request.url.path,
+        params=dict(request.query_params),
+        content=await request.body(),
+        headers={"X-Admin-Token": request.headers.get("x-admin-token", "")},
+    )
+    return Response(content=body, status_code=status_code, media_type=content_type)
+
+
+for _path in ("/embeddings{rest:path}", "/index{rest:path}", "/shards", "/snapshots{rest:path}"):
+    proxy_router.add_api_route(
+        _path, forward_to_vector_service, methods=["GET", "POST"], include_in_schema=False
+    )
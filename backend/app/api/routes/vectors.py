@@ -0,0 +1,52 @@
+"""Vector service endpoints — the store's operations for API workers in remote mode."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_vector_service_token
+from app.models.schemas import VectorAddRequest, VectorDeleteRequest, VectorSearchRequest
+from app.services.vector_store import vector_store
+
+router = APIRouter(prefix="/vectors", dependencies=[Depends(require_vector_service_token)])
+
+
+@router.post("/chunks", summary="Embed and store a document's chunks")
+async def add_chunks(request: VectorAddRequest):
+    count = await asyncio.to_thread(
+        vector_store.add_chunks,
+        request.document_id,
+        request.filename,
+        [chunk.model_dump() for chunk in request.chunks],
+        request.tenant_id,
+    )
+    return {"count": count}
+
+
+@router.post("/search", summary="Search the shards visible to a tenant")
+async def search(request: VectorSearchRequest):
+    results = await asyncio.to_thread(
+        vector_store.search,
+        request.query,
+        request.top_k,
+        request.exclude_document_ids,
+        request.document_ids,
+        request.tenant_id,
+    )
+    return {"results": results}
+
+
+@router.post("/delete", summary="Delete documents' chunks from every shard")
+async def delete(request: VectorDeleteRequest):
+    await asyncio.to_thread(vector_store.delete_by_documents, request.document_ids)
+    return {"deleted": len(request.document_ids)}
+
+
+@router.get("/documents", summary="IDs of documents with stored chunks")
+async def document_ids():
+    return {"document_ids": sorted(await asyncio.to_thread(vector_store.document_ids))}
+
+
+@router.get("/count", summary="Total stored chunks")
+async def count():
+    return {"count": await asyncio.to_thread(vector_store.count)}
@@ -19,11 +19,41 @@ class Settings(BaseSettings):
     chroma_dir: Path = Path("./data/chroma")
     sqlite_url: str = "sqlite+aiosqlite:///./data/documind.db"
 
+    # SQLite tuning (applied to every new connection)
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"  # safe with WAL; "full" for maximum durability
+    sqlite_cache_size_kb: int = 16384
+    sqlite_mmap_size_mb: int = 128
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_pool_size: int = 5
+    sqlite_max_overflow: int = 10
+
     # Document processing
     max_file_size_mb: int = 10
     chunk_size: int = 500
     chunk_overlap: int = 50
     supported_extensions: list[str] = [".pdf", ".docx", ".txt", ".md"]
+    max_upload_size_mb: int = 500  # resumable upload sessions (POST /api/uploads)
+    upload_session_ttl_s: float = 86400.0  # idle sessions are removed by compaction
+    pdf_parallel_min_pages: int = 64  # smaller PDFs are extracted in-process
+    pdf_workers: int = 0  # extraction processes; 0 = CPU count, 1 = always in-process
+    pdf_pages_per_task: int = 32
+    pdf_range_timeout_s: float = 120.0  # a page range still running after this fails
+
+    # Document listing
+    document_page_size: int = 50
+    document_page_size_max: int = 200
+
+    # Document status streams (SSE)
+    document_events_buffer: int = 1000  # recent events kept for Last-Event-ID resume
+    document_events_heartbeat_s: float = 15.0  # keep-alive comment + status recheck interval
+
+    # Deletion & compaction
+    bulk_delete_max: int = 1000
+    purge_batch_size: int = 100
+    compaction_interval_s: float = 3600.0
+    compaction_grace_s: float = 600.0  # leave younger files/rows alone (uploads in flight)
+    stale_processing_s: float = 3600.0  # "processing" rows older than this are marked failed
 
     # LLM
     llm_provider: str = "groq"  # "groq" or "openai"
@@ -35,9 +65,90 @@ class Settings(BaseSettings):
     # RAG
     retrieval_top_k: int = 5
     max_chat_history: int = 5
+    chat_session_cache_size: int = 1000  # conversations whose history is held in memory
+    chat_retrieval_cache_size: int = 8  # retrieved source lists kept per conversation
+    chat_retrieval_cache_ttl_s: float = 300.0
+    corpus_stats_reconcile_interval_s: float = 300.0
+    # Deadlines — one budget per chat request, shared by admission, retrieval and generation
+    chat_deadline_s: float = 30.0  # 0 = unbounded; requests may ask for less (deadline_s)
+    chat_retrieval_budget_s: float = 3.0  # then a stale cached result or no context
+    chat_generation_reserve_s: float = 5.0  # kept for the answer; less left = shorter prompt
+    chat_degraded_top_k: int = 2  # context chunks in the shorter prompt
+    llm_max_tokens: int = 2048
+    llm_timeout_s: float = 60.0  # provider HTTP timeout, independent of the deadline
+
+    # Ingestion scheduling — priority lanes, fair-shared across tenants
+    ingestion_workers: int = 4  # documents processed at once
+    ingestion_bulk_threshold: int = 3  # a tenant's queued uploads before new ones go to bulk
+    ingestion_starvation_s: float = 300.0  # a document waiting this long runs next
+    ingestion_tenant_weights: dict[str, float] = {}  # fair-share weight per tenant (default 1)
+
+    # Admission control (concurrent LLM generations)
+    max_concurrent_generations: int = 8
+    generation_queue_size: int = 32
+    generation_queue_timeout_s: float = 15.0
+    generation_retry_after_s: int = 5
+
+    # Observability
+    metrics_enabled: bool = True
+    tracing_sample_rate: float = 0.0  # 0 disables span recording; 1 traces every request
+    tracing_exporter: str = "log"  # "log", "otlp_file" or "none"
+    tracing_otlp_file: Path = Path("./data/traces.jsonl")
+    log_async: bool = True  # render and write log lines on a background thread
+    log_queue_size: int = 10000  # events buffered for the writer; overflow is dropped
+    log_sample_rates: dict[str, float] = {}  # event name -> fraction kept, e.g. 0.1
 
-    # ChromaDB
-    chroma_collection: str = "documind_docs"
+    # Admin & profiling
+    admin_token: str = ""  # required by /api/admin endpoints; empty disables them
+    profiling_enabled: bool = False
+    profiling_interval_ms: float = 5.0
+    profiling_max_seconds: int = 60
+    profiling_max_profiles: int = 20
+    profiling_tracemalloc_frames: int = 25
+
+    # Embeddings — changing the model, max sequence length or PCA dims re-embeds the corpus
+    embedding_model_dir: Path | None = None  # model.onnx + tokenizer.json; None = MiniLM-L6
+    embedding_max_seq_length: int = 256
+    embedding_batch_size: int = 32
+    embedding_intra_op_threads: int = 0  # 0 = onnxruntime default
+    embedding_inter_op_threads: int = 0
+    embedding_pca_dims: int = 0  # project to this many dims (0 = off); fitted on the corpus
+    embedding_pca_sample_size: int = 5000  # chunks sampled to fit the projection
+    reembed_batch_documents: int = 8
+
+    # Vector index
+    vector_backend: str = "chroma"  # "chroma" or "numpy" (in-process, exact search)
+    vector_index_dir: Path = Path("./data/vectors")  # numpy indexes + embedding manifests
+    chroma_collection: str = "documind_docs"  # collection name for every backend
+    # Per-collection storage precision for the numpy backend: {"<collection>": "int8"};
+    # "*" sets the default. int8 scans quantized codes and re-scores in float32.
+    vector_quantization: dict[str, str] = {}
+    vector_rescore_factor: int = 4  # int8 shortlist = factor × top_k
+    # HNSW graph of the chroma backend; used when a collection is created or rebuilt
+    hnsw_m: int = 16
+    hnsw_construction_ef: int = 100
+    hnsw_search_ef: int = 100
+    index_eval_queries: int = 100  # queries sampled when measuring recall@k
+    # Near-duplicate chunks are stored once and referenced by the other documents
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.9  # estimated Jaccard similarity of word 3-shingles
+
+    # Tenancy — one vector collection (shard) per tenant
+    default_tenant: str = "default"  # requests without a tenant_id; keeps the base collection
+    shared_tenants: list[str] = []  # shards every tenant may also search (e.g. ["default"])
+    shard_search_workers: int = 8  # threads fanning a query out across shards
+
+    # Vector service — "remote" lets several API workers share one vector store process
+    vector_store_mode: str = "local"  # "local" (in-process) or "remote" (app.vector_service)
+    vector_service_url: str = "http://127.0.0.1:8100"
+    vector_service_token: str = ""  # shared secret sent by API workers; empty = no check
+    vector_service_pool_size: int = 16  # keep-alive connections per API worker
+    vector_service_timeout_s: float = 30.0
+    vector_service_retries: int = 2  # connection retries before failing a call
+
+    # Snapshots — archives of the vector index, chunk texts and document rows
+    snapshot_dir: Path = Path("./data/snapshots")
+    snapshot_keep: int = 3  # newest archives kept in snapshot_dir
 
     # Sample docs
     sample_docs_dir: Path = Path("./sample_docs")
@@ -47,5 +158,9 @@ class Settings(BaseSettings):
     def max_file_size_bytes(self) -> int:
         return self.max_file_size_mb * 1024 * 1024
 
+    @property
+    def max_upload_size_bytes(self) -> int:
+        return self.max_upload_size_mb * 1024 * 1024
+
 
 settings = Settings()
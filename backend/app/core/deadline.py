@@ -0,0 +1,46 @@
+"""Request deadlines — one time budget shared by the stages of a request.
+
+A chat request gets a ``Deadline`` when it arrives; each stage (admission wait,
+retrieval, generation) asks it how long it may take, capped by the stage's own
+budget and leaving a reserve for the stages after it.
+"""
+
+import math
+import time
+
+
+class Deadline:
+    """An absolute point on the monotonic clock, or none (unbounded)."""
+
+    __slots__ = ("started_at", "expires_at")
+
+    def __init__(self, seconds: float | None = None):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds if seconds else math.inf
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at != math.inf
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def budget(self, cap: float | None = None, reserve: float = 0.0) -> float | None:
+        """Seconds a stage may take: at most ``cap``, leaving ``reserve`` for later
+        stages. None when neither the deadline nor the cap bounds it.
+        """
+        available = self.remaining() - reserve if self.bounded else math.inf
+        if cap:
+            available = min(available, cap)
+        return None if available == math.inf else max(0.0, available)
+
+    def timeout(self) -> float | None:
+        """Remaining time for ``asyncio.wait_for``; None when unbounded."""
+        return self.remaining() if self.bounded else None
@@ -25,6 +25,22 @@ class FileTooLargeError(HTTPException):
         )
 
 
+class InvalidCursorError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+class BulkDeleteTooLargeError(HTTPException):
+    def __init__(self, max_ids: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk delete accepts at most {max_ids} document IDs per request",
+        )
+
+
 class DocumentProcessingError(HTTPException):
     def __init__(self, detail: str):
         super().__init__(
@@ -41,9 +57,149 @@ class NoDocumentsError(HTTPException):
         )
 
 
+class ChatSessionNotFoundError(HTTPException):
+    def __init__(self, session_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Chat session '{session_id}' not found",
+        )
+
+
 class LLMProviderError(HTTPException):
     def __init__(self, provider: str, detail: str):
         super().__init__(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"LLM provider '{provider}' error: {detail}",
         )
+
+
+class GenerationQueueFullError(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent chat requests. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class GenerationQueueTimeoutError(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Timed out waiting for a free generation slot. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class AdminAuthError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid admin token",
+        )
+
+
+class ProfilingDisabledError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled. Set DOCUMIND_PROFILING_ENABLED=true to enable it.",
+        )
+
+
+class ProfileNotFoundError(HTTPException):
+    def __init__(self, profile_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile '{profile_id}' not found",
+        )
+
+
+class IndexNotTunableError(HTTPException):
+    def __init__(self, backend: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The '{backend}' vector backend uses exact search and has no HNSW parameters",
+        )
+
+
+class TenantNotFoundError(HTTPException):
+    def __init__(self, tenant_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No vector shard for tenant '{tenant_id}'",
+        )
+
+
+class VectorServiceAuthError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid vector service token",
+        )
+
+
+class VectorServiceUnavailableError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Vector service unavailable: {detail}",
+        )
+
+
+class VectorServiceError(HTTPException):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Vector service error ({status_code}): {detail}",
+        )
+
+
+class SnapshotError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class SnapshotNotFoundError(HTTPException):
+    def __init__(self, name: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Snapshot '{name}' not found",
+        )
+
+
+class UploadSessionNotFoundError(HTTPException):
+    def __init__(self, upload_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload session '{upload_id}' not found or expired",
+        )
+
+
+class UploadRangeError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class UploadRangeConflictError(HTTPException):
+    def __init__(self, first: int, last: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Bytes {first}-{last} overlap a part that was already received "
+                "or is being written"
+            ),
+        )
+
+
+class UploadChecksumError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+class UploadIncompleteError(HTTPException):
+    def __init__(self, missing_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is incomplete: {missing_bytes} bytes not yet received",
+        )
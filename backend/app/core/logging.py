@@ -1,27 +1,175 @@
+"""structlog setup: synchronous stdout, or queue-backed with a background writer.
+
+In queue mode (``log_async``) the calling thread only merges context, timestamps
+and enqueues the event dict; JSON/console rendering and the stdout write happen
+on a writer thread. The queue is bounded: when it is full the event is dropped
+and counted rather than blocking the event loop on a slow pipe.
+
+``log_sample_rates`` keeps a fraction of high-volume info/debug events by name,
+e.g. ``{"rag_query_started": 0.1}``. Kept events carry ``sample_rate`` so counts
+can be scaled back up; warnings and errors are never sampled.
+"""
+
+import atexit
 import logging
+import queue
+import random
 import sys
+import threading
 
 import structlog
 
 from app.config import settings
+from app.core.metrics import LOG_EVENTS_DROPPED, LOG_EVENTS_SAMPLED_OUT
+
+_SAMPLED_LEVELS = frozenset({"debug", "info"})
+# Most events rendered per stdout write by the writer thread
+_WRITE_BATCH = 256
+_STOP = object()
+
+
+def _sample(logger, method_name: str, event_dict: dict) -> dict:
+    rate = settings.log_sample_rates.get(event_dict.get("event"))
+    if rate is None or rate >= 1 or method_name not in _SAMPLED_LEVELS:
+        return event_dict
+    if random.random() >= rate:
+        LOG_EVENTS_SAMPLED_OUT.labels(event=event_dict["event"]).inc()
+        raise structlog.DropEvent
+    event_dict["sample_rate"] = rate
+    return event_dict
+
+
+def _to_writer(logger, method_name: str, event_dict: dict) -> tuple:
+    # Passed to QueueLogger.msg as-is; rendering happens on the writer thread
+    return (event_dict,), {}
+
+
+class QueueLogWriter:
+    """Renders queued event dicts and writes them to stdout on a daemon thread."""
+
+    def __init__(self, renderer, maxsize: int):
+        self.renderer = renderer
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def put(self, event_dict: dict) -> None:
+        try:
+            self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self._dropped += 1
+            LOG_EVENTS_DROPPED.inc()
+
+    def render(self, event_dict: dict) -> str:
+        try:
+            return self.renderer(None, event_dict.get("level", "info"), event_dict)
+        except Exception as e:
+            return f"log_render_failed event={event_dict.get('event')!r} error={e!r}"
+
+    def _run(self) -> None:
+        reported = 0
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [self.render(event) for event in batch if event is not _STOP]
+            if self._dropped != reported:
+                # Said once per batch in the log itself, not once per lost event
+                dropped = {"event": "log_events_dropped", "level": "warning"}
+                lines.append(self.render({**dropped, "count": self._dropped - reported}))
+                reported = self._dropped
+            if lines:
+                _write("\n".join(lines))
+            if _STOP in batch:
+                return
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out what is queued and stop the thread."""
+        if not self.running:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+def _write(text: str) -> None:
+    try:
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        pass  # stdout closed; nothing left to write to
+
+
+class QueueLogger:
+    """structlog logger that hands event dicts to the current writer.
+
+    Loggers are cached on first use, so the writer is looked up per call: once it
+    is closed (shutdown, exit) events are rendered and written synchronously.
+    """
+
+    def __init__(self, renderer):
+        self._renderer = renderer
+
+    def msg(self, event_dict: dict) -> None:
+        writer = _writer
+        if writer is not None and writer.running:
+            writer.put(event_dict)
+        else:
+            _write(self._renderer(None, event_dict.get("level", "info"), event_dict))
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+_writer: QueueLogWriter | None = None
 
 
 def setup_logging():
+    global _writer
     log_level = logging.DEBUG if settings.debug else logging.INFO
+    renderer = (
+        structlog.dev.ConsoleRenderer() if settings.debug
+        else structlog.processors.JSONRenderer()
+    )
+    processors = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+        _sample,
+        structlog.processors.StackInfoRenderer(),
+        structlog.dev.set_exc_info,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+
+    if settings.log_async:
+        if _writer is None or not _writer.running:
+            _writer = QueueLogWriter(renderer, settings.log_queue_size)
+        _writer.renderer = renderer
+        # The traceback only exists on the calling thread
+        processors += [structlog.processors.format_exc_info, _to_writer]
+        logger_factory = lambda *args: QueueLogger(renderer)  # noqa: E731
+    else:
+        processors.append(renderer)
+        logger_factory = structlog.PrintLoggerFactory()
 
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer() if settings.debug
-            else structlog.processors.JSONRenderer(),
-        ],
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
@@ -33,5 +181,14 @@ def setup_logging():
     )
 
 
+def shutdown_logging() -> None:
+    """Write out queued events and stop the writer thread, if there is one."""
+    if _writer is not None:
+        _writer.close()
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str):
     return structlog.get_logger(name)
@@ -0,0 +1,379 @@
+"""In-process metrics registry rendered in the Prometheus text exposition format.
+
+Deliberately tiny: counters, gauges and fixed-bucket histograms guarded by a
+per-child lock, so recording on the hot path is a dict lookup plus a few adds.
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> "_Metric | None":
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: MetricsRegistry | None = registry,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwvalues: str):
+        """Return the child for a label combination, creating it on first use."""
+        if kwvalues:
+            values = tuple(str(kwvalues[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self._children[()]
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple[str, ...], child) -> list[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class _ValueChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed upper-bound buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: MetricsRegistry | None = registry,
+    ):
+        self.buckets = tuple(sorted(b for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def time(self):
+        return self._unlabelled().time()
+
+    def _render_child(self, values: tuple[str, ...], child) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+# ── Metric catalog ─────────────────────────────────────
+
+GENERATION_ACTIVE = Gauge(
+    "documind_generation_active",
+    "Chat generations currently holding an admission slot.",
+)
+GENERATION_QUEUE_DEPTH = Gauge(
+    "documind_generation_queue_depth",
+    "Chat requests waiting for an admission slot.",
+)
+GENERATION_QUEUE_WAIT_SECONDS = Histogram(
+    "documind_generation_queue_wait_seconds",
+    "Time chat requests spent waiting for an admission slot.",
+)
+GENERATION_REJECTED = Counter(
+    "documind_generation_rejected_total",
+    "Chat requests rejected by admission control.",
+    ("reason",),
+)
+
+CHAT_REQUESTS = Counter(
+    "documind_chat_requests_total",
+    "Chat streams by outcome.",
+    ("outcome",),
+)
+CHAT_STAGE_TIMEOUTS = Counter(
+    "documind_chat_stage_timeouts_total",
+    "Chat pipeline stages that ran out of their time budget.",
+    ("stage",),
+)
+CHAT_DEGRADED = Counter(
+    "documind_chat_degraded_total",
+    "Chat answers produced with a fallback, by fallback.",
+    ("fallback",),
+)
+CHAT_RETRIEVAL_CACHE = Counter(
+    "documind_chat_retrieval_cache_total",
+    "Session retrieval cache lookups by result (hit, miss, or stale when used as a fallback).",
+    ("result",),
+)
+SSE_BYTES_SENT = Counter(
+    "documind_sse_bytes_sent_total",
+    "Bytes of Server-Sent Events written to chat and document status clients.",
+)
+DOCUMENT_EVENT_STREAMS = Gauge(
+    "documind_document_event_streams",
+    "Open document status streams.",
+)
+
+QUERY_EMBEDDING_SECONDS = Histogram(
+    "documind_query_embedding_seconds",
+    "Time to embed a chat question.",
+)
+VECTOR_SEARCH_SECONDS = Histogram(
+    "documind_vector_search_seconds",
+    "Time for the nearest-neighbour query against the vector index.",
+)
+CONTEXT_BUILD_SECONDS = Histogram(
+    "documind_context_build_seconds",
+    "Time to format retrieved chunks and build the LLM message list.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "documind_llm_time_to_first_token_seconds",
+    "Time from the provider request to the first streamed token.",
+    ("provider",),
+)
+LLM_GENERATION_SECONDS = Histogram(
+    "documind_llm_generation_seconds",
+    "Total time spent streaming a completion from the provider.",
+    ("provider",),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "documind_llm_tokens_per_second",
+    "Streaming throughput of a completion after the first token.",
+    ("provider",),
+    buckets=(5, 10, 25, 50, 100, 200, 400, 800, 1600),
+)
+LLM_TOKENS = Counter(
+    "documind_llm_tokens_total",
+    "Streamed completion tokens (provider deltas).",
+    ("provider",),
+)
+
+INGESTION_PHASE_SECONDS = Histogram(
+    "documind_ingestion_phase_seconds",
+    "Time spent in each document ingestion phase.",
+    ("phase",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+INGESTION_ACTIVE = Gauge(
+    "documind_ingestion_active",
+    "Documents being processed.",
+)
+INGESTION_QUEUE_DEPTH = Gauge(
+    "documind_ingestion_queue_depth",
+    "Documents waiting for an ingestion worker, per priority lane.",
+    ("priority",),
+)
+INGESTION_QUEUE_WAIT_SECONDS = Histogram(
+    "documind_ingestion_queue_wait_seconds",
+    "Time documents waited for an ingestion worker, per priority lane.",
+    ("priority",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+INGESTION_STARVATION_PROMOTIONS = Counter(
+    "documind_ingestion_starvation_promotions_total",
+    "Queued documents run ahead of their lane after waiting too long.",
+    ("priority",),
+)
+INGESTION_DOCUMENTS = Counter(
+    "documind_ingestion_documents_total",
+    "Documents processed by final status.",
+    ("status",),
+)
+LOG_EVENTS_DROPPED = Counter(
+    "documind_log_events_dropped_total",
+    "Log events dropped because the queue-backed log writer was full.",
+)
+LOG_EVENTS_SAMPLED_OUT = Counter(
+    "documind_log_events_sampled_out_total",
+    "Log events skipped by per-event sampling.",
+    ("event",),
+)
+PDF_PAGE_FAILURES = Counter(
+    "documind_pdf_page_failures_total",
+    "PDF pages skipped because text extraction failed.",
+)
+INGESTION_CHUNKS = Counter(
+    "documind_ingestion_chunks_total",
+    "Chunks written to the vector index.",
+)
+DEDUP_CHUNKS = Counter(
+    "documind_dedup_chunks_total",
+    "Chunks stored as references to a near-duplicate instead of being embedded.",
+)
+DEDUP_BYTES_SAVED = Counter(
+    "documind_dedup_bytes_saved_total",
+    "Approximate vector and text bytes not stored thanks to near-duplicate references.",
+)
+DEDUP_EMBED_SECONDS_SAVED = Counter(
+    "documind_dedup_embed_seconds_saved_total",
+    "Estimated embedding time skipped for near-duplicate chunks.",
+)
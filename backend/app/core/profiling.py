@@ -0,0 +1,289 @@
+"""On-demand profiling — a pure-Python stack sampler plus tracemalloc snapshots.
+
+The sampler runs on its own thread and reads ``sys._current_frames()`` at a fixed
+interval, so nothing is instrumented and there is no cost unless a profile is
+running. Profiles render as collapsed stacks (flamegraph.pl / speedscope import)
+or as native speedscope JSON.
+"""
+
+import hmac
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+# (function name, filename, line number)
+Frame = tuple[str, str, int]
+
+
+def _frame_stack(frame) -> tuple[Frame, ...]:
+    """Walk a frame to the root and return it root-first."""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, lineno = frame
+    # ';' separates frames in the collapsed format
+    return f"{name} ({filename}:{lineno})".replace(";", ":")
+
+
+@dataclass
+class Profile:
+    id: str
+    kind: str
+    label: str
+    interval: float
+    started_at: datetime
+    duration: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format: ``frame;frame;frame count`` per line."""
+        lines = [
+            ";".join(_frame_label(f) for f in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> dict:
+        """Speedscope's sampled-profile file format."""
+        frame_index: dict[Frame, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    name, filename, lineno = frame
+                    frames.append({"name": name, "file": filename, "line": lineno})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.label,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": self.label,
+            "exporter": "documind",
+        }
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "duration_s": round(self.duration, 3),
+            "samples": self.samples,
+        }
+
+
+class SamplingProfiler:
+    """Samples stacks of the given threads (or every thread) until stopped."""
+
+    def __init__(
+        self,
+        kind: str,
+        label: str,
+        interval: float,
+        thread_ids: set[int] | None = None,
+    ):
+        self.profile = Profile(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            label=label,
+            interval=interval,
+            started_at=datetime.now(timezone.utc),
+        )
+        self._thread_ids = thread_ids
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="documind-profiler", daemon=True)
+        self._start = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        self.profile.duration = time.perf_counter() - self._start
+        return self.profile
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        profile = self.profile
+        per_thread = self._thread_ids is None
+        while not self._stop.wait(profile.interval):
+            names = {t.ident: t.name for t in threading.enumerate()} if per_thread else {}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self._thread_ids is not None and thread_id not in self._thread_ids:
+                    continue
+                stack = _frame_stack(frame)
+                if per_thread:
+                    # Root each stack at its thread so the flamegraph splits by thread
+                    stack = ((f"thread:{names.get(thread_id, thread_id)}", "", 0), *stack)
+                profile.stacks[stack] += 1
+            profile.samples += 1
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in memory for download."""
+
+    def __init__(self, max_profiles: int):
+        self._max_profiles = max_profiles
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Profile | None:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> list[Profile]:
+        return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(settings.profiling_max_profiles)
+
+
+# ── Memory (tracemalloc) ───────────────────────────────
+
+def start_memory_tracing(frames: int) -> bool:
+    """Start tracemalloc; returns False if it was already running."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    logger.info("tracemalloc_started", frames=frames)
+    return True
+
+
+def stop_memory_tracing() -> bool:
+    if not tracemalloc.is_tracing():
+        return False
+    tracemalloc.stop()
+    logger.info("tracemalloc_stopped")
+    return True
+
+
+def memory_snapshot(top: int) -> tuple[dict, str]:
+    """Snapshot traced allocations.
+
+    Returns a JSON-friendly report of the top allocation sites plus the full
+    snapshot as collapsed stacks weighted by live bytes.
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+    )
+    by_line = snapshot.statistics("lineno")
+    current, peak = tracemalloc.get_traced_memory()
+    report = {
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "top_allocators": [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in by_line[:top]
+        ],
+    }
+    lines = []
+    for stat in snapshot.statistics("traceback"):
+        stack = ";".join(
+            f"{f.filename}:{f.lineno}".replace(";", ":") for f in stat.traceback
+        )
+        lines.append(f"{stack} {stat.size}")
+    return report, "\n".join(lines) + "\n"
+
+
+# ── ASGI middleware ────────────────────────────────────
+
+class ProfilingMiddleware:
+    """Profiles a single request when it carries ``X-Profile: <admin token>``.
+
+    Samples the event-loop thread for the lifetime of the request (including a
+    streamed body and any background tasks), so concurrent requests on the same
+    loop show up too. The profile ID is returned in ``X-Profile-Id`` and can be
+    downloaded from the admin API once the request finishes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(
+            kind="request",
+            label=f"{scope['method']} {scope['path']}",
+            interval=settings.profiling_interval_ms / 1000,
+            thread_ids={threading.get_ident()},
+        )
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profiler.profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile_store.add(profiler.stop())
+            logger.info("request_profiled", profile_id=profiler.profile.id, path=scope["path"])
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        for key, value in scope.get("headers", ()):
+            if key == b"x-profile":
+                token = value.decode("latin-1")
+                return bool(settings.admin_token) and hmac.compare_digest(
+                    token, settings.admin_token
+                )
+        return False
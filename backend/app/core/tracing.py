@@ -0,0 +1,349 @@
+"""Lightweight request-scoped tracing with pluggable span exporters.
+
+Every HTTP request gets a trace ID bound into structlog's contextvars. Spans are
+only recorded for sampled requests; for the rest ``tracer.span()`` returns a shared
+no-op span, so instrumented code costs one contextvar lookup when tracing is off.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Protocol
+
+import structlog
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_current_span: ContextVar["Span | None"] = ContextVar("documind_current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    """A timed operation within a trace. Use as a context manager."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "events", "error", "_trace_buffer", "_token",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, trace_buffer: list):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes: dict = {}
+        self.events: list[tuple[str, int, dict]] = []
+        self.error: str | None = None
+        self._trace_buffer = trace_buffer
+        self._token = None
+
+    @property
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._trace_buffer.append(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited from a different context (e.g. an async generator finalised elsewhere)
+            pass
+
+
+class _NoopSpan:
+    """Stand-in for unsampled requests; every operation is a no-op."""
+
+    __slots__ = ()
+
+    is_recording = False
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ── Exporters ──────────────────────────────────────────
+
+class SpanExporter(Protocol):
+    """Receives every finished span of a trace once its root span ends."""
+
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class NoopSpanExporter:
+    def export(self, spans: list[Span]) -> None:
+        pass
+
+
+class LogSpanExporter:
+    """Writes one structlog line per span."""
+
+    def export(self, spans: list[Span]) -> None:
+        for span in spans:
+            logger.info(
+                "span",
+                span=span.name,
+                span_id=span.span_id,
+                parent_id=span.parent_id,
+                duration_ms=round((span.end_ns - span.start_ns) / 1e6, 3),
+                error=span.error,
+                **span.attributes,
+            )
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list — for tests and debugging."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class OTLPJsonFileExporter:
+    """Appends traces as OTLP/JSON ``ExportTraceServiceRequest`` lines.
+
+    Works offline; the file can be replayed into any OTLP/HTTP collector
+    (``curl -H 'Content-Type: application/json' --data @line``) or loaded by
+    tools that read the OTLP JSON encoding.
+    """
+
+    def __init__(self, path: Path, service_name: str):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "documind"},
+                            "spans": [self._encode(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload, separators=(",", ":"), default=str)
+        with self._lock, self._path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    @staticmethod
+    def _encode(span: Span) -> dict:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "events": [
+                {"timeUnixNano": str(ts), "name": name, "attributes": _otlp_attributes(attrs)}
+                for name, ts, attrs in span.events
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+
+def build_exporter(name: str) -> SpanExporter:
+    """Exporter factory keyed by the ``tracing_exporter`` setting."""
+    name = name.lower()
+    if name == "log":
+        return LogSpanExporter()
+    if name == "otlp_file":
+        return OTLPJsonFileExporter(settings.tracing_otlp_file, settings.app_name)
+    if name == "none":
+        return NoopSpanExporter()
+    raise ValueError(f"Unknown tracing exporter '{name}'. Use 'log', 'otlp_file' or 'none'.")
+
+
+# ── Tracer ─────────────────────────────────────────────
+
+class _RootSpan(Span):
+    """Root span: exports the whole trace when it ends."""
+
+    __slots__ = ("_tracer",)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        super().__exit__(exc_type, exc, tb)
+        self._tracer._export(self._trace_buffer)
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter, sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def should_sample(self, parent_sampled: bool = False) -> bool:
+        if parent_sampled:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def start_trace(
+        self, name: str, trace_id: str, sampled: bool, parent_id: str | None = None, **attributes
+    ):
+        """Open the root span of a trace, or return the no-op span if not sampled.
+
+        ``parent_id`` is the caller's span when the trace was propagated to us.
+        """
+        if not sampled:
+            return NOOP_SPAN
+        root = _RootSpan(name, trace_id, parent_id, [])
+        root._tracer = self
+        root.attributes.update(attributes)
+        return root
+
+    def span(self, name: str, **attributes):
+        """Open a child of the current span. No-op outside a sampled trace."""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        child = Span(name, parent.trace_id, parent.span_id, parent._trace_buffer)
+        if attributes:
+            child.attributes.update(attributes)
+        return child
+
+    def current_span(self):
+        return _current_span.get() or NOOP_SPAN
+
+    def _export(self, spans: list[Span]) -> None:
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning("trace_export_failed", error=str(e))
+
+
+tracer = Tracer(build_exporter(settings.tracing_exporter), settings.tracing_sample_rate)
+
+
+# ── ASGI middleware ────────────────────────────────────
+
+def _parse_traceparent(value: str) -> tuple[str, str, bool] | None:
+    """Parse a W3C ``traceparent`` header into (trace_id, parent_span_id, sampled)."""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """Binds a trace ID per HTTP request and wraps the request in a root span.
+
+    Pure ASGI (not BaseHTTPMiddleware) so the context — and therefore the current
+    span — flows into streaming response bodies and background tasks.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id, parent_sampled = None, None, False
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                parsed = _parse_traceparent(value.decode("latin-1"))
+                if parsed:
+                    trace_id, parent_id, parent_sampled = parsed
+                break
+        trace_id = trace_id or _new_id(16)
+
+        sampled = tracer.should_sample(parent_sampled)
+        root = tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            trace_id,
+            sampled,
+            parent_id,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        log_tokens = structlog.contextvars.bind_contextvars(trace_id=trace_id)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_with_trace_id)
+        finally:
+            structlog.contextvars.reset_contextvars(**log_tokens)
@@ -1,5 +1,6 @@
 """DocuMind — AI Knowledge Base Assistant API."""
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -7,9 +8,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.core.logging import get_logger, setup_logging
-from app.models.database import init_db
+from app.core.logging import get_logger, setup_logging, shutdown_logging
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware
+from app.models.database import close_db, init_db
 from app.models.schemas import ErrorResponse
+from app.services.compaction import (
+    load_tombstones,
+    purge_tombstoned,
+    run_compactor,
+    tombstones,
+)
+from app.services.corpus_stats import corpus_stats
+from app.services.document_processor import shutdown_pdf_pool
+from app.services.reembedding import start_background_reembed
+from app.services.vector_store import vector_store
 
 logger = get_logger(__name__)
 
@@ -19,6 +32,8 @@ async def lifespan(app: FastAPI):
     setup_logging()
     await init_db()
     settings.upload_dir.mkdir(parents=True, exist_ok=True)
+    await corpus_stats.reconcile()
+    await load_tombstones()
 
     # Load sample documents if configured
     if settings.load_sample_docs and settings.sample_docs_dir.exists():
@@ -30,7 +45,26 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning("sample_docs_load_failed", error=str(e))
 
+    background = [
+        asyncio.create_task(
+            corpus_stats.run_reconciler(settings.corpus_stats_reconcile_interval_s)
+        ),
+        asyncio.create_task(run_compactor(settings.compaction_interval_s)),
+    ]
+    if tombstones.ids:
+        # Finish purges interrupted by a restart
+        background.append(asyncio.create_task(purge_tombstoned()))
+    if vector_store.needs_rebuild():
+        # Embedding settings changed or a rebuild was interrupted: rebuild in the background
+        if task := start_background_reembed():
+            background.append(task)
     yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    shutdown_pdf_pool()
+    await close_db()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -46,7 +80,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "X-Profile-Id"],
 )
+app.add_middleware(TracingMiddleware)
+if settings.profiling_enabled and settings.admin_token:
+    app.add_middleware(ProfilingMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -57,8 +95,26 @@ async def generic_exception_handler(request: Request, exc: Exception):
 
 
 # Import and include routers
-from app.api.routes import chat, documents, health  # noqa: E402
+from app.api.routes import (  # noqa: E402
+    admin,
+    chat,
+    documents,
+    health,
+    metrics,
+    uploads,
+    vector_admin,
+)
 
 app.include_router(health.router, prefix=settings.api_prefix, tags=["Health"])
 app.include_router(documents.router, prefix=settings.api_prefix, tags=["Documents"])
+app.include_router(uploads.router, prefix=settings.api_prefix, tags=["Documents"])
 app.include_router(chat.router, prefix=settings.api_prefix, tags=["Chat"])
+app.include_router(admin.router, prefix=settings.api_prefix, tags=["Admin"])
+if settings.vector_store_mode.lower() == "remote":
+    # The vector service owns the store; its admin endpoints are relayed there
+    app.include_router(vector_admin.proxy_router, prefix=settings.api_prefix, tags=["Admin"])
+else:
+    app.include_router(vector_admin.router, prefix=settings.api_prefix, tags=["Admin"])
+
+if settings.metrics_enabled:
+    app.include_router(metrics.router, tags=["Metrics"])
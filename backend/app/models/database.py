@@ -1,11 +1,15 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -17,6 +21,7 @@ class Document(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String, nullable=False)
+    tenant_id = Column(String, nullable=False, default=settings.default_tenant)
     file_size = Column(Integer, nullable=False, default=0)
     status = Column(String, nullable=False, default="processing")
     chunk_count = Column(Integer, nullable=False, default=0)
@@ -24,15 +29,138 @@ class Document(Base):
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
                         onupdate=lambda: datetime.now(timezone.utc))
+    deleted_at = Column(DateTime, nullable=True)  # set when tombstoned (status "deleting")
+
+    __table_args__ = (
+        # Chat/health filter on status; the list endpoint orders by created_at
+        Index("ix_documents_status", "status"),
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        Index("ix_documents_tenant_created_at_id", "tenant_id", "created_at", "id"),
+    )
+
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String, nullable=False, default=settings.default_tenant)
+    # Bumped with every appended turn; workers compare it to spot stale cached history
+    turn_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+
+
+class ChatTurn(Base):
+    __tablename__ = "chat_turns"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String, nullable=False)
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # History loads read a session's latest turns
+        Index("ix_chat_turns_session_id_id", "session_id", "id"),
+    )
+
 
+# Schema migrations for databases created by older releases. Each entry upgrades the
+# schema by one version and SQLite's user_version records how many have been applied.
+# Fresh databases get the current schema from create_all and skip straight to the end.
+# New tables need no entry: create_all adds missing tables to existing databases too.
+MIGRATIONS: list[list[str]] = [
+    # 1: secondary indexes
+    [
+        "CREATE INDEX IF NOT EXISTS ix_documents_status ON documents (status)",
+        "CREATE INDEX IF NOT EXISTS ix_documents_created_at_id ON documents (created_at, id)",
+    ],
+    # 2: tombstones for asynchronous deletion
+    [
+        "ALTER TABLE documents ADD COLUMN deleted_at DATETIME",
+    ],
+    # 3: tenant shards (existing documents belong to the default tenant)
+    [
+        "ALTER TABLE documents ADD COLUMN tenant_id VARCHAR NOT NULL "
+        f"DEFAULT '{settings.default_tenant}'",
+        "CREATE INDEX IF NOT EXISTS ix_documents_tenant_created_at_id "
+        "ON documents (tenant_id, created_at, id)",
+    ],
+]
 
-engine = create_async_engine(settings.sqlite_url, echo=settings.debug)
+
+def _is_memory_db(url: str) -> bool:
+    return url.rstrip("/").endswith(":") or ":memory:" in url or "mode=memory" in url
+
+
+def sqlite_pragmas(in_memory: bool) -> list[str]:
+    """Per-connection PRAGMAs for the configured SQLite profile."""
+    pragmas = [
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if not in_memory:
+        # WAL lets background ingestion commits proceed without blocking readers
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        pragmas.append(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+    return pragmas
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {"echo": settings.debug}
+    if not _is_memory_db(url):
+        # aiosqlite defaults to NullPool: a new thread, connection and PRAGMA round per session
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.sqlite_pool_size,
+            max_overflow=settings.sqlite_max_overflow,
+        )
+    return kwargs
+
+
+engine = create_async_engine(settings.sqlite_url, **_engine_kwargs(settings.sqlite_url))
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+_PRAGMAS = sqlite_pragmas(_is_memory_db(settings.sqlite_url))
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in _PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _migrate(conn, fresh: bool) -> None:
+    current = conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+    target = len(MIGRATIONS)
+    if not fresh:
+        for version in range(current, target):
+            for statement in MIGRATIONS[version]:
+                conn.exec_driver_sql(statement)
+            logger.info("db_migrated", version=version + 1)
+    if current != target:
+        conn.exec_driver_sql(f"PRAGMA user_version = {target}")
+
 
 async def init_db():
     async with engine.begin() as conn:
+        fresh = not await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table(Document.__tablename__)
+        )
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate, fresh)
+
+
+async def close_db():
+    """Let SQLite refresh planner statistics, then close pooled connections."""
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA optimize")
+    await engine.dispose()
 
 
 async def get_session() -> AsyncSession:
@@ -6,7 +6,11 @@ The frontend TypeScript types mirror these definitions exactly.
 from datetime import datetime
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+
+# Tenant IDs name vector collections, so they are kept short and collection-safe
+TENANT_ID_PATTERN = r"^[a-z0-9](?:[a-z0-9_-]{0,22}[a-z0-9])?$"
 
 
 # ── Enums ──────────────────────────────────────────────
@@ -16,6 +20,14 @@ class DocumentStatus(str, Enum):
     processing = "processing"
     ready = "ready"
     failed = "failed"
+    deleting = "deleting"
+
+
+class IngestionPriority(str, Enum):
+    """Ingestion lanes, highest priority first."""
+    interactive = "interactive"
+    bulk = "bulk"
+    background = "background"
 
 
 # ── Document Schemas ───────────────────────────────────
@@ -23,6 +35,7 @@ class DocumentStatus(str, Enum):
 class DocumentUploadResponse(BaseModel):
     id: str
     filename: str
+    tenant_id: str
     status: DocumentStatus
     created_at: datetime
 
@@ -32,12 +45,16 @@ class DocumentUploadResponse(BaseModel):
 class DocumentDetail(BaseModel):
     id: str
     filename: str
+    tenant_id: str
     file_size: int
     status: DocumentStatus
     chunk_count: int
     error_message: str | None = None
     created_at: datetime
     updated_at: datetime
+    # While queued or running for ingestion in this process (position 0 = running)
+    priority: IngestionPriority | None = None
+    queue_position: int | None = None
 
     model_config = {"from_attributes": True}
 
@@ -45,6 +62,25 @@ class DocumentDetail(BaseModel):
 class DocumentListResponse(BaseModel):
     documents: list[DocumentDetail]
     total: int
+    next_cursor: str | None = None
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., ge=1)
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+    sha256: str | None = Field(None, pattern=r"^[0-9a-fA-F]{64}$")  # checked on completion
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    filename: str
+    tenant_id: str
+    size: int
+    received: list[tuple[int, int]]  # merged [start, end) byte ranges
+    received_bytes: int
+    complete: bool
+    expires_at: datetime
 
 
 class DocumentDeleteResponse(BaseModel):
@@ -52,6 +88,58 @@ class DocumentDeleteResponse(BaseModel):
     message: str
 
 
+class BulkDeleteRequest(BaseModel):
+    document_ids: list[str] = Field(..., min_length=1)
+
+
+class BulkDeleteResponse(BaseModel):
+    accepted: list[str]
+    not_found: list[str]
+
+
+class CompactionReport(BaseModel):
+    purged_documents: int
+    orphan_vector_documents: int
+    orphan_files: int
+    stale_processing_failed: int
+    expired_upload_sessions: int = 0
+
+
+class IndexRebuildRequest(BaseModel):
+    """HNSW parameters for the rebuilt collection; omitted fields use the settings."""
+
+    m: int | None = Field(None, ge=2, le=128)
+    construction_ef: int | None = Field(None, ge=1, le=2000)
+    search_ef: int | None = Field(None, ge=1, le=2000)
+
+
+# ── Vector Service Schemas ─────────────────────────────
+
+class VectorChunk(BaseModel):
+    text: str
+    chunk_index: int
+    page_or_section: str | None = None
+
+
+class VectorAddRequest(BaseModel):
+    document_id: str
+    filename: str
+    chunks: list[VectorChunk]
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+
+
+class VectorSearchRequest(BaseModel):
+    query: str
+    top_k: int | None = Field(None, ge=1)
+    exclude_document_ids: list[str] | None = None
+    document_ids: list[str] | None = None
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+
+
+class VectorDeleteRequest(BaseModel):
+    document_ids: list[str]
+
+
 # ── Chat Schemas ───────────────────────────────────────
 
 class ChatMessage(BaseModel):
@@ -61,7 +149,40 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=2000)
+    # Server-side history (POST /chat/sessions); replaces resending chat_history
+    session_id: str | None = None
     chat_history: list[ChatMessage] = Field(default_factory=list)
+    # Searches this tenant's shard plus the shared ones; None = the default tenant
+    # (or the session's tenant)
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+    # Time budget for the whole answer; capped by the server's chat_deadline_s
+    deadline_s: float | None = Field(None, gt=0, le=300)
+
+    @model_validator(mode="after")
+    def _one_history_source(self):
+        if self.session_id and self.chat_history:
+            raise ValueError("Send either session_id or chat_history, not both")
+        return self
+
+
+class ChatSessionCreate(BaseModel):
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+
+
+class ChatTurnResponse(BaseModel):
+    question: str
+    answer: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ChatSessionResponse(BaseModel):
+    session_id: str
+    tenant_id: str
+    turn_count: int
+    created_at: datetime
+    turns: list[ChatTurnResponse] = Field(default_factory=list)
 
 
 class SourceChunk(BaseModel):
@@ -71,6 +192,7 @@ class SourceChunk(BaseModel):
     page_or_section: str | None = None
     chunk_index: int
     relevance_score: float
+    also_in: list[str] = []  # other documents containing the same text
 
 
 class ChatResponse(BaseModel):
@@ -99,6 +221,24 @@ class SSEErrorEvent(BaseModel):
     detail: str
 
 
+# Document status streams (GET /documents/events, GET /documents/{id}/events):
+#   id: <epoch>-<seq>
+#   event: status    → data: DocumentStatusEvent
+#   event: done      → data: {}   (single-document streams, after a final status)
+#   : ping           (heartbeat comment)
+
+
+class DocumentStatusEvent(BaseModel):
+    document_id: str
+    tenant_id: str
+    status: DocumentStatus
+    phase: str | None = None  # queued, parsing, chunking or indexing while processing
+    progress: float = 0.0
+    chunk_count: int | None = None
+    error_message: str | None = None
+    timestamp: float
+
+
 # ── Health Schema ──────────────────────────────────────
 
 class HealthResponse(BaseModel):
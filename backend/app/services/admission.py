@@ -0,0 +1,121 @@
+"""Admission control for LLM generations — bounded concurrency with a bounded wait queue."""
+
+import asyncio
+import time
+from collections import deque
+
+from app.config import settings
+from app.core.exceptions import GenerationQueueFullError, GenerationQueueTimeoutError
+from app.core.logging import get_logger
+from app.core.metrics import (
+    GENERATION_ACTIVE,
+    GENERATION_QUEUE_DEPTH,
+    GENERATION_QUEUE_WAIT_SECONDS,
+    GENERATION_REJECTED,
+)
+
+logger = get_logger(__name__)
+
+
+class AdmissionTicket:
+    """A held generation slot. Releasing is idempotent."""
+
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release_slot()
+
+
+class AdmissionController:
+    """Caps concurrent generations; excess requests queue FIFO up to a limit, then get rejected.
+
+    Slots are handed directly to the oldest waiter on release, so a burst of new
+    arrivals cannot overtake requests that are already queued.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._retry_after = retry_after
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float | None = None) -> AdmissionTicket:
+        """Wait for a generation slot.
+
+        Raises GenerationQueueFullError when the wait queue is full and
+        GenerationQueueTimeoutError when no slot frees up within the queue timeout
+        (or ``timeout``, the request's remaining deadline, if shorter).
+        """
+        if self._active < self._max_concurrent and not self._waiters:
+            self._active += 1
+            GENERATION_ACTIVE.set(self._active)
+            GENERATION_QUEUE_WAIT_SECONDS.observe(0.0)
+            return AdmissionTicket(self)
+
+        if len(self._waiters) >= self._max_queue:
+            GENERATION_REJECTED.labels(reason="queue_full").inc()
+            logger.warning("admission_rejected", reason="queue_full", active=self._active)
+            raise GenerationQueueFullError(self._retry_after)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        GENERATION_QUEUE_DEPTH.set(len(self._waiters))
+        start = time.monotonic()
+        try:
+            wait = self._queue_timeout if timeout is None else min(timeout, self._queue_timeout)
+            await asyncio.wait_for(fut, timeout=wait)
+        except TimeoutError:
+            # wait_for can time out after the slot was handed over; give it back
+            if fut.done() and not fut.cancelled():
+                self._release_slot()
+            GENERATION_REJECTED.labels(reason="queue_timeout").inc()
+            logger.warning("admission_rejected", reason="queue_timeout", active=self._active)
+            raise GenerationQueueTimeoutError(self._retry_after) from None
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the caller went away
+            if fut.done() and not fut.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            GENERATION_QUEUE_DEPTH.set(len(self._waiters))
+            GENERATION_QUEUE_WAIT_SECONDS.observe(time.monotonic() - start)
+
+        return AdmissionTicket(self)
+
+    def _release_slot(self) -> None:
+        # Hand the slot to the oldest live waiter; otherwise free it
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                GENERATION_QUEUE_DEPTH.set(len(self._waiters))
+                return
+        self._active -= 1
+        GENERATION_ACTIVE.set(self._active)
+
+
+# Module-level singleton
+admission_controller = AdmissionController(
+    max_concurrent=settings.max_concurrent_generations,
+    max_queue=settings.generation_queue_size,
+    queue_timeout=settings.generation_queue_timeout_s,
+    retry_after=settings.generation_retry_after_s,
+)
@@ -0,0 +1,195 @@
+"""Server-side chat sessions — conversation history kept by the API, not resent by clients.
+
+A session's last ``max_chat_history`` exchanges are held in a bounded in-memory
+LRU and every completed turn is persisted to SQLite. Each turn costs one primary
+key lookup (which also notices turns appended by another worker, via
+``turn_count``) and one insert, however long the conversation gets. Evicted or
+stale sessions are reloaded from their latest turns only.
+
+Each cached session also keeps a small retrieval cache, so a repeated or
+regenerated question reuses the chunks retrieved for it earlier.
+"""
+
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, select, update
+
+from app.config import settings
+from app.core.exceptions import ChatSessionNotFoundError
+from app.core.logging import get_logger
+from app.core.metrics import CHAT_RETRIEVAL_CACHE
+from app.models.database import ChatSession, ChatTurn, async_session
+from app.services.compaction import tombstones
+from app.services.corpus_stats import corpus_stats
+
+logger = get_logger(__name__)
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+class RetrievalCache:
+    """Per-session LRU of retrieved sources, keyed by normalized question text.
+
+    An entry is reused only while the local corpus is unchanged and it is younger
+    than ``chat_retrieval_cache_ttl_s`` (which bounds staleness from documents
+    ingested by other workers), except as a fallback for a search that timed out.
+    Tombstoned documents are filtered out on reuse.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[int, float, list[dict]]] = OrderedDict()
+
+    def get(self, question: str, stale_ok: bool = False) -> list[dict] | None:
+        """Cached sources for the question, if still valid.
+
+        ``stale_ok`` also returns an outdated entry: the fallback when a fresh
+        search ran out of time.
+        """
+        key = _normalize(question)
+        entry = self._entries.get(key)
+        if entry is not None:
+            version, stored_at, sources = entry
+            fresh = time.monotonic() - stored_at < settings.chat_retrieval_cache_ttl_s
+            if stale_ok or (version == corpus_stats.version and fresh):
+                self._entries.move_to_end(key)
+                result = "hit" if version == corpus_stats.version and fresh else "stale"
+                CHAT_RETRIEVAL_CACHE.labels(result=result).inc()
+                return [s for s in sources if s["document_id"] not in tombstones.ids]
+        if not stale_ok:
+            CHAT_RETRIEVAL_CACHE.labels(result="miss").inc()
+        return None
+
+    def put(self, question: str, sources: list[dict]) -> None:
+        if self._maxsize <= 0:
+            return
+        key = _normalize(question)
+        self._entries[key] = (corpus_stats.version, time.monotonic(), sources)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+@dataclass
+class ConversationState:
+    session_id: str
+    tenant_id: str
+    turn_count: int
+    # (question, answer) pairs; only what the prompt can use is kept
+    turns: deque = field(default_factory=lambda: deque(maxlen=settings.max_chat_history))
+    retrieval: RetrievalCache = field(
+        default_factory=lambda: RetrievalCache(settings.chat_retrieval_cache_size)
+    )
+
+    def history(self) -> list[dict]:
+        """Recent turns as chat messages, oldest first."""
+        messages = []
+        for question, answer in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+
+class ChatSessionStore:
+    """LRU of active conversations in front of the chat_sessions/chat_turns tables."""
+
+    def __init__(self):
+        self._cache: OrderedDict[str, ConversationState] = OrderedDict()
+
+    def _remember(self, state: ConversationState) -> None:
+        self._cache[state.session_id] = state
+        self._cache.move_to_end(state.session_id)
+        while len(self._cache) > settings.chat_session_cache_size:
+            self._cache.popitem(last=False)
+
+    async def create(self, tenant_id: str) -> ChatSession:
+        async with async_session() as db:
+            row = ChatSession(id=str(uuid.uuid4()), tenant_id=tenant_id)
+            db.add(row)
+            await db.commit()
+        self._remember(ConversationState(row.id, tenant_id, 0))
+        logger.info("chat_session_created", session_id=row.id, tenant_id=tenant_id)
+        return row
+
+    async def load(self, session_id: str, tenant_id: str | None = None) -> ConversationState:
+        """The session's state, reloading its latest turns if the cached copy is stale.
+
+        A session of another tenant is reported as not found.
+        """
+        async with async_session() as db:
+            result = await db.execute(
+                select(ChatSession.tenant_id, ChatSession.turn_count).where(
+                    ChatSession.id == session_id
+                )
+            )
+            row = result.one_or_none()
+            if row is None or (tenant_id is not None and row.tenant_id != tenant_id):
+                self._cache.pop(session_id, None)
+                raise ChatSessionNotFoundError(session_id)
+
+            state = self._cache.get(session_id)
+            if state is not None and state.turn_count == row.turn_count:
+                self._cache.move_to_end(session_id)
+                return state
+
+            result = await db.execute(
+                select(ChatTurn.question, ChatTurn.answer)
+                .where(ChatTurn.session_id == session_id)
+                .order_by(ChatTurn.id.desc())
+                .limit(settings.max_chat_history)
+            )
+            recent = reversed(result.all())
+
+        fresh = ConversationState(session_id, row.tenant_id, row.turn_count)
+        fresh.turns.extend((question, answer) for question, answer in recent)
+        if state is not None:
+            # Only history went stale; retrieval results are still good
+            fresh.retrieval = state.retrieval
+        self._remember(fresh)
+        return fresh
+
+    async def append_turn(self, state: ConversationState, question: str, answer: str) -> None:
+        """Persist a completed turn and add it to the cached history."""
+        async with async_session() as db:
+            result = await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == state.session_id)
+                .values(turn_count=ChatSession.turn_count + 1)
+            )
+            if result.rowcount == 0:
+                # Deleted while the answer was streaming
+                await db.rollback()
+                self._cache.pop(state.session_id, None)
+                return
+            db.add(ChatTurn(session_id=state.session_id, question=question, answer=answer))
+            await db.commit()
+        state.turns.append((question, answer))
+        state.turn_count += 1
+
+    async def turns(self, session_id: str) -> tuple[ChatSession, list[ChatTurn]]:
+        """The session row and its full transcript."""
+        async with async_session() as db:
+            session = await db.get(ChatSession, session_id)
+            if session is None:
+                raise ChatSessionNotFoundError(session_id)
+            result = await db.execute(
+                select(ChatTurn).where(ChatTurn.session_id == session_id).order_by(ChatTurn.id)
+            )
+            return session, list(result.scalars())
+
+    async def delete(self, session_id: str) -> None:
+        async with async_session() as db:
+            result = await db.execute(delete(ChatSession).where(ChatSession.id == session_id))
+            if result.rowcount == 0:
+                raise ChatSessionNotFoundError(session_id)
+            await db.execute(delete(ChatTurn).where(ChatTurn.session_id == session_id))
+            await db.commit()
+        self._cache.pop(session_id, None)
+
+
+chat_sessions = ChatSessionStore()
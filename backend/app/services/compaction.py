@@ -0,0 +1,231 @@
+"""Asynchronous deletion — tombstones, batched purges and storage reconciliation.
+
+Deleting marks documents as tombstoned (status "deleting") and returns at once.
+Search skips their chunks straight away; their vectors, upload files and DB rows
+are removed later in batches. A periodic compaction pass also cleans up anything
+a crash left behind: orphaned vectors and upload files, and rows stuck in
+"processing".
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.models.database import Document, async_session
+from app.services.corpus_stats import corpus_stats
+from app.services.document_events import document_events
+from app.services.ingestion_scheduler import ingestion_scheduler
+from app.services.uploads import expire_sessions
+
+logger = get_logger(__name__)
+
+# Upload files are saved as "<uuid4>_<original filename>"
+_UUID_LEN = 36
+
+
+class TombstoneRegistry:
+    """IDs of tombstoned documents whose chunks must be excluded from search."""
+
+    def __init__(self):
+        self._ids: frozenset[str] = frozenset()
+
+    @property
+    def ids(self) -> frozenset[str]:
+        # Immutable snapshot — safe to hand to a worker thread
+        return self._ids
+
+    def add(self, document_ids) -> None:
+        self._ids = self._ids | set(document_ids)
+
+    def discard(self, document_ids) -> None:
+        self._ids = self._ids - set(document_ids)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._ids
+
+
+tombstones = TombstoneRegistry()
+
+_purge_lock = asyncio.Lock()
+
+
+async def tombstone_documents(document_ids: list[str]) -> list[str]:
+    """Tombstone the given documents and return the IDs that were found.
+
+    Updates the corpus stats immediately so chat and health stop counting them.
+    """
+    async with async_session() as db:
+        result = await db.execute(
+            select(Document.id, Document.tenant_id, Document.status, Document.chunk_count).where(
+                Document.id.in_(document_ids), Document.status != "deleting"
+            )
+        )
+        rows = result.all()
+        if not rows:
+            return []
+        found = [row.id for row in rows]
+        await db.execute(
+            update(Document)
+            .where(Document.id.in_(found))
+            .values(status="deleting", deleted_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+
+    tombstones.add(found)
+    for row in rows:
+        corpus_stats.document_removed(row.status == "ready", row.chunk_count)
+        document_events.publish(row.id, row.tenant_id, "deleting")
+    logger.info("documents_tombstoned", count=len(found))
+    return found
+
+
+def _upload_files_by_document() -> dict[str, list]:
+    files: dict[str, list] = {}
+    if not settings.upload_dir.exists():
+        return files
+    for path in settings.upload_dir.iterdir():
+        if path.is_file() and len(path.name) > _UUID_LEN and path.name[_UUID_LEN] == "_":
+            files.setdefault(path.name[:_UUID_LEN], []).append(path)
+    return files
+
+
+def _unlink_all(paths) -> int:
+    removed = 0
+    for path in paths:
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as e:
+            logger.warning("file_delete_failed", path=str(path), error=str(e))
+    return removed
+
+
+async def purge_tombstoned(batch_size: int | None = None) -> int:
+    """Remove vectors, files and rows of tombstoned documents, one batch at a time.
+
+    Single-flight: concurrent callers wait for the running pass instead of racing it.
+    """
+    from app.services.vector_store import vector_store
+
+    batch_size = batch_size or settings.purge_batch_size
+    purged = 0
+    async with _purge_lock:
+        files = await asyncio.to_thread(_upload_files_by_document)
+        while True:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(Document.id).where(Document.status == "deleting").limit(batch_size)
+                )
+                batch = list(result.scalars().all())
+                if not batch:
+                    break
+
+                try:
+                    await asyncio.to_thread(vector_store.delete_by_documents, batch)
+                except Exception as e:
+                    # Keep the tombstones; the next pass retries the batch
+                    logger.warning("vector_purge_failed", count=len(batch), error=str(e))
+                    break
+                await asyncio.to_thread(
+                    _unlink_all, [p for doc_id in batch for p in files.pop(doc_id, [])]
+                )
+
+                await db.execute(
+                    delete(Document).where(Document.id.in_(batch), Document.status == "deleting")
+                )
+                await db.commit()
+
+            tombstones.discard(batch)
+            purged += len(batch)
+            logger.info("tombstones_purged", count=len(batch))
+    return purged
+
+
+async def compact() -> dict:
+    """Purge tombstones, then reconcile the vector store and upload dir against the DB."""
+    from app.services.vector_store import vector_store
+
+    report = {
+        "purged_documents": await purge_tombstoned(),
+        "orphan_vector_documents": 0,
+        "orphan_files": 0,
+        "stale_processing_failed": 0,
+        "expired_upload_sessions": await asyncio.to_thread(expire_sessions),
+    }
+
+    async with async_session() as db:
+        known_ids = set((await db.execute(select(Document.id))).scalars().all())
+
+        # Rows whose background task died with a previous process. Documents still
+        # queued for an ingestion worker may legitimately wait longer than that.
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.stale_processing_s)
+        result = await db.execute(
+            update(Document)
+            .where(
+                Document.status == "processing",
+                Document.updated_at < stale_before,
+                Document.id.not_in(ingestion_scheduler.document_ids()),
+            )
+            .values(status="failed", error_message="Processing was interrupted")
+        )
+        await db.commit()
+        report["stale_processing_failed"] = result.rowcount or 0
+
+    # Vectors whose document row no longer exists. Documents created after the ID
+    # snapshot may already have vectors, so re-check against the DB before deleting.
+    vector_doc_ids = await asyncio.to_thread(vector_store.document_ids)
+    candidates = vector_doc_ids - known_ids
+    if candidates:
+        async with async_session() as db:
+            result = await db.execute(select(Document.id).where(Document.id.in_(candidates)))
+            orphans = list(candidates - set(result.scalars().all()))
+        if orphans:
+            await asyncio.to_thread(vector_store.delete_by_documents, orphans)
+        report["orphan_vector_documents"] = len(orphans)
+
+    # Upload files without a row, old enough that they are not an upload in flight
+    cutoff = time.time() - settings.compaction_grace_s
+    files = await asyncio.to_thread(_upload_files_by_document)
+    orphan_files = [
+        path
+        for doc_id, paths in files.items()
+        if doc_id not in known_ids
+        for path in paths
+        if path.stat().st_mtime < cutoff
+    ]
+    if orphan_files:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Document.id).where(
+                    Document.id.in_({p.name[:_UUID_LEN] for p in orphan_files})
+                )
+            )
+            still_known = set(result.scalars().all())
+        orphan_files = [p for p in orphan_files if p.name[:_UUID_LEN] not in still_known]
+        report["orphan_files"] = await asyncio.to_thread(_unlink_all, orphan_files)
+
+    logger.info("compaction_complete", **report)
+    return report
+
+
+async def load_tombstones() -> None:
+    """Restore the tombstone set after a restart and finish any interrupted purge."""
+    async with async_session() as db:
+        result = await db.execute(select(Document.id).where(Document.status == "deleting"))
+        tombstones.add(result.scalars().all())
+    if tombstones.ids:
+        logger.info("tombstones_loaded", count=len(tombstones.ids))
+
+
+async def run_compactor(interval: float) -> None:
+    """Compact forever at a fixed interval (run as a lifespan task)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await compact()
+        except Exception as e:
+            logger.warning("compaction_failed", error=str(e))
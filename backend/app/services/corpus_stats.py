@@ -0,0 +1,91 @@
+"""In-memory corpus statistics — ready-document and vector counts without per-request queries."""
+
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from app.core.logging import get_logger
+from app.models.database import Document, async_session
+
+logger = get_logger(__name__)
+
+
+class CorpusStats:
+    """Counts kept current by ingestion/deletion and periodically reconciled with storage.
+
+    Callers apply deltas only after their DB transaction commits, so the counts
+    never include uncommitted work. A reconcile pass overwrites the counts with
+    fresh values unless a delta landed while it was querying; in that case the
+    result is discarded and the next pass tries again.
+    """
+
+    def __init__(self):
+        self.ready_documents = 0
+        self.vector_count = 0
+        self.last_reconciled_at: float | None = None
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Bumped by every local ingestion or deletion; cached retrievals key on it."""
+        return self._version
+
+    def document_ready(self, chunk_count: int) -> None:
+        """Record a document that finished ingestion (call after commit)."""
+        self.ready_documents += 1
+        self.vector_count += chunk_count
+        self._version += 1
+
+    def document_removed(self, was_ready: bool, chunk_count: int) -> None:
+        """Record a deleted document (call after commit)."""
+        if was_ready:
+            self.ready_documents = max(0, self.ready_documents - 1)
+            self.vector_count = max(0, self.vector_count - chunk_count)
+        self._version += 1
+
+    async def reconcile(self) -> bool:
+        """Recount from SQLite and the vector store. Returns False if a concurrent update won."""
+        version = self._version
+        async with async_session() as db:
+            result = await db.execute(select(func.count()).where(Document.status == "ready"))
+            ready = result.scalar() or 0
+
+        vectors = 0
+        try:
+            from app.services.vector_store import vector_store
+
+            vectors = await asyncio.to_thread(vector_store.count)
+        except Exception as e:
+            logger.warning("corpus_stats_vector_count_failed", error=str(e))
+            vectors = self.vector_count
+
+        if version != self._version:
+            logger.debug("corpus_stats_reconcile_skipped", reason="concurrent_update")
+            return False
+
+        if (ready, vectors) != (self.ready_documents, self.vector_count):
+            logger.info(
+                "corpus_stats_drift_corrected",
+                ready_documents=ready,
+                vector_count=vectors,
+                previous_ready_documents=self.ready_documents,
+                previous_vector_count=self.vector_count,
+            )
+        self.ready_documents = ready
+        self.vector_count = vectors
+        self.last_reconciled_at = time.time()
+        return True
+
+    async def run_reconciler(self, interval: float) -> None:
+        """Reconcile forever at a fixed interval (run as a lifespan task)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning("corpus_stats_reconcile_failed", error=str(e))
+
+
+# Module-level singleton
+corpus_stats = CorpusStats()
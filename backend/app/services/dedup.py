@@ -0,0 +1,446 @@
+"""Near-duplicate chunk detection — MinHash signatures behind an LSH band index.
+
+Corporate corpora repeat themselves: headers, disclaimers, copied sections. When a
+chunk's word 3-shingles have an estimated Jaccard similarity of at least
+``dedup_threshold`` with a chunk already stored in the collection, it is neither
+embedded nor stored again; it is recorded as a reference to that canonical chunk.
+A search hit on a canonical chunk is resolved to the live documents holding it,
+so the text fills one top-k slot and the other documents are listed in ``also_in``.
+
+Signatures have ``NUM_PERM`` values in ``BANDS`` bands. Two chunks become
+candidates when any band matches exactly and are then compared on the full
+signature; with 16 bands of 4 rows, pairs at 0.85 similarity are found with
+>99.9% probability while unrelated chunks almost never collide.
+
+A collection's index is an append-only JSON-lines log next to its manifest,
+replayed on startup and rewritten once mostly superseded.
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+_ROWS = NUM_PERM // BANDS
+_SHINGLE = 3
+# Shorter chunks (headings, captions) are always stored as they are
+_MIN_WORDS = 8
+_PRIME = 4294967311  # smallest prime above 2**32
+
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+ChunkKey = tuple[str, int]  # (document_id, chunk_index)
+
+
+def signature(text: str) -> np.ndarray | None:
+    """MinHash signature of the text's word 3-shingles, or None for very short text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < _MIN_WORDS:
+        return None
+    shingles = {" ".join(words[i : i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    # a*h + b stays below 2**64 for 32-bit a, b and h
+    values = (np.outer(_A, hashes) + _B[:, None]) % _PRIME
+    return np.minimum(values.min(axis=1), 0xFFFFFFFF).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _band_keys(sig: np.ndarray) -> list[int]:
+    return [hash(sig[i * _ROWS : (i + 1) * _ROWS].tobytes()) for i in range(BANDS)]
+
+
+def _encode(sig: np.ndarray) -> str:
+    return base64.b64encode(sig.tobytes()).decode()
+
+
+def _decode(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.uint32).copy()
+
+
+def collapse_near_duplicates(sources: list[dict]) -> list[dict]:
+    """Drop results that repeat a better-scored one, listing their documents in ``also_in``.
+
+    ``sources`` are search results, best first. Catches duplicates that were
+    stored separately (before deduplication, or in different shards).
+    """
+    kept: list[tuple[dict, np.ndarray | None]] = []
+    for source in sources:
+        sig = signature(source["content"])
+        for other, other_sig in kept:
+            if (sig is None or other_sig is None) and source["content"] != other["content"]:
+                continue
+            if sig is not None and other_sig is not None:
+                if similarity(sig, other_sig) < settings.dedup_threshold:
+                    continue
+            also_in = other.setdefault("also_in", [])
+            for name in (source["document_name"], *source.get("also_in", ())):
+                if name != other["document_name"] and name not in also_in:
+                    also_in.append(name)
+            break
+        else:
+            kept.append((source, sig))
+    return [source for source, _ in kept]
+
+
+@dataclass
+class ChunkRef:
+    """A chunk stored as a reference to a near-duplicate canonical chunk."""
+
+    filename: str
+    page_or_section: str | None
+
+
+@dataclass
+class DedupPlan:
+    """Which of a document's chunks (by position) to embed and store."""
+
+    signatures: list[np.ndarray | None]
+    unique: list[int] = field(default_factory=list)
+    # position -> canonical chunk it duplicates
+    duplicates: dict[int, ChunkKey] = field(default_factory=dict)
+
+
+class NearDuplicateIndex:
+    """Canonical chunk signatures and the references to them, for one collection."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._signatures: dict[ChunkKey, np.ndarray] = {}
+        self._buckets: list[dict[int, set[ChunkKey]]] = [{} for _ in range(BANDS)]
+        self._owned: dict[str, set[int]] = {}
+        self._refs: dict[ChunkKey, dict[ChunkKey, ChunkRef]] = {}
+        self._ref_docs: dict[str, dict[int, ChunkKey]] = {}
+        self._records = 0
+        self._load()
+
+    # ── State ──────────────────────────────────────────
+
+    def _add_canonical(self, key: ChunkKey, sig: np.ndarray) -> None:
+        self._signatures[key] = sig
+        for band, bucket in zip(self._buckets, _band_keys(sig)):
+            band.setdefault(bucket, set()).add(key)
+        self._owned.setdefault(key[0], set()).add(key[1])
+
+    def _remove_canonical(self, key: ChunkKey) -> None:
+        sig = self._signatures.pop(key, None)
+        if sig is not None:
+            for band, bucket in zip(self._buckets, _band_keys(sig)):
+                members = band.get(bucket)
+                if members is not None:
+                    members.discard(key)
+                    if not members:
+                        del band[bucket]
+        owned = self._owned.get(key[0])
+        if owned is not None:
+            owned.discard(key[1])
+            if not owned:
+                del self._owned[key[0]]
+
+    def _add_ref(self, key: ChunkKey, canonical: ChunkKey, ref: ChunkRef) -> None:
+        self._refs.setdefault(canonical, {})[key] = ref
+        self._ref_docs.setdefault(key[0], {})[key[1]] = canonical
+
+    def _remove_ref(self, key: ChunkKey) -> None:
+        canonical = self._ref_docs.get(key[0], {}).pop(key[1], None)
+        if not self._ref_docs.get(key[0], True):
+            del self._ref_docs[key[0]]
+        refs = self._refs.get(canonical)
+        if refs is not None:
+            refs.pop(key, None)
+            if not refs:
+                del self._refs[canonical]
+
+    def _move(self, old: ChunkKey, new: ChunkKey) -> None:
+        """Make reference ``new`` the canonical copy in place of ``old``."""
+        refs = self._refs.pop(old, {})
+        refs.pop(new)
+        del self._ref_docs[new[0]][new[1]]
+        if not self._ref_docs[new[0]]:
+            del self._ref_docs[new[0]]
+        sig = self._signatures[old]
+        self._remove_canonical(old)
+        self._add_canonical(new, sig)
+        for key, other in refs.items():
+            self._add_ref(key, new, other)
+
+    def _delete(self, document_ids: set[str]) -> None:
+        for document_id in document_ids:
+            for chunk_index in list(self._ref_docs.get(document_id, {})):
+                self._remove_ref((document_id, chunk_index))
+            for chunk_index in list(self._owned.get(document_id, ())):
+                key = (document_id, chunk_index)
+                for ref_key in list(self._refs.get(key, {})):
+                    self._remove_ref(ref_key)
+                self._remove_canonical(key)
+
+    def _find(
+        self, sig: np.ndarray, buckets: list[dict[int, set[ChunkKey]]], signatures: dict
+    ) -> ChunkKey | None:
+        best, best_score = None, settings.dedup_threshold
+        candidates: set[ChunkKey] = set()
+        for band, bucket in zip(buckets, _band_keys(sig)):
+            candidates |= band.get(bucket, set())
+        for key in candidates:
+            score = similarity(sig, signatures[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    # ── Persistence ────────────────────────────────────
+
+    def _apply(self, record: dict) -> None:
+        op = record["op"]
+        if op == "add":
+            for chunk_index, sig in record["chunks"]:
+                self._add_canonical((record["doc"], chunk_index), _decode(sig))
+        elif op == "ref":
+            for chunk_index, section, owner, owner_index in record["chunks"]:
+                self._add_ref(
+                    (record["doc"], chunk_index),
+                    (owner, owner_index),
+                    ChunkRef(record["filename"], section),
+                )
+        elif op == "promote":
+            for old_doc, old_index, new_doc, new_index in record["moves"]:
+                self._move((old_doc, old_index), (new_doc, new_index))
+        elif op == "delete":
+            self._delete(set(record["docs"]))
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            return
+        with open(self._path) as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        # A torn last line from a crash mid-append
+                        logger.warning("dedup_log_record_skipped", path=str(self._path))
+                        continue
+                    self._records += 1
+        live = len(self._owned) + len(self._ref_docs)
+        if self._records > 2 * live + 100:
+            self._rewrite()
+
+    def _records_for_state(self) -> list[dict]:
+        records = []
+        for document_id, owned in self._owned.items():
+            chunks = []
+            for chunk_index in sorted(owned):
+                chunks.append([chunk_index, _encode(self._signatures[(document_id, chunk_index)])])
+            records.append({"op": "add", "doc": document_id, "chunks": chunks})
+        for document_id, refs in self._ref_docs.items():
+            chunks, filename = [], ""
+            for chunk_index, canonical in sorted(refs.items()):
+                ref = self._refs[canonical][(document_id, chunk_index)]
+                filename = ref.filename
+                chunks.append([chunk_index, ref.page_or_section, *canonical])
+            records.append(
+                {"op": "ref", "doc": document_id, "filename": filename, "chunks": chunks}
+            )
+        return records
+
+    def _rewrite(self) -> None:
+        records = self._records_for_state()
+        tmp = self._path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        os.replace(tmp, self._path)
+        logger.info("dedup_log_compacted", path=str(self._path), records=len(records))
+        self._records = len(records)
+
+    def _append(self, *records: dict) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        self._records += len(records)
+
+    def clear(self) -> None:
+        """Forget everything (the collection was replaced wholesale)."""
+        with self._lock:
+            self._signatures.clear()
+            self._buckets = [{} for _ in range(BANDS)]
+            self._owned.clear()
+            self._refs.clear()
+            self._ref_docs.clear()
+            self._records = 0
+            self._path.unlink(missing_ok=True)
+
+    # ── Ingestion ──────────────────────────────────────
+
+    def plan(self, document_id: str, chunks: list[dict]) -> DedupPlan:
+        """Split a document's chunks into ones to store and near-duplicates of stored ones.
+
+        Later chunks of the same document may also duplicate earlier ones.
+        """
+        plan = DedupPlan(signatures=[signature(c["text"]) for c in chunks])
+        local_buckets: list[dict[int, set[ChunkKey]]] = [{} for _ in range(BANDS)]
+        local: dict[ChunkKey, np.ndarray] = {}
+        with self._lock:
+            for position, (chunk, sig) in enumerate(zip(chunks, plan.signatures)):
+                if sig is None:
+                    plan.unique.append(position)
+                    continue
+                match = self._find(sig, local_buckets, local) or self._find(
+                    sig, self._buckets, self._signatures
+                )
+                if match is not None:
+                    plan.duplicates[position] = match
+                    continue
+                plan.unique.append(position)
+                key = (document_id, chunk["chunk_index"])
+                local[key] = sig
+                for band, bucket in zip(local_buckets, _band_keys(sig)):
+                    band.setdefault(bucket, set()).add(key)
+        return plan
+
+    def commit(
+        self, document_id: str, filename: str, chunks: list[dict], plan: DedupPlan
+    ) -> list[int]:
+        """Record a stored plan. Returns positions whose canonical chunk was deleted
+        meanwhile; the caller must store those itself and commit them again.
+        """
+        with self._lock:
+            batch = {(document_id, chunks[p]["chunk_index"]) for p in plan.unique}
+            orphaned = [
+                position
+                for position, canonical in plan.duplicates.items()
+                if canonical not in batch
+                and canonical[1] not in self._owned.get(canonical[0], ())
+            ]
+            added = []
+            for position in plan.unique:
+                sig = plan.signatures[position]
+                if sig is not None:
+                    chunk_index = chunks[position]["chunk_index"]
+                    self._add_canonical((document_id, chunk_index), sig)
+                    added.append([chunk_index, _encode(sig)])
+            refs = []
+            for position, canonical in plan.duplicates.items():
+                if position in orphaned:
+                    continue
+                chunk = chunks[position]
+                ref = ChunkRef(filename, chunk.get("page_or_section"))
+                self._add_ref((document_id, chunk["chunk_index"]), canonical, ref)
+                refs.append([chunk["chunk_index"], ref.page_or_section, *canonical])
+            records = []
+            if added:
+                records.append({"op": "add", "doc": document_id, "chunks": added})
+            if refs:
+                records.append(
+                    {"op": "ref", "doc": document_id, "filename": filename, "chunks": refs}
+                )
+            if records:
+                self._append(*records)
+        return orphaned
+
+    # ── Deletion ───────────────────────────────────────
+
+    def promotions(self, document_ids: set[str]) -> list[tuple[ChunkKey, ChunkKey, ChunkRef]]:
+        """(canonical, new canonical, its ref) for canonical chunks of the deleted
+        documents that are still referenced by a surviving document.
+        """
+        moves = []
+        with self._lock:
+            for document_id in document_ids:
+                for chunk_index in sorted(self._owned.get(document_id, ())):
+                    key = (document_id, chunk_index)
+                    for ref_key, ref in self._refs.get(key, {}).items():
+                        if ref_key[0] not in document_ids:
+                            moves.append((key, ref_key, ref))
+                            break
+        return moves
+
+    def remove_documents(
+        self, document_ids: set[str], moves: list[tuple[ChunkKey, ChunkKey, ChunkRef]]
+    ) -> None:
+        """Apply the promotions whose vectors were copied, then forget the documents."""
+        with self._lock:
+            records = []
+            applied = []
+            for old, new, _ in moves:
+                if old in self._refs and new in self._refs[old]:
+                    self._move(old, new)
+                    applied.append([*old, *new])
+            if applied:
+                records.append({"op": "promote", "moves": applied})
+            known = {
+                d for d in document_ids if d in self._owned or d in self._ref_docs
+            }
+            if known:
+                self._delete(known)
+                records.append({"op": "delete", "docs": sorted(known)})
+            if records:
+                self._append(*records)
+
+    # ── Queries ────────────────────────────────────────
+
+    @property
+    def has_references(self) -> bool:
+        return bool(self._refs)
+
+    def references(self, key: ChunkKey) -> list[tuple[ChunkKey, ChunkRef]]:
+        """Chunks stored as references to canonical chunk ``key``."""
+        with self._lock:
+            return list(self._refs.get(key, {}).items())
+
+    def owners_with_references(self, document_ids: set[str]) -> set[str]:
+        """Those documents that own a canonical chunk some other chunk refers to."""
+        with self._lock:
+            return {
+                d
+                for d in document_ids
+                if any((d, i) in self._refs for i in self._owned.get(d, ()))
+            }
+
+    def canonical_owners(self, document_ids: set[str]) -> set[str]:
+        """Documents owning canonical copies of the given documents' referenced chunks."""
+        with self._lock:
+            return {
+                canonical[0]
+                for d in document_ids
+                for canonical in self._ref_docs.get(d, {}).values()
+            }
+
+    def reference_map(self) -> dict[str, list[tuple[int, ChunkRef, ChunkKey]]]:
+        """document -> its referenced chunks as (chunk_index, ref, canonical)."""
+        with self._lock:
+            return {
+                document_id: [
+                    (chunk_index, self._refs[canonical][(document_id, chunk_index)], canonical)
+                    for chunk_index, canonical in sorted(refs.items())
+                ]
+                for document_id, refs in self._ref_docs.items()
+            }
+
+    def reference_documents(self) -> set[str]:
+        with self._lock:
+            return set(self._ref_docs)
+
+    def reference_count(self) -> int:
+        with self._lock:
+            return sum(len(refs) for refs in self._ref_docs.values())
@@ -0,0 +1,132 @@
+"""In-process document status events — the feed behind the document SSE streams.
+
+Ingestion and deletion publish an event whenever a document changes status or
+moves to the next processing phase. Events are kept in a bounded ring buffer so
+a reconnecting client can resume after the last event it saw (``Last-Event-ID``).
+
+Event IDs are ``<epoch>-<seq>``. The epoch is random per process, so an ID from
+another worker or from before a restart is recognised as unknown and the client
+gets a fresh snapshot instead of a silently incomplete replay.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from app.config import settings
+
+# Processing phases in order; progress is the fraction of phases completed
+PHASES = ("queued", "parsing", "chunking", "indexing")
+
+
+@dataclass(frozen=True)
+class DocumentEvent:
+    id: str
+    document_id: str
+    tenant_id: str
+    status: str
+    phase: str | None = None
+    progress: float = 0.0
+    chunk_count: int | None = None
+    error_message: str | None = None
+    timestamp: float = 0.0
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in ("ready", "failed", "deleting")
+
+    def payload(self) -> dict:
+        data = asdict(self)
+        del data["id"]
+        return data
+
+
+class DocumentEventBus:
+    """A ring buffer of recent events plus wake-ups for the streams waiting on them.
+
+    Publishing and waiting both happen on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, buffer_size: int | None = None):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events: deque[DocumentEvent] = deque(
+            maxlen=buffer_size or settings.document_events_buffer
+        )
+        self._seq = 0
+        self._waiters: set[asyncio.Event] = set()
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(
+        self,
+        document_id: str,
+        tenant_id: str,
+        status: str,
+        phase: str | None = None,
+        **fields,
+    ) -> DocumentEvent:
+        if status == "ready":
+            progress = 1.0
+        elif phase in PHASES:
+            progress = round(PHASES.index(phase) / len(PHASES), 2)
+        else:
+            progress = 0.0
+        self._seq += 1
+        event = DocumentEvent(
+            id=f"{self.epoch}-{self._seq}",
+            document_id=document_id,
+            tenant_id=tenant_id,
+            status=status,
+            phase=phase,
+            progress=progress,
+            timestamp=time.time(),
+            **fields,
+        )
+        self._events.append(event)
+        for waiter in self._waiters:
+            waiter.set()
+        return event
+
+    def _seq_of(self, event_id: str) -> int | None:
+        """Sequence number of an ID from this process, or None if it is unknown."""
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        return int(seq)
+
+    def can_resume(self, event_id: str) -> bool:
+        """True if every event after ``event_id`` is still buffered."""
+        seq = self._seq_of(event_id)
+        if seq is None:
+            return False
+        oldest = self._seq - len(self._events) + 1
+        return seq >= oldest - 1
+
+    def since(self, event_id: str) -> list[DocumentEvent]:
+        """Buffered events after ``event_id`` (which must satisfy ``can_resume``)."""
+        seq = self._seq_of(event_id) or 0
+        skip = len(self._events) - (self._seq - seq)
+        return list(self._events)[max(0, skip):]
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Event]:
+        """An event set on every publish; the subscriber clears it before reading."""
+        waiter = asyncio.Event()
+        self._waiters.add(waiter)
+        try:
+            yield waiter
+        finally:
+            self._waiters.discard(waiter)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._waiters)
+
+
+document_events = DocumentEventBus()
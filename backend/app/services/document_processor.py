@@ -1,85 +1,162 @@
 """Document processing pipeline — parse, chunk, and index documents."""
 
+import asyncio
+import multiprocessing
+import os
 import re
+import threading
+import time
 import uuid
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
+from xml.etree import ElementTree
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import INGESTION_DOCUMENTS, INGESTION_PHASE_SECONDS, PDF_PAGE_FAILURES
+from app.core.tracing import tracer
 from app.models.database import Document
+from app.services.corpus_stats import corpus_stats
+from app.services.document_events import document_events
+from app.services.pdf_extract import extract_page_range, extract_pages
 from app.services.vector_store import vector_store
 
 logger = get_logger(__name__)
 
 
+@contextmanager
+def _phase(name: str):
+    """Record an ingestion phase as both a latency metric and a trace span."""
+    with tracer.span(f"ingestion.{name}"), INGESTION_PHASE_SECONDS.labels(phase=name).time():
+        yield
+
+
 async def process_document(document_id: str, file_path: str, db: AsyncSession):
     """Parse, chunk, and index a document. Updates the DB record on completion or failure.
 
     Called as a background task with its own DB session (passed from the route).
     """
+    with tracer.span("ingestion.process_document", document_id=document_id):
+        await _process_document(document_id, file_path, db)
+
+
+async def _process_document(document_id: str, file_path: str, db: AsyncSession):
     path = Path(file_path)
+    start = time.perf_counter()
+    tenant_id = settings.default_tenant
     try:
         logger.info("processing_started", document_id=document_id, file_path=file_path)
 
-        # 1. Parse document to raw text
-        text = parse_document(path)
+        # 1. Get the original filename and tenant from DB
+        result = await db.execute(select(Document).where(Document.id == document_id))
+        doc = result.scalar_one_or_none()
+        if not doc:
+            raise ValueError(f"Document {document_id} not found in database")
+        tenant_id = doc.tenant_id
+
+        # 2. Parse document to raw text
+        document_events.publish(document_id, tenant_id, "processing", "parsing")
+        problems: list[str] = []
+        with _phase("parse"):
+            # Off the event loop: large PDFs wait here on the extraction workers
+            text = await asyncio.to_thread(parse_document, path, problems)
         if not text.strip():
             raise ValueError("Document is empty or could not be parsed")
 
-        # 2. Chunk the text
-        chunks = chunk_text(
-            text,
-            chunk_size=settings.chunk_size,
-            overlap=settings.chunk_overlap,
-        )
+        # 3. Chunk the text
+        document_events.publish(document_id, tenant_id, "processing", "chunking")
+        with _phase("chunk"):
+            chunks = chunk_text(
+                text,
+                chunk_size=settings.chunk_size,
+                overlap=settings.chunk_overlap,
+            )
         if not chunks:
             raise ValueError("No chunks produced from document")
 
-        # 3. Get the original filename from DB
-        result = await db.execute(select(Document).where(Document.id == document_id))
-        doc = result.scalar_one_or_none()
-        if not doc:
-            raise ValueError(f"Document {document_id} not found in database")
-
-        # 4. Add chunks to vector store
-        count = vector_store.add_chunks(document_id, doc.filename, chunks)
+        # 4. Add chunks to vector store (embed + store phases are timed inside)
+        document_events.publish(
+            document_id, tenant_id, "processing", "indexing", chunk_count=len(chunks)
+        )
+        count = await asyncio.to_thread(
+            vector_store.add_chunks, document_id, doc.filename, chunks, tenant_id
+        )
 
-        # 5. Update DB record
-        doc.status = "ready"
-        doc.chunk_count = count
-        await db.commit()
+        # 5. Update DB record; skipped PDF pages are kept as a note on the ready document
+        warning = _problems_note(problems)
+        with _phase("persist"):
+            # Only a still-processing row becomes ready; a tombstoned one stays deleted
+            result = await db.execute(
+                update(Document)
+                .where(Document.id == document_id, Document.status == "processing")
+                .values(status="ready", chunk_count=count, error_message=warning)
+            )
+            await db.commit()
+        if result.rowcount == 0:
+            logger.info("processing_discarded", document_id=document_id, reason="deleted")
+            return
+        corpus_stats.document_ready(count)
+        document_events.publish(
+            document_id, tenant_id, "ready", chunk_count=count, error_message=warning
+        )
 
+        duration = time.perf_counter() - start
+        INGESTION_PHASE_SECONDS.labels(phase="total").observe(duration)
+        INGESTION_DOCUMENTS.labels(status="ready").inc()
+        tracer.current_span().set_attribute("chunk_count", count)
         logger.info(
             "processing_complete",
             document_id=document_id,
             chunk_count=count,
+            duration_ms=round(duration * 1000, 1),
         )
 
     except Exception as e:
+        INGESTION_DOCUMENTS.labels(status="failed").inc()
+        tracer.current_span().set_attribute("error", str(e))
         logger.error("processing_failed", document_id=document_id, error=str(e))
         try:
-            result = await db.execute(select(Document).where(Document.id == document_id))
-            doc = result.scalar_one_or_none()
-            if doc:
-                doc.status = "failed"
-                doc.error_message = str(e)
-                await db.commit()
+            await db.rollback()
+            # A document tombstoned mid-processing must not come back as "failed"
+            result = await db.execute(
+                update(Document)
+                .where(Document.id == document_id, Document.status == "processing")
+                .values(status="failed", error_message=str(e))
+            )
+            await db.commit()
+            if result.rowcount:
+                document_events.publish(document_id, tenant_id, "failed", error_message=str(e))
         except Exception as db_err:
             logger.error("status_update_failed", document_id=document_id, error=str(db_err))
 
 
-def parse_document(file_path: Path) -> str:
-    """Extract text from a document based on its file extension."""
+def _problems_note(problems: list[str]) -> str | None:
+    if not problems:
+        return None
+    pages = [p.split(":", 1)[0].removeprefix("Page ") for p in problems]
+    return f"Skipped {len(problems)} unreadable page(s): {', '.join(pages)}"
+
+
+def parse_document(file_path: Path, problems: list[str] | None = None) -> str:
+    """Extract text from a document based on its file extension.
+
+    Parts that could not be read but did not stop extraction (e.g. a corrupt PDF
+    page) are described in ``problems`` when a list is passed.
+    """
     ext = file_path.suffix.lower()
 
     if ext in (".md", ".txt"):
         return file_path.read_text(encoding="utf-8")
 
     elif ext == ".pdf":
-        return _parse_pdf(file_path)
+        return _parse_pdf(file_path, problems)
 
     elif ext == ".docx":
         return _parse_docx(file_path)
@@ -88,26 +165,264 @@ def parse_document(file_path: Path) -> str:
         raise ValueError(f"Unsupported file type: {ext}")
 
 
-def _parse_pdf(file_path: Path) -> str:
-    """Extract text from a PDF using pypdf."""
+# ── PDF ────────────────────────────────────────────────
+
+_pdf_pool: ProcessPoolExecutor | None = None
+# Large PDFs are extracted from several to_thread workers at once
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Spawned, not forked: the API process runs threads (and maybe a loaded model)
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=settings.pdf_workers or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor, stop: bool = False) -> None:
+    """Forget a broken pool, unless another caller already replaced it.
+
+    With ``stop``, also kill its workers: one of them is stuck on a page.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    if stop:
+        # No public way to kill running workers before Python 3.14's terminate_workers
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+
+def _extract_pdf_parallel(file_path: Path, page_count: int) -> list[tuple[int, str, str | None]]:
+    """Extract page ranges in worker processes; a failed or hung range fails only its pages.
+
+    Each range gets ``pdf_range_timeout_s``. Ranges queue for the pool's workers, so
+    the file as a whole waits at most that long per round of ranges.
+    """
+    workers = settings.pdf_workers or os.cpu_count() or 1
+    step = max(1, min(settings.pdf_pages_per_task, -(-page_count // workers)))
+    pool = _get_pdf_pool()
+    futures = {
+        pool.submit(
+            extract_page_range, str(file_path), start, min(start + step, page_count)
+        ): (start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    }
+    rounds = -(-len(futures) // workers)
+    deadline = time.monotonic() + settings.pdf_range_timeout_s * rounds
+    pages = []
+    pending = set(futures)
+    while pending:
+        done, pending = wait(
+            pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+        )
+        if not done:
+            break
+        for future in done:
+            start, stop = futures[future]
+            try:
+                pages.extend(future.result())
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # A worker died (e.g. out of memory); start a fresh pool next time
+                    _discard_pdf_pool(pool)
+                error = f"{type(e).__name__}: {e}"
+                pages.extend((number, "", error) for number in range(start + 1, stop + 1))
+    if pending:
+        logger.warning(
+            "pdf_ranges_timed_out",
+            file=file_path.name,
+            ranges=len(pending),
+            timeout_s=settings.pdf_range_timeout_s,
+        )
+        _discard_pdf_pool(pool, stop=True)
+        error = f"TimeoutError: not extracted within {settings.pdf_range_timeout_s:g}s"
+        for future in pending:
+            start, stop = futures[future]
+            pages.extend((number, "", error) for number in range(start + 1, stop + 1))
+    return sorted(pages, key=lambda page: page[0])
+
+
+def _parse_pdf(file_path: Path, problems: list[str] | None = None) -> str:
+    """Extract text from a PDF using pypdf, in page order with [Page N] markers.
+
+    PDFs of ``pdf_parallel_min_pages`` pages or more are split into page ranges
+    extracted in parallel by worker processes. A page that fails is skipped and
+    reported; the document only fails if no page could be read.
+    """
     from pypdf import PdfReader
 
     reader = PdfReader(str(file_path))
-    pages = []
-    for i, page in enumerate(reader.pages, start=1):
-        text = page.extract_text()
-        if text and text.strip():
-            pages.append(f"[Page {i}]\n{text.strip()}")
-    return "\n\n".join(pages)
+    page_count = len(reader.pages)
+    if page_count >= settings.pdf_parallel_min_pages and settings.pdf_workers != 1:
+        pages = _extract_pdf_parallel(file_path, page_count)
+    else:
+        pages = extract_pages(reader, 0, page_count)
+
+    failed = [(number, error) for number, _, error in pages if error]
+    if failed:
+        PDF_PAGE_FAILURES.inc(len(failed))
+        logger.warning(
+            "pdf_pages_failed",
+            file=file_path.name,
+            pages=[number for number, _ in failed],
+            error=failed[0][1],
+        )
+        if len(failed) == page_count:
+            raise ValueError(f"No page could be extracted: {failed[0][1]}")
+        if problems is not None:
+            problems.extend(f"Page {number}: {error}" for number, error in failed)
+
+    return "\n\n".join(
+        f"[Page {number}]\n{text.strip()}" for number, text, _ in pages if text.strip()
+    )
 
 
 def _parse_docx(file_path: Path) -> str:
-    """Extract text from a DOCX using python-docx."""
-    import docx
+    """Extract text from a DOCX, streaming its XML (see ``iter_docx_blocks``)."""
+    return "\n\n".join(iter_docx_blocks(file_path))
+
+
+# ── DOCX streaming ─────────────────────────────────────
 
-    doc = docx.Document(str(file_path))
-    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    return "\n\n".join(paragraphs)
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_HEADING_NAME = re.compile(r"^heading (\d)$")
+
+
+def _docx_heading_levels(archive: zipfile.ZipFile) -> dict[str, int]:
+    """Heading level per paragraph style ID, from ``word/styles.xml``.
+
+    Style IDs are localized ("Heading1", "Überschrift1", ...), so levels come from the
+    built-in style names and outline levels, following ``basedOn`` chains.
+    """
+    try:
+        root = ElementTree.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return {}
+    levels: dict[str, int] = {}
+    based_on: dict[str, str] = {}
+    for style in root.iter(f"{_W}style"):
+        if style.get(f"{_W}type") != "paragraph":
+            continue
+        style_id = style.get(f"{_W}styleId")
+        name = style.find(f"{_W}name")
+        name = (name.get(f"{_W}val") or "").lower() if name is not None else ""
+        outline = style.find(f"{_W}pPr/{_W}outlineLvl")
+        if name == "title":
+            levels[style_id] = 1
+        elif match := _HEADING_NAME.match(name):
+            levels[style_id] = int(match.group(1))
+        elif outline is not None and outline.get(f"{_W}val", "").isdigit():
+            levels[style_id] = int(outline.get(f"{_W}val")) + 1
+        if (parent := style.find(f"{_W}basedOn")) is not None:
+            based_on[style_id] = parent.get(f"{_W}val")
+    # Outline levels are inherited, so styles based on a heading are headings too
+    for style_id in based_on:
+        parent, seen = based_on[style_id], {style_id}
+        while style_id not in levels and parent and parent not in seen:
+            if parent in levels:
+                levels[style_id] = levels[parent]
+            seen.add(parent)
+            parent = based_on.get(parent)
+    return levels
+
+
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    for node in paragraph.iter():
+        if node.tag == f"{_W}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{_W}tab":
+            parts.append("\t")
+        elif node.tag in (f"{_W}br", f"{_W}cr"):
+            parts.append("\n")
+    return "".join(parts).strip()
+
+
+def _paragraph_level(paragraph, styles: dict[str, int]) -> int:
+    props = paragraph.find(f"{_W}pPr")
+    if props is None:
+        return 0
+    outline = props.find(f"{_W}outlineLvl")
+    if outline is not None and outline.get(f"{_W}val", "").isdigit():
+        return int(outline.get(f"{_W}val")) + 1
+    style = props.find(f"{_W}pStyle")
+    return styles.get(style.get(f"{_W}val"), 0) if style is not None else 0
+
+
+def iter_docx_blocks(file_path: Path) -> Iterator[str]:
+    """Yield a DOCX body's paragraphs, headings and tables in document order.
+
+    Streams ``word/document.xml`` with ``iterparse`` and clears each body element
+    once it has been read, so memory stays flat however long the document is.
+    Headings become ``#`` markers (which ``chunk_text`` treats as sections) and
+    each table becomes one block of ``| cell | cell |`` rows.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        styles = _docx_heading_levels(archive)
+        with archive.open("word/document.xml") as xml:
+            # Nesting: text boxes put paragraphs inside paragraphs, tables nest in cells
+            paragraph_depth = table_depth = 0
+            rows: list[str] = []
+            cells: list[str] = []
+            cell: list[str] = []
+            body = None
+            for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == f"{_W}p":
+                        paragraph_depth += 1
+                    elif tag == f"{_W}tbl":
+                        table_depth += 1
+                    elif tag == f"{_W}body":
+                        body = elem
+                    continue
+
+                if tag == f"{_W}p":
+                    paragraph_depth -= 1
+                    if paragraph_depth:
+                        continue  # read with its enclosing paragraph
+                    text = _paragraph_text(elem)
+                    if table_depth:
+                        if text:
+                            cell.append(text)
+                    elif text:
+                        level = _paragraph_level(elem, styles)
+                        yield f"{'#' * min(level, 6)} {text}" if level else text
+                elif tag == f"{_W}tc" and table_depth == 1:
+                    cells.append(" ".join(cell).replace("|", "\\|"))
+                    cell = []
+                elif tag == f"{_W}tr" and table_depth == 1:
+                    if any(cells):
+                        rows.append(f"| {' | '.join(cells)} |")
+                    cells = []
+                    elem.clear()
+                elif tag == f"{_W}tbl":
+                    table_depth -= 1
+                    if not table_depth and rows:
+                        yield "\n".join(rows)
+                        rows = []
+                else:
+                    continue
+                if body is not None and not paragraph_depth and not table_depth:
+                    # Finished a top-level block: drop everything parsed so far
+                    body.clear()
 
 
 def chunk_text(
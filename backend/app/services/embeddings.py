@@ -0,0 +1,257 @@
+"""Embedding functions — a tunable ONNX sentence encoder with optional PCA projection.
+
+The encoder runs any sentence-transformers style ONNX export (``model.onnx`` +
+``tokenizer.json``) with mean pooling, defaulting to the all-MiniLM-L6-v2 model
+Chroma downloads. Batches are sorted by length and padded only to their longest
+member, which produces the same vectors as fixed-length padding for far less work.
+
+An ``EmbeddingConfig`` names everything that changes the vectors (model, max
+sequence length, PCA). Collections record the config they were built with, so a
+changed config is detected and re-embedded instead of mixing vector spaces.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+@dataclass(frozen=True)
+class EmbeddingConfig:
+    """The parts of the embedding setup that determine the vectors."""
+
+    model: str = DEFAULT_MODEL  # DEFAULT_MODEL or a directory with model.onnx + tokenizer.json
+    max_seq_length: int = 256
+    pca_dims: int = 0  # 0 = full model dimension
+    pca_file: str | None = None  # fitted projection, relative to vector_index_dir
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingConfig":
+        model_dir = settings.embedding_model_dir
+        return cls(
+            model=str(model_dir) if model_dir else DEFAULT_MODEL,
+            max_seq_length=settings.embedding_max_seq_length,
+            pca_dims=settings.embedding_pca_dims,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EmbeddingConfig":
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def same_space(self, other: "EmbeddingConfig") -> bool:
+        """True if vectors made under either config are interchangeable (ignores pca_file)."""
+        return (self.model, self.max_seq_length, self.pca_dims) == (
+            other.model,
+            other.max_seq_length,
+            other.pca_dims,
+        )
+
+    def digest(self) -> str:
+        key = json.dumps([self.model, self.max_seq_length, self.pca_dims])
+        return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class OnnxEncoder:
+    """Mean-pooled sentence embeddings from an ONNX transformer. Loads lazily, thread-safe."""
+
+    def __init__(
+        self,
+        model: str,
+        max_seq_length: int,
+        batch_size: int,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ):
+        self._model = model
+        self._max_seq_length = max_seq_length
+        self._batch_size = max(1, batch_size)
+        self._intra_op_threads = intra_op_threads
+        self._inter_op_threads = inter_op_threads
+        self._load_lock = threading.Lock()
+        self._session = None
+        self._tokenizer = None
+        self._input_names: set[str] = set()
+
+    def _model_dir(self) -> Path:
+        if self._model != DEFAULT_MODEL:
+            return Path(self._model)
+        # Reuse (and if needed download) the model Chroma ships as its default
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+        default = ONNXMiniLM_L6_V2()
+        default._download_model_if_not_exists()
+        return Path(default.DOWNLOAD_PATH) / default.EXTRACTED_FOLDER_NAME
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._session is not None:
+                return
+            import onnxruntime
+            from tokenizers import Tokenizer
+
+            model_dir = self._model_dir()
+            tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self._max_seq_length)
+            tokenizer.no_padding()
+
+            options = onnxruntime.SessionOptions()
+            options.log_severity_level = 3
+            if self._intra_op_threads:
+                options.intra_op_num_threads = self._intra_op_threads
+            if self._inter_op_threads:
+                options.inter_op_num_threads = self._inter_op_threads
+            session = onnxruntime.InferenceSession(
+                str(model_dir / "model.onnx"),
+                sess_options=options,
+                providers=onnxruntime.get_available_providers(),
+            )
+            self._input_names = {i.name for i in session.get_inputs()}
+            self._tokenizer = tokenizer
+            self._session = session
+            logger.info(
+                "embedding_model_loaded",
+                model=self._model,
+                max_seq_length=self._max_seq_length,
+                intra_op_threads=self._intra_op_threads,
+                inter_op_threads=self._inter_op_threads,
+            )
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if self._session is None:
+            self._load()
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        encodings = self._tokenizer.encode_batch(texts)
+        # Similar lengths share a batch, so padding stays short
+        order = np.argsort([len(e.ids) for e in encodings], kind="stable")
+        result = None
+        for start in range(0, len(texts), self._batch_size):
+            rows = order[start : start + self._batch_size]
+            width = max(len(encodings[i].ids) for i in rows)
+            input_ids = np.zeros((len(rows), width), dtype=np.int64)
+            attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+            for j, i in enumerate(rows):
+                ids = encodings[i].ids
+                input_ids[j, : len(ids)] = ids
+                attention_mask[j, : len(ids)] = 1
+
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            hidden = self._session.run(None, feeds)[0]
+
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if result is None:
+                result = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            result[rows] = _normalize(pooled)
+        return result
+
+
+class PcaProjection:
+    """Linear projection onto the top principal components, fitted on a corpus sample."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)  # (dims, model_dim)
+
+    @classmethod
+    def fit(cls, samples: np.ndarray, dims: int) -> "PcaProjection":
+        if len(samples) < dims:
+            raise ValueError(
+                f"PCA to {dims} dims needs at least {dims} samples, got {len(samples)}"
+            )
+        mean = samples.mean(axis=0)
+        _, _, vt = np.linalg.svd(samples - mean, full_matrices=False)
+        return cls(mean, vt[:dims])
+
+    def __call__(self, vectors: np.ndarray) -> np.ndarray:
+        return _normalize((vectors - self.mean) @ self.components.T)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: Path) -> "PcaProjection":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["mean"], data["components"])
+
+
+class Embedder:
+    """Encoder plus optional PCA — the callable that turns texts into stored vectors."""
+
+    def __init__(self, config: EmbeddingConfig, encoder: OnnxEncoder, pca: PcaProjection | None):
+        self.config = config
+        self.encoder = encoder
+        self.pca = pca
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        vectors = self.encoder(texts)
+        if self.pca is not None and len(vectors):
+            vectors = self.pca(vectors)
+        return vectors
+
+    def embed_query(self, text: str, encoded: dict | None = None) -> np.ndarray:
+        """Embed one query, reusing the encoder output cached in ``encoded`` (keyed by
+        encoder) so collections sharing a model encode it only once.
+        """
+        vectors = encoded.get(self.encoder) if encoded is not None else None
+        if vectors is None:
+            vectors = self.encoder([text])
+            if encoded is not None:
+                encoded[self.encoder] = vectors
+        if self.pca is not None:
+            vectors = self.pca(vectors)
+        return vectors[0]
+
+
+def build_encoder(config: EmbeddingConfig) -> OnnxEncoder:
+    return OnnxEncoder(
+        config.model,
+        config.max_seq_length,
+        batch_size=settings.embedding_batch_size,
+        intra_op_threads=settings.embedding_intra_op_threads,
+        inter_op_threads=settings.embedding_inter_op_threads,
+    )
+
+
+# One encoder (and ONNX session) per model, shared by every collection using it
+_encoders: dict[tuple[str, int], OnnxEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def shared_encoder(config: EmbeddingConfig) -> OnnxEncoder:
+    key = (config.model, config.max_seq_length)
+    with _encoders_lock:
+        if key not in _encoders:
+            _encoders[key] = build_encoder(config)
+        return _encoders[key]
+
+
+def build_embedder(config: EmbeddingConfig, encoder: OnnxEncoder | None = None) -> Embedder:
+    """Embedder for a collection's config (loads its fitted PCA, if any)."""
+    pca = None
+    if config.pca_file:
+        pca = PcaProjection.load(settings.vector_index_dir / config.pca_file)
+    return Embedder(config, encoder or shared_encoder(config), pca)
@@ -0,0 +1,112 @@
+"""Index evaluation — recall@k and latency of a vector backend versus exact search.
+
+Queries are sampled from the stored chunk vectors and nudged by a little noise,
+so they land where real questions about the corpus do without needing labelled
+data. Ground truth is an exact cosine scan over every stored vector; recall@k is
+the fraction of that exact top-k the backend also returns.
+"""
+
+import statistics
+import time
+
+import numpy as np
+
+from app.services.vector_backends import VectorBackend
+
+# Norm of the random offset added to each sampled vector (stored vectors are unit length)
+DEFAULT_NOISE = 0.3
+
+
+def load_vectors(backend: VectorBackend) -> tuple[np.ndarray, list[tuple[str, int]]]:
+    """Every stored vector with its (document_id, chunk_index) key, in a stable order."""
+    blocks: list[np.ndarray] = []
+    keys: list[tuple[str, int]] = []
+    for document_id in sorted(backend.document_ids()):
+        stored = backend.document_chunks(document_id)
+        vectors = backend.document_vectors(document_id)
+        if stored is None or vectors is None or len(vectors) != len(stored[1]):
+            continue  # changed while reading
+        blocks.append(vectors)
+        keys.extend((document_id, chunk["chunk_index"]) for chunk in stored[1])
+    if not blocks:
+        return np.empty((0, 0), dtype=np.float32), []
+    matrix = np.vstack(blocks).astype(np.float32, copy=False)
+    # Some backends keep vectors as given; cosine ranking needs unit rows
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12), keys
+
+
+def sample_queries(
+    matrix: np.ndarray, count: int, noise: float = DEFAULT_NOISE, seed: int = 0
+) -> np.ndarray:
+    """``count`` unit query vectors near randomly chosen stored vectors."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(matrix), size=min(count, len(matrix)), replace=False)
+    offsets = rng.normal(size=(len(picks), matrix.shape[1])).astype(np.float32)
+    offsets *= noise / np.linalg.norm(offsets, axis=1, keepdims=True)
+    queries = matrix[picks] + offsets
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def percentile_ms(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 3)
+
+
+def evaluate(
+    backend: VectorBackend,
+    queries: int = 100,
+    k: int = 5,
+    noise: float = DEFAULT_NOISE,
+    seed: int = 0,
+    vectors: tuple[np.ndarray, list[tuple[str, int]]] | None = None,
+) -> dict:
+    """Recall@k and p50/p95 latency of ``backend.search`` against brute force.
+
+    ``vectors`` (as returned by ``load_vectors``) skips reading the corpus back,
+    e.g. when several backends holding the same data are compared.
+    """
+    matrix, keys = vectors if vectors is not None else load_vectors(backend)
+    params = backend.hnsw_params()
+    report = {
+        "backend": backend.name,
+        "hnsw": params.to_dict() if params else None,
+        "chunks": len(keys),
+        "queries": 0,
+        "k": k,
+    }
+    if not keys:
+        return report
+
+    k = min(k, len(keys))
+    recalls: list[float] = []
+    index_latencies: list[float] = []
+    exact_latencies: list[float] = []
+    for query in sample_queries(matrix, queries, noise, seed):
+        start = time.perf_counter()
+        scores = matrix @ query
+        exact = np.argpartition(scores, -k)[-k:]
+        exact_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        hits = backend.search(query, k)
+        index_latencies.append(time.perf_counter() - start)
+
+        expected = {keys[i] for i in exact}
+        found = {(hit.document_id, hit.chunk_index) for hit in hits}
+        recalls.append(len(expected & found) / k)
+
+    report.update(
+        queries=len(recalls),
+        k=k,
+        recall_at_k=round(statistics.mean(recalls), 4),
+        min_recall=round(min(recalls), 4),
+        latency_ms={
+            "p50": percentile_ms(index_latencies, 0.50),
+            "p95": percentile_ms(index_latencies, 0.95),
+        },
+        exact_latency_ms={
+            "p50": percentile_ms(exact_latencies, 0.50),
+            "p95": percentile_ms(exact_latencies, 0.95),
+        },
+    )
+    return report
@@ -0,0 +1,209 @@
+"""Ingestion scheduling — priority lanes with weighted fair sharing across tenants.
+
+At most ``ingestion_workers`` documents are processed at once. Waiting jobs sit
+in one of three lanes, served in strict priority order:
+
+- ``interactive``: a single upload someone is waiting on
+- ``bulk``: a tenant's uploads beyond ``ingestion_bulk_threshold`` queued or running
+- ``background``: re-indexing and other work nobody is waiting on
+
+Within a lane, tenants share the workers in proportion to their
+``ingestion_tenant_weights`` (start-time fair queuing), so one uploader's
+hundreds of files interleave with everyone else's instead of running first.
+A job that has waited ``ingestion_starvation_s`` runs next whatever its lane.
+
+Like admission control, a freed worker is handed directly to the chosen waiter.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    INGESTION_ACTIVE,
+    INGESTION_QUEUE_DEPTH,
+    INGESTION_QUEUE_WAIT_SECONDS,
+    INGESTION_STARVATION_PROMOTIONS,
+)
+from app.models.schemas import IngestionPriority
+
+logger = get_logger(__name__)
+
+_LANES = tuple(IngestionPriority)
+
+
+@dataclass(eq=False)
+class _Job:
+    document_id: str
+    tenant_id: str
+    priority: IngestionPriority
+    start_tag: float
+    seq: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: asyncio.Future | None = None
+
+    def key(self, now: float) -> tuple:
+        """Dispatch order: starving jobs oldest first, then lane, then fair-share tag."""
+        if now - self.enqueued_at >= settings.ingestion_starvation_s:
+            return (0, self.enqueued_at, self.seq)
+        return (1 + _LANES.index(self.priority), self.start_tag, self.seq)
+
+
+class IngestionTicket:
+    """A held ingestion worker. Releasing is idempotent."""
+
+    __slots__ = ("_scheduler", "_job", "_released")
+
+    def __init__(self, scheduler: "IngestionScheduler", job: _Job):
+        self._scheduler = scheduler
+        self._job = job
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._scheduler._release(self._job)
+
+    async def __aenter__(self) -> "IngestionTicket":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+class IngestionScheduler:
+    """Bounded ingestion concurrency with priority lanes and per-tenant fair queuing."""
+
+    def __init__(self):
+        self._active: list[_Job] = []
+        self._waiting: list[_Job] = []
+        # Per lane: virtual time, and each tenant's latest start tag
+        self._virtual = dict.fromkeys(_LANES, 0.0)
+        self._last_tag: dict[tuple[IngestionPriority, str], float] = {}
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def classify(self, tenant_id: str, requested: IngestionPriority | None) -> IngestionPriority:
+        """The lane for a new upload: as requested, else interactive unless the tenant
+        already has ``ingestion_bulk_threshold`` documents queued or running.
+        """
+        if requested is not None:
+            return requested
+        pending = sum(j.tenant_id == tenant_id for j in (*self._active, *self._waiting))
+        if pending >= settings.ingestion_bulk_threshold:
+            return IngestionPriority.bulk
+        return IngestionPriority.interactive
+
+    def _enqueue(self, document_id: str, tenant_id: str, priority: IngestionPriority) -> _Job:
+        weight = max(settings.ingestion_tenant_weights.get(tenant_id, 1.0), 1e-3)
+        start = max(self._virtual[priority], self._last_tag.get((priority, tenant_id), 0.0))
+        self._last_tag[(priority, tenant_id)] = start + 1.0 / weight
+        return _Job(document_id, tenant_id, priority, start, next(self._seq))
+
+    def _start(self, job: _Job) -> None:
+        self._active.append(job)
+        self._virtual[job.priority] = max(self._virtual[job.priority], job.start_tag)
+        waited = time.monotonic() - job.enqueued_at
+        INGESTION_QUEUE_WAIT_SECONDS.labels(priority=job.priority.value).observe(waited)
+        INGESTION_ACTIVE.set(len(self._active))
+        self._update_depth()
+
+    def _update_depth(self) -> None:
+        depth = Counter(job.priority for job in self._waiting)
+        for lane in _LANES:
+            INGESTION_QUEUE_DEPTH.labels(priority=lane.value).set(depth[lane])
+
+    async def acquire(
+        self, document_id: str, tenant_id: str, priority: IngestionPriority
+    ) -> IngestionTicket:
+        """Wait for an ingestion worker."""
+        job = self._enqueue(document_id, tenant_id, priority)
+        if len(self._active) < settings.ingestion_workers and not self._waiting:
+            self._start(job)
+            return IngestionTicket(self, job)
+
+        job.future = asyncio.get_running_loop().create_future()
+        self._waiting.append(job)
+        self._update_depth()
+        logger.info(
+            "ingestion_queued",
+            document_id=document_id,
+            tenant_id=tenant_id,
+            priority=priority.value,
+            position=self.position(document_id),
+        )
+        try:
+            await job.future
+        except asyncio.CancelledError:
+            if job.future.done() and not job.future.cancelled():
+                # Handed a worker just before the caller went away
+                self._release(job)
+            elif job in self._waiting:
+                self._waiting.remove(job)
+                self._update_depth()
+            raise
+        return IngestionTicket(self, job)
+
+    def _release(self, job: _Job) -> None:
+        if job in self._active:
+            self._active.remove(job)
+        while self._waiting and len(self._active) < settings.ingestion_workers:
+            now = time.monotonic()
+            nxt = min(self._waiting, key=lambda j: j.key(now))
+            self._waiting.remove(nxt)
+            if nxt.future is None or nxt.future.done():
+                continue
+            if nxt.key(now)[0] == 0 and nxt.priority is not _LANES[0]:
+                INGESTION_STARVATION_PROMOTIONS.labels(priority=nxt.priority.value).inc()
+                logger.warning(
+                    "ingestion_starvation_promoted",
+                    document_id=nxt.document_id,
+                    priority=nxt.priority.value,
+                    waited_s=round(now - nxt.enqueued_at, 1),
+                )
+            self._start(nxt)
+            nxt.future.set_result(None)
+        INGESTION_ACTIVE.set(len(self._active))
+        self._update_depth()
+
+    def document_ids(self) -> set[str]:
+        """Documents queued or running in this process."""
+        return {job.document_id for job in (*self._active, *self._waiting)}
+
+    def status(self, document_id: str) -> tuple[IngestionPriority, int] | None:
+        """(lane, queue position) of a queued or running document; position 0 is running.
+
+        Positions are this process's dispatch order if nothing else arrives.
+        """
+        for job in self._active:
+            if job.document_id == document_id:
+                return job.priority, 0
+        position = self.position(document_id)
+        if position is None:
+            return None
+        job = next(j for j in self._waiting if j.document_id == document_id)
+        return job.priority, position
+
+    def position(self, document_id: str) -> int | None:
+        """1-based place of a waiting document in the dispatch order."""
+        now = time.monotonic()
+        ordered = sorted(self._waiting, key=lambda j: j.key(now))
+        for i, job in enumerate(ordered, start=1):
+            if job.document_id == document_id:
+                return i
+        return None
+
+
+# Module-level singleton
+ingestion_scheduler = IngestionScheduler()
@@ -27,7 +27,7 @@ class GroqProvider:
     def __init__(self):
         if not settings.groq_api_key:
             raise LLMProviderError("groq", "DOCUMIND_GROQ_API_KEY not set")
-        self._client = AsyncGroq(api_key=settings.groq_api_key)
+        self._client = AsyncGroq(api_key=settings.groq_api_key, timeout=settings.llm_timeout_s)
         self._model = settings.groq_model
 
     async def stream_chat(
@@ -40,7 +40,7 @@ class GroqProvider:
                 messages=full_messages,
                 stream=True,
                 temperature=0.3,
-                max_tokens=2048,
+                max_tokens=settings.llm_max_tokens,
             )
             async for chunk in stream:
                 delta = chunk.choices[0].delta
@@ -57,7 +57,9 @@ class OpenAIProvider:
     def __init__(self):
         if not settings.openai_api_key:
             raise LLMProviderError("openai", "DOCUMIND_OPENAI_API_KEY not set")
-        self._client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self._client = AsyncOpenAI(
+            api_key=settings.openai_api_key, timeout=settings.llm_timeout_s
+        )
         self._model = settings.openai_model
 
     async def stream_chat(
@@ -70,7 +72,7 @@ class OpenAIProvider:
                 messages=full_messages,
                 stream=True,
                 temperature=0.3,
-                max_tokens=2048,
+                max_tokens=settings.llm_max_tokens,
             )
             async for chunk in stream:
                 delta = chunk.choices[0].delta
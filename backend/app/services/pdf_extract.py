@@ -0,0 +1,30 @@
+"""PDF page text extraction, run in-process or in worker processes.
+
+Kept free of app imports: pool workers are spawned and import only this module
+and pypdf, not the vector store or the embedding model.
+"""
+
+from pypdf import PdfReader
+
+
+def _page_text(reader: PdfReader, index: int) -> str:
+    return reader.pages[index].extract_text() or ""
+
+
+def extract_pages(reader: PdfReader, start: int, stop: int) -> list[tuple[int, str, str | None]]:
+    """(page number, text, error) for pages ``start`` to ``stop - 1`` (0-based).
+
+    A page that fails to extract is reported with its error and empty text.
+    """
+    results = []
+    for index in range(start, stop):
+        try:
+            results.append((index + 1, _page_text(reader, index), None))
+        except Exception as e:
+            results.append((index + 1, "", f"{type(e).__name__}: {e}"))
+    return results
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[tuple[int, str, str | None]]:
+    """Worker entry point: open the file independently and extract one page range."""
+    return extract_pages(PdfReader(path), start, stop)
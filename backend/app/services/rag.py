@@ -1,10 +1,24 @@
 """Retrieval-Augmented Generation — query pipeline."""
 
+import asyncio
+import time
 from collections.abc import AsyncGenerator
 
 from app.config import settings
+from app.core.deadline import Deadline
 from app.core.logging import get_logger
+from app.core.metrics import (
+    CHAT_DEGRADED,
+    CHAT_STAGE_TIMEOUTS,
+    CONTEXT_BUILD_SECONDS,
+    LLM_GENERATION_SECONDS,
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+    LLM_TOKENS,
+    LLM_TOKENS_PER_SECOND,
+)
+from app.core.tracing import tracer
 from app.models.schemas import SourceChunk
+from app.services.compaction import tombstones
 from app.services.vector_store import vector_store
 
 logger = get_logger(__name__)
@@ -23,32 +37,155 @@ async def query(
     question: str,
     chat_history: list[dict],
     llm_client,
+    tenant_id: str | None = None,
+    retrieval_cache=None,
+    deadline: Deadline | None = None,
 ) -> AsyncGenerator[dict, None]:
     """RAG query pipeline. Yields dicts:
     - {"type": "token", "token": str}    for each streamed token
-    - {"type": "sources", "sources": list[dict]}  at the end
+    - {"type": "sources", "sources": list[dict], "truncated": bool, "degraded": list[str]}
+      at the end
+
+    ``retrieval_cache`` (a session's ``RetrievalCache``) is consulted before the
+    vector search and filled after it.
+
+    ``deadline`` bounds the whole pipeline. Retrieval gets at most
+    ``chat_retrieval_budget_s`` and leaves ``chat_generation_reserve_s`` (at most
+    half the time left) for the answer; a search that overruns falls back to a
+    stale cached result, or to no context. With less than the reserve left, the
+    prompt is cut to ``chat_degraded_top_k`` chunks and no history. Generation
+    stops when the deadline passes, and the sources are still sent, with
+    ``truncated`` set.
+    ``degraded`` names the fallbacks used.
     """
+    deadline = deadline or Deadline()
+    degraded: list[str] = []
     logger.info("rag_query_started", question=question[:100])
 
     # 1. Retrieve relevant chunks from vector store
-    raw_sources = vector_store.search(question)
-    logger.info("retrieval_complete", source_count=len(raw_sources))
+    retrieval_start = time.perf_counter()
+    raw_sources = retrieval_cache.get(question) if retrieval_cache is not None else None
+    cached = raw_sources is not None
+    if not cached:
+        reserve = settings.chat_generation_reserve_s
+        if deadline.bounded:
+            # A short deadline still leaves the search half of it
+            reserve = min(reserve, deadline.remaining() / 2)
+        budget = deadline.budget(settings.chat_retrieval_budget_s, reserve=reserve)
+        try:
+            if budget is not None and budget <= 0:
+                raise TimeoutError
+            # Off the event loop: embedding the query (or the vector service round trip) blocks
+            raw_sources = await asyncio.wait_for(
+                asyncio.to_thread(
+                    vector_store.search,
+                    question,
+                    exclude_document_ids=tombstones.ids,
+                    tenant_id=tenant_id,
+                ),
+                budget,
+            )
+            if retrieval_cache is not None:
+                retrieval_cache.put(question, raw_sources)
+        except TimeoutError:
+            # The search thread cannot be interrupted; its result is dropped. No time
+            # left means no search was started, which is not a stage timeout
+            if budget is None or budget > 0:
+                _stage_timeout("retrieval", budget, deadline)
+            if retrieval_cache is not None:
+                raw_sources = retrieval_cache.get(question, stale_ok=True)
+            degraded.append("no_retrieval" if raw_sources is None else "stale_retrieval")
+            raw_sources = raw_sources or []
+    logger.info(
+        "retrieval_complete",
+        source_count=len(raw_sources),
+        cached=cached,
+        duration_ms=round((time.perf_counter() - retrieval_start) * 1000, 1),
+    )
 
     # 2. Build context and messages
-    context = _format_context(raw_sources)
-    messages = _build_messages(context, chat_history, question)
+    if deadline.bounded and deadline.remaining() < settings.chat_generation_reserve_s:
+        # A shorter prompt is read faster
+        degraded.append("fewer_chunks")
+        raw_sources = raw_sources[: settings.chat_degraded_top_k]
+        chat_history = []
+    for fallback in degraded:
+        CHAT_DEGRADED.labels(fallback=fallback).inc()
+    with tracer.span("rag.build_messages") as span, CONTEXT_BUILD_SECONDS.time():
+        context = _format_context(raw_sources)
+        messages = _build_messages(context, chat_history, question)
+        span.set_attribute("context_chars", len(context))
+        span.set_attribute("message_count", len(messages))
 
     # 3. Stream LLM response
-    async for token in llm_client.stream_chat(messages, SYSTEM_PROMPT):
-        yield {"type": "token", "token": token}
+    provider = settings.llm_provider.lower()
+    token_count = 0
+    first_token_at = None
+    truncated = False
+    generation_budget = deadline.timeout()
+    generation_start = time.perf_counter()
+    with tracer.span("llm.stream_chat", provider=provider) as span:
+        stream = llm_client.stream_chat(messages, SYSTEM_PROMPT)
+        try:
+            while True:
+                try:
+                    token = await asyncio.wait_for(anext(stream), deadline.timeout())
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    truncated = True
+                    _stage_timeout("generation", generation_budget, deadline)
+                    CHAT_DEGRADED.labels(fallback="truncated").inc()
+                    break
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(provider).observe(
+                        first_token_at - generation_start
+                    )
+                    span.add_event("first_token")
+                token_count += 1
+                yield {"type": "token", "token": token}
+        finally:
+            await stream.aclose()
+        span.add_event("completion", token_count=token_count, truncated=truncated)
+    generation_end = time.perf_counter()
+
+    LLM_GENERATION_SECONDS.labels(provider).observe(generation_end - generation_start)
+    LLM_TOKENS.labels(provider).inc(token_count)
+    if first_token_at is not None and token_count > 1 and generation_end > first_token_at:
+        LLM_TOKENS_PER_SECOND.labels(provider).observe(
+            (token_count - 1) / (generation_end - first_token_at)
+        )
 
     # 4. Yield sources at the end
     source_chunks = [
         SourceChunk(**s).model_dump() for s in raw_sources
     ]
-    yield {"type": "sources", "sources": source_chunks}
+    yield {
+        "type": "sources",
+        "sources": source_chunks,
+        "truncated": truncated,
+        "degraded": degraded,
+    }
+
+    logger.info(
+        "rag_query_complete",
+        token_count=token_count,
+        ttft_ms=round((first_token_at - generation_start) * 1000, 1) if first_token_at else None,
+        generation_ms=round((generation_end - generation_start) * 1000, 1),
+        truncated=truncated,
+        degraded=degraded,
+    )
 
-    logger.info("rag_query_complete")
+
+def _stage_timeout(stage: str, budget: float | None, deadline: Deadline) -> None:
+    CHAT_STAGE_TIMEOUTS.labels(stage=stage).inc()
+    logger.warning(
+        "chat_stage_timeout",
+        stage=stage,
+        budget_ms=round(budget * 1000, 1) if budget is not None else None,
+        elapsed_ms=round(deadline.elapsed() * 1000, 1),
+    )
 
 
 def _format_context(sources: list[dict]) -> str:
@@ -0,0 +1,148 @@
+"""Background re-embedding — rebuilds the vector collection after an embedding config change.
+
+Chunks are read back from the active collection (no re-parsing), embedded with the
+new config and written to a shadow collection, a few documents at a time. When
+only the HNSW parameters change, the stored vectors are copied instead. Progress
+is recorded in the collection manifest after every batch, so a restart resumes
+where it stopped. Searches keep using the old collection and its own embedder until
+the shadow holds every document; then the two are swapped in one step.
+"""
+
+import asyncio
+import dataclasses
+import random
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.services.embeddings import (
+    Embedder,
+    EmbeddingConfig,
+    PcaProjection,
+    build_embedder,
+    build_encoder,
+)
+from app.services.vector_backends import HnswParams, VectorBackend
+from app.services.vector_store import VectorStoreService, vector_store
+
+logger = get_logger(__name__)
+
+_lock = asyncio.Lock()
+_task: asyncio.Task | None = None
+
+
+def _fit_pca(source: VectorBackend, config: EmbeddingConfig, storage: str) -> EmbeddingConfig:
+    """Fit the projection on a random sample of stored chunks and save it next to the index."""
+    encoder = build_encoder(config)
+    document_ids = list(source.document_ids())
+    random.shuffle(document_ids)
+    texts: list[str] = []
+    for document_id in document_ids:
+        stored = source.document_chunks(document_id)
+        if stored:
+            texts.extend(chunk["text"] for chunk in stored[1])
+        if len(texts) >= settings.embedding_pca_sample_size:
+            break
+    texts = texts[: settings.embedding_pca_sample_size]
+
+    projection = PcaProjection.fit(encoder(texts), config.pca_dims)
+    path = VectorStoreService.pca_path(storage)
+    projection.save(path)
+    logger.info("pca_fitted", dims=config.pca_dims, samples=len(texts), path=str(path))
+    return dataclasses.replace(config, pca_file=path.name)
+
+
+def _copy_documents(
+    source: VectorBackend,
+    target: VectorBackend,
+    embedder: Embedder | None,
+    document_ids: list[str],
+) -> None:
+    """Copy documents into ``target``, re-embedded with ``embedder`` or, if None, as stored."""
+    for document_id in document_ids:
+        stored = source.document_chunks(document_id)
+        if stored is None:
+            continue  # deleted since the batch was planned
+        filename, chunks = stored
+        if embedder is not None:
+            vectors = embedder([c["text"] for c in chunks])
+        else:
+            vectors = source.document_vectors(document_id)
+            if vectors is None or len(vectors) != len(chunks):
+                continue  # deleted or replaced between the two reads
+        target.add(document_id, filename, chunks, vectors)
+
+
+async def reembed_collection(index: HnswParams | None = None) -> bool:
+    """Rebuild every shard whose configured embedding or requested HNSW parameters
+    differ from its active ones, finishing interrupted rebuilds first.
+
+    Shards are rebuilt one at a time. Returns True if any shard was swapped.
+    """
+    if _lock.locked():
+        return False
+    async with _lock:
+        swapped = False
+        for tenant_id, shard in vector_store.shards().items():
+            if await _rebuild_shard(shard, index):
+                logger.info("shard_rebuilt", tenant_id=tenant_id)
+                swapped = True
+        return swapped
+
+
+async def _rebuild_shard(shard: VectorStoreService, index: HnswParams | None) -> bool:
+    plan = await asyncio.to_thread(shard.rebuild_target, index)
+    if plan is None:
+        return False
+
+    source = shard.backend
+    active = shard.embedder
+    target, config, done = shard.start_reembed(*plan)
+    copy_vectors = config.same_space(active.config)
+    if copy_vectors:
+        # Same vector space: only the index changes, so no encoder work is needed
+        embedder = build_embedder(config, encoder=active.encoder)
+    else:
+        if config.pca_dims and not config.pca_file:
+            config = await asyncio.to_thread(_fit_pca, source, config, shard.reembed_storage)
+            shard.update_reembed_config(config)
+        embedder = build_embedder(config)
+
+    batch_size = max(1, settings.reembed_batch_documents)
+    while True:
+        remaining = sorted(await asyncio.to_thread(source.document_ids) - done)
+        if not remaining:
+            # Checked again under the swap lock, in case a document just arrived
+            if await asyncio.to_thread(shard.finish_reembed, embedder):
+                return True
+            continue
+        for i in range(0, len(remaining), batch_size):
+            batch = remaining[i : i + batch_size]
+            await asyncio.to_thread(
+                _copy_documents, source, target, None if copy_vectors else embedder, batch
+            )
+            done.update(batch)
+            shard.record_reembed_progress(batch)
+        logger.info("reembed_progress", done=len(done))
+
+
+def reembed_running() -> bool:
+    return _task is not None and not _task.done()
+
+
+def start_background_reembed(index: HnswParams | None = None) -> asyncio.Task | None:
+    """Run ``reembed_collection`` as a task unless one is already running."""
+    global _task
+    if reembed_running():
+        return None
+    _task = asyncio.create_task(_run(index))
+    return _task
+
+
+async def _run(index: HnswParams | None) -> None:
+    try:
+        await reembed_collection(index)
+    except asyncio.CancelledError:
+        logger.info("reembed_interrupted")
+        raise
+    except Exception as e:
+        logger.error("reembed_failed", error=str(e))
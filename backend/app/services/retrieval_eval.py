@@ -0,0 +1,335 @@
+"""Retrieval evaluation — recall@k, MRR, context size and latency on a labelled question set.
+
+A labelled set maps each question to the evidence that answers it: a filename plus
+a passage of that file. A retrieved chunk is relevant when it comes from the file
+and contains the start of the passage, so labels survive changes to chunk size and
+overlap. ``generate_dataset`` builds a synthetic set from markdown docs (bold-term
+definitions, table rows and section lead sentences).
+
+``run_config`` indexes a docs directory into a throwaway store under a set of
+setting overrides, then asks every question twice: through
+``VectorStoreService.search`` (the index alone) and through the ``rag.query``
+retrieval path, with a stub LLM that captures the prompt (what chat would send).
+"""
+
+import re
+import statistics
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.config import settings
+from app.services import rag
+from app.services.document_processor import chunk_text, parse_document
+from app.services.index_eval import percentile_ms
+from app.services.vector_store import ShardedVectorStore
+
+# Settings a run may override
+TUNABLE_SETTINGS = (
+    "chunk_size",
+    "chunk_overlap",
+    "retrieval_top_k",
+    "vector_backend",
+    "vector_quantization",
+    "vector_rescore_factor",
+    "hnsw_m",
+    "hnsw_construction_ef",
+    "hnsw_search_ef",
+)
+
+# Characters of the evidence a chunk must contain to count as relevant
+_EVIDENCE_PREFIX = 80
+
+_TERM_LINE = re.compile(r"^(?:[-*]\s+|\d+\.\s+)?\*\*(.+?)\*\*:?\s*(.*)$")
+_TABLE_ROW = re.compile(r"^\|\s*\*\*(.+?)\*\*\s*\|")
+_HEADING = re.compile(r"^(#{1,6})\s+(.+)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_TERM_QUESTIONS = (
+    "What is {term}?",
+    "What does the {title} say about {term}?",
+    "Explain {term}.",
+)
+_SECTION_QUESTIONS = (
+    "What does the {title} say about {heading}?",
+    "Summarize the {heading} section of the {title}.",
+)
+
+
+def approx_tokens(text: str) -> int:
+    """Token estimate with the chunker's convention (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _clean(text: str) -> str:
+    return _normalize(text.replace("**", "").strip(" :"))
+
+
+# ── Labelled sets ──────────────────────────────────────
+
+def _markdown_questions(path: Path) -> Iterator[dict]:
+    """Candidate (question, evidence) pairs of one markdown file, in document order."""
+    title = path.stem.replace("-", " ")
+    heading = None
+    seen: set[str] = set()
+    paragraph_start = True
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        if not stripped:
+            paragraph_start = True
+            continue
+        if heading_match := _HEADING.match(stripped):
+            if len(heading_match.group(1)) == 1:
+                title = _clean(heading_match.group(2))
+            else:
+                heading = _clean(re.sub(r"^\d+\.\s*", "", heading_match.group(2)))
+                seen.discard(heading.lower())
+            paragraph_start = True
+            continue
+
+        term = None
+        if (match := _TERM_LINE.match(stripped)) and match.group(2):
+            term = _clean(match.group(1))
+        elif match := _TABLE_ROW.match(stripped):
+            term = _clean(match.group(1))
+        if term and 2 < len(term) < 60 and term.lower() not in seen:
+            seen.add(term.lower())
+            yield {"kind": "term", "term": term, "title": title, "evidence": stripped}
+        elif (
+            paragraph_start
+            and heading
+            and heading.lower() not in seen
+            and stripped[0].isalpha()
+            and len(stripped) > 40
+        ):
+            seen.add(heading.lower())
+            sentence = _SENTENCE_END.split(stripped)[0]
+            yield {"kind": "section", "heading": heading, "title": title, "evidence": sentence}
+        paragraph_start = False
+
+
+def generate_dataset(docs_dir: Path, per_document: int = 20) -> dict:
+    """Build a synthetic labelled set from the markdown files in ``docs_dir``.
+
+    Up to ``per_document`` questions per file, spread evenly over the file.
+    """
+    questions = []
+    for path in sorted(docs_dir.glob("*.md")):
+        candidates = list(_markdown_questions(path))
+        stride = max(1, len(candidates) / per_document)
+        picks = [candidates[int(i * stride)] for i in range(min(per_document, len(candidates)))]
+        for i, pick in enumerate(picks):
+            if pick["kind"] == "term":
+                template = _TERM_QUESTIONS[i % len(_TERM_QUESTIONS)]
+            else:
+                template = _SECTION_QUESTIONS[i % len(_SECTION_QUESTIONS)]
+            question = template.format(**pick)
+            questions.append(
+                {
+                    "id": f"q{len(questions) + 1:03d}",
+                    "question": question,
+                    "expected": [{"filename": path.name, "evidence": pick["evidence"]}],
+                }
+            )
+    return {"name": docs_dir.name, "questions": questions}
+
+
+# ── Scoring ────────────────────────────────────────────
+
+def is_relevant(source: dict, expected: dict) -> bool:
+    if source["document_name"] != expected["filename"]:
+        return False
+    evidence = _normalize(expected["evidence"])[:_EVIDENCE_PREFIX]
+    return evidence in _normalize(source["content"])
+
+
+def score(sources: list[dict], expected: list[dict]) -> tuple[float, float]:
+    """(recall, reciprocal rank) of one ranked result list.
+
+    Recall is the fraction of expected passages found among the results; the
+    reciprocal rank is 1/rank of the first relevant result, or 0.
+    """
+    found = [any(is_relevant(s, e) for s in sources) for e in expected]
+    first = next(
+        (rank for rank, s in enumerate(sources, 1) if any(is_relevant(s, e) for e in expected)),
+        None,
+    )
+    return sum(found) / len(expected), 1.0 / first if first else 0.0
+
+
+def _summary(recalls: list[float], ranks: list[float], latencies: list[float]) -> dict:
+    return {
+        "recall_at_k": round(statistics.mean(recalls), 4),
+        "mrr": round(statistics.mean(ranks), 4),
+        "latency_ms": {
+            "p50": percentile_ms(latencies, 0.50),
+            "p95": percentile_ms(latencies, 0.95),
+        },
+    }
+
+
+# ── Runs ───────────────────────────────────────────────
+
+@contextmanager
+def override_settings(overrides: dict) -> Iterator[None]:
+    unknown = set(overrides) - set(TUNABLE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Not tunable: {', '.join(sorted(unknown))}")
+    previous = {name: getattr(settings, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+class _PromptCapture:
+    """Stands in for the LLM: records the prompt, generates nothing."""
+
+    def __init__(self):
+        self.messages: list[dict] = []
+
+    async def stream_chat(self, messages: list[dict], system_prompt: str):
+        self.messages = messages
+        for token in ():
+            yield token
+
+
+async def _rag_retrieve(question: str) -> tuple[list[dict], list[dict]]:
+    capture = _PromptCapture()
+    sources: list[dict] = []
+    async for event in rag.query(question, [], capture):
+        if event["type"] == "sources":
+            sources = event["sources"]
+    return sources, capture.messages
+
+
+@contextmanager
+def _rag_store(store: ShardedVectorStore) -> Iterator[None]:
+    # rag.query reads the module's store; point it at the evaluation index
+    previous = rag.vector_store
+    rag.vector_store = store
+    try:
+        yield
+    finally:
+        rag.vector_store = previous
+
+
+async def run_config(dataset: dict, docs_dir: Path, overrides: dict, name: str) -> dict:
+    """Index ``docs_dir`` under ``overrides`` and score every question of ``dataset``."""
+    questions = dataset["questions"]
+    with override_settings(overrides), tempfile.TemporaryDirectory() as tmp:
+        config = {key: getattr(settings, key) for key in TUNABLE_SETTINGS}
+        # A throwaway index, whatever the backend
+        index_dir, chroma_dir = settings.vector_index_dir, settings.chroma_dir
+        settings.vector_index_dir = Path(tmp) / "vectors"
+        settings.chroma_dir = Path(tmp) / "chroma"
+        try:
+            store = ShardedVectorStore(collection="retrieval_eval")
+            start = time.perf_counter()
+            for path in sorted(docs_dir.iterdir()):
+                if path.suffix.lower() not in settings.supported_extensions:
+                    continue
+                chunks = chunk_text(
+                    parse_document(path), settings.chunk_size, settings.chunk_overlap
+                )
+                store.add_chunks(path.name, path.name, chunks)
+            build_s = time.perf_counter() - start
+            shard = store.shard(settings.default_tenant)
+            k = settings.retrieval_top_k
+
+            search: tuple[list, list, list] = ([], [], [])
+            for item in questions:
+                start = time.perf_counter()
+                sources = shard.search(item["question"], k)
+                search[2].append(time.perf_counter() - start)
+                recall, rank = score(sources, item["expected"])
+                search[0].append(recall)
+                search[1].append(rank)
+
+            pipeline: tuple[list, list, list] = ([], [], [])
+            context_tokens: list[int] = []
+            with _rag_store(store):
+                for item in questions:
+                    start = time.perf_counter()
+                    sources, messages = await _rag_retrieve(item["question"])
+                    pipeline[2].append(time.perf_counter() - start)
+                    recall, rank = score(sources, item["expected"])
+                    pipeline[0].append(recall)
+                    pipeline[1].append(rank)
+                    context_tokens.append(approx_tokens(messages[-1]["content"]))
+            chunk_count = store.count()
+        finally:
+            settings.vector_index_dir, settings.chroma_dir = index_dir, chroma_dir
+
+    ordered = sorted(context_tokens)
+    return {
+        "name": name,
+        "config": config,
+        "k": k,
+        "chunks": chunk_count,
+        "index_build_s": round(build_s, 3),
+        "search": _summary(*search),
+        "rag": {
+            **_summary(*pipeline),
+            "context_tokens": {
+                "mean": round(statistics.mean(context_tokens), 1),
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            },
+        },
+    }
+
+
+async def evaluate(dataset: dict, docs_dir: Path, configs: dict[str, dict]) -> dict:
+    """Run every named config against the same labelled set; results side by side."""
+    if not dataset["questions"]:
+        raise ValueError("The labelled set has no questions")
+    runs = [
+        await run_config(dataset, docs_dir, overrides, name)
+        for name, overrides in configs.items()
+    ]
+    return {
+        "dataset": dataset["name"],
+        "questions": len(dataset["questions"]),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "runs": runs,
+    }
+
+
+def flatten(report: dict) -> Iterator[dict]:
+    """One row per run for side-by-side tables."""
+    for run in report["runs"]:
+        yield {
+            "run": run["name"],
+            "chunks": run["chunks"],
+            "recall": run["search"]["recall_at_k"],
+            "mrr": run["search"]["mrr"],
+            "search_p50": run["search"]["latency_ms"]["p50"],
+            "search_p95": run["search"]["latency_ms"]["p95"],
+            "rag_recall": run["rag"]["recall_at_k"],
+            "rag_mrr": run["rag"]["mrr"],
+            "ctx_tokens": run["rag"]["context_tokens"]["mean"],
+            "rag_p50": run["rag"]["latency_ms"]["p50"],
+            "rag_p95": run["rag"]["latency_ms"]["p95"],
+        }
+
+
+def compare(reports: list[dict]) -> list[dict]:
+    """Rows of several reports, labelled with their dataset when they differ."""
+    label = len({r["dataset"] for r in reports}) > 1
+    rows = []
+    for report in reports:
+        for row in flatten(report):
+            if label:
+                row["run"] = f"{report['dataset']}/{row['run']}"
+            rows.append(row)
+    return rows
+
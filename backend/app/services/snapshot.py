@@ -0,0 +1,353 @@
+"""Index snapshots — one versioned archive to seed a replica or restart cold.
+
+A snapshot is an uncompressed tar, so a restore can memory-map the large arrays in
+place instead of extracting them:
+
+- ``snapshot.json``                format/version, creation time and, per tenant
+  shard, the embedding config, HNSW parameters, dimension and row count
+- ``documents.jsonl``              the ``documents`` rows, one JSON object per line
+- ``shards/<tenant>/vectors.f32``  row-major float32 matrix, rows grouped by document
+- ``shards/<tenant>/texts.bin``    chunk texts, UTF-8, concatenated
+- ``shards/<tenant>/chunks.npz``   per-row document/section indices, chunk index and
+  text offsets, plus the document and section string tables
+- ``shards/<tenant>/pca.npz``      the shard's PCA projection, if it has one
+
+Exports read the store without taking its write locks, in a worker thread, so
+chat and ingestion carry on. The archive only holds documents that are both
+ready in the database and stored in their shard, so rows and vectors agree.
+"""
+
+import asyncio
+import json
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+from collections.abc import Collection, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.core.exceptions import SnapshotError
+from app.core.logging import get_logger
+from app.models.database import Document, async_session
+from app.models.schemas import TENANT_ID_PATTERN
+from app.services.corpus_stats import corpus_stats
+from app.services.embeddings import EmbeddingConfig
+from app.services.vector_backends import HnswParams
+from app.services.vector_store import VectorStoreService, vector_store
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT = "documind-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot.tar"
+
+_DATETIME_COLUMNS = ("created_at", "updated_at", "deleted_at")
+
+_lock = asyncio.Lock()
+_task: asyncio.Task | None = None
+
+
+# ── Export ─────────────────────────────────────────────
+
+def _row_to_dict(doc: Document) -> dict:
+    row = {column.name: getattr(doc, column.name) for column in Document.__table__.columns}
+    for name in _DATETIME_COLUMNS:
+        if row[name] is not None:
+            row[name] = row[name].isoformat()
+    return row
+
+
+def _export_shard(
+    shard: VectorStoreService, ready: Collection[str], work: Path
+) -> dict | None:
+    """Write one shard's files into ``work``; returns its manifest entry (with the
+    exported document IDs), or None if the shard has no ready documents.
+    """
+    backend, embedder = shard.active
+    documents: list[str] = []
+    filenames: list[str] = []
+    sections: dict[str, int] = {"": 0}
+    doc_index: list[np.ndarray] = []
+    chunk_index: list[np.ndarray] = []
+    section_index: list[np.ndarray] = []
+    text_offsets: list[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+    end = 0
+    dim = 0
+    with open(work / "vectors.f32", "wb") as vectors_file, open(work / "texts.bin", "wb") as texts:
+        # References to near-duplicate chunks are exported as full chunks
+        for document_id, filename, chunks, vectors in shard.export_documents(backend):
+            if document_id not in ready:
+                continue  # still processing, or tombstoned
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            dim = vectors.shape[1]
+            vectors_file.write(vectors.tobytes())
+            encoded = [chunk["text"].encode() for chunk in chunks]
+            texts.write(b"".join(encoded))
+            offsets = end + np.cumsum([len(b) for b in encoded], dtype=np.int64)
+            end = int(offsets[-1])
+            text_offsets.append(offsets)
+            doc_index.append(np.full(len(chunks), len(documents), dtype=np.int32))
+            chunk_index.append(np.array([c["chunk_index"] for c in chunks], dtype=np.int32))
+            section_index.append(
+                np.array(
+                    [
+                        sections.setdefault(c["page_or_section"] or "", len(sections))
+                        for c in chunks
+                    ],
+                    dtype=np.int32,
+                )
+            )
+            documents.append(document_id)
+            filenames.append(filename)
+    if not documents:
+        return None
+
+    np.savez(
+        work / "chunks.npz",
+        doc_index=np.concatenate(doc_index),
+        chunk_index=np.concatenate(chunk_index),
+        section_index=np.concatenate(section_index),
+        text_offsets=np.concatenate(text_offsets),
+        documents=np.array(documents, dtype=str),
+        filenames=np.array(filenames, dtype=str),
+        sections=np.array(list(sections), dtype=str),
+    )
+    config = embedder.config
+    if config.pca_file:
+        shutil.copyfile(settings.vector_index_dir / config.pca_file, work / "pca.npz")
+    params = backend.hnsw_params()
+    return {
+        "embedding": config.to_dict(),
+        "hnsw": params.to_dict() if params else None,
+        "dim": dim,
+        "rows": int(sum(len(block) for block in chunk_index)),
+        "documents": documents,
+        "pca": config.pca_file is not None,
+    }
+
+
+def _write_archive(path: Path, rows: dict[str, dict]) -> dict:
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "backend": settings.vector_backend,
+        "documents": 0,
+        "chunks": 0,
+        "shards": [],
+    }
+    exported: list[str] = []
+    tmp = path.with_name(path.name + ".tmp")
+    with tempfile.TemporaryDirectory(dir=path.parent) as work, tarfile.open(tmp, "w") as tar:
+        for tenant_id, shard in sorted(vector_store.shards().items()):
+            shard_dir = Path(work) / tenant_id
+            shard_dir.mkdir()
+            entry = _export_shard(shard, rows.keys(), shard_dir)
+            if entry is None:
+                continue
+            exported.extend(entry.pop("documents"))
+            manifest["shards"].append({"tenant_id": tenant_id, **entry})
+            manifest["chunks"] += entry["rows"]
+            for file in sorted(shard_dir.iterdir()):
+                tar.add(file, arcname=f"shards/{tenant_id}/{file.name}")
+
+        documents = Path(work) / "documents.jsonl"
+        with open(documents, "w") as f:
+            for document_id in exported:
+                f.write(json.dumps(rows[document_id]) + "\n")
+        tar.add(documents, arcname="documents.jsonl")
+        manifest["documents"] = len(exported)
+
+        manifest_file = Path(work) / "snapshot.json"
+        manifest_file.write_text(json.dumps(manifest, indent=2))
+        tar.add(manifest_file, arcname="snapshot.json")
+    tmp.replace(path)
+    return manifest
+
+
+def _prune() -> None:
+    """Keep only the newest ``snapshot_keep`` archives."""
+    for old in list_snapshots()[settings.snapshot_keep :]:
+        (settings.snapshot_dir / old["name"]).unlink(missing_ok=True)
+
+
+async def create_snapshot(path: Path | None = None) -> dict:
+    """Export the store and document rows to ``path`` (default: a new file in the
+    snapshot directory) and return the archive's manifest.
+    """
+    async with _lock:
+        if path is None:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            path = settings.snapshot_dir / f"documind-{stamp}{SNAPSHOT_SUFFIX}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        async with async_session() as db:
+            result = await db.execute(select(Document).where(Document.status == "ready"))
+            rows = {doc.id: _row_to_dict(doc) for doc in result.scalars()}
+        manifest = await asyncio.to_thread(_write_archive, path, rows)
+        if path.parent == settings.snapshot_dir:
+            await asyncio.to_thread(_prune)
+        logger.info(
+            "snapshot_created",
+            path=str(path),
+            documents=manifest["documents"],
+            chunks=manifest["chunks"],
+            bytes=path.stat().st_size,
+            duration_s=round(time.perf_counter() - start, 3),
+        )
+        return manifest
+
+
+def snapshot_running() -> bool:
+    return _task is not None and not _task.done()
+
+
+async def _run() -> None:
+    try:
+        await create_snapshot()
+    except Exception as e:
+        logger.error("snapshot_failed", error=str(e))
+
+
+def start_background_snapshot() -> asyncio.Task | None:
+    """Run ``create_snapshot`` as a task unless one is already running."""
+    global _task
+    if snapshot_running():
+        return None
+    _task = asyncio.create_task(_run())
+    return _task
+
+
+def list_snapshots() -> list[dict]:
+    """Archives in the snapshot directory, newest first."""
+    if not settings.snapshot_dir.exists():
+        return []
+    snapshots = []
+    for path in settings.snapshot_dir.glob(f"*{SNAPSHOT_SUFFIX}"):
+        stat = path.stat()
+        snapshots.append({"name": path.name, "bytes": stat.st_size, "mtime": stat.st_mtime})
+    return sorted(snapshots, key=lambda s: s["name"], reverse=True)
+
+
+# ── Import ─────────────────────────────────────────────
+
+def read_manifest(tar: tarfile.TarFile) -> dict:
+    try:
+        manifest = json.load(tar.extractfile("snapshot.json"))
+    except (KeyError, ValueError) as e:
+        raise SnapshotError(f"Not a snapshot archive: {e}") from None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Not a snapshot archive")
+    if manifest.get("version", 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"Snapshot version {manifest['version']} is newer than this release supports "
+            f"({SNAPSHOT_VERSION})"
+        )
+    for shard in manifest["shards"]:
+        if not re.match(TENANT_ID_PATTERN, shard["tenant_id"]):
+            raise SnapshotError(f"Invalid tenant '{shard['tenant_id']}' in snapshot")
+    return manifest
+
+
+def _map_member(path: Path, member: tarfile.TarInfo, dtype, shape) -> np.ndarray:
+    """Memory-map an uncompressed archive member in place."""
+    return np.memmap(path, dtype=dtype, mode="r", offset=member.offset_data, shape=shape)
+
+
+def _shard_documents(path: Path, tar: tarfile.TarFile, shard: dict) -> Iterator[tuple]:
+    """Yield (document_id, filename, chunks, vectors) for a shard, vectors memory-mapped."""
+    prefix = f"shards/{shard['tenant_id']}/"
+    vectors = _map_member(
+        path, tar.getmember(prefix + "vectors.f32"), np.float32, (shard["rows"], shard["dim"])
+    )
+    texts_member = tar.getmember(prefix + "texts.bin")
+    texts = (
+        _map_member(path, texts_member, np.uint8, (texts_member.size,))
+        if texts_member.size
+        else np.empty(0, dtype=np.uint8)
+    )
+    with np.load(tar.extractfile(prefix + "chunks.npz"), allow_pickle=False) as meta:
+        doc_index = meta["doc_index"]
+        chunk_index = meta["chunk_index"]
+        section_index = meta["section_index"]
+        text_offsets = meta["text_offsets"]
+        documents = meta["documents"].tolist()
+        filenames = meta["filenames"].tolist()
+        sections = meta["sections"].tolist()
+
+    bounds = [0, *(np.flatnonzero(np.diff(doc_index)) + 1).tolist(), len(doc_index)]
+    for start, end in zip(bounds, bounds[1:]):
+        doc = doc_index[start]
+        chunks = [
+            {
+                "text": texts[text_offsets[row] : text_offsets[row + 1]].tobytes().decode(),
+                "chunk_index": int(chunk_index[row]),
+                "page_or_section": sections[section_index[row]] or None,
+            }
+            for row in range(start, end)
+        ]
+        yield documents[doc], filenames[doc], chunks, vectors[start:end]
+
+
+def _restore_shards(path: Path, manifest: dict) -> list[dict]:
+    with tarfile.open(path, "r:") as tar:
+        for shard in manifest["shards"]:
+            pca_file = None
+            with tempfile.TemporaryDirectory() as work:
+                if shard["pca"]:
+                    pca_file = Path(work) / "pca.npz"
+                    with open(pca_file, "wb") as f:
+                        shutil.copyfileobj(
+                            tar.extractfile(f"shards/{shard['tenant_id']}/pca.npz"), f
+                        )
+                vector_store.shard(shard["tenant_id"]).restore(
+                    EmbeddingConfig.from_dict(shard["embedding"]),
+                    HnswParams.from_dict(shard["hnsw"]) if shard["hnsw"] else None,
+                    _shard_documents(path, tar, shard),
+                    pca_file,
+                )
+            logger.info("snapshot_shard_restored", tenant_id=shard["tenant_id"], rows=shard["rows"])
+        return [json.loads(line) for line in tar.extractfile("documents.jsonl")]
+
+
+async def restore_snapshot(path: Path) -> dict:
+    """Load a snapshot into this (empty) node: vectors, chunk texts and document rows.
+
+    Documents come back ready to query. A shard whose embedding config differs from
+    the settings is re-embedded in the background on the next start, as usual.
+    """
+    start = time.perf_counter()
+    try:
+        with tarfile.open(path, "r:") as tar:
+            manifest = read_manifest(tar)
+    except (OSError, tarfile.TarError) as e:
+        raise SnapshotError(f"Cannot read snapshot '{path}': {e}") from None
+
+    async with async_session() as db:
+        existing = (await db.execute(select(func.count()).select_from(Document))).scalar()
+    if existing or await asyncio.to_thread(vector_store.count):
+        raise SnapshotError("Snapshots can only be restored into an empty node")
+
+    rows = await asyncio.to_thread(_restore_shards, path, manifest)
+    async with async_session() as db:
+        for row in rows:
+            for name in _DATETIME_COLUMNS:
+                if row.get(name):
+                    row[name] = datetime.fromisoformat(row[name])
+        db.add_all(Document(**row) for row in rows)
+        await db.commit()
+    await corpus_stats.reconcile()
+    logger.info(
+        "snapshot_restored",
+        path=str(path),
+        documents=manifest["documents"],
+        chunks=manifest["chunks"],
+        duration_s=round(time.perf_counter() - start, 3),
+    )
+    return manifest
@@ -0,0 +1,313 @@
+"""Resumable uploads — sessions that receive a file as checksummed byte ranges.
+
+A session is a directory under ``<upload_dir>/.sessions/<upload_id>``:
+
+- ``session.json``: filename, tenant, total size and optional whole-file SHA-256
+- ``data``: a sparse file of the final size; each part is written at its offset
+- ``ranges``: one ``start end sha256`` line per verified part, appended
+- ``claims/<start>-<end>``: a part being written; no other part may overlap it
+- ``lock``: flock-ed while claims and ranges are checked and updated
+
+Parts may arrive in any order or through different API workers; the file is
+assembled in place and never held in memory. A part only counts as received once
+its bytes are on disk and its checksum matched. Received bytes are never
+overwritten: resending a received part verbatim is a no-op, and a part that
+overlaps received or in-flight bytes any other way is rejected. A part claims its
+range before writing, so of two overlapping parts sent at once only one is written.
+
+Finalizing moves ``data`` into the upload dir, where normal ingestion takes over.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+from app.config import settings
+from app.core.exceptions import (
+    UploadChecksumError,
+    UploadIncompleteError,
+    UploadRangeConflictError,
+    UploadRangeError,
+    UploadSessionNotFoundError,
+)
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+# Writes are batched to this size before a thread hop to the disk
+_WRITE_BUFFER = 1024 * 1024
+# A claim not written to for this long belongs to a writer that went away
+_CLAIM_STALE_S = 300.0
+
+
+def sessions_dir() -> Path:
+    # Inside the upload dir so finalizing is a rename on the same filesystem
+    return settings.upload_dir / ".sessions"
+
+
+def _session_dir(upload_id: str) -> Path:
+    try:
+        uuid.UUID(upload_id)
+    except ValueError:
+        raise UploadSessionNotFoundError(upload_id) from None
+    path = sessions_dir() / upload_id
+    if not (path / "session.json").exists():
+        raise UploadSessionNotFoundError(upload_id)
+    return path
+
+
+def _merge(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge half-open [start, end) ranges into sorted disjoint ones."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _parts(path: Path) -> list[tuple[int, int, str]]:
+    if not (path / "ranges").exists():
+        return []
+    parts = []
+    for line in (path / "ranges").read_text().splitlines():
+        start, end, sha256 = line.split()
+        parts.append((int(start), int(end), sha256))
+    return parts
+
+
+def _read_session(path: Path) -> dict:
+    session = json.loads((path / "session.json").read_text())
+    received = _merge([(start, end) for start, end, _ in _parts(path)])
+    last_activity = max(p.stat().st_mtime for p in path.iterdir())
+    return {
+        **session,
+        "received": received,
+        "received_bytes": sum(end - start for start, end in received),
+        "complete": received == [(0, session["size"])],
+        "expires_at": last_activity + settings.upload_session_ttl_s,
+    }
+
+
+def create_session(filename: str, size: int, tenant_id: str, sha256: str | None) -> dict:
+    upload_id = str(uuid.uuid4())
+    path = sessions_dir() / upload_id
+    path.mkdir(parents=True)
+    with open(path / "data", "wb") as f:
+        f.truncate(size)
+    session = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "tenant_id": tenant_id,
+        "size": size,
+        "sha256": sha256,
+        "created_at": time.time(),
+    }
+    (path / "session.json").write_text(json.dumps(session))
+    logger.info("upload_session_created", upload_id=upload_id, filename=filename, size=size)
+    return _read_session(path)
+
+
+def get_session(upload_id: str) -> dict:
+    return _read_session(_session_dir(upload_id))
+
+
+def parse_content_range(header: str | None, size: int) -> tuple[int, int]:
+    """Half-open [start, end) of a ``Content-Range: bytes first-last/total`` header."""
+    match = _CONTENT_RANGE.match(header or "")
+    if not match:
+        raise UploadRangeError("Content-Range must look like 'bytes <first>-<last>/<total>'")
+    first, last, total = int(match.group(1)), int(match.group(2)), match.group(3)
+    if total != "*" and int(total) != size:
+        raise UploadRangeError(f"Content-Range total {total} does not match upload size {size}")
+    if first > last or last >= size:
+        raise UploadRangeError(f"Range {first}-{last} is outside 0-{size - 1}")
+    return first, last + 1
+
+
+@contextlib.contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold the session's lock, across API workers, for a few file operations."""
+    try:
+        fd = os.open(path / "lock", os.O_RDWR | os.O_CREAT)
+    except FileNotFoundError:
+        # Finalized or aborted meanwhile
+        raise UploadSessionNotFoundError(path.name) from None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _claim(path: Path, start: int, end: int, sha256: str) -> Path | None:
+    """Reserve [start, end) for this writer.
+
+    Returns the claim, or None if this exact part was already received. Raises
+    UploadRangeConflictError if the range overlaps received or in-flight bytes.
+    """
+    with _locked(path):
+        for part_start, part_end, part_sha256 in _parts(path):
+            if (part_start, part_end, part_sha256) == (start, end, sha256):
+                return None
+            if part_start < end and start < part_end:
+                raise UploadRangeConflictError(start, end - 1)
+        claims = path / "claims"
+        claims.mkdir(exist_ok=True)
+        now = time.time()
+        for other in claims.iterdir():
+            other_start, other_end = map(int, other.name.split("-"))
+            if other_start < end and start < other_end:
+                if now - other.stat().st_mtime < _CLAIM_STALE_S:
+                    raise UploadRangeConflictError(start, end - 1)
+                other.unlink()
+        claim = claims / f"{start}-{end}"
+        os.close(os.open(claim, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+        return claim
+
+
+def _record(path: Path, claim: Path, start: int, end: int, sha256: str) -> None:
+    """Mark a written part as received, if its claim still holds."""
+    with _locked(path):
+        if not claim.exists():
+            # Taken for abandoned and handed to another part
+            raise UploadRangeConflictError(start, end - 1)
+        # One short append per part, under the lock
+        with open(path / "ranges", "a") as f:
+            f.write(f"{start} {end} {sha256}\n")
+        claim.unlink()
+
+
+def _release(path: Path, claim: Path) -> None:
+    with contextlib.suppress(UploadSessionNotFoundError), _locked(path):
+        claim.unlink(missing_ok=True)
+
+
+def _write_at(fd: int, data: bytes, offset: int, claim: Path) -> None:
+    os.pwrite(fd, data, offset)
+    # A long part keeps its claim fresh
+    with contextlib.suppress(FileNotFoundError):
+        os.utime(claim)
+
+
+async def write_part(
+    upload_id: str,
+    content_range: str | None,
+    sha256: str,
+    body: AsyncIterator[bytes],
+) -> dict:
+    """Claim a part's range, write it at its offset, verify its checksum, then record
+    it as received.
+    """
+    path = _session_dir(upload_id)
+    session = json.loads((path / "session.json").read_text())
+    start, end = parse_content_range(content_range, session["size"])
+    sha256 = sha256.lower()
+    claim = await asyncio.to_thread(_claim, path, start, end, sha256)
+    if claim is None:
+        # A retry of a part whose response was lost
+        async for _ in body:
+            pass
+        return _read_session(path)
+
+    try:
+        digest = hashlib.sha256()
+        fd = os.open(path / "data", os.O_WRONLY)
+        try:
+            offset, buffer = start, bytearray()
+            async for chunk in body:
+                if offset + len(buffer) + len(chunk) > end:
+                    raise UploadRangeError(f"Part is longer than its range ({end - start} bytes)")
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= _WRITE_BUFFER:
+                    await asyncio.to_thread(_write_at, fd, bytes(buffer), offset, claim)
+                    offset += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(_write_at, fd, bytes(buffer), offset, claim)
+                offset += len(buffer)
+            if offset != end:
+                raise UploadRangeError(
+                    f"Part is {offset - start} bytes, its range is {end - start}"
+                )
+            if digest.hexdigest() != sha256:
+                raise UploadChecksumError(f"Part {start}-{end - 1} does not match its SHA-256")
+            await asyncio.to_thread(os.fsync, fd)
+        finally:
+            os.close(fd)
+        await asyncio.to_thread(_record, path, claim, start, end, sha256)
+    except BaseException:
+        _release(path, claim)
+        raise
+    return _read_session(path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_WRITE_BUFFER):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def finalize(upload_id: str, document_id: str) -> tuple[dict, Path]:
+    """Check the session is complete and move its file into the upload dir.
+
+    Returns the session and the final path, named like a regular upload.
+    """
+    path = _session_dir(upload_id)
+    session = _read_session(path)
+    if not session["complete"]:
+        raise UploadIncompleteError(session["size"] - session["received_bytes"])
+    if session["sha256"]:
+        actual = await asyncio.to_thread(_file_sha256, path / "data")
+        if actual != session["sha256"]:
+            raise UploadChecksumError("The assembled file does not match the upload's SHA-256")
+
+    # Only the final component, so a "/" in the client's filename cannot leave the dir
+    target = settings.upload_dir / f"{document_id}_{Path(session['filename']).name}"
+    try:
+        # Atomic: of two concurrent finalize calls, only one gets the file
+        os.rename(path / "data", target)
+    except FileNotFoundError:
+        raise UploadSessionNotFoundError(upload_id) from None
+    shutil.rmtree(path, ignore_errors=True)
+    logger.info("upload_session_finalized", upload_id=upload_id, document_id=document_id)
+    return session, target
+
+
+def abort(upload_id: str) -> None:
+    shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
+    logger.info("upload_session_aborted", upload_id=upload_id)
+
+
+def expire_sessions() -> int:
+    """Remove sessions with no activity for ``upload_session_ttl_s``."""
+    root = sessions_dir()
+    if not root.exists():
+        return 0
+    now = time.time()
+    expired = 0
+    for path in root.iterdir():
+        try:
+            if _read_session(path)["expires_at"] < now:
+                shutil.rmtree(path, ignore_errors=True)
+                expired += 1
+        except (OSError, ValueError, KeyError):
+            # Half-created, half-removed or finalized meanwhile; leave it for the next pass
+            continue
+    if expired:
+        logger.info("upload_sessions_expired", count=expired)
+    return expired
@@ -0,0 +1,157 @@
+"""Vector index backends — storage and nearest-neighbour search behind VectorStoreService.
+
+Embedding happens in the service; a backend only stores normalized vectors with
+their chunk text and metadata, and answers top-k cosine queries with optional
+document filters.
+"""
+
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from typing import Protocol
+
+import numpy as np
+
+from app.config import settings
+
+
+@dataclass(slots=True)
+class SearchHit:
+    document_id: str
+    filename: str
+    content: str
+    page_or_section: str | None
+    chunk_index: int
+    score: float  # cosine similarity, higher is closer
+
+
+@dataclass(frozen=True)
+class HnswParams:
+    """HNSW graph parameters of an approximate index (fixed once the index is built)."""
+
+    m: int = 16  # links per node: higher = better recall, more memory
+    construction_ef: int = 100  # candidate list size while inserting
+    search_ef: int = 100  # candidate list size while querying (must be >= k)
+
+    @classmethod
+    def from_settings(cls) -> "HnswParams":
+        return cls(settings.hnsw_m, settings.hnsw_construction_ef, settings.hnsw_search_ef)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HnswParams":
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class VectorBackend(Protocol):
+    """Storage + search for document chunks of a single collection."""
+
+    name: str
+
+    def add(
+        self,
+        document_id: str,
+        filename: str,
+        chunks: list[dict],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        """Store chunks (dicts with text, chunk_index, page_or_section) and their embeddings."""
+        ...
+
+    def add_many(
+        self, documents: Iterable[tuple[str, str, list[dict], Sequence[Sequence[float]]]]
+    ) -> None:
+        """``add`` for a stream of (document_id, filename, chunks, embeddings) — for bulk loads."""
+        ...
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        document_ids: Collection[str] | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+    ) -> list[SearchHit]:
+        """Top-k chunks by cosine similarity, best first.
+
+        ``document_ids`` restricts the search to those documents;
+        ``exclude_document_ids`` skips them.
+        """
+        ...
+
+    def delete(self, document_ids: Collection[str]) -> None:
+        """Remove every chunk of the given documents."""
+        ...
+
+    def count(self) -> int:
+        """Number of stored chunks."""
+        ...
+
+    def document_ids(self) -> set[str]:
+        """Distinct IDs of documents that have chunks stored."""
+        ...
+
+    def document_chunks(self, document_id: str) -> tuple[str, list[dict]] | None:
+        """(filename, chunks ordered by chunk_index) of a stored document, or None."""
+        ...
+
+    def document_vectors(self, document_id: str) -> np.ndarray | None:
+        """Stored vectors of a document, in the same order as ``document_chunks``."""
+        ...
+
+    def export_documents(self) -> Iterator[tuple[str, str, list[dict], np.ndarray]]:
+        """Every stored document as (document_id, filename, chunks, vectors in chunk order)."""
+        ...
+
+    def hnsw_params(self) -> HnswParams | None:
+        """Parameters the approximate index was built with; None for exact search."""
+        ...
+
+    def storage_bytes(self) -> int | None:
+        """On-disk size of the collection's index, if the backend can tell."""
+        ...
+
+    def drop(self) -> None:
+        """Delete the collection and its storage."""
+        ...
+
+
+def quantization_for(collection: str) -> str:
+    """Storage precision configured for a collection ("none" or "int8")."""
+    overrides = settings.vector_quantization
+    return overrides.get(collection, overrides.get("*", "none")).lower()
+
+
+def build_backend(
+    name: str,
+    collection: str,
+    storage_name: str | None = None,
+    hnsw: HnswParams | None = None,
+) -> VectorBackend:
+    """Backend factory keyed by the ``vector_backend`` setting.
+
+    ``storage_name`` is the physical collection to open (defaults to ``collection``);
+    rebuilt generations of a collection live side by side under different names.
+    ``hnsw`` only applies when the collection is created (defaults to the settings).
+    """
+    name = name.lower()
+    quantization = quantization_for(collection)
+    storage_name = storage_name or collection
+    if name == "chroma":
+        from app.services.vector_backends.chroma import ChromaBackend
+
+        if quantization != "none":
+            raise ValueError(
+                f"Quantization '{quantization}' needs the numpy backend; "
+                "Chroma always stores float32 vectors."
+            )
+        return ChromaBackend(settings.chroma_dir, storage_name, hnsw or HnswParams.from_settings())
+    if name == "numpy":
+        from app.services.vector_backends.numpy_index import NumpyBackend
+
+        return NumpyBackend(
+            settings.vector_index_dir / storage_name,
+            quantization=quantization,
+            rescore_factor=settings.vector_rescore_factor,
+        )
+    raise ValueError(f"Unknown vector backend '{name}'. Use 'chroma' or 'numpy'.")
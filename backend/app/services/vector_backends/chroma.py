@@ -0,0 +1,203 @@
+"""ChromaDB backend — a persistent HNSW collection."""
+
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from pathlib import Path
+
+import chromadb
+import numpy as np
+
+from app.services.vector_backends import HnswParams, SearchHit
+
+# Rows per upsert in bulk loads (below Chroma's max batch size)
+_ADD_BATCH_ROWS = 5000
+
+
+class ChromaBackend:
+    name = "chroma"
+
+    def __init__(self, path: Path, collection: str, hnsw: HnswParams | None = None):
+        self._client = chromadb.PersistentClient(path=str(path))
+        self._path = path
+        self._name = collection
+        hnsw = hnsw or HnswParams()
+        # Embeddings are always supplied by the caller, so no embedding function here.
+        # The HNSW parameters only take effect when the collection is created.
+        self._collection = self._client.get_or_create_collection(
+            name=collection,
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": hnsw.m,
+                "hnsw:construction_ef": hnsw.construction_ef,
+                "hnsw:search_ef": hnsw.search_ef,
+            },
+            embedding_function=None,
+        )
+
+    def add(
+        self,
+        document_id: str,
+        filename: str,
+        chunks: list[dict],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        # Upsert so re-adding a document (e.g. a resumed re-embed) is idempotent
+        self._upsert([(document_id, filename, chunks, embeddings)])
+
+    def add_many(
+        self, documents: Iterable[tuple[str, str, list[dict], Sequence[Sequence[float]]]]
+    ) -> None:
+        # Small documents are grouped so a bulk load makes few, large upserts
+        pending: list[tuple[str, str, list[dict], Sequence[Sequence[float]]]] = []
+        rows = 0
+        for document in documents:
+            pending.append(document)
+            rows += len(document[2])
+            if rows >= _ADD_BATCH_ROWS:
+                self._upsert(pending)
+                pending, rows = [], 0
+        if pending:
+            self._upsert(pending)
+
+    def _upsert(self, documents) -> None:
+        ids, embeddings, texts, metadatas = [], [], [], []
+        for document_id, filename, chunks, vectors in documents:
+            ids.extend(f"{document_id}_chunk_{c['chunk_index']}" for c in chunks)
+            embeddings.extend(np.asarray(vectors, dtype=np.float32))
+            texts.extend(c["text"] for c in chunks)
+            metadatas.extend(
+                {
+                    "document_id": document_id,
+                    "filename": filename,
+                    "chunk_index": c["chunk_index"],
+                    "page_or_section": c.get("page_or_section") or "",
+                }
+                for c in chunks
+            )
+        if ids:
+            self._collection.upsert(
+                ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas
+            )
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        document_ids: Collection[str] | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+    ) -> list[SearchHit]:
+        total = self._collection.count()
+        if total == 0:
+            return []
+
+        clauses = []
+        if document_ids is not None:
+            clauses.append({"document_id": {"$in": list(document_ids)}})
+        if exclude_document_ids:
+            clauses.append({"document_id": {"$nin": list(exclude_document_ids)}})
+        where = None
+        if len(clauses) == 1:
+            where = clauses[0]
+        elif clauses:
+            where = {"$and": clauses}
+
+        # Don't request more results than exist
+        results = self._collection.query(
+            query_embeddings=[np.asarray(embedding, dtype=np.float32)],
+            n_results=min(k, total),
+            where=where,
+        )
+        return [
+            SearchHit(
+                document_id=meta["document_id"],
+                filename=meta["filename"],
+                content=content,
+                page_or_section=meta.get("page_or_section") or None,
+                chunk_index=meta["chunk_index"],
+                # Cosine distance → similarity (ChromaDB returns distance)
+                score=1.0 - distance,
+            )
+            for meta, content, distance in zip(
+                results["metadatas"][0], results["documents"][0], results["distances"][0]
+            )
+        ]
+
+    def delete(self, document_ids: Collection[str]) -> None:
+        if document_ids:
+            self._collection.delete(where={"document_id": {"$in": list(document_ids)}})
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def document_ids(self, batch_size: int = 5000) -> set[str]:
+        ids: set[str] = set()
+        offset = 0
+        while True:
+            batch = self._collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not batch["ids"]:
+                return ids
+            ids.update(m["document_id"] for m in batch["metadatas"])
+            offset += len(batch["ids"])
+
+    def document_chunks(self, document_id: str) -> tuple[str, list[dict]] | None:
+        result = self._collection.get(
+            where={"document_id": document_id}, include=["documents", "metadatas"]
+        )
+        if not result["ids"]:
+            return None
+        rows = sorted(
+            zip(result["metadatas"], result["documents"]), key=lambda r: r[0]["chunk_index"]
+        )
+        chunks = [
+            {
+                "text": text,
+                "chunk_index": meta["chunk_index"],
+                "page_or_section": meta.get("page_or_section") or None,
+            }
+            for meta, text in rows
+        ]
+        return rows[0][0]["filename"], chunks
+
+    def document_vectors(self, document_id: str) -> np.ndarray | None:
+        result = self._collection.get(
+            where={"document_id": document_id}, include=["embeddings", "metadatas"]
+        )
+        if not result["ids"]:
+            return None
+        order = np.argsort([m["chunk_index"] for m in result["metadatas"]], kind="stable")
+        return np.asarray(result["embeddings"], dtype=np.float32)[order]
+
+    def export_documents(self) -> Iterator[tuple[str, str, list[dict], np.ndarray]]:
+        # Chroma has no read snapshots: each document is consistent, the set as a whole
+        # is whatever was stored while iterating
+        for document_id in sorted(self.document_ids()):
+            stored = self.document_chunks(document_id)
+            vectors = self.document_vectors(document_id)
+            if stored is None or vectors is None or len(vectors) != len(stored[1]):
+                continue  # deleted or replaced between the reads
+            yield document_id, stored[0], stored[1], vectors
+
+    def hnsw_params(self) -> HnswParams:
+        # Collections created before these were configurable carry Chroma's defaults
+        metadata = self._collection.metadata or {}
+        defaults = HnswParams()
+        return HnswParams(
+            m=int(metadata.get("hnsw:M", defaults.m)),
+            construction_ef=int(metadata.get("hnsw:construction_ef", defaults.construction_ef)),
+            search_ef=int(metadata.get("hnsw:search_ef", defaults.search_ef)),
+        )
+
+    def storage_bytes(self) -> int | None:
+        # The HNSW segment has its own directory; texts and metadata share chroma.sqlite3
+        try:
+            segments = self._client._server._sysdb.get_segments(collection=self._collection.id)
+        except Exception:
+            return None
+        total = 0
+        for segment in segments:
+            directory = self._path / str(segment["id"])
+            if directory.is_dir():
+                total += sum(f.stat().st_size for f in directory.iterdir() if f.is_file())
+        return total
+
+    def drop(self) -> None:
+        self._client.delete_collection(self._name)
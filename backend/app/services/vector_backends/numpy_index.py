@@ -0,0 +1,751 @@
+"""In-process NumPy backend — exact cosine search over a memory-mapped float32 matrix.
+
+Layout of a collection directory:
+
+- ``vectors.f32``  row-major float32 matrix of normalized embeddings (memory-mapped,
+  grown geometrically so appends rarely remap)
+- ``texts.bin``    chunk texts, UTF-8, concatenated
+- ``meta.npz``     compact per-row arrays (document/section indices, chunk index,
+  text offsets, live flag) plus the document and section string tables
+- ``codes.i8``     optional int8 scalar-quantized copy of the vectors (see below)
+
+Vectors and texts are appended first and ``meta.npz`` is replaced atomically last,
+so a crash mid-write leaves the previous, consistent index. Writers build a new
+``_State`` and swap it in; searches read whichever state is current without locking.
+Deleted rows are masked out and reclaimed by a rewrite once they pass a threshold.
+A rewrite goes to a new generation of the data files (``vectors.<n>.f32`` and so
+on) that only the new ``meta.npz`` names; the old generation is removed after the
+swap, and files of any other generation are removed on load.
+
+With ``quantization="int8"`` each dimension is mapped linearly onto [-128, 127]
+using a per-dimension scale/offset. Searches scan the int8 codes (a quarter of the
+bytes), keep ``rescore_factor * k`` candidates and re-score only those against the
+float32 rows, so the full-precision matrix stays on disk except for a few pages.
+"""
+
+import os
+import shutil
+import threading
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.services.vector_backends import HnswParams, SearchHit
+
+logger = get_logger(__name__)
+
+_MIN_CAPACITY = 1024
+# Rewrite the files once this fraction of rows is deleted
+_COMPACT_DEAD_RATIO = 0.25
+# Rows per block when scanning int8 codes (bounds the float32 temporary)
+_SCAN_BLOCK_ROWS = 4096
+# Headroom added to the calibrated range so later batches rarely force a re-encode
+_RANGE_MARGIN = 0.05
+
+QUANTIZATIONS = ("none", "int8")
+
+
+@dataclass(slots=True)
+class _State:
+    n: int
+    dim: int
+    vectors: np.ndarray  # (capacity, dim) float32 memmap; rows [:n] are in use
+    texts: np.ndarray  # uint8 memmap over texts.bin
+    doc_index: np.ndarray  # int32[n] → documents
+    chunk_index: np.ndarray  # int32[n]
+    section_index: np.ndarray  # int32[n] → sections (0 = none)
+    text_offsets: np.ndarray  # int64[n + 1]
+    alive: np.ndarray  # bool[n]
+    dead: int
+    codes: np.ndarray | None  # (capacity, dim) int8 memmap when quantized
+    scale: np.ndarray | None  # float32[dim]: value = (code + 128) * scale + offset
+    offset: np.ndarray | None  # float32[dim]
+    # Unbuffered handle for re-scoring reads; pread keeps those rows out of RSS
+    vectors_file: BinaryIO | None
+    documents: list[str]
+    filenames: list[str]
+    sections: list[str]
+    doc_lookup: dict[str, int]
+    section_lookup: dict[str, int]
+    generation: int = 0  # which data files the rows live in (see _data_paths)
+
+
+@dataclass(slots=True)
+class _Tables:
+    """Working copies of a state's document and section tables, for one write batch."""
+
+    documents: list[str]
+    filenames: list[str]
+    sections: list[str]
+    doc_lookup: dict[str, int]
+    section_lookup: dict[str, int]
+
+    @classmethod
+    def of(cls, state: _State) -> "_Tables":
+        return cls(
+            list(state.documents),
+            list(state.filenames),
+            list(state.sections),
+            dict(state.doc_lookup),
+            dict(state.section_lookup),
+        )
+
+    def section(self, name: str) -> int:
+        if name not in self.section_lookup:
+            self.section_lookup[name] = len(self.sections)
+            self.sections.append(name)
+        return self.section_lookup[name]
+
+
+def _data_paths(path: Path, generation: int) -> tuple[Path, Path, Path]:
+    """(vectors, codes, texts) files of a generation; generation 0 has the plain names."""
+    tag = "" if generation == 0 else f".{generation}"
+    return path / f"vectors{tag}.f32", path / f"codes{tag}.i8", path / f"texts{tag}.bin"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _calibrate(low: np.ndarray, high: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-dimension (scale, offset) covering [low, high] plus a margin."""
+    margin = (high - low) * _RANGE_MARGIN
+    low, high = low - margin, high + margin
+    scale = np.maximum(high - low, 1e-6) / 255.0
+    return scale.astype(np.float32), low.astype(np.float32)
+
+
+def _quantize(matrix: np.ndarray, scale: np.ndarray, offset: np.ndarray) -> np.ndarray:
+    codes = np.rint((matrix - offset) / scale) - 128.0
+    return np.clip(codes, -128, 127).astype(np.int8)
+
+
+class NumpyBackend:
+    name = "numpy"
+
+    def __init__(self, path: Path, quantization: str = "none", rescore_factor: int = 4):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}'. Use 'none' or 'int8'.")
+        self._path = path
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._generation = 0
+        self._meta_path = path / "meta.npz"
+        self._quantized = quantization == "int8"
+        self._rescore_factor = max(1, rescore_factor)
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return _data_paths(self._path, self._generation)[0]
+
+    @property
+    def _codes_path(self) -> Path:
+        return _data_paths(self._path, self._generation)[1]
+
+    @property
+    def _texts_path(self) -> Path:
+        return _data_paths(self._path, self._generation)[2]
+
+    def _data_files(self) -> list[Path]:
+        """Data files of every generation, plus temporaries of interrupted rewrites."""
+        return [
+            p
+            for pattern in ("vectors*.f32", "codes*.i8", "texts*.bin", "*.tmp")
+            for p in self._path.glob(pattern)
+        ]
+
+    @property
+    def quantization(self) -> str:
+        return "int8" if self._quantized else "none"
+
+    # ── Persistence ────────────────────────────────────
+
+    def _load(self) -> _State:
+        if not self._meta_path.exists():
+            return self._empty_state(dim=0)
+
+        with np.load(self._meta_path, allow_pickle=False) as meta:
+            self._generation = int(meta["generation"]) if "generation" in meta.files else 0
+            dim = int(meta["dim"])
+            capacity = int(meta["capacity"])
+            documents = meta["documents"].tolist()
+            sections = meta["sections"].tolist()
+            alive = meta["alive"].copy()
+            quantized = "scale" in meta.files
+            state = _State(
+                n=len(alive),
+                dim=dim,
+                vectors=self._map_vectors(capacity, dim),
+                texts=self._map_texts(),
+                doc_index=meta["doc_index"].copy(),
+                chunk_index=meta["chunk_index"].copy(),
+                section_index=meta["section_index"].copy(),
+                text_offsets=meta["text_offsets"].copy(),
+                alive=alive,
+                dead=int(len(alive) - alive.sum()),
+                codes=self._map_codes(capacity, dim) if quantized else None,
+                scale=meta["scale"].copy() if quantized else None,
+                offset=meta["offset"].copy() if quantized else None,
+                vectors_file=self._open_vectors() if quantized else None,
+                documents=documents,
+                filenames=meta["filenames"].tolist(),
+                sections=sections,
+                doc_lookup={d: i for i, d in enumerate(documents)},
+                section_lookup={s: i for i, s in enumerate(sections)},
+                generation=self._generation,
+            )
+        # Left by a rewrite that crashed before or after its meta swap
+        current = set(_data_paths(self._path, self._generation))
+        for path in self._data_files():
+            if path not in current:
+                path.unlink(missing_ok=True)
+        # Drop text appended after the last committed meta (interrupted write)
+        if self._texts_path.stat().st_size > state.text_offsets[-1]:
+            with open(self._texts_path, "r+b") as f:
+                f.truncate(int(state.text_offsets[-1]))
+            state.texts = self._map_texts()
+
+        # The configured precision wins: build or drop the int8 codes to match it
+        if self._quantized and state.codes is None and state.n:
+            state = self._requantize(state, state.vectors)
+            self._write_meta(state)
+        elif not self._quantized and state.codes is not None:
+            state = replace(state, codes=None, scale=None, offset=None, vectors_file=None)
+            self._write_meta(state)
+            self._codes_path.unlink(missing_ok=True)
+
+        logger.info(
+            "numpy_index_loaded",
+            path=str(self._path),
+            rows=state.n,
+            dead=state.dead,
+            quantization=self.quantization,
+        )
+        return state
+
+    def _empty_state(self, dim: int) -> _State:
+        """Reset the files and return an empty state."""
+        for path in self._data_files():
+            path.unlink(missing_ok=True)
+        self._generation = 0
+        self._texts_path.touch()
+        return self._blank_state(dim)
+
+    @staticmethod
+    def _blank_state(dim: int) -> _State:
+        return _State(
+            n=0,
+            dim=dim,
+            vectors=np.empty((0, dim), dtype=np.float32),
+            texts=np.empty(0, dtype=np.uint8),
+            doc_index=np.empty(0, dtype=np.int32),
+            chunk_index=np.empty(0, dtype=np.int32),
+            section_index=np.empty(0, dtype=np.int32),
+            text_offsets=np.zeros(1, dtype=np.int64),
+            alive=np.empty(0, dtype=bool),
+            dead=0,
+            codes=None,
+            scale=None,
+            offset=None,
+            vectors_file=None,
+            documents=[],
+            filenames=[],
+            sections=[""],
+            doc_lookup={},
+            section_lookup={"": 0},
+        )
+
+    def _map_vectors(self, capacity: int, dim: int) -> np.ndarray:
+        if capacity == 0 or dim == 0:
+            return np.empty((0, dim), dtype=np.float32)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+
+    def _map_codes(self, capacity: int, dim: int) -> np.ndarray:
+        if capacity == 0 or dim == 0:
+            return np.empty((0, dim), dtype=np.int8)
+        return np.memmap(self._codes_path, dtype=np.int8, mode="r+", shape=(capacity, dim))
+
+    def _open_vectors(self) -> BinaryIO:
+        # Closed when the last state referencing it is garbage collected
+        return open(self._vectors_path, "rb", buffering=0)
+
+    def _map_texts(self) -> np.ndarray:
+        if not self._texts_path.exists() or self._texts_path.stat().st_size == 0:
+            return np.empty(0, dtype=np.uint8)
+        return np.memmap(self._texts_path, dtype=np.uint8, mode="r")
+
+    def _write_meta(self, state: _State) -> None:
+        tmp = self._meta_path.with_suffix(".tmp.npz")
+        quantization = {}
+        if state.codes is not None:
+            quantization = {"scale": state.scale, "offset": state.offset}
+        np.savez(
+            tmp,
+            **quantization,
+            dim=np.int64(state.dim),
+            generation=np.int64(state.generation),
+            capacity=np.int64(len(state.vectors)),
+            doc_index=state.doc_index,
+            chunk_index=state.chunk_index,
+            section_index=state.section_index,
+            text_offsets=state.text_offsets,
+            alive=state.alive,
+            documents=np.array(state.documents, dtype=str),
+            filenames=np.array(state.filenames, dtype=str),
+            sections=np.array(state.sections, dtype=str),
+        )
+        os.replace(tmp, self._meta_path)
+
+    def _ensure_capacity(self, state: _State, rows: int) -> np.ndarray:
+        """Return a vectors memmap with room for ``rows`` rows, growing the file if needed."""
+        if rows <= len(state.vectors):
+            return state.vectors
+        capacity = max(_MIN_CAPACITY, len(state.vectors) * 2, rows)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * state.dim * 4)
+        return self._map_vectors(capacity, state.dim)
+
+    def _requantize(self, state: _State, vectors: np.ndarray, batch=None) -> _State:
+        """Encode ``batch`` (rows appended after ``state.n``) into the int8 codes.
+
+        If the batch falls outside the calibrated range, recalibrate and re-encode
+        every row from the float32 vectors. Runs with the write lock held; searches on
+        the previous state may briefly see mixed codes, which re-scoring absorbs.
+        """
+        n = state.n + (0 if batch is None else len(batch))
+        codes = state.codes
+        if codes is None or len(codes) < len(vectors):
+            # Codes mirror the capacity of the vectors file
+            with open(self._codes_path, "ab") as f:
+                f.truncate(len(vectors) * state.dim)
+            codes = self._map_codes(len(vectors), state.dim)
+
+        scale, offset = state.scale, state.offset
+        start = state.n
+        if scale is None:
+            observed = vectors[:n] if batch is None else np.vstack([vectors[: state.n], batch])
+            scale, offset = _calibrate(observed.min(axis=0), observed.max(axis=0))
+            start = 0
+        elif batch is not None:
+            high = offset + 255.0 * scale
+            low_batch, high_batch = batch.min(axis=0), batch.max(axis=0)
+            if np.any(low_batch < offset) or np.any(high_batch > high):
+                scale, offset = _calibrate(
+                    np.minimum(offset, low_batch), np.maximum(high, high_batch)
+                )
+                start = 0
+        for i in range(start, n, _SCAN_BLOCK_ROWS):
+            j = min(i + _SCAN_BLOCK_ROWS, n)
+            codes[i:j] = _quantize(vectors[i:j], scale, offset)
+        codes.flush()
+        if start == 0 and state.n:
+            logger.info("numpy_index_requantized", rows=n)
+        return replace(
+            state,
+            codes=codes,
+            scale=scale,
+            offset=offset,
+            vectors_file=state.vectors_file or self._open_vectors(),
+        )
+
+    # ── Writes ─────────────────────────────────────────
+
+    def add(
+        self,
+        document_id: str,
+        filename: str,
+        chunks: list[dict],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        self.add_many([(document_id, filename, chunks, embeddings)])
+
+    def add_many(
+        self, documents: Iterable[tuple[str, str, list[dict], Sequence[Sequence[float]]]]
+    ) -> None:
+        """Append documents with a single metadata write.
+
+        Streams: each document's vectors and texts go to disk as they arrive, so a
+        bulk load (e.g. a snapshot restore) only holds the per-row arrays in memory.
+        Each document is validated before anything of it is written, and the batch
+        is all or nothing: on failure texts.bin is cut back and the state is untouched.
+        """
+        with self._lock:
+            state = self._state
+            text_end = int(state.text_offsets[-1])
+            try:
+                new_state = self._append(state, documents)
+            except BaseException:
+                if self._texts_path.exists() and self._texts_path.stat().st_size > text_end:
+                    os.truncate(self._texts_path, text_end)
+                raise
+            if new_state is not None:
+                self._write_meta(new_state)
+                self._state = new_state
+
+    def _append(
+        self,
+        state: _State,
+        documents: Iterable[tuple[str, str, list[dict], Sequence[Sequence[float]]]],
+    ) -> _State | None:
+        """Write the batch's vectors and texts past the live rows and return the state
+        that includes them, or None if there was nothing to add (caller holds the lock).
+        """
+        alive, dead = state.alive, state.dead
+        vectors = state.vectors
+        n = state.n
+        end = int(state.text_offsets[-1])
+        # Tables are copied so a failed batch leaves the live state as it was
+        tables = _Tables.of(state)
+        doc_parts: list[np.ndarray] = []
+        chunk_parts: list[np.ndarray] = []
+        section_parts: list[np.ndarray] = []
+        offset_parts: list[np.ndarray] = []
+        seen: set[str] = set()
+        texts_file = None
+        try:
+            for document_id, filename, chunks, embeddings in documents:
+                if not chunks:
+                    continue
+                if document_id in seen:
+                    raise ValueError(f"Document '{document_id}' appears twice in one batch")
+                seen.add(document_id)
+                matrix = np.asarray(embeddings, dtype=np.float32)
+                if matrix.ndim != 2 or len(matrix) != len(chunks):
+                    raise ValueError(
+                        f"Document '{document_id}' has {len(chunks)} chunks but "
+                        f"{len(matrix)} embeddings"
+                    )
+                if state.dim and matrix.shape[1] != state.dim:
+                    raise ValueError(
+                        f"Embedding dimension {matrix.shape[1]} does not match index "
+                        f"({state.dim})"
+                    )
+                encoded = [chunk["text"].encode() for chunk in chunks]
+                chunk_index = np.array([c["chunk_index"] for c in chunks], dtype=np.int32)
+                matrix = _normalize(matrix)
+
+                if state.dim == 0:
+                    state = self._empty_state(dim=matrix.shape[1])
+                    alive, dead, vectors = state.alive, state.dead, state.vectors
+                    tables = _Tables.of(state)
+                if texts_file is None:
+                    texts_file = open(self._texts_path, "ab")
+
+                # Re-adding a document replaces its previous chunks
+                doc = tables.doc_lookup.get(document_id)
+                if doc is None:
+                    doc = len(tables.documents)
+                    tables.documents.append(document_id)
+                    tables.filenames.append(filename)
+                    tables.doc_lookup[document_id] = doc
+                elif state.n:
+                    replaced = alive & (state.doc_index == doc)
+                    dead += int(replaced.sum())
+                    alive = alive & ~replaced
+
+                section_index = np.empty(len(chunks), dtype=np.int32)
+                for i, chunk in enumerate(chunks):
+                    section_index[i] = tables.section(chunk.get("page_or_section") or "")
+
+                lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+                offsets = end + np.cumsum(lengths)
+                end = int(offsets[-1])
+                texts_file.write(b"".join(encoded))
+
+                vectors = self._ensure_capacity(replace(state, vectors=vectors), n + len(chunks))
+                vectors[n : n + len(chunks)] = matrix
+                n += len(chunks)
+
+                doc_parts.append(np.full(len(chunks), doc, dtype=np.int32))
+                chunk_parts.append(chunk_index)
+                section_parts.append(section_index)
+                offset_parts.append(offsets)
+        finally:
+            if texts_file is not None:
+                texts_file.close()
+        if n == state.n:
+            return None
+
+        vectors.flush()
+        if self._quantized:
+            state = self._requantize(state, vectors, batch=vectors[state.n : n])
+
+        return replace(
+            state,
+            n=n,
+            vectors=vectors,
+            texts=self._map_texts(),
+            doc_index=np.concatenate([state.doc_index, *doc_parts]),
+            chunk_index=np.concatenate([state.chunk_index, *chunk_parts]),
+            section_index=np.concatenate([state.section_index, *section_parts]),
+            text_offsets=np.concatenate([state.text_offsets, *offset_parts]),
+            alive=np.concatenate([alive, np.ones(n - state.n, dtype=bool)]),
+            dead=dead,
+            documents=tables.documents,
+            filenames=tables.filenames,
+            sections=tables.sections,
+            doc_lookup=tables.doc_lookup,
+            section_lookup=tables.section_lookup,
+        )
+
+    def delete(self, document_ids: Collection[str]) -> None:
+        with self._lock:
+            state = self._state
+            docs = [state.doc_lookup[d] for d in document_ids if d in state.doc_lookup]
+            if not docs or state.n == 0:
+                return
+            removed = state.alive & np.isin(state.doc_index, docs)
+            count = int(removed.sum())
+            if count == 0:
+                return
+            # A new array, so searches holding the old state are unaffected
+            new_state = replace(state, alive=state.alive & ~removed, dead=state.dead + count)
+            if new_state.dead > _COMPACT_DEAD_RATIO * new_state.n:
+                new_state = self._compact(new_state)
+            else:
+                self._write_meta(new_state)
+            self._state = new_state
+
+    def _compact(self, state: _State) -> _State:
+        """Rewrite vectors and texts with live rows only (caller holds the lock)."""
+        keep = np.flatnonzero(state.alive)
+        if len(keep) == 0:
+            self._meta_path.unlink(missing_ok=True)
+            return self._empty_state(dim=state.dim)
+
+        # Re-number documents so the tables only list documents that still have rows
+        live_docs, doc_index = np.unique(state.doc_index[keep], return_inverse=True)
+        documents = [state.documents[i] for i in live_docs]
+        filenames = [state.filenames[i] for i in live_docs]
+
+        capacity = max(_MIN_CAPACITY, len(keep))
+        old_generation, generation = self._generation, self._generation + 1
+        vectors_path, codes_path, texts_path = _data_paths(self._path, generation)
+        out = np.memmap(vectors_path, dtype=np.float32, mode="w+", shape=(capacity, state.dim))
+        out[: len(keep)] = state.vectors[keep]
+        out.flush()
+        del out
+
+        if state.codes is not None:
+            out = np.memmap(codes_path, dtype=np.int8, mode="w+", shape=(capacity, state.dim))
+            out[: len(keep)] = state.codes[keep]
+            out.flush()
+            del out
+
+        starts = state.text_offsets[keep]
+        ends = state.text_offsets[keep + 1]
+        with open(texts_path, "wb") as f:
+            for start, end in zip(starts, ends):
+                f.write(state.texts[start:end].tobytes())
+
+        # The new files only count once the meta naming them is in place
+        self._generation = generation
+        try:
+            new_state = replace(
+                state,
+                n=len(keep),
+                vectors=self._map_vectors(capacity, state.dim),
+                codes=self._map_codes(capacity, state.dim) if state.codes is not None else None,
+                vectors_file=self._open_vectors() if state.codes is not None else None,
+                texts=self._map_texts(),
+                doc_index=doc_index.astype(np.int32),
+                chunk_index=state.chunk_index[keep],
+                section_index=state.section_index[keep],
+                text_offsets=np.concatenate([[0], np.cumsum(ends - starts)]).astype(np.int64),
+                alive=np.ones(len(keep), dtype=bool),
+                dead=0,
+                documents=documents,
+                filenames=filenames,
+                doc_lookup={d: i for i, d in enumerate(documents)},
+                generation=generation,
+            )
+            self._write_meta(new_state)
+        except BaseException:
+            self._generation = old_generation
+            for path in (vectors_path, codes_path, texts_path):
+                path.unlink(missing_ok=True)
+            raise
+
+        # Old memmaps stay valid for in-flight searches after their files are removed
+        for path in _data_paths(self._path, old_generation):
+            path.unlink(missing_ok=True)
+        logger.info("numpy_index_compacted", rows=new_state.n, removed=state.n - new_state.n)
+        return new_state
+
+    # ── Reads ──────────────────────────────────────────
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        k: int,
+        document_ids: Collection[str] | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+    ) -> list[SearchHit]:
+        state = self._state
+        if state.n - state.dead == 0:
+            return []
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+
+        valid = None
+        if state.dead:
+            valid = state.alive
+        if document_ids is not None:
+            docs = [state.doc_lookup[d] for d in document_ids if d in state.doc_lookup]
+            mask = np.isin(state.doc_index, docs)
+            valid = mask if valid is None else valid & mask
+        if exclude_document_ids:
+            docs = [state.doc_lookup[d] for d in exclude_document_ids if d in state.doc_lookup]
+            if docs:
+                mask = ~np.isin(state.doc_index, docs)
+                valid = mask if valid is None else valid & mask
+
+        available = state.n if valid is None else int(valid.sum())
+        k = min(k, available)
+        if k <= 0:
+            return []
+
+        if state.codes is not None:
+            # Coarse pass over int8 codes, then exact re-scoring of the shortlist
+            shortlist = min(k * self._rescore_factor, available)
+            # Sorted row order keeps the memmap reads sequential
+            rows = np.sort(_top_k(self._approximate_scores(state, query), valid, shortlist))
+            exact = _read_rows(state, rows) @ query
+            order = np.argsort(exact)[::-1][:k]
+            return [self._hit(state, int(rows[i]), float(exact[i])) for i in order]
+
+        scores = state.vectors[: state.n] @ query
+        top = _top_k(scores, valid, k)
+        top = top[np.argsort(scores[top])[::-1]]
+        return [self._hit(state, int(row), float(scores[row])) for row in top]
+
+    @staticmethod
+    def _approximate_scores(state: _State, query: np.ndarray) -> np.ndarray:
+        # q·x ≈ Σ q_d·scale_d·code_d + const — the constant does not change the ranking
+        weights = query * state.scale
+        scores = np.empty(state.n, dtype=np.float32)
+        for i in range(0, state.n, _SCAN_BLOCK_ROWS):
+            j = min(i + _SCAN_BLOCK_ROWS, state.n)
+            scores[i:j] = state.codes[i:j].astype(np.float32) @ weights
+        return scores
+
+    @staticmethod
+    def _hit(state: _State, row: int, score: float) -> SearchHit:
+        start, end = state.text_offsets[row], state.text_offsets[row + 1]
+        doc = state.doc_index[row]
+        return SearchHit(
+            document_id=state.documents[doc],
+            filename=state.filenames[doc],
+            content=state.texts[start:end].tobytes().decode(),
+            page_or_section=state.sections[state.section_index[row]] or None,
+            chunk_index=int(state.chunk_index[row]),
+            score=score,
+        )
+
+    def memory_footprint(self) -> dict:
+        """Bytes a full scan touches, versus the float32 matrix kept on disk."""
+        state = self._state
+        vector_bytes = state.n * state.dim * 4
+        scanned = state.n * state.dim if state.codes is not None else vector_bytes
+        return {
+            "rows": state.n,
+            "quantization": self.quantization,
+            "scanned_bytes": scanned,
+            "float32_bytes": vector_bytes,
+        }
+
+    def document_chunks(self, document_id: str) -> tuple[str, list[dict]] | None:
+        state = self._state
+        doc = state.doc_lookup.get(document_id)
+        if doc is None or state.n == 0:
+            return None
+        rows = np.flatnonzero(state.alive & (state.doc_index == doc))
+        if len(rows) == 0:
+            return None
+        rows = rows[np.argsort(state.chunk_index[rows], kind="stable")]
+        chunks = []
+        for row in rows:
+            hit = self._hit(state, int(row), 0.0)
+            chunks.append(
+                {
+                    "text": hit.content,
+                    "chunk_index": hit.chunk_index,
+                    "page_or_section": hit.page_or_section,
+                }
+            )
+        return state.filenames[doc], chunks
+
+    def document_vectors(self, document_id: str) -> np.ndarray | None:
+        state = self._state
+        doc = state.doc_lookup.get(document_id)
+        if doc is None or state.n == 0:
+            return None
+        rows = np.flatnonzero(state.alive & (state.doc_index == doc))
+        if len(rows) == 0:
+            return None
+        rows = rows[np.argsort(state.chunk_index[rows], kind="stable")]
+        return np.array(state.vectors[rows])
+
+    def export_documents(self) -> Iterator[tuple[str, str, list[dict], np.ndarray]]:
+        # One state throughout: rows [:n] are never rewritten, so this is a point-in-time view
+        state = self._state
+        rows = np.flatnonzero(state.alive[: state.n])
+        if len(rows) == 0:
+            return
+        rows = rows[np.lexsort((state.chunk_index[rows], state.doc_index[rows]))]
+        bounds = np.flatnonzero(np.diff(state.doc_index[rows])) + 1
+        for group in np.split(rows, bounds):
+            doc = state.doc_index[group[0]]
+            chunks = []
+            for row in group:
+                hit = self._hit(state, int(row), 0.0)
+                chunks.append(
+                    {
+                        "text": hit.content,
+                        "chunk_index": hit.chunk_index,
+                        "page_or_section": hit.page_or_section,
+                    }
+                )
+            yield state.documents[doc], state.filenames[doc], chunks, np.array(state.vectors[group])
+
+    def hnsw_params(self) -> HnswParams | None:
+        return None  # exact search
+
+    def storage_bytes(self) -> int:
+        return sum(f.stat().st_size for f in self._path.iterdir() if f.is_file())
+
+    def drop(self) -> None:
+        with self._lock:
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._generation = 0
+            self._state = self._blank_state(self._state.dim)
+
+    def count(self) -> int:
+        state = self._state
+        return state.n - state.dead
+
+    def document_ids(self) -> set[str]:
+        state = self._state
+        live = np.unique(state.doc_index[state.alive])
+        return {state.documents[i] for i in live}
+
+
+def _top_k(scores: np.ndarray, valid: np.ndarray | None, k: int) -> np.ndarray:
+    """Indices of the k highest scores among ``valid`` rows (unordered)."""
+    if valid is not None:
+        scores = np.where(valid, scores, -np.inf)
+    return np.argpartition(scores, -k)[-k:]
+
+
+def _read_rows(state: _State, rows: np.ndarray) -> np.ndarray:
+    """Read float32 rows with pread instead of faulting them in through the memmap."""
+    row_bytes = state.dim * 4
+    fd = state.vectors_file.fileno()
+    data = b"".join(os.pread(fd, row_bytes, int(row) * row_bytes) for row in rows)
+    return np.frombuffer(data, dtype=np.float32).reshape(len(rows), state.dim)
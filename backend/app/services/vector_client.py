@@ -0,0 +1,121 @@
+"""Vector store client — API workers reach the vector service over pooled HTTP.
+
+In remote mode a single ``app.vector_service`` process owns the embedding model,
+the collections, their manifests and background rebuilds, so any number of API
+workers can share them. This client mirrors the parts of ShardedVectorStore the
+API uses. Calls are synchronous like the local store's; each worker keeps a
+bounded pool of keep-alive connections that its threads share.
+"""
+
+from collections.abc import Collection
+
+import httpx
+
+from app.core.exceptions import VectorServiceError, VectorServiceUnavailableError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RemoteVectorStore:
+    def __init__(
+        self,
+        base_url: str,
+        token: str = "",
+        pool_size: int = 16,
+        timeout_s: float = 30.0,
+        retries: int = 2,
+    ):
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self._client = httpx.Client(
+            base_url=base_url,
+            headers={"X-Vector-Service-Token": token} if token else {},
+            timeout=timeout_s,
+            # Retries cover connection failures only, so no request is applied twice
+            transport=httpx.HTTPTransport(limits=limits, retries=retries),
+        )
+        logger.info("vector_client_initialized", url=base_url, pool_size=pool_size)
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        try:
+            return self._client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            logger.error("vector_service_unreachable", path=path, error=str(e))
+            raise VectorServiceUnavailableError(str(e) or type(e).__name__) from e
+
+    def _call(self, method: str, path: str, **kwargs) -> dict:
+        response = self._request(method, path, **kwargs)
+        if response.is_error:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise VectorServiceError(response.status_code, str(detail))
+        return response.json()
+
+    # ── Chunks ─────────────────────────────────────────
+
+    def add_chunks(
+        self, document_id: str, filename: str, chunks: list[dict], tenant_id: str | None = None
+    ) -> int:
+        body = {
+            "document_id": document_id,
+            "filename": filename,
+            "chunks": [
+                {
+                    "text": c["text"],
+                    "chunk_index": c["chunk_index"],
+                    "page_or_section": c.get("page_or_section"),
+                }
+                for c in chunks
+            ],
+            "tenant_id": tenant_id,
+        }
+        return self._call("POST", "/vectors/chunks", json=body)["count"]
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+        document_ids: Collection[str] | None = None,
+        tenant_id: str | None = None,
+    ) -> list[dict]:
+        body = {
+            "query": query,
+            "top_k": top_k,
+            "exclude_document_ids": list(exclude_document_ids) if exclude_document_ids else None,
+            "document_ids": list(document_ids) if document_ids is not None else None,
+            "tenant_id": tenant_id,
+        }
+        return self._call("POST", "/vectors/search", json=body)["results"]
+
+    def delete_by_document(self, document_id: str):
+        self.delete_by_documents([document_id])
+
+    def delete_by_documents(self, document_ids: list[str]):
+        if document_ids:
+            self._call("POST", "/vectors/delete", json={"document_ids": list(document_ids)})
+
+    def document_ids(self) -> set[str]:
+        return set(self._call("GET", "/vectors/documents")["document_ids"])
+
+    def count(self) -> int:
+        return self._call("GET", "/vectors/count")["count"]
+
+    # ── Maintenance ────────────────────────────────────
+
+    def needs_rebuild(self) -> bool:
+        return False  # the vector service runs its own rebuilds
+
+    def forward(
+        self, method: str, path: str, params: dict, content: bytes, headers: dict
+    ) -> tuple[int, bytes, str | None]:
+        """Relay a request as-is; returns (status, body, content type)."""
+        response = self._request(method, path, params=params, content=content, headers=headers)
+        return response.status_code, response.content, response.headers.get("content-type")
+
+    def close(self) -> None:
+        self._client.close()
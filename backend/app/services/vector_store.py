@@ -1,104 +1,837 @@
-"""ChromaDB vector store — singleton service for document chunk storage and retrieval."""
+"""Vector store — singleton service for document chunk storage and retrieval."""
 
-import chromadb
+import dataclasses
+import heapq
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import (
+    DEDUP_BYTES_SAVED,
+    DEDUP_CHUNKS,
+    DEDUP_EMBED_SECONDS_SAVED,
+    INGESTION_CHUNKS,
+    INGESTION_PHASE_SECONDS,
+    QUERY_EMBEDDING_SECONDS,
+    VECTOR_SEARCH_SECONDS,
+)
+from app.core.tracing import tracer
+from app.services.dedup import (
+    ChunkKey,
+    ChunkRef,
+    DedupPlan,
+    NearDuplicateIndex,
+    collapse_near_duplicates,
+)
+from app.services.embeddings import Embedder, EmbeddingConfig, build_embedder
+from app.services.vector_backends import HnswParams, VectorBackend, build_backend
 
 logger = get_logger(__name__)
 
+# Most other documents named in a result's ``also_in``
+_ALSO_IN_LIMIT = 20
+
 
 class VectorStoreService:
-    """Manages a single ChromaDB collection for document chunks."""
+    """Embeds chunks and queries, and delegates storage and search to a vector backend.
+
+    A manifest next to the indexes records which physical collection is active and
+    the embedding config its vectors were made with. Queries are always embedded
+    with that config, so changing the settings never mixes vector spaces; instead
+    the corpus is re-embedded into a new collection that is swapped in when complete.
+    The same rebuild-and-swap applies new HNSW parameters, copying the stored vectors.
+
+    Near-duplicate chunks are stored once; the other occurrences are references kept
+    in a per-collection index (see dedup) and resolved when searching.
+    """
 
-    def __init__(self):
-        self._client = chromadb.PersistentClient(path=str(settings.chroma_dir))
-        self._collection = self._client.get_or_create_collection(
-            name=settings.chroma_collection,
-            metadata={"hnsw:space": "cosine"},
+    def __init__(self, backend: VectorBackend | None = None, collection: str | None = None):
+        self._collection = collection or settings.chroma_collection
+        self._manifest_path = settings.vector_index_dir / f"{self._collection}.manifest.json"
+        self._manifest = self._load_manifest()
+        # Embeddings are computed here rather than in the backend so each stage can be timed
+        active_backend = backend or build_backend(
+            settings.vector_backend, self._collection, self._manifest["storage"]
         )
+        embedder = build_embedder(EmbeddingConfig.from_dict(self._manifest["embedding"]))
+        # Swapped as one tuple so readers never pair a backend with the wrong embedder
+        self._active: tuple[VectorBackend, Embedder] = (active_backend, embedder)
+        self._target: VectorBackend | None = None
+        self._swap_lock = threading.Lock()
+        self._dedup = NearDuplicateIndex(
+            settings.vector_index_dir / f"{self._collection}.dedup.jsonl"
+        )
+        # Moving average of embedding time per chunk, and the vector width
+        self._embed_cost: tuple[float, int] | None = None
         logger.info(
             "vector_store_initialized",
-            collection=settings.chroma_collection,
-            count=self._collection.count(),
+            backend=active_backend.name,
+            collection=self._collection,
+            storage=self._manifest["storage"],
+            count=active_backend.count(),
         )
 
+    @property
+    def active(self) -> tuple[VectorBackend, Embedder]:
+        """The backend and the embedder its vectors were made with, read as one pair."""
+        return self._active
+
+    @property
+    def backend(self) -> VectorBackend:
+        return self._active[0]
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._active[1]
+
+    @property
+    def embedding_config(self) -> EmbeddingConfig:
+        return self._active[1].config
+
+    @property
+    def index_params(self) -> HnswParams | None:
+        return self.backend.hnsw_params()
+
+    # ── Manifest ───────────────────────────────────────
+
+    def _load_manifest(self) -> dict:
+        if self._manifest_path.exists():
+            return json.loads(self._manifest_path.read_text())
+        # First run (or an index that predates manifests): vectors were made with the
+        # configured model; a PCA projection only exists once it has been fitted
+        config = EmbeddingConfig.from_settings()
+        manifest = {
+            "storage": self._collection,
+            "embedding": EmbeddingConfig(config.model, config.max_seq_length).to_dict(),
+            "reembed": None,
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    def _write_manifest(self, manifest: dict) -> None:
+        self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self._manifest_path)
+
+    # ── Re-embedding ───────────────────────────────────
+
+    def needs_reembed(self, config: EmbeddingConfig | None = None) -> bool:
+        """True if the active vectors were made with a different embedding config."""
+        config = config or EmbeddingConfig.from_settings()
+        active = self.embedding_config
+        if config.same_space(active):
+            return False
+        pca_only = config.same_space(
+            EmbeddingConfig(active.model, active.max_seq_length, config.pca_dims)
+        )
+        if pca_only and config.pca_dims and self.count() < config.pca_dims:
+            # Too few chunks to fit the projection yet; keep full-dimension vectors
+            logger.info("pca_deferred", pca_dims=config.pca_dims, chunks=self.count())
+            return False
+        return True
+
+    def rebuild_target(
+        self, index: HnswParams | None = None
+    ) -> tuple[EmbeddingConfig, HnswParams | None] | None:
+        """The (embedding config, HNSW params) to rebuild with, or None if up to date.
+
+        The embedding comes from the settings; the index parameters from ``index``,
+        else from an interrupted rebuild, else the active collection's. A pending
+        rebuild that no longer differs from the active collection is discarded.
+        """
+        config = EmbeddingConfig.from_settings() if self.needs_reembed() else self.embedding_config
+        current = self.index_params
+        pending = self._manifest.get("reembed")
+        if index is None:
+            index = current
+            if pending and pending.get("index"):
+                index = HnswParams.from_dict(pending["index"])
+        if config.same_space(self.embedding_config) and index == current:
+            if pending:
+                self._drop_storage(pending["storage"])
+                self._manifest["reembed"] = None
+                self._write_manifest(self._manifest)
+            return None
+        return config, index
+
+    def start_reembed(
+        self, config: EmbeddingConfig, index: HnswParams | None = None
+    ) -> tuple[VectorBackend, EmbeddingConfig, set]:
+        """Open (or resume) the shadow collection for ``config`` and ``index``.
+
+        Returns the target backend, the config to embed with (carrying a fitted PCA
+        file when resuming) and the IDs of documents already copied.
+        """
+        pending = self._manifest.get("reembed")
+        index_dict = index.to_dict() if index else None
+        if (
+            pending
+            and EmbeddingConfig.from_dict(pending["embedding"]).same_space(config)
+            and pending.get("index") == index_dict
+        ):
+            target = build_backend(
+                settings.vector_backend, self._collection, pending["storage"], index
+            )
+            self._target = target
+            logger.info("reembed_resumed", storage=pending["storage"], done=len(pending["done"]))
+            return target, EmbeddingConfig.from_dict(pending["embedding"]), set(pending["done"])
+
+        if pending:
+            # The target changed again mid-way: the half-built collection is useless
+            self._drop_storage(pending["storage"])
+        storage = f"{self._collection}-{config.digest()}-{int(time.time())}"
+        if config.pca_file and config.same_space(self.embedding_config):
+            # Vectors are copied as-is; the new collection gets its own copy of the
+            # projection because the old one is deleted with the old collection
+            shutil.copyfile(settings.vector_index_dir / config.pca_file, self.pca_path(storage))
+            config = dataclasses.replace(config, pca_file=self.pca_path(storage).name)
+        target = build_backend(settings.vector_backend, self._collection, storage, index)
+        self._target = target
+        self._manifest["reembed"] = {
+            "storage": storage,
+            "embedding": config.to_dict(),
+            "index": index_dict,
+            "done": [],
+            "started_at": time.time(),
+        }
+        self._write_manifest(self._manifest)
+        logger.info(
+            "reembed_started", storage=storage, embedding=config.to_dict(), index=index_dict
+        )
+        return target, config, set()
+
+    def update_reembed_config(self, config: EmbeddingConfig) -> None:
+        """Persist the target config once its PCA projection has been fitted."""
+        self._manifest["reembed"]["embedding"] = config.to_dict()
+        self._write_manifest(self._manifest)
+
+    def record_reembed_progress(self, document_ids: Iterable[str]) -> None:
+        pending = self._manifest["reembed"]
+        pending["done"] = sorted(set(pending["done"]).union(document_ids))
+        self._write_manifest(self._manifest)
+
+    def finish_reembed(self, embedder: Embedder) -> bool:
+        """Swap the shadow collection in if it holds every active document.
+
+        ``embedder`` must produce the target's vectors; it becomes the query embedder.
+        """
+        with self._swap_lock:
+            pending = self._manifest["reembed"]
+            old_backend = self.backend
+            if old_backend.document_ids() - set(pending["done"]):
+                return False
+            target = self._target
+            # Documents deleted while they were being copied
+            stale = target.document_ids() - old_backend.document_ids()
+            if stale:
+                target.delete(stale)
+
+            self._active = (target, embedder)
+            self._target = None
+            old_storage = self._manifest["storage"]
+            self._manifest = {
+                "storage": pending["storage"],
+                "embedding": embedder.config.to_dict(),
+                "reembed": None,
+            }
+            self._write_manifest(self._manifest)
+
+        old_backend.drop()
+        self.pca_path(old_storage).unlink(missing_ok=True)
+        logger.info("reembed_swapped", storage=pending["storage"], previous=old_storage)
+        return True
+
+    def restore(
+        self,
+        config: EmbeddingConfig,
+        index: HnswParams | None,
+        documents: Iterable[tuple[str, str, list[dict], Sequence[Sequence[float]]]],
+        pca_file: Path | None = None,
+    ) -> int:
+        """Bulk-load documents into a new collection and swap it in (snapshot restore).
+
+        ``documents`` yields (document_id, filename, chunks, vectors) already in the
+        vector space of ``config``; ``pca_file`` is its projection, copied next to the
+        index. Replaces the active collection and drops any pending rebuild. Returns
+        the number of chunks loaded.
+        """
+        storage = f"{self._collection}-{config.digest()}-{int(time.time())}"
+        if pca_file is not None:
+            shutil.copyfile(pca_file, self.pca_path(storage))
+            config = dataclasses.replace(config, pca_file=self.pca_path(storage).name)
+        target = build_backend(settings.vector_backend, self._collection, storage, index)
+        try:
+            target.add_many(documents)
+            embedder = build_embedder(config)
+        except BaseException:
+            # No manifest references the new storage yet; nothing else would remove it
+            target.drop()
+            self.pca_path(storage).unlink(missing_ok=True)
+            raise
+
+        with self._swap_lock:
+            old_backend = self.backend
+            old_storage = self._manifest["storage"]
+            pending = self._manifest.get("reembed")
+            self._active = (target, embedder)
+            self._target = None
+            self._manifest = {"storage": storage, "embedding": config.to_dict(), "reembed": None}
+            self._write_manifest(self._manifest)
+            # The snapshot holds every chunk in full
+            self._dedup.clear()
+
+        old_backend.drop()
+        self.pca_path(old_storage).unlink(missing_ok=True)
+        if pending:
+            self._drop_storage(pending["storage"])
+        logger.info("collection_restored", storage=storage, chunks=target.count())
+        return target.count()
+
+    @property
+    def reembed_storage(self) -> str | None:
+        pending = self._manifest.get("reembed")
+        return pending["storage"] if pending else None
+
+    @staticmethod
+    def pca_path(storage: str) -> Path:
+        return settings.vector_index_dir / f"{storage}.pca.npz"
+
+    def _drop_storage(self, storage: str) -> None:
+        try:
+            build_backend(settings.vector_backend, self._collection, storage).drop()
+        except Exception as e:
+            logger.warning("reembed_cleanup_failed", storage=storage, error=str(e))
+        self.pca_path(storage).unlink(missing_ok=True)
+
+    def reembed_status(self) -> dict:
+        pending = self._manifest.get("reembed")
+        status = {
+            "storage": self._manifest["storage"],
+            "embedding": self.embedding_config.to_dict(),
+            "configured": EmbeddingConfig.from_settings().to_dict(),
+            "needs_reembed": self.needs_reembed(),
+            "reembed": None,
+        }
+        if pending:
+            status["reembed"] = {
+                "storage": pending["storage"],
+                "embedding": pending["embedding"],
+                "index": pending.get("index"),
+                "documents_done": len(pending["done"]),
+                "documents_total": len(self.document_ids()),
+            }
+        return status
+
+    def index_status(self) -> dict:
+        backend = self.backend
+        params = backend.hnsw_params()
+        pending = self._manifest.get("reembed")
+        return {
+            "backend": backend.name,
+            "storage": self._manifest["storage"],
+            "chunks": backend.count(),
+            "hnsw": params.to_dict() if params else None,
+            "configured": HnswParams.from_settings().to_dict() if params else None,
+            "rebuild": pending.get("index") if pending else None,
+        }
+
+    # ── Chunks ─────────────────────────────────────────
+
     def add_chunks(self, document_id: str, filename: str, chunks: list[dict]) -> int:
         """Add document chunks to the collection.
 
         Each chunk dict must have: text, chunk_index, page_or_section.
-        Returns the number of chunks added.
+        With ``dedup_enabled``, chunks nearly duplicating one already stored are
+        recorded as references to it instead of being embedded and stored.
+        Returns the number of chunks added, references included.
         """
         if not chunks:
             return 0
 
-        ids = [f"{document_id}_chunk_{c['chunk_index']}" for c in chunks]
-        documents = [c["text"] for c in chunks]
-        metadatas = [
-            {
-                "document_id": document_id,
-                "filename": filename,
-                "chunk_index": c["chunk_index"],
-                "page_or_section": c.get("page_or_section") or "",
-            }
-            for c in chunks
-        ]
+        with tracer.span("vector_store.add_chunks", chunk_count=len(chunks)) as span:
+            plan = self._dedup.plan(document_id, chunks) if settings.dedup_enabled else None
+            positions = plan.unique if plan is not None else list(range(len(chunks)))
+            stored: list[int] = []
+            while True:
+                if positions:
+                    batch = [chunks[p] for p in positions]
+                    self._embed_and_store(document_id, filename, batch, append=bool(stored))
+                    span.add_event("stored")
+                    stored += positions
+                if plan is None:
+                    break
+                with self._swap_lock:
+                    # Positions whose canonical chunk was deleted meanwhile
+                    positions = self._dedup.commit(document_id, filename, chunks, plan)
+                if not positions:
+                    break
+                plan = DedupPlan(plan.signatures, unique=positions)
+            span.set_attribute("duplicate_count", len(chunks) - len(stored))
 
-        self._collection.add(ids=ids, documents=documents, metadatas=metadatas)
+        INGESTION_CHUNKS.inc(len(stored))
+        duplicates = sorted(set(range(len(chunks))) - set(stored))
+        bytes_saved, seconds_saved = 0, 0.0
+        if duplicates and self._embed_cost is not None:
+            seconds_per_chunk, dim = self._embed_cost
+            text_bytes = sum(len(chunks[p]["text"].encode()) for p in duplicates)
+            bytes_saved = text_bytes + len(duplicates) * dim * 4
+            seconds_saved = len(duplicates) * seconds_per_chunk
+            DEDUP_CHUNKS.inc(len(duplicates))
+            DEDUP_BYTES_SAVED.inc(bytes_saved)
+            DEDUP_EMBED_SECONDS_SAVED.inc(seconds_saved)
+        elif duplicates:
+            DEDUP_CHUNKS.inc(len(duplicates))
         logger.info(
             "chunks_added",
             document_id=document_id,
             filename=filename,
             count=len(chunks),
+            stored=len(stored),
+            duplicates=len(duplicates),
+            bytes_saved=bytes_saved,
+            embed_seconds_saved=round(seconds_saved, 3),
         )
         return len(chunks)
 
-    def search(self, query: str, top_k: int | None = None) -> list[dict]:
+    def _embed_and_store(
+        self, document_id: str, filename: str, chunks: list[dict], append: bool = False
+    ) -> None:
+        texts = [c["text"] for c in chunks]
+        while True:
+            backend, embedder = self._active
+            started = time.perf_counter()
+            with INGESTION_PHASE_SECONDS.labels(phase="embed").time():
+                embeddings = embedder(texts)
+            elapsed = (time.perf_counter() - started) / len(texts)
+            with self._swap_lock, INGESTION_PHASE_SECONDS.labels(phase="store").time():
+                # A re-embed swap in between means these vectors are in the old space
+                if self._active[0] is backend:
+                    if append:
+                        _append_chunks(backend, document_id, filename, chunks, embeddings)
+                    else:
+                        backend.add(document_id, filename, chunks, embeddings)
+                    break
+        if self._embed_cost is not None:
+            elapsed = 0.8 * self._embed_cost[0] + 0.2 * elapsed
+        self._embed_cost = (elapsed, len(embeddings[0]))
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+        document_ids: Collection[str] | None = None,
+        encoded: dict | None = None,
+    ) -> list[dict]:
         """Search for chunks relevant to the query.
 
+        Chunks of documents in ``exclude_document_ids`` (e.g. tombstoned ones) are skipped;
+        ``document_ids``, when given, restricts the search to those documents.
+        ``encoded`` caches the query's encoder output across collections (see Embedder).
         Returns a list of dicts matching SourceChunk fields:
-        document_id, document_name, content, page_or_section, chunk_index, relevance_score.
+        document_id, document_name, content, page_or_section, chunk_index, relevance_score,
+        and ``also_in`` (other documents containing the same text) when not empty.
         """
         k = top_k or settings.retrieval_top_k
+        backend, embedder = self._active
+        dedup = self._dedup
+        fetch, search_ids, search_exclude = k, document_ids, exclude_document_ids
+        if dedup.has_references:
+            # A canonical chunk of an excluded or unlisted document may stand in for
+            # an allowed one; fetch extra to make up for hits that resolve to nothing
+            fetch = k * 2
+            if exclude_document_ids:
+                excluded = set(exclude_document_ids)
+                search_exclude = excluded - dedup.owners_with_references(excluded)
+            if document_ids is not None:
+                search_ids = set(document_ids) | dedup.canonical_owners(set(document_ids))
 
-        # If collection is empty, return nothing
-        if self._collection.count() == 0:
-            return []
+        with tracer.span("vector_store.search", top_k=k) as span:
+            # If collection is empty, return nothing
+            if backend.count() == 0:
+                return []
 
-        # Don't request more results than exist
-        k = min(k, self._collection.count())
+            with tracer.span("vector_store.embed_query"), QUERY_EMBEDDING_SECONDS.time():
+                query_embedding = embedder.embed_query(query, encoded)
+            with tracer.span("vector_store.query"), VECTOR_SEARCH_SECONDS.time():
+                hits = backend.search(
+                    query_embedding,
+                    fetch,
+                    document_ids=search_ids,
+                    exclude_document_ids=search_exclude,
+                )
+            span.set_attribute("result_count", len(hits))
 
-        results = self._collection.query(query_texts=[query], n_results=k)
+        def allowed(document_id: str) -> bool:
+            if exclude_document_ids and document_id in exclude_document_ids:
+                return False
+            return document_ids is None or document_id in document_ids
 
         sources = []
-        for i in range(len(results["ids"][0])):
-            distance = results["distances"][0][i]
-            # Cosine distance → relevance score (ChromaDB returns distance, not similarity)
-            relevance = 1.0 - distance
+        for hit in hits:
+            holders = [(hit.document_id, hit.filename, hit.page_or_section, hit.chunk_index)]
+            for (document_id, chunk_index), ref in dedup.references(
+                (hit.document_id, hit.chunk_index)
+            ):
+                holders.append((document_id, ref.filename, ref.page_or_section, chunk_index))
+            holders = [h for h in holders if allowed(h[0])]
+            if not holders:
+                continue
+            (document_id, filename, section, chunk_index), others = holders[0], holders[1:]
+            source = {
+                "document_id": document_id,
+                "document_name": filename,
+                "content": hit.content,
+                "page_or_section": section,
+                "chunk_index": chunk_index,
+                "relevance_score": round(hit.score, 4),
+            }
+            also_in = list(dict.fromkeys(h[1] for h in others if h[1] != filename))
+            if also_in:
+                source["also_in"] = also_in[:_ALSO_IN_LIMIT]
+            sources.append(source)
+        if settings.dedup_enabled:
+            sources = collapse_near_duplicates(sources)
+        return sources[:k]
 
-            meta = results["metadatas"][0][i]
-            sources.append(
-                {
-                    "document_id": meta["document_id"],
-                    "document_name": meta["filename"],
-                    "content": results["documents"][0][i],
-                    "page_or_section": meta.get("page_or_section") or None,
-                    "chunk_index": meta["chunk_index"],
-                    "relevance_score": round(relevance, 4),
+    def delete_by_document(self, document_id: str):
+        """Delete all chunks belonging to a document."""
+        self.delete_by_documents([document_id])
+
+    def delete_by_documents(self, document_ids: list[str]):
+        """Delete all chunks belonging to any of the given documents in one call.
+
+        A deleted chunk that other documents refer to as a near-duplicate is first
+        copied, vector included, to one of them, which becomes the canonical copy.
+        """
+        if not document_ids:
+            return
+        deleted = set(document_ids)
+        with self._swap_lock:
+            moves = self._dedup.promotions(deleted)
+            if moves:
+                moves = self._promote(moves)
+            self.backend.delete(document_ids)
+            if self._target is not None:
+                self._target.delete(document_ids)
+            self._dedup.remove_documents(deleted, moves)
+        logger.info("chunks_deleted", document_count=len(document_ids), promoted=len(moves))
+
+    def _promote(self, moves: list) -> list:
+        """Copy canonical chunks to the references taking over; returns the moves made.
+
+        Called under the swap lock.
+        """
+        done = []
+        for backend in (self.backend, self._target):
+            if backend is None:
+                continue
+            additions: dict[str, tuple[str, list[dict], list]] = {}
+            for owner, group in itertools.groupby(moves, key=lambda m: m[0][0]):
+                stored, vectors = backend.document_chunks(owner), backend.document_vectors(owner)
+                if stored is None or vectors is None:
+                    continue
+                by_index = {c["chunk_index"]: (c, v) for c, v in zip(stored[1], vectors)}
+                for move in group:
+                    (_, old_index), (document_id, chunk_index), ref = move
+                    if old_index not in by_index:
+                        continue
+                    chunk, vector = by_index[old_index]
+                    entry = additions.setdefault(document_id, (ref.filename, [], []))
+                    entry[1].append(
+                        {
+                            "text": chunk["text"],
+                            "chunk_index": chunk_index,
+                            "page_or_section": ref.page_or_section,
+                        }
+                    )
+                    entry[2].append(vector)
+                    if backend is self.backend:
+                        done.append(move)
+            for document_id, (filename, chunks, vectors) in additions.items():
+                _append_chunks(backend, document_id, filename, chunks, vectors)
+        if len(done) < len(moves):
+            logger.warning("dedup_promotion_incomplete", missing=len(moves) - len(done))
+        return done
+
+    def document_ids(self) -> set[str]:
+        """Return the distinct document IDs that have chunks in the collection."""
+        return self.backend.document_ids() | self._dedup.reference_documents()
+
+    def count(self) -> int:
+        """Return total number of chunks in the collection."""
+        return self.backend.count()
+
+    def duplicate_count(self) -> int:
+        """Chunks stored as references to a near-duplicate."""
+        return self._dedup.reference_count()
+
+    def export_documents(
+        self, backend: VectorBackend | None = None
+    ) -> Iterator[tuple[str, str, list[dict], np.ndarray]]:
+        """The backend's ``export_documents`` with near-duplicate references filled in.
+
+        Each referenced chunk is exported in full, with its canonical chunk's text
+        and vector, so an export never depends on the dedup index.
+        """
+        backend = backend or self.backend
+        references = self._dedup.reference_map()
+        if not references:
+            yield from backend.export_documents()
+            return
+
+        # Canonical vectors are read per referencing document rather than collected
+        # up front, so the export holds one document's worth of vectors at a time
+        exported: set[str] = set()
+        for document_id, filename, chunks, vectors in backend.export_documents():
+            exported.add(document_id)
+            if document_id not in references:
+                yield document_id, filename, chunks, vectors
+                continue
+            rows = list(zip(chunks, vectors)) + _resolve_references(
+                backend, references[document_id]
+            )
+            rows.sort(key=lambda row: row[0]["chunk_index"])
+            yield document_id, filename, [c for c, _ in rows], np.array([v for _, v in rows])
+
+        for document_id, refs in references.items():
+            if document_id in exported:
+                continue
+            rows = _resolve_references(backend, refs)
+            if rows:
+                rows.sort(key=lambda row: row[0]["chunk_index"])
+                yield document_id, refs[0][1].filename, [c for c, _ in rows], np.array(
+                    [v for _, v in rows]
+                )
+
+
+def _resolve_references(
+    backend: VectorBackend, refs: list[tuple[int, ChunkRef, ChunkKey]]
+) -> list[tuple[dict, np.ndarray]]:
+    """Full chunks for one document's references, read from their canonical documents.
+
+    References whose canonical chunk is no longer stored are skipped.
+    """
+    owners: dict[str, dict[int, tuple[str, np.ndarray]]] = {}
+    rows = []
+    for chunk_index, ref, (owner, canonical_index) in refs:
+        if owner not in owners:
+            stored = backend.document_chunks(owner)
+            vectors = backend.document_vectors(owner)
+            owners[owner] = (
+                {}
+                if stored is None or vectors is None or len(vectors) != len(stored[1])
+                else {
+                    chunk["chunk_index"]: (chunk["text"], vector)
+                    for chunk, vector in zip(stored[1], vectors)
                 }
             )
+        if canonical_index in owners[owner]:
+            text, vector = owners[owner][canonical_index]
+            chunk = {
+                "text": text,
+                "chunk_index": chunk_index,
+                "page_or_section": ref.page_or_section,
+            }
+            rows.append((chunk, vector))
+    return rows
+
+def _append_chunks(
+    backend: VectorBackend,
+    document_id: str,
+    filename: str,
+    chunks: list[dict],
+    vectors: Sequence[Sequence[float]],
+) -> None:
+    """Add chunks to a document that may already have some (``add`` replaces them)."""
+    stored = backend.document_chunks(document_id)
+    if stored is not None:
+        existing = np.asarray(backend.document_vectors(document_id), dtype=np.float32)
+        chunks = stored[1] + chunks
+        vectors = np.concatenate([existing, np.asarray(vectors, dtype=np.float32)])
+    backend.add(document_id, filename, chunks, vectors)
+
+
+class ShardedVectorStore:
+    """One collection per tenant, with searches fanned out across the visible shards.
+
+    The default tenant keeps the base collection, so single-tenant deployments are
+    unchanged; every other tenant gets ``<collection>-<tenant_id>``, created on its
+    first upload. Each shard is a full VectorStoreService (own manifest, re-embedding
+    and index parameters), so a tenant's bulk ingestion never grows the index other
+    tenants search, and a query's cost is bounded by the shards it can see.
+    """
 
-        return sources
+    def __init__(self, collection: str | None = None):
+        self._collection = collection or settings.chroma_collection
+        self._shards: dict[str, VectorStoreService] = {}
+        self._lock = threading.Lock()
+        for tenant_id in self._discover():
+            self.shard(tenant_id)
+        self.shard(settings.default_tenant)
+
+    def _discover(self) -> list[str]:
+        """Tenants with an existing shard, found from the collection manifests."""
+        prefix = f"{self._collection}-"
+        tenants = []
+        for path in sorted(settings.vector_index_dir.glob(f"{prefix}*.manifest.json")):
+            tenants.append(path.name[len(prefix) : -len(".manifest.json")])
+        return tenants
+
+    def collection_for(self, tenant_id: str) -> str:
+        if tenant_id == settings.default_tenant:
+            return self._collection
+        return f"{self._collection}-{tenant_id}"
+
+    def shard(self, tenant_id: str) -> VectorStoreService:
+        """The tenant's shard, created on first use."""
+        service = self._shards.get(tenant_id)
+        if service is None:
+            with self._lock:
+                service = self._shards.get(tenant_id)
+                if service is None:
+                    service = VectorStoreService(collection=self.collection_for(tenant_id))
+                    self._shards[tenant_id] = service
+        return service
+
+    def shards(self) -> dict[str, VectorStoreService]:
+        return dict(self._shards)
+
+    def visible_tenants(self, tenant_id: str) -> list[str]:
+        """Tenants whose shards a request from ``tenant_id`` may search."""
+        tenants = dict.fromkeys([tenant_id, *settings.shared_tenants])
+        return [t for t in tenants if t in self._shards]
+
+    # ── Chunks ─────────────────────────────────────────
+
+    def add_chunks(
+        self, document_id: str, filename: str, chunks: list[dict], tenant_id: str | None = None
+    ) -> int:
+        return self.shard(tenant_id or settings.default_tenant).add_chunks(
+            document_id, filename, chunks
+        )
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        exclude_document_ids: Collection[str] | None = None,
+        document_ids: Collection[str] | None = None,
+        tenant_id: str | None = None,
+    ) -> list[dict]:
+        """Search every shard visible to ``tenant_id`` in parallel and merge the top-k.
+
+        Scores are cosine similarities in each shard's own space, so they compare
+        directly across shards built with the same model.
+        """
+        k = top_k or settings.retrieval_top_k
+        tenants = self.visible_tenants(tenant_id or settings.default_tenant)
+        shards = [self._shards[t] for t in tenants if self._shards[t].count()]
+        if not shards:
+            return []
+        if len(shards) == 1:
+            return shards[0].search(query, k, exclude_document_ids, document_ids)
+
+        # Encode the query once per model before fanning out
+        encoded: dict = {}
+        for shard in shards:
+            if shard.embedder.encoder not in encoded:
+                shard.embedder.embed_query(query, encoded)
+
+        def search_shard(shard: VectorStoreService) -> list[dict]:
+            return shard.search(query, k, exclude_document_ids, document_ids, encoded)
+
+        with tracer.span("vector_store.fan_out", shards=len(shards)):
+            results = list(_search_pool.map(search_shard, shards))
+        if not settings.dedup_enabled:
+            return heapq.nlargest(
+                k, itertools.chain.from_iterable(results), key=lambda s: s["relevance_score"]
+            )
+        merged = sorted(
+            itertools.chain.from_iterable(results),
+            key=lambda s: s["relevance_score"],
+            reverse=True,
+        )
+        # The same text may be stored in several shards
+        return collapse_near_duplicates(merged)[:k]
 
     def delete_by_document(self, document_id: str):
-        """Delete all chunks belonging to a document."""
-        self._collection.delete(where={"document_id": document_id})
-        logger.info("chunks_deleted", document_id=document_id)
+        self.delete_by_documents([document_id])
+
+    def delete_by_documents(self, document_ids: list[str]):
+        """Delete the documents' chunks from whichever shards hold them."""
+        for shard in self.shards().values():
+            shard.delete_by_documents(document_ids)
+
+    def document_ids(self) -> set[str]:
+        ids: set[str] = set()
+        for shard in self.shards().values():
+            ids |= shard.document_ids()
+        return ids
 
     def count(self) -> int:
-        """Return total number of chunks in the collection."""
-        return self._collection.count()
+        return sum(shard.count() for shard in self.shards().values())
+
+    # ── Maintenance ────────────────────────────────────
+
+    def needs_rebuild(self) -> bool:
+        """True if any shard has a stale embedding config or an interrupted rebuild."""
+        return any(
+            shard.needs_reembed() or shard.reembed_storage for shard in self.shards().values()
+        )
+
+    def shard_stats(self) -> list[dict]:
+        stats = []
+        for tenant_id, shard in sorted(self.shards().items()):
+            backend = shard.backend
+            stats.append(
+                {
+                    "tenant_id": tenant_id,
+                    "collection": self.collection_for(tenant_id),
+                    "storage": shard.index_status()["storage"],
+                    "backend": backend.name,
+                    "chunks": backend.count(),
+                    "duplicate_chunks": shard.duplicate_count(),
+                    "documents": len(shard.document_ids()),
+                    "storage_bytes": backend.storage_bytes(),
+                }
+            )
+        return stats
+
+
+_search_pool = ThreadPoolExecutor(
+    max_workers=settings.shard_search_workers, thread_name_prefix="shard-search"
+)
+
+
+def build_vector_store():
+    """The store for this process: in-process shards, or a client for the vector service."""
+    mode = settings.vector_store_mode.lower()
+    if mode == "local":
+        return ShardedVectorStore()
+    if mode == "remote":
+        from app.services.vector_client import RemoteVectorStore
+
+        return RemoteVectorStore(
+            settings.vector_service_url,
+            token=settings.vector_service_token,
+            pool_size=settings.vector_service_pool_size,
+            timeout_s=settings.vector_service_timeout_s,
+            retries=settings.vector_service_retries,
+        )
+    raise ValueError(f"Unknown vector store mode '{mode}'. Use 'local' or 'remote'.")
 
 
 # Module-level singleton
-vector_store = VectorStoreService()
+vector_store = build_vector_store()
@@ -0,0 +1,56 @@
+"""Snapshot command — export the vector index and documents, or seed a fresh node.
+
+    python -m app.snapshot export [--out PATH]
+    python -m app.snapshot import PATH
+
+Run it where the vector store lives: the API host in local mode, the vector
+service host in remote mode. Import only accepts an empty node; start the server
+afterwards and the documents are ready to query.
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.config import settings
+
+settings.vector_store_mode = "local"
+
+from app.core.exceptions import SnapshotError  # noqa: E402
+from app.core.logging import setup_logging  # noqa: E402
+from app.models.database import close_db, init_db  # noqa: E402
+from app.services.snapshot import create_snapshot, restore_snapshot  # noqa: E402
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    await init_db()
+    try:
+        if args.command == "export":
+            return await create_snapshot(args.out)
+        return await restore_snapshot(args.path)
+    finally:
+        await close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write a snapshot archive")
+    export.add_argument("--out", type=Path, help="Archive path (default: the snapshot dir)")
+    restore = commands.add_parser("import", help="Load a snapshot into an empty node")
+    restore.add_argument("path", type=Path)
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        manifest = asyncio.run(_run(args))
+    except SnapshotError as e:
+        raise SystemExit(e.detail) from None
+    summary = {key: manifest[key] for key in ("version", "created_at", "documents", "chunks")}
+    summary["shards"] = [shard["tenant_id"] for shard in manifest["shards"]]
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""DocuMind vector service — hosts the vector store for API workers in remote mode.
+
+Run a single instance next to the API:
+
+    uvicorn app.vector_service:app --port 8100
+
+then start the API with ``DOCUMIND_VECTOR_STORE_MODE=remote`` and as many workers
+as there are cores. The service always holds the store in-process, whatever the
+mode setting says, and it is the only process that opens the collections.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.config import settings
+
+settings.vector_store_mode = "local"
+
+from app.api.routes import metrics, vector_admin, vectors  # noqa: E402
+from app.core.logging import get_logger, setup_logging, shutdown_logging  # noqa: E402
+from app.core.tracing import TracingMiddleware  # noqa: E402
+from app.services.reembedding import start_background_reembed  # noqa: E402
+from app.services.vector_store import vector_store  # noqa: E402
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    background = []
+    if vector_store.needs_rebuild():
+        # Embedding settings changed or a rebuild was interrupted: rebuild in the background
+        if task := start_background_reembed():
+            background.append(task)
+    logger.info("vector_service_started", shards=len(vector_store.shards()))
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    shutdown_logging()
+
+
+app = FastAPI(title=f"{settings.app_name} vector service", lifespan=lifespan)
+app.add_middleware(TracingMiddleware)
+
+
+@app.get("/health", summary="Vector service health")
+async def health():
+    return {"status": "ok", "shards": len(vector_store.shards())}
+
+
+app.include_router(vectors.router, tags=["Vectors"])
+app.include_router(vector_admin.router, prefix=settings.api_prefix, tags=["Admin"])
+if settings.metrics_enabled:
+    app.include_router(metrics.router, tags=["Metrics"])
@@ -0,0 +1,116 @@
+"""Recall@k and query latency of Chroma's HNSW index across parameter settings.
+
+Builds one collection per ``M:construction_ef:search_ef`` configuration from the
+same vectors, samples queries near stored vectors and compares each collection's
+top-k with an exact brute-force scan. Vectors are synthetic clustered embeddings,
+or the live collection's (``--source live``) to tune for the real corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_hnsw --chunks 50000 --configs 16:100:100 16:100:20 32:200:200
+    python -m benchmarks.bench_hnsw --source live --configs 16:100:100 48:400:200
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.index_eval import evaluate
+from app.services.vector_backends import HnswParams
+from app.services.vector_backends.chroma import ChromaBackend
+from benchmarks.bench_quantization import _dataset
+
+BATCH = 5000  # below Chroma's max insert batch
+
+
+def _parse_config(value: str) -> HnswParams:
+    m, construction_ef, search_ef = (int(part) for part in value.split(":"))
+    return HnswParams(m=m, construction_ef=construction_ef, search_ef=search_ef)
+
+
+def _synthetic(chunks: int, dim: int, seed: int) -> list[tuple[str, list[dict], np.ndarray]]:
+    data, _ = _dataset(chunks, dim, 1, seed)
+    documents = []
+    for i in range(0, len(data), BATCH):
+        batch = data[i : i + BATCH]
+        chunk_dicts = [
+            {"text": f"chunk {i + j}", "chunk_index": j, "page_or_section": None}
+            for j in range(len(batch))
+        ]
+        documents.append((f"doc-{i // BATCH}", chunk_dicts, batch))
+    return documents
+
+
+def _live() -> list[tuple[str, list[dict], np.ndarray]]:
+    from app.config import settings
+    from app.services.vector_store import ShardedVectorStore
+
+    backend = ShardedVectorStore().shard(settings.default_tenant).backend
+    documents = []
+    for document_id in sorted(backend.document_ids()):
+        stored = backend.document_chunks(document_id)
+        vectors = backend.document_vectors(document_id)
+        if stored and vectors is not None:
+            documents.append((document_id, stored[1], vectors))
+    return documents
+
+
+def _build(path: Path, params: HnswParams, documents) -> tuple[ChromaBackend, float]:
+    backend = ChromaBackend(path, "bench_hnsw", params)
+    start = time.perf_counter()
+    for document_id, chunks, vectors in documents:
+        for i in range(0, len(chunks), BATCH):
+            backend.add(
+                document_id, document_id, chunks[i : i + BATCH], vectors[i : i + BATCH]
+            )
+    return backend, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=["synthetic", "live"], default="synthetic")
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=["16:100:100", "16:100:10", "8:50:50", "32:200:200"],
+        help="M:construction_ef:search_ef per collection",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = _live() if args.source == "live" else _synthetic(args.chunks, args.dim, args.seed)
+    total = sum(len(chunks) for _, chunks, _ in documents)
+    if not total:
+        raise SystemExit("No vectors to index")
+    print(f"{total} chunks, {args.queries} queries, k={args.k}\n")
+
+    rows = []
+    for config in args.configs:
+        params = _parse_config(config)
+        with tempfile.TemporaryDirectory() as tmp:
+            backend, build_s = _build(Path(tmp), params, documents)
+            report = evaluate(backend, args.queries, args.k, seed=args.seed)
+        rows.append((config, build_s, report))
+
+    header = (
+        f"{'M:cef:sef':<14} {'build s':>8} {'recall@k':>9} {'min':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'exact p50':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for config, build_s, report in rows:
+        print(
+            f"{config:<14} {build_s:>8.1f} {report['recall_at_k']:>9.3f} "
+            f"{report['min_recall']:>6.2f} {report['latency_ms']['p50']:>8.2f} "
+            f"{report['latency_ms']['p95']:>8.2f} {report['exact_latency_ms']['p50']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Recall, latency and memory of the NumPy vector index: float32 vs int8 + re-scoring.
+
+Builds one index per precision from the same synthetic clustered embeddings, then
+runs the same queries against each in a fresh process so resident memory reflects
+only the pages that precision's search touches. Recall@k is measured against the
+float32 index (exact search).
+
+Usage (from backend/):
+    python -m benchmarks.bench_quantization --chunks 200000 --dim 384 --queries 200
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.vector_backends.numpy_index import NumpyBackend
+
+BATCH = 10_000
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _dataset(chunks: int, dim: int, queries: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(chunks // 500, 1), dim)).astype(np.float32)
+    labels = rng.integers(len(centers), size=chunks)
+    data = centers[labels] + 0.6 * rng.normal(size=(chunks, dim)).astype(np.float32)
+    picks = rng.integers(chunks, size=queries)
+    query_vectors = data[picks] + 0.3 * rng.normal(size=(queries, dim)).astype(np.float32)
+    return data, query_vectors
+
+
+def _build(path: Path, data: np.ndarray, quantization: str) -> float:
+    backend = NumpyBackend(path, quantization=quantization)
+    start = time.perf_counter()
+    for i in range(0, len(data), BATCH):
+        batch = data[i : i + BATCH]
+        chunks = [
+            {"text": f"chunk {i + j}", "chunk_index": i + j, "page_or_section": None}
+            for j in range(len(batch))
+        ]
+        backend.add(f"doc-{i // BATCH}", f"doc-{i // BATCH}.md", chunks, batch)
+    return time.perf_counter() - start
+
+
+def _run_queries(path, quantization, rescore_factor, queries, k, results) -> None:
+    """Child process: open the index, search, report latency/RSS/result IDs."""
+    backend = NumpyBackend(Path(path), quantization=quantization, rescore_factor=rescore_factor)
+    rss_before = _rss_bytes()
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = backend.search(query, k)
+        latencies.append(time.perf_counter() - start)
+        found.append([h.chunk_index for h in hits])
+    results.put(
+        {
+            "latencies": latencies,
+            "found": found,
+            "rss_growth": _rss_bytes() - rss_before,
+            "footprint": backend.memory_footprint(),
+        }
+    )
+
+
+def _measure(path: Path, quantization: str, rescore_factor: int, queries, k: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(
+        target=_run_queries, args=(str(path), quantization, rescore_factor, queries, k, results)
+    )
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def _ms(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rescore-factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    data, queries = _dataset(args.chunks, args.dim, args.queries, args.seed)
+    print(f"{args.chunks} chunks × {args.dim} dims, {args.queries} queries, k={args.k}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        float_path, int8_path = Path(tmp) / "float32", Path(tmp) / "int8"
+        print(f"build float32: {_build(float_path, data, 'none'):.1f}s")
+        print(f"build int8:    {_build(int8_path, data, 'int8'):.1f}s\n")
+        del data
+
+        baseline = _measure(float_path, "none", 1, queries, args.k)
+        rows = [("float32", baseline, 1.0)]
+        for factor in args.rescore_factors:
+            result = _measure(int8_path, "int8", factor, queries, args.k)
+            recall = statistics.mean(
+                len(set(got) & set(want)) / len(want)
+                for got, want in zip(result["found"], baseline["found"])
+            )
+            rows.append((f"int8 ×{factor}", result, recall))
+
+    header = (
+        f"{'index':<12} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'scanned MB':>11} {'RSS +MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, result, recall in rows:
+        print(
+            f"{name:<12} {recall:>9.3f} {_ms(result['latencies'], 0.50):>8.2f} "
+            f"{_ms(result['latencies'], 0.95):>8.2f} "
+            f"{result['footprint']['scanned_bytes'] / 2**20:>11.1f} "
+            f"{result['rss_growth'] / 2**20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
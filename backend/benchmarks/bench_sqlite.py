@@ -0,0 +1,162 @@
+"""Concurrent read/write throughput of the SQLite metadata store, default vs tuned profile.
+
+Readers run the hot queries (ready-document count, newest-first page); writers
+insert documents and flip them to ready the way ingestion does.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite --documents 20000 --readers 8 --writers 2 --duration 5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+from app.models.database import Base, Document, sqlite_pragmas
+
+
+def _make_engine(path: Path, tuned: bool):
+    url = f"sqlite+aiosqlite:///{path}"
+    if not tuned:
+        return create_async_engine(url)
+
+    engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.sqlite_pool_size,
+        max_overflow=settings.sqlite_max_overflow,
+    )
+    pragmas = sqlite_pragmas(in_memory=False)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+async def _seed(engine, tuned: bool, count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if not tuned:
+            await conn.exec_driver_sql("DROP INDEX IF EXISTS ix_documents_status")
+            await conn.exec_driver_sql("DROP INDEX IF EXISTS ix_documents_created_at_id")
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "filename": f"doc-{i}.md",
+                "file_size": 1024,
+                "status": random.choice(("ready", "ready", "ready", "failed", "processing")),
+                "chunk_count": 10,
+                "created_at": now - timedelta(seconds=i),
+                "updated_at": now,
+            }
+            for i in range(count)
+        ]
+        await conn.execute(insert(Document), rows)
+
+
+async def _reader(engine, stop: float, latencies: list[float]) -> None:
+    page = select(Document.id, Document.filename).order_by(
+        Document.created_at.desc(), Document.id.desc()
+    ).limit(50)
+    count_ready = select(func.count()).where(Document.status == "ready")
+    i = 0
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        async with engine.connect() as conn:
+            await conn.execute(count_ready if i % 2 else page)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+async def _writer(engine, stop: float, latencies: list[float], errors: list[str]) -> None:
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        doc_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    insert(Document).values(
+                        id=doc_id, filename="new.md", file_size=1, status="processing",
+                        chunk_count=0, created_at=now, updated_at=now,
+                    )
+                )
+            async with engine.begin() as conn:
+                await conn.execute(
+                    update(Document).where(Document.id == doc_id).values(status="ready")
+                )
+        except Exception as e:  # "database is locked" under the default profile
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def _p(values: list[float], q: int) -> float:
+    """q-th percentile in milliseconds."""
+    if len(values) < 2:
+        return values[0] * 1000 if values else float("nan")
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+async def run_profile(tuned: bool, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _make_engine(Path(tmp) / "bench.db", tuned)
+        await _seed(engine, tuned, args.documents)
+        reads: list[float] = []
+        writes: list[float] = []
+        errors: list[str] = []
+        stop = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(_reader(engine, stop, reads) for _ in range(args.readers)),
+            *(_writer(engine, stop, writes, errors) for _ in range(args.writers)),
+        )
+        await engine.dispose()
+    return {
+        "profile": "tuned" if tuned else "default",
+        "reads_per_s": len(reads) / args.duration,
+        "read_p50_ms": _p(reads, 50),
+        "read_p95_ms": _p(reads, 95),
+        "writes_per_s": len(writes) / args.duration,
+        "write_p95_ms": _p(writes, 95),
+        "write_errors": len(errors),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [await run_profile(False, args), await run_profile(True, args)]
+    header = f"{'profile':<8} {'reads/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+    header += f"{'writes/s':>9} {'w p95 ms':>9} {'errors':>7}"
+    print(header)
+    for r in results:
+        print(
+            f"{r['profile']:<8} {r['reads_per_s']:>9.0f} {r['read_p50_ms']:>8.2f} "
+            f"{r['read_p95_ms']:>8.2f} {r['writes_per_s']:>9.0f} {r['write_p95_ms']:>9.2f} "
+            f"{r['write_errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
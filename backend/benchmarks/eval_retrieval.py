@@ -0,0 +1,120 @@
+"""Retrieval quality versus latency across chunking, top-k and index settings.
+
+Indexes the docs once per configuration and asks a labelled question set through
+both the vector store and the RAG retrieval path, reporting recall@k, MRR, context
+tokens per query and p50/p95 latency. Without ``--dataset`` a synthetic set is
+generated from the docs; ``generate`` writes it out for review or hand-editing.
+
+Usage (from backend/):
+    python -m benchmarks.eval_retrieval run
+    python -m benchmarks.eval_retrieval run --config small chunk_size=250 chunk_overlap=25 \\
+        --config wide retrieval_top_k=10 --out eval-chunks.json
+    python -m benchmarks.eval_retrieval generate --out eval-set.json
+    python -m benchmarks.eval_retrieval compare eval-main.json eval-chunks.json
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.config import settings
+from app.services.retrieval_eval import (
+    TUNABLE_SETTINGS,
+    compare,
+    evaluate,
+    generate_dataset,
+)
+
+_COLUMNS = (
+    ("run", "<18", "{}"),
+    ("chunks", ">7", "{}"),
+    ("recall", ">7", "{:.3f}"),
+    ("mrr", ">6", "{:.3f}"),
+    ("search_p50", ">11", "{:.2f}"),
+    ("search_p95", ">11", "{:.2f}"),
+    ("rag_recall", ">11", "{:.3f}"),
+    ("ctx_tokens", ">11", "{:.0f}"),
+    ("rag_p50", ">8", "{:.2f}"),
+    ("rag_p95", ">8", "{:.2f}"),
+)
+
+
+def _parse_value(value: str):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _parse_configs(specs: list[list[str]] | None) -> dict[str, dict]:
+    configs = {"baseline": {}}
+    for name, *pairs in specs or []:
+        overrides = {}
+        for pair in pairs:
+            key, _, value = pair.partition("=")
+            if key not in TUNABLE_SETTINGS:
+                raise SystemExit(f"Unknown setting '{key}'. Tunable: {', '.join(TUNABLE_SETTINGS)}")
+            overrides[key] = _parse_value(value)
+        configs[name] = overrides
+    return configs
+
+
+def _print_table(rows: list[dict]) -> None:
+    header = " ".join(f"{name:{align}}" for name, align, _ in _COLUMNS)
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(" ".join(f"{fmt.format(row[name]):{align}}" for name, align, fmt in _COLUMNS))
+    print("\nrecall/mrr: vector store search; rag_*: the chat retrieval path; latencies in ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic labelled set")
+    generate.add_argument("--docs", type=Path, default=settings.sample_docs_dir)
+    generate.add_argument("--per-document", type=int, default=20)
+    generate.add_argument("--out", type=Path, required=True)
+
+    run = commands.add_parser("run", help="Evaluate configurations side by side")
+    run.add_argument("--docs", type=Path, default=settings.sample_docs_dir)
+    run.add_argument("--dataset", type=Path, help="Labelled set (default: synthetic from --docs)")
+    run.add_argument(
+        "--config",
+        nargs="+",
+        action="append",
+        metavar="NAME [KEY=VALUE ...]",
+        help="A named run with setting overrides; repeatable. 'baseline' is always included",
+    )
+    run.add_argument("--out", type=Path, help="Write the JSON report here")
+
+    compare_cmd = commands.add_parser("compare", help="Tabulate saved reports side by side")
+    compare_cmd.add_argument("reports", type=Path, nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        dataset = generate_dataset(args.docs, args.per_document)
+        args.out.write_text(json.dumps(dataset, indent=2, ensure_ascii=False))
+        print(f"{len(dataset['questions'])} questions → {args.out}")
+        return
+
+    if args.command == "compare":
+        _print_table(compare([json.loads(path.read_text()) for path in args.reports]))
+        return
+
+    if args.dataset:
+        dataset = json.loads(args.dataset.read_text())
+    else:
+        dataset = generate_dataset(args.docs)
+    report = asyncio.run(evaluate(dataset, args.docs, _parse_configs(args.config)))
+    print(f"{report['questions']} questions from '{report['dataset']}'\n")
+    _print_table(compare([report]))
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,98 @@
 """Shared test fixtures — isolated in-memory DB, no sample doc loading."""
 
+import hashlib
 import os
+import tempfile
 
 # Disable sample doc loading and use in-memory SQLite before any app imports
 os.environ["DOCUMIND_LOAD_SAMPLE_DOCS"] = "false"
 os.environ["DOCUMIND_SQLITE_URL"] = "sqlite+aiosqlite://"  # in-memory
+# In-process vector index in a throwaway directory — no Chroma server or shared state
+os.environ["DOCUMIND_VECTOR_BACKEND"] = "numpy"
+os.environ["DOCUMIND_VECTOR_INDEX_DIR"] = tempfile.mkdtemp(prefix="documind-vectors-")
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
+from app.config import settings
 from app.main import app
+from app.services import embeddings, reembedding
+from app.services.vector_store import ShardedVectorStore, VectorStoreService
+
+DIM = 16
 
 
 @pytest.fixture
-def client(tmp_path):
-    """TestClient with an isolated in-memory DB and temp upload dir."""
-    # Ensure upload dir exists for tests that upload files
+def client(monkeypatch, tmp_path):
+    """TestClient with an isolated in-memory DB and temp upload, chroma and snapshot dirs."""
+    # settings is already loaded, so the directories are patched on it rather than the env
     upload_dir = tmp_path / "uploads"
     upload_dir.mkdir()
-    os.environ["DOCUMIND_UPLOAD_DIR"] = str(upload_dir)
+    monkeypatch.setattr(settings, "upload_dir", upload_dir)
+    monkeypatch.setattr(settings, "chroma_dir", tmp_path / "chroma")
+    monkeypatch.setattr(settings, "snapshot_dir", tmp_path / "snapshots")
 
     with TestClient(app) as c:
         yield c
+
+
+class FakeEncoder:
+    """Deterministic per-(model, text) vectors, so different models give different spaces."""
+
+    def __init__(self, config):
+        self.model = config.model
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        rows = []
+        for text in texts:
+            seed = int(hashlib.sha256(f"{self.model}|{text}".encode()).hexdigest()[:8], 16)
+            rows.append(np.random.default_rng(seed).normal(size=DIM))
+        matrix = np.asarray(rows, dtype=np.float32)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch, tmp_path) -> list[FakeEncoder]:
+    """Offline embeddings into a fresh numpy index; returns the encoders built, in order."""
+    encoders: list[FakeEncoder] = []
+
+    def build_encoder(config):
+        encoders.append(FakeEncoder(config))
+        return encoders[-1]
+
+    monkeypatch.setattr(embeddings, "build_encoder", build_encoder)
+    monkeypatch.setattr(reembedding, "build_encoder", build_encoder)
+    monkeypatch.setattr(embeddings, "_encoders", {})
+    monkeypatch.setattr(settings, "vector_index_dir", tmp_path / "vectors")
+    monkeypatch.setattr(settings, "vector_backend", "numpy")
+    monkeypatch.setattr(settings, "embedding_model_dir", None)
+    monkeypatch.setattr(settings, "embedding_pca_dims", 0)
+    monkeypatch.setattr(settings, "shared_tenants", [])
+    return encoders
+
+
+@pytest.fixture
+def store(fake_encoder) -> ShardedVectorStore:
+    """An empty sharded vector store on the fake encoder."""
+    return ShardedVectorStore(collection="test_docs")
+
+
+def chunks_of(*texts: str) -> list[dict]:
+    """Chunks as the document processor produces them, one per text."""
+    return [
+        {"text": text, "chunk_index": i, "page_or_section": f"Page {i + 1}"}
+        for i, text in enumerate(texts)
+    ]
+
+
+def make_chunks(prefix: str, count: int = 3) -> list[dict]:
+    return chunks_of(*(f"{prefix} chunk {i}" for i in range(count)))
+
+
+def add_documents(service: VectorStoreService | ShardedVectorStore, count: int) -> None:
+    """Store ``doc-0`` … ``doc-<count-1>`` with three chunks each."""
+    for d in range(count):
+        service.add_chunks(f"doc-{d}", f"doc-{d}.md", make_chunks(f"document {d}"))
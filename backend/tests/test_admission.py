@@ -0,0 +1,93 @@
+"""Tests for chat admission control."""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import GenerationQueueFullError, GenerationQueueTimeoutError
+from app.services.admission import AdmissionController
+
+
+def _controller(**overrides) -> AdmissionController:
+    params = {"max_concurrent": 1, "max_queue": 1, "queue_timeout": 1.0, "retry_after": 3}
+    params.update(overrides)
+    return AdmissionController(**params)
+
+
+class TestAdmissionController:
+    async def test_admits_up_to_limit(self):
+        controller = _controller(max_concurrent=2)
+        await controller.acquire()
+        await controller.acquire()
+        assert controller.active == 2
+        assert controller.waiting == 0
+
+    async def test_queue_full_rejected_with_retry_after(self):
+        controller = _controller()
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.waiting == 1
+
+        with pytest.raises(GenerationQueueFullError) as exc_info:
+            await controller.acquire()
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "3"
+        waiter.cancel()
+
+    async def test_queue_timeout(self):
+        controller = _controller(queue_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(GenerationQueueTimeoutError) as exc_info:
+            await controller.acquire()
+        assert exc_info.value.status_code == 503
+        assert controller.waiting == 0
+
+    async def test_release_hands_slot_to_waiter(self):
+        controller = _controller()
+        ticket = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        ticket.release()
+        second = await waiter
+        assert controller.active == 1
+        assert controller.waiting == 0
+
+        second.release()
+        assert controller.active == 0
+
+    async def test_release_is_idempotent(self):
+        controller = _controller(max_concurrent=2)
+        ticket = await controller.acquire()
+        await controller.acquire()
+        ticket.release()
+        ticket.release()
+        assert controller.active == 1
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        controller = _controller()
+        ticket = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        ticket.release()
+        assert controller.active == 0
+        assert controller.waiting == 0
+
+    async def test_timeout_after_handover_does_not_leak_slot(self, monkeypatch):
+        controller = _controller()
+        ticket = await controller.acquire()
+
+        async def handed_over_then_timed_out(fut, timeout):
+            ticket.release()  # hands the slot to this waiter
+            assert fut.done()
+            raise TimeoutError
+
+        monkeypatch.setattr(asyncio, "wait_for", handed_over_then_timed_out)
+        with pytest.raises(GenerationQueueTimeoutError):
+            await controller.acquire()
+        assert controller.active == 0
+        assert controller.waiting == 0
@@ -62,6 +62,26 @@ class TestDocumentEndpoints:
         assert response.status_code == 201
         assert response.json()["filename"] == "test.md"
 
+    def test_upload_to_tenant(self, client):
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": ("team.txt", b"Team handbook.", "text/plain")},
+            data={"tenant_id": "acme"},
+        )
+        assert response.status_code == 201
+        assert response.json()["tenant_id"] == "acme"
+
+        listed = client.get("/api/documents", params={"tenant_id": "acme"}).json()
+        assert [d["filename"] for d in listed["documents"]] == ["team.txt"]
+
+    def test_upload_rejects_invalid_tenant(self, client):
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": ("team.txt", b"Team handbook.", "text/plain")},
+            data={"tenant_id": "Not A Tenant!"},
+        )
+        assert response.status_code == 422
+
     def test_get_nonexistent_document(self, client):
         response = client.get("/api/documents/nonexistent-id-123")
         assert response.status_code == 404
@@ -115,3 +135,108 @@ class TestSchemaValidation:
     def test_chat_requires_question(self, client):
         response = client.post("/api/chat", json={})
         assert response.status_code == 422
+
+
+class TestMetricsEndpoint:
+    def test_metrics_prometheus_format(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE documind_generation_queue_depth gauge" in response.text
+        assert "documind_generation_queue_wait_seconds_bucket" in response.text
+
+
+class TestDocumentPagination:
+    def _upload(self, client, name: str) -> str:
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": (name, b"Pagination test content.", "text/plain")},
+        )
+        return response.json()["id"]
+
+    def test_keyset_pages_cover_all_documents(self, client):
+        uploaded = {self._upload(client, f"page-{i}.txt") for i in range(3)}
+
+        first = client.get("/api/documents", params={"limit": 2}).json()
+        assert len(first["documents"]) == 2
+        assert first["total"] >= 3
+        assert first["next_cursor"]
+
+        seen = [d["id"] for d in first["documents"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = client.get("/api/documents", params={"limit": 2, "cursor": cursor}).json()
+            seen.extend(d["id"] for d in page["documents"])
+            cursor = page["next_cursor"]
+
+        assert uploaded <= set(seen)
+        assert len(seen) == len(set(seen))
+
+    def test_newest_first(self, client):
+        self._upload(client, "older.txt")
+        newest = self._upload(client, "newer.txt")
+        docs = client.get("/api/documents", params={"limit": 1}).json()["documents"]
+        assert docs[0]["id"] == newest
+
+    def test_filename_prefix_filter(self, client):
+        self._upload(client, "report_q1.txt")
+        self._upload(client, "reportXq2.txt")
+        data = client.get("/api/documents", params={"filename_prefix": "report_"}).json()
+        names = {d["filename"] for d in data["documents"]}
+        assert "report_q1.txt" in names
+        assert "reportXq2.txt" not in names  # '_' is literal, not a wildcard
+        assert data["total"] == len(data["documents"])
+
+    def test_status_filter(self, client):
+        data = client.get("/api/documents", params={"status": "failed"}).json()
+        assert all(d["status"] == "failed" for d in data["documents"])
+
+    def test_invalid_cursor(self, client):
+        response = client.get("/api/documents", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_limit_bounds(self, client):
+        too_big = settings.document_page_size_max + 1
+        assert client.get("/api/documents", params={"limit": too_big}).status_code == 422
+
+
+class TestBulkDelete:
+    def _upload(self, client, name: str) -> str:
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": (name, b"Bulk delete test content.", "text/plain")},
+        )
+        return response.json()["id"]
+
+    def test_bulk_delete_tombstones_documents(self, client):
+        doc_id = self._upload(client, "bulk.txt")
+        response = client.post(
+            "/api/documents/bulk-delete",
+            json={"document_ids": [doc_id, "missing-id"]},
+        )
+        assert response.status_code == 202
+        data = response.json()
+        assert data["accepted"] == [doc_id]
+        assert data["not_found"] == ["missing-id"]
+
+        assert client.get(f"/api/documents/{doc_id}").status_code == 404
+        listed = {d["id"] for d in client.get("/api/documents").json()["documents"]}
+        assert doc_id not in listed
+
+    def test_bulk_delete_requires_ids(self, client):
+        response = client.post("/api/documents/bulk-delete", json={"document_ids": []})
+        assert response.status_code == 422
+
+    def test_bulk_delete_limit(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "bulk_delete_max", 2)
+        response = client.post(
+            "/api/documents/bulk-delete", json={"document_ids": ["a", "b", "c"]}
+        )
+        assert response.status_code == 400
+
+    def test_single_delete_hides_document(self, client):
+        doc_id = self._upload(client, "single.txt")
+        assert client.delete(f"/api/documents/{doc_id}").status_code == 200
+        assert client.get(f"/api/documents/{doc_id}").status_code == 404
+        assert client.delete(f"/api/documents/{doc_id}").status_code == 404
+
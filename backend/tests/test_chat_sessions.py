@@ -0,0 +1,144 @@
+"""Tests for server-side chat sessions."""
+
+import pytest
+
+from app.config import settings
+from app.services import rag
+from app.services.chat_sessions import chat_sessions
+from app.services.corpus_stats import corpus_stats
+
+SOURCE = {
+    "document_id": "doc-1",
+    "document_name": "handbook.md",
+    "content": "Employees get 25 days of PTO.",
+    "page_or_section": "Leave",
+    "chunk_index": 0,
+    "relevance_score": 0.9,
+}
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls: list[list[dict]] = []
+
+    async def stream_chat(self, messages, system_prompt):
+        self.calls.append(messages)
+        for token in (f"Answer {len(self.calls)}", "."):
+            yield token
+
+
+class _FakeSearch:
+    def __init__(self):
+        self.queries: list[str] = []
+
+    def search(self, question, exclude_document_ids=None, tenant_id=None):
+        self.queries.append(question)
+        return [dict(SOURCE)]
+
+
+@pytest.fixture
+def chat_env(client, monkeypatch):
+    from app.services import llm
+
+    fake_llm, fake_search = _FakeLLM(), _FakeSearch()
+    monkeypatch.setattr(llm, "get_llm_client", lambda: fake_llm)
+    monkeypatch.setattr(rag, "vector_store", fake_search)
+    monkeypatch.setattr(corpus_stats, "ready_documents", 1)
+    return client, fake_llm, fake_search
+
+
+def _ask(client, session_id: str, question: str) -> str:
+    response = client.post("/api/chat", json={"question": question, "session_id": session_id})
+    assert response.status_code == 200
+    assert "event: done" in response.text
+    return response.text
+
+
+class TestChatSessions:
+    def test_history_is_kept_server_side(self, chat_env):
+        client, fake_llm, _ = chat_env
+        created = client.post("/api/chat/sessions", json={})
+        assert created.status_code == 201
+        session_id = created.json()["session_id"]
+        assert created.json()["tenant_id"] == "default"
+
+        _ask(client, session_id, "How much PTO?")
+        _ask(client, session_id, "And for part-timers?")
+
+        first, second = fake_llm.calls
+        assert len(first) == 1
+        assert [m["role"] for m in second] == ["user", "assistant", "user"]
+        assert second[0]["content"] == "How much PTO?"
+        assert second[1]["content"] == "Answer 1."
+
+        transcript = client.get(f"/api/chat/sessions/{session_id}").json()
+        assert transcript["turn_count"] == 2
+        assert [t["answer"] for t in transcript["turns"]] == ["Answer 1.", "Answer 2."]
+
+    def test_history_is_bounded(self, chat_env, monkeypatch):
+        client, fake_llm, _ = chat_env
+        monkeypatch.setattr(settings, "max_chat_history", 2)
+        session_id = client.post("/api/chat/sessions", json={}).json()["session_id"]
+        for i in range(4):
+            _ask(client, session_id, f"Question {i}")
+        # Two earlier exchanges plus the new question, however long the session is
+        assert [m["content"] for m in fake_llm.calls[-1][:-1]] == [
+            "Question 1",
+            "Answer 2.",
+            "Question 2",
+            "Answer 3.",
+        ]
+
+    async def test_reload_after_eviction_and_other_workers(self, chat_env, monkeypatch):
+        monkeypatch.setattr(settings, "chat_session_cache_size", 1)
+        first = await chat_sessions.create("default")
+        second = await chat_sessions.create("default")  # evicts the first
+
+        state = await chat_sessions.load(first.id)
+        await chat_sessions.append_turn(state, "Q1", "A1")
+        # Another worker appends a turn behind this worker's cached copy
+        stale = await chat_sessions.load(first.id)
+        other = type(stale)(stale.session_id, stale.tenant_id, stale.turn_count)
+        await chat_sessions.append_turn(other, "Q2", "A2")
+
+        reloaded = await chat_sessions.load(first.id)
+        assert [m["content"] for m in reloaded.history()] == ["Q1", "A1", "Q2", "A2"]
+        assert (await chat_sessions.load(second.id)).history() == []
+
+    def test_repeated_question_reuses_retrieval(self, chat_env):
+        client, _, fake_search = chat_env
+        session_id = client.post("/api/chat/sessions", json={}).json()["session_id"]
+        first = _ask(client, session_id, "How much PTO?")
+        again = _ask(client, session_id, "  how much   PTO? ")
+        _ask(client, session_id, "Who approves leave?")
+        assert fake_search.queries == ["How much PTO?", "Who approves leave?"]
+        assert "handbook.md" in first and "handbook.md" in again
+
+    def test_unknown_deleted_and_foreign_sessions(self, chat_env):
+        client, _, _ = chat_env
+        missing = client.post("/api/chat", json={"question": "Hi?", "session_id": "nope"})
+        assert missing.status_code == 404
+
+        session_id = client.post("/api/chat/sessions", json={"tenant_id": "acme"}).json()[
+            "session_id"
+        ]
+        foreign = client.post(
+            "/api/chat", json={"question": "Hi?", "session_id": session_id, "tenant_id": "other"}
+        )
+        assert foreign.status_code == 404
+
+        assert client.delete(f"/api/chat/sessions/{session_id}").status_code == 204
+        assert client.get(f"/api/chat/sessions/{session_id}").status_code == 404
+        assert client.delete(f"/api/chat/sessions/{session_id}").status_code == 404
+
+    def test_session_and_history_are_exclusive(self, chat_env):
+        client, _, _ = chat_env
+        response = client.post(
+            "/api/chat",
+            json={
+                "question": "Hi?",
+                "session_id": "abc",
+                "chat_history": [{"role": "user", "content": "earlier"}],
+            },
+        )
+        assert response.status_code == 422
@@ -0,0 +1,144 @@
+"""Tests for tombstoned deletion and compaction."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app.api.routes import documents
+from app.config import settings
+from app.models.database import Document, async_session, init_db
+from app.models.schemas import IngestionPriority
+from app.services import compaction, document_processor
+from app.services.compaction import TombstoneRegistry, purge_tombstoned, tombstone_documents
+
+
+class _FakeVectorStore:
+    def __init__(self, document_ids=()):
+        self.deleted: list[str] = []
+        self._document_ids = set(document_ids)
+
+    def delete_by_documents(self, document_ids):
+        self.deleted.extend(document_ids)
+
+    def document_ids(self):
+        return set(self._document_ids)
+
+
+class TestTombstoneRegistry:
+    def test_add_and_discard(self):
+        registry = TombstoneRegistry()
+        registry.add(["a", "b"])
+        assert "a" in registry
+        registry.discard(["a"])
+        assert registry.ids == frozenset({"b"})
+
+    def test_snapshot_is_immutable(self):
+        registry = TombstoneRegistry()
+        registry.add(["a"])
+        snapshot = registry.ids
+        registry.add(["b"])
+        assert snapshot == frozenset({"a"})
+
+
+class TestTombstoneAndPurge:
+    async def _add(self, **kwargs) -> str:
+        async with async_session() as db:
+            doc = Document(filename="doc.md", **kwargs)
+            db.add(doc)
+            await db.commit()
+            return doc.id
+
+    async def test_tombstone_then_purge(self, monkeypatch, tmp_path):
+        await init_db()
+        fake = _FakeVectorStore()
+        monkeypatch.setattr("app.services.vector_store.vector_store", fake)
+        monkeypatch.setattr(compaction.settings, "upload_dir", tmp_path)
+
+        doc_id = await self._add(status="ready", chunk_count=3)
+        upload = tmp_path / f"{doc_id}_doc.md"
+        upload.write_text("content")
+
+        assert await tombstone_documents([doc_id, "missing"]) == [doc_id]
+        assert doc_id in compaction.tombstones
+        # A second tombstone call is a no-op
+        assert await tombstone_documents([doc_id]) == []
+
+        assert await purge_tombstoned(batch_size=1) >= 1
+        assert doc_id in fake.deleted
+        assert doc_id not in compaction.tombstones
+        assert not upload.exists()
+        async with async_session() as db:
+            row = await db.execute(select(Document).where(Document.id == doc_id))
+            assert row.scalar_one_or_none() is None
+
+    async def test_compact_removes_orphan_vectors(self, monkeypatch, tmp_path):
+        await init_db()
+        kept = await self._add(status="ready", chunk_count=1)
+        fake = _FakeVectorStore({kept, "orphan-id"})
+        monkeypatch.setattr("app.services.vector_store.vector_store", fake)
+        monkeypatch.setattr(compaction.settings, "upload_dir", tmp_path)
+
+        report = await compaction.compact()
+        assert report["orphan_vector_documents"] == 1
+        assert fake.deleted == ["orphan-id"]
+
+
+class TestStaleProcessing:
+    async def _add_stale(self) -> str:
+        age = timedelta(seconds=settings.stale_processing_s + 60)
+        updated_at = datetime.now(timezone.utc) - age
+        async with async_session() as db:
+            doc = Document(filename="doc.md", status="processing", updated_at=updated_at)
+            db.add(doc)
+            await db.commit()
+            return doc.id
+
+    async def _status(self, document_id: str) -> str:
+        async with async_session() as db:
+            return await db.scalar(select(Document.status).where(Document.id == document_id))
+
+    async def test_queued_documents_are_not_failed(self, monkeypatch, tmp_path):
+        await init_db()
+        monkeypatch.setattr("app.services.vector_store.vector_store", _FakeVectorStore())
+        monkeypatch.setattr(compaction.settings, "upload_dir", tmp_path)
+        monkeypatch.setattr(settings, "ingestion_workers", 1)
+        queued, interrupted = await self._add_stale(), await self._add_stale()
+
+        scheduler = compaction.ingestion_scheduler
+        ticket = await scheduler.acquire("running", "t", IngestionPriority.bulk)
+        waiter = asyncio.create_task(scheduler.acquire(queued, "t", IngestionPriority.bulk))
+        await asyncio.sleep(0)
+        try:
+            report = await compaction.compact()
+        finally:
+            ticket.release()
+            (await waiter).release()
+        assert report["stale_processing_failed"] == 1
+        assert await self._status(queued) == "processing"
+        assert await self._status(interrupted) == "failed"
+
+    async def test_document_failed_while_queued_is_not_processed(self, monkeypatch):
+        await init_db()
+        monkeypatch.setattr(settings, "ingestion_workers", 1)
+        processed = []
+
+        async def process_document(document_id, file_path, db):
+            processed.append(document_id)
+
+        monkeypatch.setattr(document_processor, "process_document", process_document)
+        doc_id = await self._add_stale()
+
+        ticket = await documents.ingestion_scheduler.acquire("running", "t", IngestionPriority.bulk)
+        run = asyncio.create_task(
+            documents._run_processing(doc_id, "doc.md", "t", IngestionPriority.bulk)
+        )
+        await asyncio.sleep(0)
+        # Another API worker's compaction gave up on it
+        async with async_session() as db:
+            await db.execute(update(Document).where(Document.id == doc_id).values(status="failed"))
+            await db.commit()
+        ticket.release()
+        await run
+        assert processed == []
+        assert documents.ingestion_scheduler.active == 0
@@ -0,0 +1,85 @@
+"""Tests for in-memory corpus statistics."""
+
+from sqlalchemy import delete
+
+from app.models.database import Document, async_session, init_db
+from app.services.corpus_stats import CorpusStats
+
+
+class TestCorpusStats:
+    def test_deltas(self):
+        stats = CorpusStats()
+        stats.document_ready(10)
+        stats.document_ready(5)
+        assert stats.ready_documents == 2
+        assert stats.vector_count == 15
+
+        stats.document_removed(was_ready=True, chunk_count=10)
+        assert stats.ready_documents == 1
+        assert stats.vector_count == 5
+
+    def test_removing_unready_document_keeps_counts(self):
+        stats = CorpusStats()
+        stats.document_ready(3)
+        stats.document_removed(was_ready=False, chunk_count=0)
+        assert stats.ready_documents == 1
+        assert stats.vector_count == 3
+
+    def test_counts_never_negative(self):
+        stats = CorpusStats()
+        stats.document_removed(was_ready=True, chunk_count=7)
+        assert stats.ready_documents == 0
+        assert stats.vector_count == 0
+
+    async def test_reconcile_counts_ready_documents(self, monkeypatch):
+        await init_db()
+        async with async_session() as db:
+            await db.execute(delete(Document))
+            db.add(Document(filename="a.md", status="ready", chunk_count=2))
+            db.add(Document(filename="b.md", status="ready", chunk_count=3))
+            db.add(Document(filename="c.md", status="processing"))
+            await db.commit()
+
+        from app.services import vector_store as vector_store_module
+
+        monkeypatch.setattr(vector_store_module.vector_store, "count", lambda: 5)
+        stats = CorpusStats()
+        stats.ready_documents = 99
+        stats.vector_count = 1
+        assert await stats.reconcile() is True
+        assert stats.ready_documents == 2
+        assert stats.vector_count == 5
+        assert stats.last_reconciled_at is not None
+
+    async def test_reconcile_discarded_on_concurrent_update(self, monkeypatch):
+        await init_db()
+        stats = CorpusStats()
+
+        from app.services import vector_store as vector_store_module
+
+        def racing_count():
+            stats.document_ready(4)
+            return 0
+
+        monkeypatch.setattr(vector_store_module.vector_store, "count", racing_count)
+        assert await stats.reconcile() is False
+        assert stats.ready_documents == 1
+        assert stats.vector_count == 4
+
+
+class TestCorpusStatsRoutes:
+    def test_chat_rejected_without_ready_documents(self, client, monkeypatch):
+        from app.services.corpus_stats import corpus_stats
+
+        monkeypatch.setattr(corpus_stats, "ready_documents", 0)
+        response = client.post("/api/chat", json={"question": "Anything?"})
+        assert response.status_code == 400
+
+    def test_health_reads_in_memory_counts(self, client, monkeypatch):
+        from app.services.corpus_stats import corpus_stats
+
+        monkeypatch.setattr(corpus_stats, "ready_documents", 3)
+        monkeypatch.setattr(corpus_stats, "vector_count", 42)
+        data = client.get("/api/health").json()
+        assert data["documents_count"] == 3
+        assert data["vector_count"] == 42
@@ -0,0 +1,65 @@
+"""Tests for the SQLite profile and schema migrations."""
+
+from sqlalchemy import create_engine, inspect
+
+from app.models.database import MIGRATIONS, _is_memory_db, _migrate, sqlite_pragmas
+
+LEGACY_SCHEMA = """
+CREATE TABLE documents (
+    id VARCHAR PRIMARY KEY,
+    filename VARCHAR NOT NULL,
+    file_size INTEGER NOT NULL,
+    status VARCHAR NOT NULL,
+    chunk_count INTEGER NOT NULL,
+    error_message TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL
+)
+"""
+
+
+class TestSqlitePragmas:
+    def test_file_database_uses_wal_and_mmap(self):
+        pragmas = sqlite_pragmas(in_memory=False)
+        assert pragmas[0].lower() == "pragma journal_mode=wal"
+        assert any(p.startswith("PRAGMA mmap_size=") for p in pragmas)
+        assert any(p.startswith("PRAGMA busy_timeout=") for p in pragmas)
+
+    def test_memory_database_skips_wal(self):
+        pragmas = sqlite_pragmas(in_memory=True)
+        assert not any("journal_mode" in p for p in pragmas)
+
+    def test_memory_url_detection(self):
+        assert _is_memory_db("sqlite+aiosqlite://")
+        assert _is_memory_db("sqlite+aiosqlite:///:memory:")
+        assert not _is_memory_db("sqlite+aiosqlite:///./data/documind.db")
+
+
+class TestMigrations:
+    def test_legacy_database_gets_indexes(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(LEGACY_SCHEMA)
+        with engine.begin() as conn:
+            _migrate(conn, fresh=False)
+
+        with engine.connect() as conn:
+            indexes = {ix["name"] for ix in inspect(conn).get_indexes("documents")}
+            columns = {c["name"] for c in inspect(conn).get_columns("documents")}
+            version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+        assert {"ix_documents_status", "ix_documents_created_at_id"} <= indexes
+        assert "ix_documents_tenant_created_at_id" in indexes
+        assert "tenant_id" in columns
+        assert version == len(MIGRATIONS)
+
+    def test_migrations_are_not_rerun(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'current.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(LEGACY_SCHEMA)
+            conn.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        with engine.begin() as conn:
+            _migrate(conn, fresh=False)
+
+        with engine.connect() as conn:
+            indexes = {ix["name"] for ix in inspect(conn).get_indexes("documents")}
+        assert "ix_documents_status" not in indexes
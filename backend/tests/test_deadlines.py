@@ -0,0 +1,174 @@
+"""Tests for per-request deadlines and the chat pipeline's fallbacks."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.config import settings
+from app.core.deadline import Deadline
+from app.services import rag
+from app.services.chat_sessions import RetrievalCache
+from app.services.corpus_stats import corpus_stats
+
+SOURCES = [
+    {
+        "document_id": f"doc-{i}",
+        "document_name": f"handbook-{i}.md",
+        "content": f"Policy {i}.",
+        "page_or_section": None,
+        "chunk_index": 0,
+        "relevance_score": 0.9 - i / 10,
+    }
+    for i in range(4)
+]
+
+
+class _Search:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def search(self, question, exclude_document_ids=None, tenant_id=None):
+        time.sleep(self.delay)
+        return [dict(s) for s in SOURCES]
+
+
+class _LLM:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages: list[dict] = []
+        self.closed = False
+
+    async def stream_chat(self, messages, system_prompt):
+        self.messages = messages
+        try:
+            for token in ("Twenty", " five", " days."):
+                await asyncio.sleep(self.delay)
+                yield token
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setattr(settings, "chat_retrieval_budget_s", 0.05)
+    monkeypatch.setattr(settings, "chat_generation_reserve_s", 0.0)
+    monkeypatch.setattr(settings, "chat_degraded_top_k", 2)
+
+
+async def _run(llm, deadline=None, retrieval_cache=None, history=None) -> tuple[str, dict]:
+    tokens, final = [], None
+    async for event in rag.query(
+        "How much PTO?", history or [], llm, retrieval_cache=retrieval_cache, deadline=deadline
+    ):
+        if event["type"] == "token":
+            tokens.append(event["token"])
+        else:
+            final = event
+    return "".join(tokens), final
+
+
+class TestDeadline:
+    def test_budgets(self):
+        unbounded = Deadline()
+        assert unbounded.budget() is None and unbounded.timeout() is None
+        assert unbounded.budget(2.0) == 2.0
+
+        deadline = Deadline(10.0)
+        assert deadline.budget(2.0, reserve=5.0) == 2.0
+        assert 4.9 < deadline.budget(None, reserve=5.0) <= 5.0
+        assert deadline.budget(2.0, reserve=20.0) == 0.0
+        assert not deadline.expired
+
+
+class TestChatFallbacks:
+    async def test_slow_retrieval_answers_without_context(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search(delay=0.5))
+        llm = _LLM()
+        answer, final = await _run(llm, Deadline(5.0))
+        assert answer == "Twenty five days."
+        assert final["sources"] == [] and final["degraded"] == ["no_retrieval"]
+        assert "No relevant documents found." in llm.messages[-1]["content"]
+
+    async def test_short_deadline_still_retrieves(self, monkeypatch):
+        # The default reserve is longer than this deadline; the search gets half of it
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        monkeypatch.setattr(corpus_stats, "ready_documents", 1)
+        timeouts = []
+        monkeypatch.setattr(rag, "_stage_timeout", lambda stage, *_: timeouts.append(stage))
+
+        _, final = await _run(_LLM(), Deadline(2.0))
+        assert final["sources"]
+        assert "no_retrieval" not in final["degraded"]
+        assert timeouts == []
+
+    async def test_no_time_left_skips_the_search(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        timeouts = []
+        monkeypatch.setattr(rag, "_stage_timeout", lambda stage, *_: timeouts.append(stage))
+
+        deadline = Deadline(0.001)
+        time.sleep(0.002)
+        _, final = await _run(_LLM(), deadline)
+        assert final["sources"] == [] and "no_retrieval" in final["degraded"]
+        assert "retrieval" not in timeouts
+
+    async def test_slow_retrieval_uses_stale_cache(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search(delay=0.5))
+        monkeypatch.setattr(corpus_stats, "ready_documents", 1)
+        cache = RetrievalCache(4)
+        cache.put("how much pto?", [dict(SOURCES[0])])
+        monkeypatch.setattr(settings, "chat_retrieval_cache_ttl_s", 0.0)
+
+        _, final = await _run(_LLM(), Deadline(5.0), retrieval_cache=cache)
+        assert [s["document_id"] for s in final["sources"]] == ["doc-0"]
+        assert final["degraded"] == ["stale_retrieval"]
+
+    async def test_short_time_left_shrinks_the_prompt(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        monkeypatch.setattr(corpus_stats, "ready_documents", 1)
+        monkeypatch.setattr(settings, "chat_generation_reserve_s", 10.0)
+        cache = RetrievalCache(4)
+        cache.put("How much PTO?", [dict(s) for s in SOURCES])
+        llm = _LLM()
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+        _, final = await _run(llm, Deadline(5.0), retrieval_cache=cache, history=history)
+        assert final["degraded"] == ["fewer_chunks"]
+        assert [s["document_id"] for s in final["sources"]] == ["doc-0", "doc-1"]
+        assert len(llm.messages) == 1  # history dropped
+
+    async def test_deadline_truncates_generation_with_sources(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        llm = _LLM(delay=0.2)
+        answer, final = await _run(llm, Deadline(0.3))
+        assert answer == "Twenty"
+        assert final["truncated"] is True
+        assert len(final["sources"]) == 4
+        assert llm.closed
+
+    async def test_unbounded_request_is_unchanged(self, budgets, monkeypatch):
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        answer, final = await _run(_LLM())
+        assert answer == "Twenty five days."
+        assert final["truncated"] is False and final["degraded"] == []
+        assert len(final["sources"]) == 4
+
+
+class TestChatEndpointDeadline:
+    def test_stream_stops_cleanly_at_the_deadline(self, client, budgets, monkeypatch):
+        from app.services import llm as llm_module
+
+        monkeypatch.setattr(llm_module, "get_llm_client", lambda: _LLM(delay=0.2))
+        monkeypatch.setattr(rag, "vector_store", _Search())
+        monkeypatch.setattr(corpus_stats, "ready_documents", 1)
+
+        response = client.post("/api/chat", json={"question": "How much PTO?", "deadline_s": 0.3})
+        assert response.status_code == 200
+        events = {}
+        for block in response.text.strip().split("\n\n"):
+            name, data = block.split("\n", 1)
+            events[name.removeprefix("event: ")] = json.loads(data.removeprefix("data: "))
+        assert events["sources"]["truncated"] is True
+        assert len(events["sources"]["sources"]) == 4
+        assert "done" in events and "error" not in events
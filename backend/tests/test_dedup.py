@@ -0,0 +1,114 @@
+"""Tests for near-duplicate chunk detection and reference-aware storage."""
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.dedup import collapse_near_duplicates, signature, similarity
+from app.services.vector_store import VectorStoreService
+from tests.conftest import chunks_of
+
+BOILERPLATE = (
+    "This document is confidential and intended solely for the use of the individual "
+    "or entity to whom it is addressed. If you have received it in error, notify the "
+    "sender immediately and delete it from your system."
+)
+# Same words, different case, punctuation and spacing
+BOILERPLATE_COPY = BOILERPLATE.upper().replace(".", "").replace(" ", "  ")
+
+
+@pytest.fixture
+def service(fake_encoder, monkeypatch):
+    monkeypatch.setattr(settings, "dedup_enabled", True)
+    service = VectorStoreService(collection="dedup_docs")
+    service.add_chunks("doc-a", "a.md", chunks_of(BOILERPLATE, "Alpha revenue grew by a third."))
+    service.add_chunks("doc-b", "b.md", chunks_of("Beta churn fell slightly.", BOILERPLATE_COPY))
+    return service
+
+
+class TestSignatures:
+    def test_near_duplicates_are_similar(self):
+        assert similarity(signature(BOILERPLATE), signature(BOILERPLATE_COPY)) == 1.0
+        edited = BOILERPLATE.replace("immediately", "promptly")
+        assert similarity(signature(BOILERPLATE), signature(edited)) > 0.7
+        other = "Quarterly revenue grew in every region, led by strong demand for the new plans."
+        assert similarity(signature(BOILERPLATE), signature(other)) < 0.2
+
+    def test_short_text_is_not_signed(self):
+        assert signature("Chapter 3: Results") is None
+
+    def test_collapse_merges_separately_stored_copies(self):
+        sources = [
+            {"document_name": "a.md", "content": BOILERPLATE, "relevance_score": 0.9},
+            {"document_name": "c.md", "content": "Unrelated.", "relevance_score": 0.8},
+            {"document_name": "b.md", "content": BOILERPLATE_COPY, "relevance_score": 0.7},
+        ]
+        collapsed = collapse_near_duplicates(sources)
+        assert [s["document_name"] for s in collapsed] == ["a.md", "c.md"]
+        assert collapsed[0]["also_in"] == ["b.md"]
+
+
+class TestDeduplicatedStore:
+    def test_duplicate_is_stored_once(self, service):
+        assert service.count() == 3
+        assert service.duplicate_count() == 1
+        assert service.document_ids() == {"doc-a", "doc-b"}
+
+        results = service.search(BOILERPLATE, top_k=3)
+        boilerplate = [r for r in results if r["content"] == BOILERPLATE]
+        assert len(boilerplate) == 1
+        assert boilerplate[0]["document_id"] == "doc-a"
+        assert boilerplate[0]["also_in"] == ["b.md"]
+
+    def test_references_resolve_under_filters(self, service):
+        only_b = service.search(BOILERPLATE, top_k=3, document_ids={"doc-b"})
+        assert {r["document_id"] for r in only_b} == {"doc-b"}
+        hit = next(r for r in only_b if r["content"] == BOILERPLATE)
+        assert (hit["chunk_index"], hit["page_or_section"]) == (1, "Page 2")
+        assert "also_in" not in hit
+
+        without_a = service.search(BOILERPLATE, top_k=3, exclude_document_ids={"doc-a"})
+        assert {r["document_id"] for r in without_a} == {"doc-b"}
+        assert len(without_a) == 2
+
+    def test_delete_promotes_a_reference(self, service):
+        service.delete_by_document("doc-a")
+        assert service.count() == 2
+        assert service.duplicate_count() == 0
+        results = service.search(BOILERPLATE, top_k=1)
+        assert results[0]["document_id"] == "doc-b"
+        assert results[0]["chunk_index"] == 1
+
+        # The index is replayed from its log; new copies now refer to doc-b
+        reopened = VectorStoreService(collection="dedup_docs")
+        reopened.add_chunks("doc-c", "c.md", chunks_of(BOILERPLATE))
+        assert reopened.count() == 2
+        assert reopened.search(BOILERPLATE, top_k=1)[0]["also_in"] == ["c.md"]
+
+    def test_export_materializes_references(self, service):
+        exported = {doc: chunks for doc, _, chunks, _ in service.export_documents()}
+        assert [c["chunk_index"] for c in exported["doc-b"]] == [0, 1]
+        assert exported["doc-b"][1]["text"] == BOILERPLATE
+        assert exported["doc-b"][1]["page_or_section"] == "Page 2"
+
+    def test_export_streams_referencing_documents(self, service):
+        # Documents with references come out in backend order, not held back to the end
+        service.add_chunks("doc-c", "c.md", chunks_of("Unrelated closing notes"))
+        stored = [doc for doc, *_ in service.backend.export_documents()]
+        assert [doc for doc, *_ in service.export_documents()] == stored
+
+    def test_export_reference_only_document(self, service):
+        service.add_chunks("doc-c", "c.md", chunks_of(BOILERPLATE))
+        exported = {doc: rest for doc, *rest in service.export_documents()}
+        name, chunks, vectors = exported["doc-c"]
+        assert name == "c.md"
+        assert [c["text"] for c in chunks] == [BOILERPLATE]
+
+        _, canonical_chunks, canonical_vectors = exported["doc-a"]
+        position = [c["text"] for c in canonical_chunks].index(BOILERPLATE)
+        assert np.array_equal(vectors[0], canonical_vectors[position])
+
+    def test_disabled_stores_every_chunk(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "dedup_enabled", False)
+        service.add_chunks("doc-c", "c.md", chunks_of(BOILERPLATE))
+        assert service.count() == 4
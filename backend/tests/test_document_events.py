@@ -0,0 +1,151 @@
+"""Tests for document status events and the SSE status streams."""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import update
+
+from app.api.routes.documents import _status_stream
+from app.config import settings
+from app.models.database import Document, async_session, init_db
+from app.services import document_processor
+from app.services.document_events import DocumentEventBus, document_events
+
+
+def _events(lines) -> list[dict]:
+    """Parse SSE lines into {id, event, data} dicts, skipping comments and retry hints."""
+    events, current = [], {}
+    for line in lines:
+        if not line:
+            if "event" in current:
+                events.append(current)
+            current = {}
+        elif line.startswith("id: "):
+            current["id"] = line[4:]
+        elif line.startswith("event: "):
+            current["event"] = line[7:]
+        elif line.startswith("data: "):
+            current["data"] = json.loads(line[6:])
+    return events
+
+
+def _decode(chunk: bytes) -> list[str]:
+    return chunk.decode().split("\n")
+
+
+@pytest.fixture
+def ingest_store(store, monkeypatch):
+    """Ingestion into a fresh store with a fake encoder, so uploads become ready offline."""
+    monkeypatch.setattr(document_processor, "vector_store", store)
+
+
+class TestEventBus:
+    def test_resume_replays_buffered_events(self):
+        bus = DocumentEventBus(buffer_size=3)
+        start = bus.last_id
+        first = bus.publish("doc-1", "default", "processing", "queued")
+        bus.publish("doc-1", "default", "processing", "parsing")
+        assert bus.can_resume(start)
+        assert [e.phase for e in bus.since(first.id)] == ["parsing"]
+        assert bus.since(bus.last_id) == []
+
+        for phase in ("chunking", "indexing"):
+            bus.publish("doc-1", "default", "processing", phase)
+        # The event after `start` has been evicted
+        assert not bus.can_resume(start)
+        assert bus.can_resume(first.id)
+        assert [e.phase for e in bus.since(first.id)] == ["parsing", "chunking", "indexing"]
+
+    def test_unknown_ids_cannot_resume(self):
+        bus = DocumentEventBus()
+        bus.publish("doc-1", "default", "processing", "queued")
+        for event_id in ("", "garbage", f"{bus.epoch}-99", "0000000-1", f"{bus.epoch}-x"):
+            assert not bus.can_resume(event_id)
+
+    def test_progress_follows_phases(self):
+        bus = DocumentEventBus()
+        assert bus.publish("d", "t", "processing", "queued").progress == 0.0
+        assert bus.publish("d", "t", "processing", "chunking").progress == 0.5
+        ready = bus.publish("d", "t", "ready", chunk_count=3)
+        assert (ready.progress, ready.terminal) == (1.0, True)
+        assert ready.payload()["chunk_count"] == 3
+
+
+class TestStatusStream:
+    def _upload(self, client, content: bytes = b"Status events are pushed to clients.") -> str:
+        response = client.post(
+            "/api/documents/upload", files={"file": ("events.txt", content, "text/plain")}
+        )
+        return response.json()["id"]
+
+    def test_finished_document_snapshot(self, client, ingest_store):
+        doc_id = self._upload(client)
+        with client.stream("GET", f"/api/documents/{doc_id}/events") as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = _events(response.iter_lines())
+        assert [e["event"] for e in events] == ["status", "done"]
+        assert events[0]["data"]["status"] == "ready"
+        assert events[0]["data"]["progress"] == 1.0
+        assert events[0]["id"] == document_events.last_id
+
+    def test_resume_replays_processing_phases(self, client, ingest_store):
+        start = document_events.last_id
+        doc_id = self._upload(client)
+        headers = {"Last-Event-ID": start}
+        with client.stream("GET", f"/api/documents/{doc_id}/events", headers=headers) as response:
+            events = _events(response.iter_lines())
+        statuses = [(e["data"]["status"], e["data"]["phase"]) for e in events[:-1]]
+        assert statuses == [
+            ("processing", "queued"),
+            ("processing", "parsing"),
+            ("processing", "chunking"),
+            ("processing", "indexing"),
+            ("ready", None),
+        ]
+        assert events[-1]["event"] == "done"
+        assert events[3]["data"]["chunk_count"] == 1
+
+    def test_failure_ends_the_stream(self, client, ingest_store):
+        doc_id = self._upload(client, b"   ")
+        with client.stream("GET", f"/api/documents/{doc_id}/events") as response:
+            events = _events(response.iter_lines())
+        assert [e["event"] for e in events] == ["status", "done"]
+        assert events[0]["data"]["status"] == "failed"
+        assert "empty" in events[0]["data"]["error_message"]
+
+    def test_unknown_document(self, client):
+        assert client.get("/api/documents/missing/events").status_code == 404
+
+
+class TestTenantStream:
+    async def test_live_events_and_heartbeat_recheck(self, monkeypatch):
+        monkeypatch.setattr(settings, "document_events_heartbeat_s", 0.05)
+        await init_db()
+        async with async_session() as db:
+            db.add(Document(id="ev-1", filename="a.txt", tenant_id="evstream", status="processing"))
+            db.add(Document(id="ev-2", filename="b.txt", tenant_id="other", status="processing"))
+            await db.commit()
+
+        stream = _status_stream(None, "evstream", None)
+        chunks = [await anext(stream), await anext(stream)]
+        assert chunks[0].startswith(b"retry:")
+        [snapshot] = _events(_decode(chunks[1]))
+        assert (snapshot["data"]["document_id"], snapshot["data"]["phase"]) == ("ev-1", None)
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        document_events.publish("ev-2", "other", "processing", "parsing")
+        document_events.publish("ev-1", "evstream", "processing", "parsing")
+        [live] = _events(_decode(await pending))
+        assert (live["id"], live["data"]["phase"]) == (document_events.last_id, "parsing")
+
+        # Finished by another worker: only the database knows
+        async with async_session() as db:
+            await db.execute(update(Document).where(Document.id == "ev-1").values(status="ready"))
+            await db.commit()
+        assert await anext(stream) == b": ping\n\n"
+        [rechecked] = _events(_decode(await anext(stream)))
+        assert "id" not in rechecked
+        assert rechecked["data"]["status"] == "ready"
+        await stream.aclose()
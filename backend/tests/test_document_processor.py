@@ -116,3 +116,251 @@ class TestParseDocument:
             chunks = chunk_text(text, chunk_size=500, overlap=50)
             assert len(chunks) >= 2, f"{doc_path.name} produced too few chunks: {len(chunks)}"
             assert len(chunks) <= 100, f"{doc_path.name} produced too many chunks: {len(chunks)}"
+
+
+class TestParseDocx:
+    """Streaming DOCX extraction keeps headings and tables."""
+
+    def _docx(self, tmp_path) -> Path:
+        import docx
+
+        doc = docx.Document()
+        doc.add_heading("Operator Manual", 0)
+        doc.add_heading("Installation", 1)
+        doc.add_paragraph("Mount the unit on a level surface.")
+        table = doc.add_table(rows=2, cols=2)
+        table.cell(0, 0).text = "Setting"
+        table.cell(0, 1).text = "Value | unit"
+        table.cell(1, 0).text = "Pressure"
+        table.cell(1, 1).text = "4 bar"
+        doc.add_heading("Calibration", 2)
+        paragraph = doc.add_paragraph("First line")
+        paragraph.add_run().add_break()
+        paragraph.add_run("second line")
+        doc.add_paragraph("   ")
+        path = tmp_path / "manual.docx"
+        doc.save(str(path))
+        return path
+
+    def test_blocks_in_document_order(self, tmp_path):
+        from app.services.document_processor import iter_docx_blocks
+
+        assert list(iter_docx_blocks(self._docx(tmp_path))) == [
+            "# Operator Manual",
+            "# Installation",
+            "Mount the unit on a level surface.",
+            "| Setting | Value \\| unit |\n| Pressure | 4 bar |",
+            "## Calibration",
+            "First line\nsecond line",
+        ]
+
+    def test_headings_become_sections(self, tmp_path):
+        text = parse_document(self._docx(tmp_path))
+        chunks = chunk_text(text, chunk_size=10, overlap=0)
+        sections = {c["page_or_section"] for c in chunks}
+        assert {"Installation", "Calibration"} <= sections
+        assert any("4 bar" in c["text"] and c["page_or_section"] == "Installation" for c in chunks)
+
+    def test_localized_and_derived_heading_styles(self, tmp_path):
+        import zipfile
+
+        from app.services.document_processor import iter_docx_blocks
+
+        w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        styles = (
+            f"<w:styles {w}>"
+            '<w:style w:type="paragraph" w:styleId="berschrift1"><w:name w:val="heading 1"/>'
+            "</w:style>"
+            '<w:style w:type="paragraph" w:styleId="Kapitel"><w:name w:val="Kapitel"/>'
+            '<w:basedOn w:val="berschrift1"/></w:style>'
+            "</w:styles>"
+        )
+
+        def paragraph(text, style=None):
+            props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+            return f"<w:p>{props}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+        body = paragraph("Einleitung", "berschrift1") + paragraph("Teil", "Kapitel")
+        body += paragraph("Text")
+        path = tmp_path / "de.docx"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("word/styles.xml", styles)
+            document = f"<w:document {w}><w:body>{body}</w:body></w:document>"
+            archive.writestr("word/document.xml", document)
+        assert list(iter_docx_blocks(path)) == ["# Einleitung", "# Teil", "Text"]
+
+
+def _make_pdf(path: Path, pages: list[str]) -> Path:
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids ["
+        + " ".join(f"{4 + 2 * i} 0 R" for i in range(count))
+        + f"] /Count {count} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode()
+    out += f"startxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+    return path
+
+
+class TestParsePdf:
+    """Large PDFs are extracted page-parallel; failed pages are skipped and reported."""
+
+    PAGES = [f"Procedure step {i} text" for i in range(1, 6)]
+
+    def test_parallel_matches_sequential(self, tmp_path, monkeypatch):
+        from app.config import settings
+        from app.services import document_processor
+
+        path = _make_pdf(tmp_path / "manual.pdf", self.PAGES)
+        sequential = parse_document(path)
+        assert sequential == "\n\n".join(
+            f"[Page {i}]\n{text}" for i, text in enumerate(self.PAGES, start=1)
+        )
+
+        monkeypatch.setattr(settings, "pdf_parallel_min_pages", 2)
+        monkeypatch.setattr(settings, "pdf_pages_per_task", 2)
+        monkeypatch.setattr(settings, "pdf_workers", 2)
+        try:
+            assert parse_document(path) == sequential
+        finally:
+            document_processor.shutdown_pdf_pool()
+
+    def test_failed_page_is_skipped_and_reported(self, tmp_path, monkeypatch):
+        from app.services import pdf_extract
+
+        real = pdf_extract._page_text
+
+        def flaky(reader, index):
+            if index == 1:
+                raise KeyError("/Contents")
+            return real(reader, index)
+
+        monkeypatch.setattr(pdf_extract, "_page_text", flaky)
+        problems: list[str] = []
+        text = parse_document(_make_pdf(tmp_path / "m.pdf", self.PAGES), problems)
+        assert "[Page 2]" not in text
+        assert "[Page 1]" in text and "[Page 3]" in text
+        assert problems == ["Page 2: KeyError: '/Contents'"]
+
+    def test_failed_range_fails_only_its_pages(self, tmp_path, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.config import settings
+        from app.services import document_processor
+
+        real = document_processor.extract_page_range
+
+        def extract_range(path, start, stop):
+            if start == 2:
+                raise MemoryError("worker ran out of memory")
+            return real(path, start, stop)
+
+        monkeypatch.setattr(document_processor, "extract_page_range", extract_range)
+        monkeypatch.setattr(document_processor, "_get_pdf_pool", lambda: ThreadPoolExecutor(2))
+        monkeypatch.setattr(settings, "pdf_parallel_min_pages", 2)
+        monkeypatch.setattr(settings, "pdf_pages_per_task", 2)
+        monkeypatch.setattr(settings, "pdf_workers", 2)
+
+        problems: list[str] = []
+        text = parse_document(_make_pdf(tmp_path / "m.pdf", self.PAGES), problems)
+        assert [p.split(":")[0] for p in problems] == ["Page 3", "Page 4"]
+        assert "[Page 5]\nProcedure step 5 text" in text
+
+    def test_hung_range_times_out(self, tmp_path, monkeypatch):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.config import settings
+        from app.services import document_processor
+
+        real = document_processor.extract_page_range
+        release = threading.Event()
+
+        def extract_range(path, start, stop):
+            if start == 2:
+                release.wait()
+            return real(path, start, stop)
+
+        class Pool(ThreadPoolExecutor):
+            stopped = False
+
+            def shutdown(self, *args, **kwargs):
+                Pool.stopped = True
+
+        pool = Pool(3)
+        monkeypatch.setattr(document_processor, "extract_page_range", extract_range)
+        monkeypatch.setattr(document_processor, "_get_pdf_pool", lambda: pool)
+        monkeypatch.setattr(settings, "pdf_parallel_min_pages", 2)
+        monkeypatch.setattr(settings, "pdf_pages_per_task", 2)
+        monkeypatch.setattr(settings, "pdf_workers", 3)
+        monkeypatch.setattr(settings, "pdf_range_timeout_s", 0.2)
+
+        problems: list[str] = []
+        try:
+            text = parse_document(_make_pdf(tmp_path / "m.pdf", self.PAGES), problems)
+        finally:
+            release.set()
+        assert problems == [
+            f"Page {number}: TimeoutError: not extracted within 0.2s" for number in (3, 4)
+        ]
+        assert "[Page 5]\nProcedure step 5 text" in text
+        assert Pool.stopped
+
+    def test_concurrent_callers_share_one_pool(self, monkeypatch):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.services import document_processor
+
+        created = []
+
+        def slow_pool(**kwargs):
+            time.sleep(0.05)
+            created.append(ThreadPoolExecutor(1))
+            return created[-1]
+
+        monkeypatch.setattr(document_processor, "ProcessPoolExecutor", slow_pool)
+        monkeypatch.setattr(document_processor, "_pdf_pool", None)
+        pools = []
+        threads = [
+            threading.Thread(target=lambda: pools.append(document_processor._get_pdf_pool()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
+        document_processor.shutdown_pdf_pool()
+
+    def test_unreadable_pdf_fails(self, tmp_path, monkeypatch):
+        from app.services import pdf_extract
+
+        def broken(reader, index):
+            raise ValueError("bad stream")
+
+        monkeypatch.setattr(pdf_extract, "_page_text", broken)
+        with pytest.raises(ValueError, match="No page could be extracted"):
+            parse_document(_make_pdf(tmp_path / "m.pdf", self.PAGES[:2]))
@@ -0,0 +1,127 @@
+"""Tests for embedding configs, PCA projection and guarded re-embedding."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import embeddings, reembedding
+from app.services.embeddings import EmbeddingConfig, PcaProjection
+from app.services.vector_backends.numpy_index import NumpyBackend
+from app.services.vector_store import ShardedVectorStore, VectorStoreService
+from tests.conftest import DIM, add_documents
+
+
+def _service(monkeypatch) -> VectorStoreService:
+    """The default tenant's shard of a store on the collection the re-embedding job uses."""
+    store = ShardedVectorStore(collection="test_docs")
+    monkeypatch.setattr(reembedding, "vector_store", store)
+    return store.shard(settings.default_tenant)
+
+
+class TestEmbeddingConfig:
+    def test_same_space_ignores_pca_file(self):
+        a = EmbeddingConfig(pca_dims=64, pca_file="a.npz")
+        b = EmbeddingConfig(pca_dims=64, pca_file=None)
+        assert a.same_space(b)
+        assert a.digest() == b.digest()
+
+    def test_model_and_length_change_space(self):
+        base = EmbeddingConfig()
+        assert not base.same_space(EmbeddingConfig(model="/models/other"))
+        assert not base.same_space(EmbeddingConfig(max_seq_length=128))
+
+    def test_round_trip(self):
+        config = EmbeddingConfig(model="/m", max_seq_length=128, pca_dims=8, pca_file="p.npz")
+        assert EmbeddingConfig.from_dict(config.to_dict()) == config
+
+
+class TestPcaProjection:
+    def test_projects_to_unit_vectors(self, tmp_path):
+        samples = np.random.default_rng(0).normal(size=(100, DIM)).astype(np.float32)
+        pca = PcaProjection.fit(samples, 4)
+        projected = pca(samples[:5])
+        assert projected.shape == (5, 4)
+        assert np.allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+
+        pca.save(tmp_path / "pca.npz")
+        loaded = PcaProjection.load(tmp_path / "pca.npz")
+        assert np.allclose(loaded(samples[:5]), projected)
+
+    def test_needs_enough_samples(self):
+        with pytest.raises(ValueError):
+            PcaProjection.fit(np.ones((3, DIM), dtype=np.float32), 8)
+
+
+class TestReembedding:
+    async def test_unchanged_config_is_a_no_op(self, fake_encoder, monkeypatch, tmp_path):
+        service = _service(monkeypatch)
+        add_documents(service, 2)
+        assert not service.needs_reembed()
+        assert await reembedding.reembed_collection() is False
+
+    async def test_model_change_rebuilds_and_swaps(self, fake_encoder, monkeypatch, tmp_path):
+        service = _service(monkeypatch)
+        add_documents(service, 5)
+        old_storage = service.reembed_status()["storage"]
+
+        monkeypatch.setattr(settings, "embedding_model_dir", tmp_path / "new-model")
+        assert service.needs_reembed()
+        # Queries still use the old model until the swap
+        assert service.search("document 1 chunk 1", top_k=1)[0]["document_id"] == "doc-1"
+
+        assert await reembedding.reembed_collection() is True
+        status = service.reembed_status()
+        assert status["storage"] != old_storage
+        assert status["embedding"]["model"] == str(tmp_path / "new-model")
+        assert status["reembed"] is None
+        assert not (settings.vector_index_dir / old_storage).exists()
+        assert service.count() == 15
+        assert service.search("document 3 chunk 2", top_k=1)[0]["document_id"] == "doc-3"
+
+    async def test_resumes_after_interruption(self, fake_encoder, monkeypatch, tmp_path):
+        service = _service(monkeypatch)
+        add_documents(service, 4)
+        monkeypatch.setattr(settings, "embedding_model_dir", tmp_path / "new-model")
+
+        # Copy two documents, then "crash"
+        config = EmbeddingConfig.from_settings()
+        target, config, done = service.start_reembed(config)
+        embedder = embeddings.build_embedder(config)
+        reembedding._copy_documents(service.backend, target, embedder, ["doc-0", "doc-1"])
+        service.record_reembed_progress(["doc-0", "doc-1"])
+
+        restarted = _service(monkeypatch)
+        manifest = json.loads((settings.vector_index_dir / "test_docs.manifest.json").read_text())
+        assert manifest["reembed"]["done"] == ["doc-0", "doc-1"]
+
+        copied = []
+        original = reembedding._copy_documents
+        monkeypatch.setattr(
+            reembedding,
+            "_copy_documents",
+            lambda s, t, e, ids: copied.extend(ids) or original(s, t, e, ids),
+        )
+        assert await reembedding.reembed_collection() is True
+        assert sorted(copied) == ["doc-2", "doc-3"]
+        assert restarted.document_ids() == {f"doc-{i}" for i in range(4)}
+
+    async def test_pca_is_fitted_and_stored(self, fake_encoder, monkeypatch, tmp_path):
+        service = _service(monkeypatch)
+        add_documents(service, 4)
+        monkeypatch.setattr(settings, "embedding_pca_dims", 4)
+
+        assert await reembedding.reembed_collection() is True
+        config = service.embedding_config
+        assert config.pca_dims == 4
+        assert (settings.vector_index_dir / config.pca_file).exists()
+        hits = service.search("document 2 chunk 0", top_k=1)
+        assert hits[0]["document_id"] == "doc-2"
+        assert isinstance(service.backend, NumpyBackend)
+
+    def test_pca_deferred_on_small_corpus(self, fake_encoder, monkeypatch, tmp_path):
+        service = _service(monkeypatch)
+        add_documents(service, 1)
+        monkeypatch.setattr(settings, "embedding_pca_dims", 8)
+        assert not service.needs_reembed()
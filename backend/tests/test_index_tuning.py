@@ -0,0 +1,127 @@
+"""Tests for HNSW parameters, index rebuilds and recall measurement."""
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import index_eval, reembedding
+from app.services.vector_backends import HnswParams
+from app.services.vector_backends.chroma import ChromaBackend
+from app.services.vector_backends.numpy_index import NumpyBackend
+from app.services.vector_store import ShardedVectorStore
+from tests.conftest import add_documents
+
+
+@pytest.fixture
+def chroma_store(fake_encoder, monkeypatch, tmp_path):
+    """A vector store on the chroma backend with a fake encoder that counts calls."""
+    monkeypatch.setattr(settings, "chroma_dir", tmp_path / "chroma")
+    monkeypatch.setattr(settings, "vector_backend", "chroma")
+    monkeypatch.setattr(settings, "hnsw_m", 8)
+    store = ShardedVectorStore(collection="tuning_docs")
+    monkeypatch.setattr(reembedding, "vector_store", store)
+    return store.shard(settings.default_tenant), fake_encoder
+
+
+class TestHnswParams:
+    def test_chroma_applies_params_on_create_only(self, tmp_path):
+        params = HnswParams(m=24, construction_ef=150, search_ef=60)
+        assert ChromaBackend(tmp_path, "params_docs", params).hnsw_params() == params
+        # Reopening with other params keeps what the collection was built with
+        reopened = ChromaBackend(tmp_path, "params_docs", HnswParams())
+        assert reopened.hnsw_params() == params
+
+    def test_numpy_has_no_params(self, tmp_path):
+        assert NumpyBackend(tmp_path).hnsw_params() is None
+
+    def test_new_collection_uses_settings(self, chroma_store):
+        service, _ = chroma_store
+        assert service.index_params == HnswParams(m=8, construction_ef=100, search_ef=100)
+
+
+class TestIndexRebuild:
+    async def test_rebuild_copies_vectors_and_swaps(self, chroma_store):
+        service, encoders = chroma_store
+        add_documents(service, 4)
+        calls = encoders[0].calls
+        old_storage = service.index_status()["storage"]
+        params = HnswParams(m=32, construction_ef=200, search_ef=150)
+
+        assert await reembedding.reembed_collection(params) is True
+        assert service.index_params == params
+        assert service.index_status()["storage"] != old_storage
+        assert service.count() == 12
+        # Vectors were copied, not re-embedded
+        assert len(encoders) == 1
+        assert encoders[0].calls == calls
+        hits = service.search("document 2 chunk 1", top_k=1)
+        assert (hits[0]["document_id"], hits[0]["chunk_index"]) == ("doc-2", 1)
+
+    async def test_unchanged_params_are_a_noop(self, chroma_store):
+        service, _ = chroma_store
+        add_documents(service, 2)
+        assert await reembedding.reembed_collection(service.index_params) is False
+
+    async def test_interrupted_rebuild_resumes_with_its_params(self, chroma_store, monkeypatch):
+        service, _ = chroma_store
+        add_documents(service, 4)
+        params = HnswParams(m=12, construction_ef=80, search_ef=40)
+        target, config, _ = service.start_reembed(service.embedding_config, params)
+        reembedding._copy_documents(service.backend, target, None, ["doc-0"])
+        service.record_reembed_progress(["doc-0"])
+
+        # A restart: nothing requested, but the pending rebuild is picked up
+        store = ShardedVectorStore(collection="tuning_docs")
+        monkeypatch.setattr(reembedding, "vector_store", store)
+        restarted = store.shard(settings.default_tenant)
+        assert restarted.rebuild_target() == (restarted.embedding_config, params)
+        assert await reembedding.reembed_collection() is True
+        assert restarted.index_params == params
+        assert restarted.document_ids() == {f"doc-{d}" for d in range(4)}
+
+    def test_admin_rejects_exact_backend(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        response = client.post("/api/admin/index/rebuild", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 400
+        assert "exact search" in response.json()["detail"]
+
+
+class TestRecallEvaluation:
+    def _backend(self, tmp_path, docs: int = 20, per_doc: int = 10) -> NumpyBackend:
+        backend = NumpyBackend(tmp_path / "index")
+        rng = np.random.default_rng(5)
+        for d in range(docs):
+            chunks = [
+                {"text": f"d{d} c{i}", "chunk_index": i, "page_or_section": None}
+                for i in range(per_doc)
+            ]
+            backend.add(f"doc-{d}", f"{d}.md", chunks, rng.normal(size=(per_doc, 16)))
+        return backend
+
+    def test_exact_backend_has_full_recall(self, tmp_path):
+        report = index_eval.evaluate(self._backend(tmp_path), queries=30, k=5)
+        assert report["chunks"] == 200
+        assert report["queries"] == 30
+        assert report["recall_at_k"] == 1.0
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["p95"]
+
+    def test_recall_counts_missing_results(self, tmp_path, monkeypatch):
+        backend = self._backend(tmp_path)
+        search = backend.search
+        # Drop the best hit from every result
+        monkeypatch.setattr(backend, "search", lambda q, k: search(q, k + 1)[1:])
+        report = index_eval.evaluate(backend, queries=20, k=4)
+        assert report["recall_at_k"] == pytest.approx(0.75)
+
+    def test_empty_backend(self, tmp_path):
+        report = index_eval.evaluate(NumpyBackend(tmp_path / "empty"), queries=10)
+        assert report["chunks"] == 0
+        assert report["queries"] == 0
+
+    def test_admin_evaluate(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        response = client.post(
+            "/api/admin/index/evaluate?queries=5&k=3", headers={"X-Admin-Token": "secret"}
+        )
+        assert response.status_code == 200
+        assert response.json()["backend"] == "numpy"
@@ -0,0 +1,109 @@
+"""Tests for ingestion priority lanes, tenant fairness and starvation protection."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.models.schemas import IngestionPriority
+from app.services.ingestion_scheduler import IngestionScheduler
+
+INTERACTIVE, BULK, BACKGROUND = IngestionPriority
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "ingestion_workers", 1)
+    monkeypatch.setattr(settings, "ingestion_bulk_threshold", 3)
+    monkeypatch.setattr(settings, "ingestion_starvation_s", 300.0)
+    monkeypatch.setattr(settings, "ingestion_tenant_weights", {})
+    return IngestionScheduler()
+
+
+async def _run_order(scheduler, jobs, before_release=None) -> list[str]:
+    """Queue ``jobs`` (document_id, tenant_id, priority) behind a running one."""
+    order: list[str] = []
+    blocker = await scheduler.acquire("running", "t", INTERACTIVE)
+
+    async def run(document_id, tenant_id, priority):
+        async with await scheduler.acquire(document_id, tenant_id, priority):
+            order.append(document_id)
+
+    tasks = []
+    for job in jobs:
+        tasks.append(asyncio.create_task(run(*job)))
+        await asyncio.sleep(0)
+    if before_release is not None:
+        before_release()
+    blocker.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestIngestionScheduler:
+    async def test_interactive_upload_overtakes_bulk(self, scheduler):
+        jobs = [(f"bulk-{i}", "acme", BULK) for i in range(3)]
+        jobs += [("reindex", "acme", BACKGROUND), ("urgent", "globex", INTERACTIVE)]
+        order = await _run_order(scheduler, jobs)
+        assert order == ["urgent", "bulk-0", "bulk-1", "bulk-2", "reindex"]
+
+    async def test_tenants_share_a_lane_by_weight(self, scheduler, monkeypatch):
+        monkeypatch.setattr(settings, "ingestion_tenant_weights", {"globex": 2.0})
+        jobs = [(f"a{i}", "acme", BULK) for i in range(4)]
+        jobs += [(f"g{i}", "globex", BULK) for i in range(4)]
+        order = await _run_order(scheduler, jobs)
+        assert order == ["a0", "g0", "g1", "a1", "g2", "g3", "a2", "a3"]
+
+    async def test_starving_job_runs_next(self, scheduler):
+        jobs = [("old-reindex", "acme", BACKGROUND), ("upload", "globex", INTERACTIVE)]
+
+        def age_reindex():
+            job = next(j for j in scheduler._waiting if j.document_id == "old-reindex")
+            job.enqueued_at -= settings.ingestion_starvation_s
+            assert scheduler.position("old-reindex") == 1
+
+        order = await _run_order(scheduler, jobs, before_release=age_reindex)
+        assert order == ["old-reindex", "upload"]
+
+    async def test_status_and_queue_positions(self, scheduler):
+        running = await scheduler.acquire("running", "acme", INTERACTIVE)
+        waiters = [
+            asyncio.create_task(scheduler.acquire(doc, "acme", priority))
+            for doc, priority in (("bulk", BULK), ("next", INTERACTIVE))
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.status("running") == (INTERACTIVE, 0)
+        assert scheduler.status("next") == (INTERACTIVE, 1)
+        assert scheduler.status("bulk") == (BULK, 2)
+        assert scheduler.status("unknown") is None
+
+        # Auto-classification: the tenant already has three documents pending
+        assert scheduler.classify("acme", None) is BULK
+        assert scheduler.classify("globex", None) is INTERACTIVE
+        assert scheduler.classify("acme", BACKGROUND) is BACKGROUND
+
+        waiters[0].cancel()
+        running.release()
+        (await waiters[1]).release()
+        assert scheduler.active == 0 and scheduler.waiting == 0
+
+
+class TestUploadPriority:
+    def test_upload_reports_no_queue_once_processed(self, client):
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": ("notes.txt", b"Quarterly notes.", "text/plain")},
+            data={"priority": "background"},
+        )
+        assert response.status_code == 201
+        detail = client.get(f"/api/documents/{response.json()['id']}").json()
+        assert detail["queue_position"] is None
+        assert detail["priority"] is None
+
+    def test_unknown_priority_is_rejected(self, client):
+        response = client.post(
+            "/api/documents/upload",
+            files={"file": ("notes.txt", b"Quarterly notes.", "text/plain")},
+            data={"priority": "urgent"},
+        )
+        assert response.status_code == 422
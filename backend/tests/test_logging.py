@@ -0,0 +1,98 @@
+"""Tests for queue-backed and sampled structured logging."""
+
+import json
+import threading
+
+import pytest
+import structlog
+
+from app.config import settings
+from app.core import logging as app_logging
+from app.core.metrics import LOG_EVENTS_DROPPED
+
+
+@pytest.fixture
+def queue_logging(monkeypatch):
+    monkeypatch.setattr(settings, "debug", False)
+    monkeypatch.setattr(settings, "log_async", True)
+    app_logging.setup_logging()
+    yield
+    app_logging.shutdown_logging()
+
+
+def _lines(capsys) -> list[dict]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line]
+
+
+class TestQueueLogging:
+    def test_events_are_written_by_the_writer_thread(self, queue_logging, capsys):
+        logger = structlog.get_logger("test")
+        logger.info("retrieval_complete", chunks=3)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("rag_failed")
+        app_logging.shutdown_logging()
+
+        events = {line["event"]: line for line in _lines(capsys)}
+        assert events["retrieval_complete"]["chunks"] == 3
+        assert events["retrieval_complete"]["level"] == "info"
+        assert "timestamp" in events["retrieval_complete"]
+        # The traceback is formatted on the calling thread, where it exists
+        assert "RuntimeError: boom" in events["rag_failed"]["exception"]
+
+        # Cached loggers keep working once the writer is stopped
+        logger.info("after_shutdown")
+        assert [line["event"] for line in _lines(capsys)] == ["after_shutdown"]
+
+    def test_full_queue_drops_and_counts(self, capsys):
+        entered, release = threading.Event(), threading.Event()
+
+        def slow_renderer(logger, method_name, event_dict):
+            entered.set()
+            release.wait(5)
+            return json.dumps(event_dict)
+
+        before = LOG_EVENTS_DROPPED.labels().value
+        writer = app_logging.QueueLogWriter(slow_renderer, maxsize=1)
+        writer.put({"event": "first"})
+        assert entered.wait(5)
+        writer.put({"event": "second"})  # fills the queue
+        writer.put({"event": "third"})  # dropped, without blocking
+        assert writer.dropped == 1
+        assert LOG_EVENTS_DROPPED.labels().value == before + 1
+
+        release.set()
+        writer.close()
+        events = _lines(capsys)
+        # The drop is reported in the batch during which it happened
+        assert [e["event"] for e in events] == ["first", "log_events_dropped", "second"]
+        assert events[1]["count"] == 1
+
+
+class TestSampling:
+    def test_sampled_events(self, monkeypatch):
+        monkeypatch.setattr(
+            settings, "log_sample_rates", {"rag_query_started": 0.0, "retrieval_complete": 0.5}
+        )
+        with pytest.raises(structlog.DropEvent):
+            app_logging._sample(None, "info", {"event": "rag_query_started"})
+        # Warnings and errors are always kept
+        kept = app_logging._sample(None, "warning", {"event": "rag_query_started"})
+        assert "sample_rate" not in kept
+        assert app_logging._sample(None, "info", {"event": "other"}) == {"event": "other"}
+
+        monkeypatch.setattr(app_logging.random, "random", lambda: 0.25)
+        kept = app_logging._sample(None, "info", {"event": "retrieval_complete"})
+        assert kept["sample_rate"] == 0.5
+        monkeypatch.setattr(app_logging.random, "random", lambda: 0.75)
+        with pytest.raises(structlog.DropEvent):
+            app_logging._sample(None, "info", {"event": "retrieval_complete"})
+
+    def test_sampling_applies_through_structlog(self, queue_logging, capsys, monkeypatch):
+        monkeypatch.setattr(settings, "log_sample_rates", {"rag_query_started": 0.0})
+        logger = structlog.get_logger("test")
+        logger.info("rag_query_started")
+        logger.info("retrieval_complete")
+        app_logging.shutdown_logging()
+        assert [line["event"] for line in _lines(capsys)] == ["retrieval_complete"]
@@ -0,0 +1,61 @@
+"""Tests for the in-process metrics registry."""
+
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    def test_counter_with_labels(self, registry):
+        counter = Counter("test_requests_total", "Requests.", ("outcome",), registry=registry)
+        counter.labels(outcome="ok").inc()
+        counter.labels("ok").inc(2)
+        counter.labels(outcome="error").inc()
+        text = registry.render()
+        assert "# TYPE test_requests_total counter" in text
+        assert 'test_requests_total{outcome="ok"} 3' in text
+        assert 'test_requests_total{outcome="error"} 1' in text
+
+    def test_gauge_set_and_dec(self, registry):
+        gauge = Gauge("test_depth", "Depth.", registry=registry)
+        gauge.set(5)
+        gauge.dec()
+        assert "test_depth 4" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        hist = Histogram("test_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+        hist.observe(0.05)
+        hist.observe(0.5)
+        hist.observe(5.0)
+        text = registry.render()
+        assert 'test_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="+Inf"} 3' in text
+        assert "test_seconds_count 3" in text
+        assert "test_seconds_sum 5.55" in text
+
+    def test_histogram_timer(self, registry):
+        hist = Histogram("test_timer_seconds", "Timer.", registry=registry)
+        with hist.time():
+            pass
+        assert "test_timer_seconds_count 1" in registry.render()
+
+    def test_label_values_escaped(self, registry):
+        counter = Counter("test_escape_total", "Escape.", ("path",), registry=registry)
+        counter.labels(path='a"b').inc()
+        assert 'path="a\\"b"' in registry.render()
+
+    def test_duplicate_registration_rejected(self, registry):
+        Counter("test_dupe_total", "Dupe.", registry=registry)
+        with pytest.raises(ValueError):
+            Counter("test_dupe_total", "Dupe.", registry=registry)
+
+    def test_missing_labels_rejected(self, registry):
+        counter = Counter("test_labelled_total", "Labelled.", ("kind",), registry=registry)
+        with pytest.raises(ValueError):
+            counter.inc()
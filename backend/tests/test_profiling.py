@@ -0,0 +1,129 @@
+"""Tests for on-demand profiling."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.core.profiling import ProfilingMiddleware, SamplingProfiler, profile_store
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    return {"X-Admin-Token": "secret"}
+
+
+class TestSamplingProfiler:
+    def test_samples_target_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,))
+        worker.start()
+        profiler = SamplingProfiler("test", "busy", 0.001, thread_ids={worker.ident}).start()
+        time.sleep(0.05)
+        profile = profiler.stop()
+        stop.set()
+        worker.join()
+
+        assert profile.samples > 0
+        collapsed = profile.to_collapsed()
+        assert "_busy_loop" in collapsed
+        stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+
+    def test_speedscope_format(self):
+        profiler = SamplingProfiler("test", "idle", 0.001).start()
+        time.sleep(0.02)
+        doc = profiler.stop().to_speedscope()
+        assert doc["$schema"].startswith("https://www.speedscope.app/")
+        sampled = doc["profiles"][0]
+        assert sampled["type"] == "sampled"
+        assert len(sampled["samples"]) == len(sampled["weights"])
+        frame_count = len(doc["shared"]["frames"])
+        assert all(0 <= i < frame_count for sample in sampled["samples"] for i in sample)
+
+
+class TestProfilingMiddleware:
+    async def test_profiles_request_with_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        sent = []
+
+        async def app(scope, receive, send):
+            await asyncio.sleep(0.02)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/api/chat",
+                 "headers": [(b"x-profile", b"secret")]}
+        await ProfilingMiddleware(app)(scope, None, send)
+
+        headers = dict(sent[0]["headers"])
+        profile = profile_store.get(headers[b"x-profile-id"].decode())
+        assert profile is not None
+        assert profile.label == "POST /api/chat"
+
+    async def test_ignores_wrong_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        sent = []
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"x-profile", b"no")]}
+        await ProfilingMiddleware(app)(scope, None, send)
+        assert sent[0]["headers"] == []
+
+
+class TestAdminProfilingEndpoints:
+    def test_requires_admin_token(self, client, admin):
+        assert client.get("/api/admin/profiles").status_code == 401
+        response = client.get("/api/admin/profiles", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
+
+    def test_disabled_profiling_returns_404(self, client, admin, monkeypatch):
+        monkeypatch.setattr(settings, "profiling_enabled", False)
+        assert client.get("/api/admin/profiles", headers=admin).status_code == 404
+
+    def test_cpu_profile_download(self, client, admin):
+        response = client.post(
+            "/api/admin/profile/cpu",
+            params={"seconds": 0.05, "format": "speedscope"},
+            headers=admin,
+        )
+        assert response.status_code == 200
+        assert "speedscope" in response.headers["content-disposition"]
+        assert response.json()["profiles"][0]["type"] == "sampled"
+
+        listed = client.get("/api/admin/profiles", headers=admin).json()["profiles"]
+        assert listed[0]["kind"] == "process"
+        collapsed = client.get(f"/api/admin/profiles/{listed[0]['id']}", headers=admin)
+        assert collapsed.status_code == 200
+        assert "thread:" in collapsed.text
+
+    def test_unknown_profile_404(self, client, admin):
+        assert client.get("/api/admin/profiles/nope", headers=admin).status_code == 404
+
+    def test_memory_snapshot(self, client, admin):
+        first = client.get("/api/admin/profile/memory", headers=admin)
+        assert first.json()["started"] is True
+        try:
+            payload = [bytearray(1024) for _ in range(100)]  # noqa: F841
+            report = client.get("/api/admin/profile/memory", headers=admin).json()
+            assert report["traced_current_bytes"] > 0
+            assert report["top_allocators"]
+        finally:
+            client.post("/api/admin/profile/memory/stop", headers=admin)
@@ -0,0 +1,99 @@
+"""Tests for the retrieval evaluation harness."""
+
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.services import retrieval_eval
+from app.services.document_processor import chunk_text
+
+SAMPLE_DOCS = Path(__file__).parent.parent / "sample_docs"
+
+
+def _source(filename: str, content: str) -> dict:
+    return {"document_name": filename, "content": content}
+
+
+class TestSyntheticDataset:
+    def test_evidence_comes_from_the_labelled_file(self):
+        dataset = retrieval_eval.generate_dataset(SAMPLE_DOCS, per_document=10)
+        assert dataset["name"] == "sample_docs"
+        assert len(dataset["questions"]) == 40
+        assert len({q["id"] for q in dataset["questions"]}) == 40
+        for item in dataset["questions"]:
+            [expected] = item["expected"]
+            text = (SAMPLE_DOCS / expected["filename"]).read_text()
+            assert expected["evidence"] in text
+            assert item["question"].endswith(("?", "."))
+
+    def test_labels_survive_rechunking(self):
+        dataset = retrieval_eval.generate_dataset(SAMPLE_DOCS, per_document=5)
+        for chunk_size in (120, 500):
+            for item in dataset["questions"]:
+                [expected] = item["expected"]
+                text = (SAMPLE_DOCS / expected["filename"]).read_text()
+                sources = [
+                    _source(expected["filename"], chunk["text"])
+                    for chunk in chunk_text(text, chunk_size, 10)
+                ]
+                assert retrieval_eval.score(sources, item["expected"])[0] == 1.0
+
+
+class TestScoring:
+    def test_recall_and_reciprocal_rank(self):
+        expected = [
+            {"filename": "a.md", "evidence": "The cache is   flushed hourly."},
+            {"filename": "b.md", "evidence": "Tokens expire after a day."},
+        ]
+        sources = [
+            _source("b.md", "unrelated"),
+            # Same passage in the wrong file does not count
+            _source("b.md", "The cache is flushed hourly."),
+            _source("a.md", "Intro.\n\nThe cache is flushed\nhourly. More text."),
+        ]
+        recall, reciprocal_rank = retrieval_eval.score(sources, expected)
+        assert recall == 0.5
+        assert reciprocal_rank == pytest.approx(1 / 3)
+        assert retrieval_eval.score([], expected) == (0.0, 0.0)
+
+    def test_approx_tokens_matches_chunker_convention(self):
+        assert retrieval_eval.approx_tokens("x" * 400) == 100
+        assert retrieval_eval.approx_tokens("abc") == 1
+
+
+class TestRuns:
+    async def test_side_by_side_runs(self, fake_encoder, tmp_path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "cache.md").write_text(
+            "# Cache Guide\n\n## Expiry\n\nThe cache is flushed every hour by the scheduler.\n"
+        )
+        (docs / "auth.md").write_text(
+            "# Auth Guide\n\n## Tokens\n\nAccess tokens expire after one day of inactivity.\n"
+        )
+        index_dir = settings.vector_index_dir
+        dataset = retrieval_eval.generate_dataset(docs)
+        assert len(dataset["questions"]) == 2
+
+        report = await retrieval_eval.evaluate(
+            dataset, docs, {"baseline": {}, "top1": {"retrieval_top_k": 1}}
+        )
+        baseline, top1 = report["runs"]
+        assert report["questions"] == 2
+        assert (baseline["k"], top1["k"]) == (settings.retrieval_top_k, 1)
+        # Two single-chunk documents: every relevant chunk is within the default top-k
+        assert baseline["search"]["recall_at_k"] == 1.0
+        assert baseline["rag"]["recall_at_k"] == 1.0
+        assert top1["rag"]["context_tokens"]["mean"] < baseline["rag"]["context_tokens"]["mean"]
+        assert baseline["search"]["latency_ms"]["p50"] <= baseline["search"]["latency_ms"]["p95"]
+        assert [row["run"] for row in retrieval_eval.compare([report])] == ["baseline", "top1"]
+        # Overrides and the throwaway index are undone afterwards
+        assert settings.retrieval_top_k == 5
+        assert settings.vector_index_dir == index_dir
+
+    async def test_rejects_unknown_settings(self, tmp_path):
+        with pytest.raises(ValueError, match="llm_provider"):
+            await retrieval_eval.run_config(
+                {"questions": []}, tmp_path, {"llm_provider": "x"}, "bad"
+            )
@@ -0,0 +1,74 @@
+"""Tests for per-tenant vector shards and fan-out search."""
+
+from app.config import settings
+from app.services.vector_store import ShardedVectorStore
+from tests.conftest import make_chunks
+
+
+def _populate(store: ShardedVectorStore) -> None:
+    store.add_chunks("doc-default", "default.md", make_chunks("default"))
+    store.add_chunks("doc-a", "a.md", make_chunks("acme"), tenant_id="acme")
+    store.add_chunks("doc-b", "b.md", make_chunks("globex"), tenant_id="globex")
+
+
+class TestShardedVectorStore:
+    def test_tenants_get_separate_collections(self, store):
+        _populate(store)
+        assert set(store.shards()) == {"default", "acme", "globex"}
+        assert store.shard("acme").document_ids() == {"doc-a"}
+        assert store.collection_for("acme") == "test_docs-acme"
+        assert store.collection_for(settings.default_tenant) == "test_docs"
+        assert store.count() == 9
+        assert store.document_ids() == {"doc-default", "doc-a", "doc-b"}
+
+    def test_search_only_sees_own_shard(self, store):
+        _populate(store)
+        hits = store.search("globex chunk 1", top_k=10, tenant_id="acme")
+        assert {h["document_id"] for h in hits} == {"doc-a"}
+        assert store.search("anything", tenant_id="unknown") == []
+
+    def test_fan_out_merges_shared_shards(self, store, fake_encoder, monkeypatch):
+        _populate(store)
+        monkeypatch.setattr(settings, "shared_tenants", ["default"])
+        calls = fake_encoder[0].calls
+
+        hits = store.search("default chunk 2", top_k=4, tenant_id="acme")
+        assert len(hits) == 4
+        assert (hits[0]["document_id"], hits[0]["chunk_index"]) == ("doc-default", 2)
+        assert {h["document_id"] for h in hits} <= {"doc-default", "doc-a"}
+        scores = [h["relevance_score"] for h in hits]
+        assert scores == sorted(scores, reverse=True)
+        # One encoder shared by every shard, and the query encoded once
+        assert len(fake_encoder) == 1
+        assert fake_encoder[0].calls == calls + 1
+
+    def test_delete_reaches_every_shard(self, store):
+        _populate(store)
+        store.delete_by_documents(["doc-a", "doc-b"])
+        assert store.document_ids() == {"doc-default"}
+
+    def test_shards_are_rediscovered(self, store):
+        _populate(store)
+        reopened = ShardedVectorStore(collection="test_docs")
+        assert set(reopened.shards()) == {"default", "acme", "globex"}
+        assert reopened.shard("globex").count() == 3
+
+    def test_shard_stats(self, store):
+        _populate(store)
+        stats = {s["tenant_id"]: s for s in store.shard_stats()}
+        assert stats["acme"]["chunks"] == 3
+        assert stats["acme"]["documents"] == 1
+        assert stats["acme"]["storage_bytes"] > 0
+        assert stats["default"]["collection"] == "test_docs"
+
+
+class TestTenantApi:
+    def test_chat_rejects_invalid_tenant(self, client):
+        response = client.post("/api/chat", json={"question": "hi", "tenant_id": "../etc"})
+        assert response.status_code == 422
+
+    def test_admin_shard_stats(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        response = client.get("/api/admin/shards", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert settings.default_tenant in {s["tenant_id"] for s in response.json()["shards"]}
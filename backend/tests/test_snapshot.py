@@ -0,0 +1,155 @@
+"""Tests for snapshot export and restore."""
+
+import io
+import json
+import tarfile
+import time
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.core.exceptions import SnapshotError
+from app.models.database import Document, async_session, init_db
+from app.services import embeddings, snapshot
+from app.services.vector_store import ShardedVectorStore
+from tests.conftest import make_chunks
+
+
+def _store(monkeypatch, path) -> ShardedVectorStore:
+    monkeypatch.setattr(embeddings, "_encoders", {})
+    monkeypatch.setattr(settings, "vector_index_dir", path)
+    store = ShardedVectorStore(collection="snap_docs")
+    monkeypatch.setattr(snapshot, "vector_store", store)
+    return store
+
+
+@pytest.fixture
+async def source(fake_encoder, monkeypatch, tmp_path):
+    """A populated store and matching rows in an otherwise empty database."""
+    monkeypatch.setattr(settings, "snapshot_dir", tmp_path / "snapshots")
+    await init_db()
+    await _clear_documents()
+
+    store = _store(monkeypatch, tmp_path / "source")
+    async with async_session() as db:
+        for document_id, tenant_id, status in (
+            ("doc-a", "default", "ready"),
+            ("doc-b", "acme", "ready"),
+            ("doc-c", "default", "processing"),
+        ):
+            db.add(
+                Document(
+                    id=document_id,
+                    filename=f"{document_id}.md",
+                    tenant_id=tenant_id,
+                    status=status,
+                    chunk_count=3,
+                )
+            )
+            chunks = make_chunks(document_id)
+            store.add_chunks(document_id, f"{document_id}.md", chunks, tenant_id)
+        await db.commit()
+    return store
+
+
+async def _clear_documents() -> None:
+    async with async_session() as db:
+        await db.execute(delete(Document))
+        await db.commit()
+
+
+class TestSnapshot:
+    async def test_round_trip(self, source, monkeypatch, tmp_path):
+        manifest = await snapshot.create_snapshot()
+        assert manifest["version"] == snapshot.SNAPSHOT_VERSION
+        # The processing document has vectors but is not part of a consistent corpus yet
+        assert manifest["documents"] == 2
+        assert manifest["chunks"] == 6
+        assert [s["tenant_id"] for s in manifest["shards"]] == ["acme", "default"]
+        [archive] = snapshot.list_snapshots()
+
+        await _clear_documents()
+        restored = _store(monkeypatch, tmp_path / "replica")
+        await snapshot.restore_snapshot(settings.snapshot_dir / archive["name"])
+
+        assert restored.document_ids() == {"doc-a", "doc-b"}
+        assert restored.shard("acme").document_ids() == {"doc-b"}
+        for query, tenant_id in (("doc-a chunk 1", None), ("doc-b chunk 2", "acme")):
+            expected = source.search(
+                query, top_k=3, exclude_document_ids={"doc-c"}, tenant_id=tenant_id
+            )
+            assert restored.search(query, top_k=3, tenant_id=tenant_id) == expected
+        async with async_session() as db:
+            rows = (await db.execute(select(Document).order_by(Document.id))).scalars().all()
+        assert [(r.id, r.tenant_id, r.status, r.chunk_count) for r in rows] == [
+            ("doc-a", "default", "ready", 3),
+            ("doc-b", "acme", "ready", 3),
+        ]
+
+    async def test_restore_needs_an_empty_node(self, source):
+        await snapshot.create_snapshot()
+        [archive] = snapshot.list_snapshots()
+        with pytest.raises(SnapshotError, match="empty node"):
+            await snapshot.restore_snapshot(settings.snapshot_dir / archive["name"])
+
+    async def test_rejects_newer_format(self, tmp_path):
+        path = tmp_path / "future.snapshot.tar"
+        data = json.dumps({"format": snapshot.SNAPSHOT_FORMAT, "version": 99, "shards": []})
+        with tarfile.open(path, "w") as tar:
+            info = tarfile.TarInfo("snapshot.json")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data.encode()))
+        with pytest.raises(SnapshotError, match="version 99"):
+            await snapshot.restore_snapshot(path)
+
+    async def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "notes.tar"
+        path.write_bytes(b"not a tar")
+        with pytest.raises(SnapshotError, match="Cannot read"):
+            await snapshot.restore_snapshot(path)
+
+    async def test_keeps_newest_archives(self, source, monkeypatch):
+        monkeypatch.setattr(settings, "snapshot_keep", 2)
+        for i in range(3):
+            await snapshot.create_snapshot(
+                settings.snapshot_dir / f"documind-{i}{snapshot.SNAPSHOT_SUFFIX}"
+            )
+        await snapshot.create_snapshot()
+        names = [s["name"] for s in snapshot.list_snapshots()]
+        assert len(names) == 2
+        assert "documind-0.snapshot.tar" not in names
+
+    def test_admin_export_and_download(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        monkeypatch.setattr(settings, "snapshot_dir", tmp_path / "snapshots")
+        headers = {"X-Admin-Token": "secret"}
+
+        assert client.post("/api/admin/snapshots", headers=headers).status_code == 202
+        for _ in range(100):
+            listing = client.get("/api/admin/snapshots", headers=headers).json()
+            if not listing["running"]:
+                break
+            time.sleep(0.05)
+        [archive] = listing["snapshots"]
+
+        response = client.get(f"/api/admin/snapshots/{archive['name']}", headers=headers)
+        assert response.status_code == 200
+        with tarfile.open(fileobj=io.BytesIO(response.content)) as tar:
+            assert snapshot.read_manifest(tar)["format"] == snapshot.SNAPSHOT_FORMAT
+        missing = client.get("/api/admin/snapshots/other.snapshot.tar", headers=headers)
+        assert missing.status_code == 404
+
+    def test_failed_restore_drops_the_new_storage(self, store):
+        service = store.shard(settings.default_tenant)
+        service.add_chunks("doc-a", "doc-a.md", make_chunks("doc-a"))
+        before = sorted(settings.vector_index_dir.iterdir())
+
+        def documents():
+            yield "doc-b", "doc-b.md", make_chunks("doc-b"), [[1.0] * 16] * 3
+            raise ValueError("truncated archive")
+
+        with pytest.raises(ValueError):
+            service.restore(service.embedding_config, None, documents())
+        assert sorted(settings.vector_index_dir.iterdir()) == before
+        assert service.document_ids() == {"doc-a"}
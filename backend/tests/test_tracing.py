@@ -0,0 +1,106 @@
+"""Tests for request-scoped tracing."""
+
+import json
+
+import pytest
+
+from app.core.tracing import (
+    NOOP_SPAN,
+    InMemorySpanExporter,
+    OTLPJsonFileExporter,
+    Tracer,
+    _parse_traceparent,
+    tracer,
+)
+
+
+@pytest.fixture
+def memory_tracer():
+    return Tracer(InMemorySpanExporter(), sample_rate=1.0)
+
+
+class TestTracer:
+    def test_span_outside_trace_is_noop(self, memory_tracer):
+        assert memory_tracer.span("orphan") is NOOP_SPAN
+
+    def test_unsampled_trace_is_noop(self):
+        off = Tracer(InMemorySpanExporter(), sample_rate=0.0)
+        assert not off.should_sample()
+        with off.start_trace("GET /", "a" * 32, sampled=False):
+            assert off.span("child") is NOOP_SPAN
+        assert off.exporter.spans == []
+
+    def test_parent_sampled_flag_forces_sampling(self):
+        off = Tracer(InMemorySpanExporter(), sample_rate=0.0)
+        assert off.should_sample(parent_sampled=True)
+
+    def test_nested_spans_exported_with_root(self, memory_tracer):
+        with memory_tracer.start_trace("GET /", "b" * 32, sampled=True) as root:
+            with memory_tracer.span("outer") as outer:
+                with memory_tracer.span("inner", k=5) as inner:
+                    inner.add_event("first_token")
+
+        spans = {s.name: s for s in memory_tracer.exporter.spans}
+        assert set(spans) == {"GET /", "outer", "inner"}
+        assert spans["outer"].parent_id == root.span_id
+        assert spans["inner"].parent_id == outer.span_id
+        assert spans["inner"].attributes["k"] == 5
+        assert spans["inner"].events[0][0] == "first_token"
+        assert all(s.trace_id == "b" * 32 for s in spans.values())
+
+    def test_span_records_error(self, memory_tracer):
+        with pytest.raises(RuntimeError):
+            with memory_tracer.start_trace("GET /", "c" * 32, sampled=True):
+                with memory_tracer.span("failing"):
+                    raise RuntimeError("boom")
+        failing = next(s for s in memory_tracer.exporter.spans if s.name == "failing")
+        assert failing.error == "RuntimeError: boom"
+
+
+class TestOTLPJsonFileExporter:
+    def test_writes_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        file_tracer = Tracer(OTLPJsonFileExporter(path, "documind-test"), sample_rate=1.0)
+        with file_tracer.start_trace("POST /api/chat", "d" * 32, sampled=True):
+            with file_tracer.span("vector_store.search", top_k=5):
+                pass
+
+        payload = json.loads(path.read_text().strip())
+        scope_spans = payload["resourceSpans"][0]["scopeSpans"][0]
+        names = {s["name"] for s in scope_spans["spans"]}
+        assert names == {"POST /api/chat", "vector_store.search"}
+        child = next(s for s in scope_spans["spans"] if s["name"] == "vector_store.search")
+        assert child["traceId"] == "d" * 32
+        assert "parentSpanId" in child
+        assert {"key": "top_k", "value": {"intValue": "5"}} in child["attributes"]
+
+
+class TestTraceparent:
+    def test_valid_header(self):
+        header = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        assert _parse_traceparent(header) == (
+            "0af7651916cd43dd8448eb211c80319c",
+            "b7ad6b7169203331",
+            True,
+        )
+
+    def test_invalid_header(self):
+        assert _parse_traceparent("garbage") is None
+
+
+class TestTracingMiddleware:
+    def test_response_carries_trace_id(self, client):
+        response = client.get("/api/health")
+        assert len(response.headers["x-trace-id"]) == 32
+
+    def test_incoming_trace_id_propagated(self, client, monkeypatch):
+        exporter = InMemorySpanExporter()
+        monkeypatch.setattr(tracer, "exporter", exporter)
+        trace_id = "0af7651916cd43dd8448eb211c80319c"
+        response = client.get(
+            "/api/health", headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"}
+        )
+        assert response.headers["x-trace-id"] == trace_id
+        [root] = [s for s in exporter.spans if s.name == "GET /api/health"]
+        # The server's root span is a child of the caller's span
+        assert root.parent_id == "b7ad6b7169203331"
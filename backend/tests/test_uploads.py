@@ -0,0 +1,186 @@
+"""Tests for resumable chunked uploads."""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.config import settings
+from app.core.exceptions import UploadRangeConflictError
+from app.services import uploads
+
+
+@pytest.fixture
+def upload_dir(monkeypatch, tmp_path):
+    path = tmp_path / "files"
+    path.mkdir()
+    monkeypatch.setattr(settings, "upload_dir", path)
+    return path
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _put(client, upload_id: str, data: bytes, start: int, total: int, sha: str | None = None):
+    return client.put(
+        f"/api/uploads/{upload_id}",
+        content=data,
+        headers={
+            "Content-Range": f"bytes {start}-{start + len(data) - 1}/{total}",
+            "X-Content-SHA256": sha or _sha(data),
+        },
+    )
+
+
+async def _stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestUploadApi:
+    def test_parts_in_any_order_then_ingest(self, client, upload_dir):
+        content = b"".join(f"Line {i} of a large manual.\n".encode() for i in range(400))
+        created = client.post(
+            "/api/uploads",
+            json={"filename": "manual.txt", "size": len(content), "sha256": _sha(content)},
+        )
+        assert created.status_code == 201
+        session = created.json()
+        assert (session["received"], session["complete"]) == ([], False)
+        upload_id = session["upload_id"]
+
+        part = 4000
+        offsets = list(range(0, len(content), part))
+        for start in reversed(offsets[1:]):
+            response = _put(client, upload_id, content[start : start + part], start, len(content))
+            assert response.status_code == 200
+        status = client.get(f"/api/uploads/{upload_id}").json()
+        assert status["received"] == [[part, len(content)]]
+        assert status["received_bytes"] == len(content) - part
+
+        incomplete = client.post(f"/api/uploads/{upload_id}/complete")
+        assert incomplete.status_code == 409
+        assert f"{part} bytes" in incomplete.json()["detail"]
+
+        last = _put(client, upload_id, content[:part], 0, len(content)).json()
+        assert last["complete"] is True
+
+        done = client.post(f"/api/uploads/{upload_id}/complete")
+        assert done.status_code == 201
+        doc = done.json()
+        assert (doc["filename"], doc["tenant_id"]) == ("manual.txt", "default")
+        stored = upload_dir / f"{doc['id']}_manual.txt"
+        assert stored.read_bytes() == content
+        detail = client.get(f"/api/documents/{doc['id']}").json()
+        assert detail["file_size"] == len(content)
+        # The session is gone once its file has moved to ingestion
+        assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+    def test_rejects_bad_checksum_and_length(self, client, upload_dir):
+        upload_id = client.post("/api/uploads", json={"filename": "a.md", "size": 10}).json()[
+            "upload_id"
+        ]
+        bad = _put(client, upload_id, b"0123456789", 0, 10, sha=_sha(b"other"))
+        assert bad.status_code == 422
+        short = client.put(
+            f"/api/uploads/{upload_id}",
+            content=b"01234",
+            headers={"Content-Range": "bytes 0-9/10", "X-Content-SHA256": _sha(b"01234")},
+        )
+        assert short.status_code == 400
+        assert client.get(f"/api/uploads/{upload_id}").json()["received"] == []
+        assert _put(client, upload_id, b"0123456789", 0, 11).status_code == 400
+        missing = client.put(f"/api/uploads/{upload_id}", content=b"0123456789")
+        assert missing.status_code == 422
+
+    def test_rejects_unsupported_and_oversized_files(self, client, upload_dir, monkeypatch):
+        monkeypatch.setattr(settings, "max_upload_size_mb", 1)
+        response = client.post("/api/uploads", json={"filename": "a.exe", "size": 10})
+        assert response.status_code == 400
+        response = client.post("/api/uploads", json={"filename": "a.pdf", "size": 2 * 1024**2})
+        assert response.status_code == 413
+
+    def test_abort_and_unknown_sessions(self, client, upload_dir):
+        upload_id = client.post("/api/uploads", json={"filename": "a.md", "size": 3}).json()[
+            "upload_id"
+        ]
+        assert client.delete(f"/api/uploads/{upload_id}").status_code == 204
+        assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+        assert client.get("/api/uploads/../../etc").status_code == 404
+        assert client.post("/api/uploads/not-a-uuid/complete").status_code == 404
+
+
+class TestUploadSessions:
+    async def test_received_bytes_are_never_overwritten(self, upload_dir):
+        session = uploads.create_session("a.txt", 8, "default", None)
+        upload_id = session["upload_id"]
+        await uploads.write_part(upload_id, "bytes 0-3/8", _sha(b"abcd"), _stream(b"ab", b"cd"))
+
+        # A verbatim retry is accepted without rewriting
+        retried = await uploads.write_part(
+            upload_id, "bytes 0-3/*", _sha(b"abcd"), _stream(b"abcd")
+        )
+        assert retried["received"] == [(0, 4)]
+        with pytest.raises(UploadRangeConflictError):
+            await uploads.write_part(upload_id, "bytes 2-5/8", _sha(b"XXXX"), _stream(b"XXXX"))
+
+        await uploads.write_part(upload_id, "bytes 4-7/8", _sha(b"efgh"), _stream(b"efgh"))
+        _, path = await uploads.finalize(upload_id, "doc-1")
+        assert path.read_bytes() == b"abcdefgh"
+
+    async def test_concurrent_parts(self, upload_dir, monkeypatch):
+        monkeypatch.setattr(uploads, "_WRITE_BUFFER", 16)
+        content = os.urandom(1000)
+        upload_id = uploads.create_session("a.txt", 1000, "default", _sha(content))["upload_id"]
+        await asyncio.gather(
+            *(
+                uploads.write_part(
+                    upload_id,
+                    f"bytes {s}-{s + 99}/1000",
+                    _sha(content[s : s + 100]),
+                    _stream(content[s : s + 50], content[s + 50 : s + 100]),
+                )
+                for s in range(0, 1000, 100)
+            )
+        )
+        _, path = await uploads.finalize(upload_id, "doc-2")
+        assert path.read_bytes() == content
+
+    async def test_overlapping_parts_in_flight_conflict(self, upload_dir):
+        upload_id = uploads.create_session("a.txt", 8, "default", None)["upload_id"]
+
+        async def slow(data: bytes):
+            for i in range(len(data)):
+                await asyncio.sleep(0.01)
+                yield data[i : i + 1]
+
+        results = await asyncio.gather(
+            uploads.write_part(upload_id, "bytes 0-5/8", _sha(b"abcdef"), slow(b"abcdef")),
+            uploads.write_part(upload_id, "bytes 2-7/8", _sha(b"XXXXXX"), slow(b"XXXXXX")),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], UploadRangeConflictError)
+        assert results[0]["received"] == [(0, 6)]
+        # The rejected part left no claim behind, so the rest can still be sent
+        await uploads.write_part(upload_id, "bytes 6-7/8", _sha(b"gh"), _stream(b"gh"))
+        _, path = await uploads.finalize(upload_id, "doc-3")
+        assert path.read_bytes() == b"abcdefgh"
+
+    async def test_finalized_name_stays_in_upload_dir(self, upload_dir):
+        upload_id = uploads.create_session("reports/q1.txt", 2, "default", None)["upload_id"]
+        await uploads.write_part(upload_id, "bytes 0-1/2", _sha(b"q1"), _stream(b"q1"))
+        _, path = await uploads.finalize(upload_id, "doc-4")
+        assert path == upload_dir / "doc-4_q1.txt"
+
+    def test_idle_sessions_expire(self, upload_dir, monkeypatch):
+        fresh = uploads.create_session("a.txt", 5, "default", None)["upload_id"]
+        stale = uploads.create_session("b.txt", 5, "default", None)["upload_id"]
+        old = time.time() - settings.upload_session_ttl_s - 60
+        for path in (uploads.sessions_dir() / stale).iterdir():
+            os.utime(path, (old, old))
+
+        assert uploads.expire_sessions() == 1
+        assert {p.name for p in uploads.sessions_dir().iterdir()} == {fresh}
@@ -0,0 +1,250 @@
+"""Contract tests shared by every vector backend, plus NumPy-engine specifics."""
+
+import numpy as np
+import pytest
+
+from app.services.vector_backends.chroma import ChromaBackend
+from app.services.vector_backends.numpy_index import NumpyBackend
+from tests.conftest import make_chunks
+
+DIM = 8
+
+
+def _embeddings(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+@pytest.fixture(params=["numpy", "numpy-int8", "chroma"])
+def backend(request, tmp_path):
+    if request.param == "numpy":
+        return NumpyBackend(tmp_path / "index")
+    if request.param == "numpy-int8":
+        return NumpyBackend(tmp_path / "index", quantization="int8")
+    return ChromaBackend(tmp_path / "chroma", "test_collection")
+
+
+class TestBackendContract:
+    def test_empty(self, backend):
+        assert backend.count() == 0
+        assert backend.search(np.ones(DIM), 5) == []
+        assert backend.document_ids() == set()
+
+    def test_add_and_search(self, backend):
+        vectors = _embeddings(4, seed=1)
+        backend.add("doc-a", "a.md", make_chunks("ünïcode", 4), vectors)
+        assert backend.count() == 4
+
+        hits = backend.search(vectors[2], 3)
+        assert len(hits) == 3
+        assert hits[0].document_id == "doc-a"
+        assert hits[0].chunk_index == 2
+        assert hits[0].content == "ünïcode chunk 2"
+        assert hits[0].page_or_section == "Page 3"
+        assert hits[0].score == pytest.approx(1.0, abs=1e-4)
+        assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+    def test_filters(self, backend):
+        backend.add("doc-a", "a.md", make_chunks("ünïcode", 3), _embeddings(3, seed=1))
+        backend.add("doc-b", "b.md", make_chunks("ünïcode", 3), _embeddings(3, seed=2))
+
+        excluded = backend.search(np.ones(DIM), 10, exclude_document_ids={"doc-a"})
+        assert {h.document_id for h in excluded} == {"doc-b"}
+
+        scoped = backend.search(np.ones(DIM), 10, document_ids={"doc-a"})
+        assert {h.document_id for h in scoped} == {"doc-a"}
+        assert len(scoped) == 3
+
+    def test_delete(self, backend):
+        backend.add("doc-a", "a.md", make_chunks("ünïcode", 3), _embeddings(3, seed=1))
+        backend.add("doc-b", "b.md", make_chunks("ünïcode", 2), _embeddings(2, seed=2))
+        backend.delete(["doc-a", "unknown"])
+        assert backend.count() == 2
+        assert backend.document_ids() == {"doc-b"}
+        assert {h.document_id for h in backend.search(np.ones(DIM), 10)} == {"doc-b"}
+
+    def test_document_vectors_follow_chunk_order(self, backend):
+        vectors = _embeddings(3, seed=4)
+        backend.add("doc-a", "a.md", make_chunks("ünïcode", 3)[::-1], vectors[::-1])
+        stored = backend.document_vectors("doc-a")
+        # Backends may normalize on insert; the direction is what must survive
+        stored = stored / np.linalg.norm(stored, axis=1, keepdims=True)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.testing.assert_allclose(stored, normalized, atol=1e-5)
+        assert backend.document_vectors("missing") is None
+
+    def test_add_many_then_export(self, backend):
+        backend.add("doc-old", "old.md", make_chunks("ünïcode", 1), _embeddings(1, seed=5))
+        vectors = _embeddings(5, seed=6)
+        backend.add_many(
+            [
+                ("doc-a", "a.md", make_chunks("ünïcode", 3), vectors[:3]),
+                ("doc-empty", "e.md", [], np.empty((0, DIM))),
+                ("doc-b", "b.md", make_chunks("other ünïcode", 2), vectors[3:]),
+            ]
+        )
+        assert backend.count() == 6
+        exported = {doc: rest for doc, *rest in backend.export_documents()}
+        assert set(exported) == {"doc-a", "doc-b", "doc-old"}
+        name, chunks, stored = exported["doc-b"]
+        assert name == "b.md"
+        assert [c["text"] for c in chunks] == ["other ünïcode chunk 0", "other ünïcode chunk 1"]
+        assert chunks[1]["page_or_section"] == "Page 2"
+        stored = stored / np.linalg.norm(stored, axis=1, keepdims=True)
+        normalized = vectors[3:] / np.linalg.norm(vectors[3:], axis=1, keepdims=True)
+        np.testing.assert_allclose(stored, normalized, atol=1e-5)
+        assert backend.search(vectors[4], 1)[0].document_id == "doc-b"
+
+
+class TestNumpyBackend:
+    def test_exact_top_k_matches_brute_force(self, tmp_path):
+        backend = NumpyBackend(tmp_path)
+        vectors = _embeddings(200, seed=3)
+        backend.add("doc", "doc.md", make_chunks("ünïcode", 200), vectors)
+
+        query = _embeddings(1, seed=4)[0]
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(normalized @ (query / np.linalg.norm(query)))[::-1][:10]
+        assert [h.chunk_index for h in backend.search(query, 10)] == expected.tolist()
+
+    def test_persists_across_reopen(self, tmp_path):
+        vectors = _embeddings(5, seed=5)
+        NumpyBackend(tmp_path).add("doc", "doc.md", make_chunks("ünïcode", 5), vectors)
+
+        reopened = NumpyBackend(tmp_path)
+        assert reopened.count() == 5
+        assert reopened.search(vectors[4], 1)[0].chunk_index == 4
+
+    def test_delete_compacts_and_survives_reopen(self, tmp_path):
+        backend = NumpyBackend(tmp_path)
+        backend.add("doc-a", "a.md", make_chunks("a ünïcode", 6), _embeddings(6, seed=6))
+        keep = _embeddings(2, seed=7)
+        backend.add("doc-b", "b.md", make_chunks("b ünïcode", 2), keep)
+        backend.delete(["doc-a"])  # 75% dead → files rewritten
+
+        reopened = NumpyBackend(tmp_path)
+        assert reopened.count() == 2
+        hit = reopened.search(keep[1], 1)[0]
+        assert (hit.document_id, hit.content) == ("doc-b", "b ünïcode chunk 1")
+        # The rewrite went to a new generation of files and the old one is gone
+        assert {p.name for p in tmp_path.iterdir()} == {"meta.npz", "vectors.1.f32", "texts.1.bin"}
+
+    def test_interrupted_compaction_keeps_the_previous_index(self, tmp_path, monkeypatch):
+        backend = NumpyBackend(tmp_path)
+        backend.add("doc-a", "a.md", make_chunks("a", 6), _embeddings(6, seed=6))
+        keep = _embeddings(2, seed=7)
+        backend.add("doc-b", "b.md", make_chunks("b", 2), keep)
+
+        def crash(state):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(backend, "_write_meta", crash)
+        with pytest.raises(OSError):
+            backend.delete(["doc-a"])
+        # As if the process died after writing the new generation but before the meta
+        (tmp_path / "vectors.1.f32").write_bytes(b"partial")
+
+        reopened = NumpyBackend(tmp_path)
+        assert reopened.document_ids() == {"doc-a", "doc-b"}
+        hit = reopened.search(keep[1], 1)[0]
+        assert (hit.document_id, hit.content) == ("doc-b", "b chunk 1")
+        assert not (tmp_path / "vectors.1.f32").exists()
+
+    def test_readd_replaces_document(self, tmp_path):
+        backend = NumpyBackend(tmp_path)
+        backend.add("doc", "doc.md", make_chunks("ünïcode", 3), _embeddings(3, seed=8))
+        backend.add("doc", "doc.md", make_chunks("new ünïcode", 2), _embeddings(2, seed=9))
+        assert backend.count() == 2
+        assert all(h.content.startswith("new") for h in backend.search(np.ones(DIM), 10))
+
+    def test_grows_past_initial_capacity(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.services.vector_backends.numpy_index._MIN_CAPACITY", 4)
+        backend = NumpyBackend(tmp_path)
+        for i in range(5):
+            backend.add(f"doc-{i}", "f.md", make_chunks("ünïcode", 3), _embeddings(3, seed=i))
+        assert backend.count() == 15
+        assert len(backend.document_ids()) == 5
+
+    def test_dimension_mismatch(self, tmp_path):
+        backend = NumpyBackend(tmp_path)
+        backend.add("doc", "doc.md", make_chunks("ünïcode", 1), _embeddings(1, seed=1))
+        with pytest.raises(ValueError):
+            backend.add("other", "o.md", make_chunks("ünïcode", 1), np.ones((1, DIM + 1)))
+
+
+    def test_failed_batch_leaves_index_unchanged(self, tmp_path):
+        backend = NumpyBackend(tmp_path)
+        backend.add("doc", "doc.md", make_chunks("kept", 2), _embeddings(2, seed=1))
+        texts_size = (tmp_path / "texts.bin").stat().st_size
+        with pytest.raises(ValueError, match="twice"):
+            backend.add_many(
+                [
+                    ("new", "n.md", make_chunks("new", 2), _embeddings(2, seed=2)),
+                    ("new", "n.md", make_chunks("again", 1), _embeddings(1, seed=3)),
+                ]
+            )
+        assert (tmp_path / "texts.bin").stat().st_size == texts_size
+        assert backend.document_ids() == {"doc"}
+
+        backend.add("later", "l.md", make_chunks("later", 1), _embeddings(1, seed=4))
+        reopened = NumpyBackend(tmp_path)
+        assert reopened.document_ids() == {"doc", "later"}
+        exported = reopened.export_documents()
+        texts = {doc: [c["text"] for c in chunks] for doc, _, chunks, _ in exported}
+        assert texts["later"] == ["later chunk 0"]
+        assert texts["doc"] == ["kept chunk 0", "kept chunk 1"]
+
+class TestInt8Quantization:
+    def test_rescored_results_match_exact_search(self, tmp_path):
+        vectors = _embeddings(500, seed=10)
+        exact = NumpyBackend(tmp_path / "exact")
+        quantized = NumpyBackend(tmp_path / "int8", quantization="int8", rescore_factor=4)
+        exact.add("doc", "doc.md", make_chunks("ünïcode", 500), vectors)
+        quantized.add("doc", "doc.md", make_chunks("ünïcode", 500), vectors)
+
+        for seed in range(20, 30):
+            query = _embeddings(1, seed=seed)[0]
+            expected = [h.chunk_index for h in exact.search(query, 5)]
+            hits = quantized.search(query, 5)
+            assert len(set(expected) & {h.chunk_index for h in hits}) >= 4
+            # Scores come from the float32 vectors, not the codes
+            top = exact.search(query, 1)[0]
+            if hits[0].chunk_index == top.chunk_index:
+                assert hits[0].score == pytest.approx(top.score, abs=1e-5)
+
+    def test_out_of_range_batch_recalibrates(self, tmp_path):
+        backend = NumpyBackend(tmp_path, quantization="int8")
+        backend.add("small", "s.md", make_chunks("ünïcode", 3), _embeddings(3, seed=1) * 0.01)
+        outlier = np.zeros((1, DIM), dtype=np.float32)
+        outlier[0, 0] = 1.0
+        backend.add("big", "b.md", make_chunks("ünïcode", 1), outlier)
+        assert backend.search(outlier[0], 1)[0].document_id == "big"
+
+    def test_reopen_switches_precision(self, tmp_path):
+        vectors = _embeddings(20, seed=11)
+        NumpyBackend(tmp_path).add("doc", "doc.md", make_chunks("ünïcode", 20), vectors)
+
+        quantized = NumpyBackend(tmp_path, quantization="int8")
+        assert (tmp_path / "codes.i8").exists()
+        assert quantized.search(vectors[7], 1)[0].chunk_index == 7
+        assert quantized.memory_footprint()["scanned_bytes"] == 20 * DIM
+
+        plain = NumpyBackend(tmp_path)
+        assert not (tmp_path / "codes.i8").exists()
+        assert plain.search(vectors[7], 1)[0].chunk_index == 7
+
+    def test_compaction_keeps_codes_aligned(self, tmp_path):
+        backend = NumpyBackend(tmp_path, quantization="int8")
+        backend.add("gone", "g.md", make_chunks("ünïcode", 6), _embeddings(6, seed=12))
+        keep = _embeddings(3, seed=13)
+        backend.add("kept", "k.md", make_chunks("kept ünïcode", 3), keep)
+        backend.delete(["gone"])
+
+        reopened = NumpyBackend(tmp_path, quantization="int8")
+        for i in range(3):
+            hit = reopened.search(keep[i], 1)[0]
+            assert (hit.document_id, hit.chunk_index) == ("kept", i)
+
+    def test_unknown_quantization(self, tmp_path):
+        with pytest.raises(ValueError):
+            NumpyBackend(tmp_path, quantization="int4")
+
@@ -0,0 +1,85 @@
+"""Tests for the vector service and the pooled client API workers use in remote mode."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import vector_admin, vectors
+from app.config import settings
+from app.core.exceptions import VectorServiceError, VectorServiceUnavailableError
+from app.services.vector_client import RemoteVectorStore
+from app.services.vector_store import build_vector_store
+from app.vector_service import app as service_app
+from tests.conftest import make_chunks
+
+
+@pytest.fixture
+def local_store(store, monkeypatch):
+    monkeypatch.setattr(vectors, "vector_store", store)
+    monkeypatch.setattr(vector_admin, "vector_store", store)
+    return store
+
+
+@pytest.fixture
+def remote(local_store, monkeypatch):
+    """A client whose HTTP calls reach the vector service app in-process."""
+    monkeypatch.setattr(settings, "vector_service_token", "service-secret")
+    store = RemoteVectorStore("http://vectors", token="service-secret")
+    store._client = TestClient(
+        service_app, base_url="http://vectors", headers={"X-Vector-Service-Token": "service-secret"}
+    )
+    return store
+
+
+class TestRemoteVectorStore:
+    def test_round_trip(self, remote, local_store):
+        assert remote.add_chunks("doc-1", "one.md", make_chunks("alpha")) == 3
+        assert remote.add_chunks("doc-2", "two.md", make_chunks("beta"), tenant_id="acme") == 3
+        assert remote.count() == 6
+        assert remote.document_ids() == {"doc-1", "doc-2"}
+        assert local_store.shard("acme").document_ids() == {"doc-2"}
+
+        hits = remote.search("alpha chunk 1", top_k=2)
+        assert hits == local_store.search("alpha chunk 1", top_k=2)
+        assert hits[0]["chunk_index"] == 1
+        assert remote.search("beta chunk 0", tenant_id="acme")[0]["document_id"] == "doc-2"
+        assert remote.search("alpha chunk 1", exclude_document_ids={"doc-1"}) == []
+
+        remote.delete_by_document("doc-1")
+        assert remote.document_ids() == {"doc-2"}
+
+    def test_rejects_wrong_token(self, remote):
+        remote._client.headers["X-Vector-Service-Token"] = "wrong"
+        with pytest.raises(VectorServiceError) as exc_info:
+            remote.count()
+        assert exc_info.value.status_code == 502
+        assert "401" in exc_info.value.detail
+
+    def test_unreachable_service(self):
+        store = RemoteVectorStore("http://127.0.0.1:9", timeout_s=1.0, retries=0)
+        with pytest.raises(VectorServiceUnavailableError):
+            store.count()
+        assert store.needs_rebuild() is False
+
+    def test_mode_selection(self, monkeypatch):
+        monkeypatch.setattr(settings, "vector_store_mode", "remote")
+        assert isinstance(build_vector_store(), RemoteVectorStore)
+        monkeypatch.setattr(settings, "vector_store_mode", "sideways")
+        with pytest.raises(ValueError, match="sideways"):
+            build_vector_store()
+
+
+class TestAdminProxy:
+    def test_forwards_admin_calls(self, remote, local_store, monkeypatch):
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        remote.add_chunks("doc-1", "one.md", make_chunks("alpha"), tenant_id="acme")
+        status_code, body, content_type = remote.forward(
+            "GET", "/api/admin/shards", params={}, content=b"", headers={"X-Admin-Token": "secret"}
+        )
+        assert status_code == 200
+        assert content_type == "application/json"
+        assert b'"acme"' in body
+
+        status_code, _, _ = remote.forward(
+            "GET", "/api/admin/shards", params={}, content=b"", headers={"X-Admin-Token": "nope"}
+        )
+        assert status_code == 401
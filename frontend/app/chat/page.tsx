@@ -3,7 +3,7 @@
 import { useCallback, useEffect, useRef, useState } from "react";
 import Link from "next/link";
 import { MessageSquare, Upload, Sparkles } from "lucide-react";
-import { streamChat, checkHealth } from "@/lib/api";
+import { createChatSession, streamChat, checkHealth } from "@/lib/api";
 import type { ChatUIMessage, SourceChunk } from "@/lib/types";
 import { generateId } from "@/lib/helpers";
 import { ScrollArea } from "@/components/ui/scroll-area";
@@ -23,6 +23,8 @@ export default function ChatPage() {
   const [isStreaming, setIsStreaming] = useState(false);
   const [hasDocuments, setHasDocuments] = useState<boolean | null>(null);
   const scrollRef = useRef<HTMLDivElement>(null);
+  // History lives on the server; each turn sends only the question and this ID
+  const sessionIdRef = useRef<string | null>(null);
 
   // Check if there are documents
   useEffect(() => {
@@ -58,67 +60,72 @@ export default function ChatPage() {
       setMessages((prev) => [...prev, userMessage, assistantMessage]);
       setIsStreaming(true);
 
-      // Build chat history (exclude the current exchange)
-      const chatHistory = messages
-        .filter((m) => !m.isStreaming)
-        .map((m) => ({ role: m.role, content: m.content }));
+      const showError = (error: string) => {
+        setMessages((prev) => {
+          const next = [...prev];
+          const last = next[next.length - 1];
+          if (last && last.role === "assistant") {
+            next[next.length - 1] = {
+              ...last,
+              content: `Error: ${error}`,
+              isStreaming: false,
+            };
+          }
+          return next;
+        });
+        setIsStreaming(false);
+      };
 
-      streamChat(
-        { question, chat_history: chatHistory },
-        {
-          onToken: (token: string) => {
-            setMessages((prev) => {
-              const next = [...prev];
-              const last = next[next.length - 1];
-              if (last && last.role === "assistant") {
-                next[next.length - 1] = {
-                  ...last,
-                  content: last.content + token,
-                };
-              }
-              return next;
-            });
-          },
-          onSources: (sources: SourceChunk[]) => {
-            setMessages((prev) => {
-              const next = [...prev];
-              const last = next[next.length - 1];
-              if (last && last.role === "assistant") {
-                next[next.length - 1] = { ...last, sources };
-              }
-              return next;
-            });
-          },
-          onDone: () => {
-            setMessages((prev) => {
-              const next = [...prev];
-              const last = next[next.length - 1];
-              if (last && last.role === "assistant") {
-                next[next.length - 1] = { ...last, isStreaming: false };
-              }
-              return next;
-            });
-            setIsStreaming(false);
-          },
-          onError: (error: string) => {
-            setMessages((prev) => {
-              const next = [...prev];
-              const last = next[next.length - 1];
-              if (last && last.role === "assistant") {
-                next[next.length - 1] = {
-                  ...last,
-                  content: `Error: ${error}`,
-                  isStreaming: false,
-                };
-              }
-              return next;
-            });
-            setIsStreaming(false);
-          },
-        }
-      );
+      const ask = async () => {
+        sessionIdRef.current ??= (await createChatSession()).session_id;
+        await streamChat(
+          { question, session_id: sessionIdRef.current },
+          {
+            onToken: (token: string) => {
+              setMessages((prev) => {
+                const next = [...prev];
+                const last = next[next.length - 1];
+                if (last && last.role === "assistant") {
+                  next[next.length - 1] = {
+                    ...last,
+                    content: last.content + token,
+                  };
+                }
+                return next;
+              });
+            },
+            onSources: (sources: SourceChunk[], truncated: boolean) => {
+              setMessages((prev) => {
+                const next = [...prev];
+                const last = next[next.length - 1];
+                if (last && last.role === "assistant") {
+                  // The server stopped the answer at the request's time limit
+                  const content = truncated
+                    ? `${last.content} … (answer cut short)`
+                    : last.content;
+                  next[next.length - 1] = { ...last, content, sources };
+                }
+                return next;
+              });
+            },
+            onDone: () => {
+              setMessages((prev) => {
+                const next = [...prev];
+                const last = next[next.length - 1];
+                if (last && last.role === "assistant") {
+                  next[next.length - 1] = { ...last, isStreaming: false };
+                }
+                return next;
+              });
+              setIsStreaming(false);
+            },
+            onError: showError,
+          }
+        );
+      };
+      ask().catch((e: Error) => showError(e.message));
     },
-    [isStreaming, messages]
+    [isStreaming]
   );
 
   // Empty state: no documents
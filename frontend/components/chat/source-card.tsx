@@ -36,6 +36,11 @@ export function SourceCard({ source }: SourceCardProps) {
           <p className="mt-1 text-xs leading-relaxed text-muted-foreground">
             {expanded ? source.content : preview}
           </p>
+          {source.also_in && source.also_in.length > 0 && (
+            <p className="mt-1 truncate text-[10px] text-muted-foreground">
+              Also in {source.also_in.join(", ")}
+            </p>
+          )}
         </div>
         {source.content.length > 200 && (
           <div className="shrink-0 pt-0.5">
@@ -1,10 +1,10 @@
 "use client";
 
-import { useEffect, useRef } from "react";
+import { useEffect } from "react";
 import { Loader2 } from "lucide-react";
 import { Badge } from "@/components/ui/badge";
 import type { DocumentStatus } from "@/lib/types";
-import { getDocument } from "@/lib/api";
+import { watchDocument } from "@/lib/api";
 
 interface ProcessingStatusProps {
   status: DocumentStatus;
@@ -39,25 +39,22 @@ export function ProcessingStatus({
   documentId,
   onStatusChange,
 }: ProcessingStatusProps) {
-  const intervalRef = useRef<ReturnType<typeof setInterval>>(null);
-
   useEffect(() => {
     if (status !== "processing" && status !== "uploading") return;
 
-    intervalRef.current = setInterval(async () => {
-      try {
-        const doc = await getDocument(documentId);
-        if (doc.status !== status) {
-          onStatusChange(doc.status);
-        }
-      } catch {
-        // Silently retry on next interval
-      }
-    }, 3000);
+    // Pushed status changes; the stream ends once the document is ready or failed
+    const controller = new AbortController();
+    watchDocument(
+      documentId,
+      {
+        onStatus: (event) => {
+          if (event.status !== status) onStatusChange(event.status);
+        },
+      },
+      controller.signal,
+    );
 
-    return () => {
-      if (intervalRef.current) clearInterval(intervalRef.current);
-    };
+    return () => controller.abort();
   }, [status, documentId, onStatusChange]);
 
   const config = statusConfig[status];
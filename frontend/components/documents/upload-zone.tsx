@@ -3,7 +3,7 @@
 import { useCallback, useRef, useState } from "react";
 import { Upload, FileUp, CheckCircle2, AlertCircle } from "lucide-react";
 import { cn } from "@/lib/utils";
-import { uploadDocument } from "@/lib/api";
+import { uploadDocument, uploadResumable } from "@/lib/api";
 import type { UploadProgress } from "@/lib/types";
 import { formatFileSize } from "@/lib/helpers";
 
@@ -14,7 +14,9 @@ const ALLOWED_TYPES = [
   "text/markdown",
 ];
 const ALLOWED_EXTENSIONS = [".pdf", ".docx", ".txt", ".md"];
-const MAX_SIZE = 10 * 1024 * 1024; // 10 MB
+const MAX_SIZE = 500 * 1024 * 1024; // 500 MB
+// Larger files go through a resumable upload session in checksummed parts
+const SINGLE_REQUEST_MAX = 10 * 1024 * 1024;
 
 interface UploadZoneProps {
   onUploadComplete: () => void;
@@ -31,7 +33,7 @@ export function UploadZone({ onUploadComplete }: UploadZoneProps) {
       return `Unsupported file type. Allowed: ${ALLOWED_EXTENSIONS.join(", ")}`;
     }
     if (file.size > MAX_SIZE) {
-      return `File too large (${formatFileSize(file.size)}). Maximum: 10 MB`;
+      return `File too large (${formatFileSize(file.size)}). Maximum: 500 MB`;
     }
     return null;
   };
@@ -66,7 +68,8 @@ export function UploadZone({ onUploadComplete }: UploadZoneProps) {
           return next;
         });
 
-        uploadDocument(upload.file, (pct) => {
+        const send = upload.file.size > SINGLE_REQUEST_MAX ? uploadResumable : uploadDocument;
+        send(upload.file, (pct) => {
           setUploads((prev) => {
             const next = [...prev];
             const target = next[globalIdx];
@@ -151,7 +154,7 @@ export function UploadZone({ onUploadComplete }: UploadZoneProps) {
             Drop files here or click to upload
           </p>
           <p className="mt-1 text-xs text-muted-foreground">
-            PDF, DOCX, TXT, MD up to 10 MB
+            PDF, DOCX, TXT, MD up to 500 MB
           </p>
         </div>
         <input
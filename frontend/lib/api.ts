@@ -4,13 +4,22 @@
  */
 
 import type {
+  BulkDeleteResponse,
   ChatRequest,
+  ChatSessionResponse,
   DocumentDeleteResponse,
   DocumentDetail,
+  DocumentListParams,
   DocumentListResponse,
+  DocumentStatusEvent,
   DocumentUploadResponse,
   HealthResponse,
+  IngestionPriority,
   SourceChunk,
+  SSEErrorEvent,
+  SSESourcesEvent,
+  SSETokenEvent,
+  UploadSessionResponse,
 } from "./types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api";
@@ -45,6 +54,8 @@ async function fetchJson<T>(path: string, init?: RequestInit): Promise<T> {
 export async function uploadDocument(
   file: File,
   onProgress?: (pct: number) => void,
+  tenantId?: string,
+  priority?: IngestionPriority,
 ): Promise<DocumentUploadResponse> {
   return new Promise((resolve, reject) => {
     const xhr = new XMLHttpRequest();
@@ -69,12 +80,77 @@ export async function uploadDocument(
 
     const formData = new FormData();
     formData.append("file", file);
+    if (tenantId) formData.append("tenant_id", tenantId);
+    if (priority) formData.append("priority", priority);
     xhr.send(formData);
   });
 }
 
-export async function listDocuments(): Promise<DocumentListResponse> {
-  return fetchJson("/documents");
+const PART_SIZE = 8 * 1024 * 1024;
+const PART_RETRIES = 5;
+
+async function sha256Hex(data: ArrayBuffer): Promise<string> {
+  const digest = await crypto.subtle.digest("SHA-256", data);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+/**
+ * Upload a large file as checksummed parts of a resumable session.
+ * Failed parts are retried; parts already received are skipped after a reconnect.
+ */
+export async function uploadResumable(
+  file: File,
+  onProgress?: (pct: number) => void,
+  tenantId?: string,
+): Promise<DocumentUploadResponse> {
+  let session = await fetchJson<UploadSessionResponse>("/uploads", {
+    method: "POST",
+    body: JSON.stringify({ filename: file.name, size: file.size, tenant_id: tenantId }),
+  });
+  const report = () =>
+    onProgress?.(Math.round((session.received_bytes / file.size) * 100));
+
+  for (let start = 0; start < file.size; start += PART_SIZE) {
+    const end = Math.min(start + PART_SIZE, file.size);
+    if (session.received.some(([s, e]) => s <= start && end <= e)) continue;
+
+    const part = await file.slice(start, end).arrayBuffer();
+    const checksum = await sha256Hex(part);
+    for (let attempt = 1; ; attempt++) {
+      try {
+        session = await fetchJson<UploadSessionResponse>(`/uploads/${session.upload_id}`, {
+          method: "PUT",
+          body: part,
+          headers: {
+            "Content-Type": "application/octet-stream",
+            "Content-Range": `bytes ${start}-${end - 1}/${file.size}`,
+            "X-Content-SHA256": checksum,
+          },
+        });
+        break;
+      } catch (err) {
+        if (attempt >= PART_RETRIES) throw err;
+        await new Promise((resolve) => setTimeout(resolve, 1000 * attempt));
+        // The part may have landed before the connection dropped
+        session = await fetchJson(`/uploads/${session.upload_id}`).catch(() => session);
+        if (session.received.some(([s, e]) => s <= start && end <= e)) break;
+      }
+    }
+    report();
+  }
+
+  return fetchJson(`/uploads/${session.upload_id}/complete`, { method: "POST" });
+}
+
+export async function listDocuments(
+  params: DocumentListParams = {},
+): Promise<DocumentListResponse> {
+  const query = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined) query.set(key, String(value));
+  }
+  const qs = query.toString();
+  return fetchJson(qs ? `/documents?${qs}` : "/documents");
 }
 
 export async function getDocument(id: string): Promise<DocumentDetail> {
@@ -85,39 +161,71 @@ export async function deleteDocument(id: string): Promise<DocumentDeleteResponse
   return fetchJson(`/documents/${id}`, { method: "DELETE" });
 }
 
-// ── Chat (SSE Streaming) ──────────────────────────────
+export async function bulkDeleteDocuments(ids: string[]): Promise<BulkDeleteResponse> {
+  return fetchJson("/documents/bulk-delete", {
+    method: "POST",
+    body: JSON.stringify({ document_ids: ids }),
+  });
+}
 
-export interface StreamCallbacks {
-  onToken: (token: string) => void;
-  onSources: (sources: SourceChunk[]) => void;
-  onDone: () => void;
-  onError: (error: string) => void;
+export interface DocumentWatchCallbacks {
+  onStatus: (event: DocumentStatusEvent) => void;
+  onError?: (error: string) => void;
 }
 
-export async function streamChat(
-  request: ChatRequest,
-  callbacks: StreamCallbacks,
+const WATCH_RETRY_MS = 3000;
+
+/**
+ * Follow a document's status over SSE until it is ready, failed or deleted.
+ * Dropped connections are resumed with Last-Event-ID; abort the signal to stop.
+ */
+export async function watchDocument(
+  id: string,
+  callbacks: DocumentWatchCallbacks,
+  signal: AbortSignal,
 ): Promise<void> {
-  const res = await fetch(`${API_BASE}/chat`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify(request),
-  });
+  let lastEventId: string | undefined;
+  let finished = false;
 
-  if (!res.ok) {
-    const body = await res.json().catch(() => ({ detail: res.statusText }));
-    callbacks.onError(body.detail || "Chat request failed");
-    return;
+  while (!finished && !signal.aborted) {
+    try {
+      const res = await fetch(`${API_BASE}/documents/${id}/events`, {
+        headers: lastEventId ? { "Last-Event-ID": lastEventId } : {},
+        signal,
+      });
+      if (!res.ok || !res.body) {
+        const body = await res.json().catch(() => ({ detail: res.statusText }));
+        callbacks.onError?.(body.detail || "Status stream failed");
+        return;
+      }
+      await readEvents(res.body, (event, data, eventId) => {
+        if (eventId) lastEventId = eventId;
+        if (event === "status") callbacks.onStatus(data as DocumentStatusEvent);
+        if (event === "done") finished = true;
+      });
+    } catch {
+      if (signal.aborted) return;
+    }
+    if (!finished) {
+      await new Promise((resolve) => setTimeout(resolve, WATCH_RETRY_MS));
+    }
   }
+}
 
-  const reader = res.body?.getReader();
-  if (!reader) {
-    callbacks.onError("No response stream");
-    return;
-  }
+// ── SSE parsing ───────────────────────────────────────
+
+type SseHandler = (event: string, data: unknown, id?: string) => void;
+
+async function readEvents(
+  body: ReadableStream<Uint8Array>,
+  onEvent: SseHandler,
+): Promise<void> {
+  const reader = body.getReader();
 
   const decoder = new TextDecoder();
   let buffer = "";
+  let eventType = "";
+  let eventId: string | undefined;
 
   while (true) {
     const { done, value } = await reader.read();
@@ -127,36 +235,83 @@ export async function streamChat(
     const lines = buffer.split("\n");
     buffer = lines.pop() || "";
 
-    let eventType = "";
     for (const line of lines) {
-      if (line.startsWith("event: ")) {
+      if (line.startsWith("id: ")) {
+        eventId = line.slice(4).trim();
+      } else if (line.startsWith("event: ")) {
         eventType = line.slice(7).trim();
       } else if (line.startsWith("data: ")) {
-        const data = line.slice(6);
         try {
-          const parsed = JSON.parse(data);
-          switch (eventType) {
-            case "token":
-              callbacks.onToken(parsed.token);
-              break;
-            case "sources":
-              callbacks.onSources(parsed.sources);
-              break;
-            case "done":
-              callbacks.onDone();
-              break;
-            case "error":
-              callbacks.onError(parsed.detail);
-              break;
-          }
+          onEvent(eventType, JSON.parse(line.slice(6)), eventId);
         } catch {
           // Skip malformed events
         }
+      } else if (line === "") {
+        eventType = "";
+        eventId = undefined;
       }
     }
   }
 }
 
+// ── Chat (SSE Streaming) ──────────────────────────────
+
+export interface StreamCallbacks {
+  onToken: (token: string) => void;
+  onSources: (sources: SourceChunk[], truncated: boolean) => void;
+  onDone: () => void;
+  onError: (error: string) => void;
+}
+
+export async function createChatSession(tenantId?: string): Promise<ChatSessionResponse> {
+  return fetchJson("/chat/sessions", {
+    method: "POST",
+    body: JSON.stringify({ tenant_id: tenantId ?? null }),
+  });
+}
+
+export async function streamChat(
+  request: ChatRequest,
+  callbacks: StreamCallbacks,
+): Promise<void> {
+  const res = await fetch(`${API_BASE}/chat`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(request),
+  });
+
+  if (!res.ok) {
+    const body = await res.json().catch(() => ({ detail: res.statusText }));
+    callbacks.onError(body.detail || "Chat request failed");
+    return;
+  }
+
+  if (!res.body) {
+    callbacks.onError("No response stream");
+    return;
+  }
+
+  await readEvents(res.body, (event, data) => {
+    switch (event) {
+      case "token":
+        callbacks.onToken((data as SSETokenEvent).token);
+        break;
+      case "sources":
+        callbacks.onSources(
+          (data as SSESourcesEvent).sources,
+          (data as SSESourcesEvent).truncated ?? false,
+        );
+        break;
+      case "done":
+        callbacks.onDone();
+        break;
+      case "error":
+        callbacks.onError((data as SSEErrorEvent).detail);
+        break;
+    }
+  });
+}
+
 // ── Health ─────────────────────────────────────────────
 
 export async function checkHealth(): Promise<HealthResponse> {
@@ -5,13 +5,16 @@
 
 // ── Enums ──────────────────────────────────────────────
 
-export type DocumentStatus = "uploading" | "processing" | "ready" | "failed";
+export type DocumentStatus = "uploading" | "processing" | "ready" | "failed" | "deleting";
+
+export type IngestionPriority = "interactive" | "bulk" | "background";
 
 // ── Document Types ─────────────────────────────────────
 
 export interface DocumentUploadResponse {
   id: string;
   filename: string;
+  tenant_id: string;
   status: DocumentStatus;
   created_at: string;
 }
@@ -19,17 +22,40 @@ export interface DocumentUploadResponse {
 export interface DocumentDetail {
   id: string;
   filename: string;
+  tenant_id: string;
   file_size: number;
   status: DocumentStatus;
   chunk_count: number;
   error_message: string | null;
   created_at: string;
   updated_at: string;
+  priority: IngestionPriority | null;
+  queue_position: number | null;
 }
 
 export interface DocumentListResponse {
   documents: DocumentDetail[];
   total: number;
+  next_cursor: string | null;
+}
+
+export interface DocumentListParams {
+  limit?: number;
+  cursor?: string;
+  status?: DocumentStatus;
+  filename_prefix?: string;
+  tenant_id?: string;
+}
+
+export interface UploadSessionResponse {
+  upload_id: string;
+  filename: string;
+  tenant_id: string;
+  size: number;
+  received: [number, number][]; // merged [start, end) byte ranges
+  received_bytes: number;
+  complete: boolean;
+  expires_at: string;
 }
 
 export interface DocumentDeleteResponse {
@@ -37,6 +63,11 @@ export interface DocumentDeleteResponse {
   message: string;
 }
 
+export interface BulkDeleteResponse {
+  accepted: string[];
+  not_found: string[];
+}
+
 // ── Chat Types ─────────────────────────────────────────
 
 export interface ChatMessage {
@@ -46,7 +77,24 @@ export interface ChatMessage {
 
 export interface ChatRequest {
   question: string;
-  chat_history: ChatMessage[];
+  session_id?: string | null;
+  chat_history?: ChatMessage[];
+  tenant_id?: string | null;
+  deadline_s?: number | null;
+}
+
+export interface ChatTurn {
+  question: string;
+  answer: string;
+  created_at: string;
+}
+
+export interface ChatSessionResponse {
+  session_id: string;
+  tenant_id: string;
+  turn_count: number;
+  created_at: string;
+  turns: ChatTurn[];
 }
 
 export interface SourceChunk {
@@ -56,6 +104,7 @@ export interface SourceChunk {
   page_or_section: string | null;
   chunk_index: number;
   relevance_score: number;
+  also_in?: string[];
 }
 
 export interface ChatResponse {
@@ -71,12 +120,27 @@ export interface SSETokenEvent {
 
 export interface SSESourcesEvent {
   sources: SourceChunk[];
+  truncated?: boolean;
+  degraded?: string[];
 }
 
 export interface SSEErrorEvent {
   detail: string;
 }
 
+export type ProcessingPhase = "queued" | "parsing" | "chunking" | "indexing";
+
+export interface DocumentStatusEvent {
+  document_id: string;
+  tenant_id: string;
+  status: DocumentStatus;
+  phase: ProcessingPhase | null;
+  progress: number;
+  chunk_count: number | null;
+  error_message: string | null;
+  timestamp: number;
+}
+
 // ── Health Types ───────────────────────────────────────
 
 export interface HealthResponse {